@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+"""
+Benchmark: motores do Intruder (ThreadPoolExecutor, asyncio e turbo)
+
+Um servidor asyncio local (em outro processo, para não disputar o GIL) responde
+cada requisição após um atraso fixo, simulando a latência de um alvo remoto. O
+servidor também faz o papel do proxy: o Intruder envia para ele as requisições
+em forma absoluta, como faria com o proxy do InteceptProxy. O motor turbo
+conecta direto no servidor, com pipelining: como o servidor responde em ordem
+em cada conexão, com atraso > 0 ele fica limitado a conexões / atraso; com
+atraso 0 mede-se o custo de cada motor por requisição.
+
+Mede, para o mesmo ataque: req/s, latência p50/p95/p99, taxa de erros e o pico
+de threads do processo.
+
+Uso:
+    python benchmarks/bench_async_engine.py [requisições] [atraso_ms]
+"""
+import asyncio
+import multiprocessing
+import os
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+
+from core.advanced_sender import AdvancedSender
+from core.rate_limiter import AdaptiveRateLimiter
+
+RESPONSE_BODY = b"<html><body><h1>Login</h1><p>Invalid credentials</p></body></html>"
+
+
+def serve(port_queue, delay: float):
+    """Servidor HTTP/1.1 keep-alive mínimo: responde 200 após `delay` segundos."""
+    response = (b"HTTP/1.1 200 OK\r\nContent-Type: text/html\r\nContent-Length: "
+                + str(len(RESPONSE_BODY)).encode() + b"\r\n\r\n" + RESPONSE_BODY)
+
+    async def handle(reader, writer):
+        try:
+            while True:
+                head = await reader.readuntil(b"\r\n\r\n")
+                for line in head.split(b"\r\n"):
+                    if line.lower().startswith(b"content-length:"):
+                        await reader.readexactly(int(line.split(b":", 1)[1]))
+                await asyncio.sleep(delay)
+                writer.write(response)
+                await writer.drain()
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+
+    async def main():
+        server = await asyncio.start_server(handle, "127.0.0.1", 0, backlog=4096)
+        port_queue.put(server.sockets[0].getsockname()[1])
+        await server.serve_forever()
+
+    asyncio.run(main())
+
+
+def run(port: int, count: int, **engine_options):
+    """Executa o ataque e devolve (resumo das métricas, pico de threads)."""
+    # O motor turbo não usa o proxy: o Host aponta direto para o servidor
+    host = f"127.0.0.1:{port}" if engine_options.get('engine') == 'turbo' else "127.0.0.1:8080"
+    sender = AdvancedSender(
+        raw_request=f"POST /login HTTP/1.1\nHost: {host}\nContent-Type: application/x-www-form-urlencoded\n\n"
+                    "user=admin&password=§senha§",
+        payload_sets=[[f"senha{i}" for i in range(count)]],
+        proxy_port=port,
+        # Sem teto de concorrência por host: o que limita é o próprio motor
+        rate_limiter=AdaptiveRateLimiter(max_concurrency=10000),
+        **engine_options,
+    )
+    peak_threads = threading.active_count()
+    running = True
+
+    def sample_threads():
+        nonlocal peak_threads
+        while running:
+            peak_threads = max(peak_threads, threading.active_count())
+            time.sleep(0.01)
+
+    sampler = threading.Thread(target=sample_threads, daemon=True)
+    sampler.start()
+    sender.run_attack()
+    running = False
+    sampler.join()
+    return sender.last_stats, peak_threads - 1  # sem a thread de amostragem
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    delay = (float(sys.argv[2]) if len(sys.argv) > 2 else 50) / 1000
+
+    port_queue = multiprocessing.Queue()
+    server = multiprocessing.Process(target=serve, args=(port_queue, delay), daemon=True)
+    server.start()
+    port = port_queue.get(timeout=10)
+
+    print(f"{count} requisições, servidor local com {delay * 1000:.0f} ms de latência")
+    print(f"  {'motor':<22} {'req/s':>8} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'erros':>7} {'threads':>8}")
+    configs = [
+        ("threads (10)", {'engine': 'threads', 'num_threads': 10}),
+        ("threads (100)", {'engine': 'threads', 'num_threads': 100}),
+        ("async (100 em voo)", {'engine': 'async', 'in_flight': 100}),
+        ("async (500 em voo)", {'engine': 'async', 'in_flight': 500}),
+        ("turbo (4 x 32)", {'engine': 'turbo', 'connections': 4, 'pipeline': 32}),
+        ("turbo (16 x 64)", {'engine': 'turbo', 'connections': 16, 'pipeline': 64}),
+    ]
+    try:
+        for name, options in configs:
+            stats, threads = run(port, count, **options)
+            latency = stats['latency_ms']
+            print(f"  {name:<22} {stats['requests_per_second']:>8,.0f} {latency['p50']:>8.1f} {latency['p95']:>8.1f} "
+                  f"{latency['p99']:>8.1f} {stats['error_rate']:>7.1%} {threads:>8}")
+    finally:
+        server.terminate()
+
+
+if __name__ == '__main__':
+    main()
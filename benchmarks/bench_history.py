@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+"""
+Benchmark: histórico em lista (busca linear + pop(0)) vs. ring buffer indexado
+
+Mede, com 1k, 100k e 1M entradas no histórico:
+  - add_request com o histórico cheio (evicção da entrada mais antiga)
+  - get_new_entries com poucas entradas novas (o polling da GUI a cada segundo)
+  - get_entry_by_id de uma entrada antiga
+
+Uso:
+    python benchmarks/bench_history.py [repetições]
+"""
+import os
+import sys
+import time
+from types import SimpleNamespace
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+
+from core.history import RequestHistory
+
+
+SIZES = [("1k", 1_000), ("100k", 100_000), ("1M", 1_000_000)]
+
+
+class LegacyRequestHistory(RequestHistory):
+    """Reproduz a implementação anterior: lista, pop(0) e buscas lineares."""
+
+    def __init__(self):
+        super().__init__()
+        self.history = []
+
+    def add_request(self, flow, vulnerabilities=None):
+        with self.lock:
+            self.current_id += 1
+            self.history.append({'id': self.current_id, 'url': flow.request.pretty_url, 'vulnerabilities': []})
+            if len(self.history) > self.max_items:
+                self.history.pop(0)
+        return self.current_id
+
+    def get_new_entries(self, last_id=0):
+        if not last_id or not self.history:
+            return self.history
+        first_new_index = -1
+        for i, entry in enumerate(reversed(self.history)):
+            if entry['id'] <= last_id:
+                break
+            first_new_index = len(self.history) - 1 - i
+        return self.history[first_new_index:] if first_new_index != -1 else []
+
+    def get_entry_by_id(self, entry_id):
+        for entry in reversed(self.history):
+            if entry['id'] == entry_id:
+                return entry
+        return None
+
+
+class RingRequestHistory(RequestHistory):
+    """Ring buffer atual, com entradas mínimas para isolar o custo da estrutura."""
+
+    def add_request(self, flow, vulnerabilities=None):
+        with self.lock:
+            self.current_id += 1
+            entry = {'id': self.current_id, 'url': flow.request.pretty_url, 'vulnerabilities': []}
+            self.history.append(entry)
+            self.entries_by_id[entry['id']] = entry
+            while len(self.history) > self.max_items:
+                evicted = self.history.popleft()
+                del self.entries_by_id[evicted['id']]
+        return self.current_id
+
+
+FLOW = SimpleNamespace(request=SimpleNamespace(pretty_url="http://exemplo.com/"))
+
+
+def fill(history_cls, size):
+    history = history_cls()
+    history.max_items = size
+    for _ in range(size):
+        history.add_request(FLOW)
+    return history
+
+
+def measure(func, repeats):
+    start = time.perf_counter()
+    for _ in range(repeats):
+        func()
+    return (time.perf_counter() - start) / repeats
+
+
+def main():
+    repeats = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+
+    print("=" * 78)
+    print("Histórico - lista com busca linear vs. ring buffer indexado (µs por operação)")
+    print("=" * 78)
+    print(f"{'Entradas':<10}{'Operação':<22}{'Lista':>14}{'Ring buffer':>16}{'Speedup':>12}")
+    print("-" * 78)
+
+    for label, size in SIZES:
+        legacy = fill(LegacyRequestHistory, size)
+        ring = fill(RingRequestHistory, size)
+
+        # O polling da GUI: 10 entradas novas desde o último ID conhecido
+        last_id = legacy.current_id - 10
+        oldest_id = legacy.current_id - size + 1
+        operations = [
+            ("add_request (cheio)", lambda h: h.add_request(FLOW)),
+            ("get_new_entries", lambda h: h.get_new_entries(h.current_id - 10)),
+            ("get_entry_by_id", lambda h: h.get_entry_by_id(h.current_id - size + 1)),
+        ]
+        assert len(legacy.get_new_entries(last_id)) == len(ring.get_new_entries(last_id)) == 10
+        assert legacy.get_entry_by_id(oldest_id)['id'] == ring.get_entry_by_id(oldest_id)['id']
+
+        reps = repeats if size < 1_000_000 else max(1, repeats // 10)
+        for name, operation in operations:
+            legacy_time = measure(lambda: operation(legacy), reps)
+            ring_time = measure(lambda: operation(ring), reps)
+            print(f"{label:<10}{name:<22}{legacy_time * 1e6:>11.2f} µs{ring_time * 1e6:>13.2f} µs"
+                  f"{legacy_time / ring_time:>11.1f}x")
+        print("-" * 78)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+"""
+Relatório de memória: histórico com bodies decodificados na captura vs. bytes crus
+(sem compressão, com zlib e, se instalado, com zstd)
+
+Carrega um corpus gravado (arquivo do `mitmdump -w`) ou, sem argumento, um corpus
+sintético com a mistura típica de uma sessão (HTML, JSON, JS, imagens e fontes),
+e mede com tracemalloc a memória retida pelo histórico em cada modo.
+
+Uso:
+    python benchmarks/bench_history_memory.py [fluxos.mitm]
+"""
+import os
+import random
+import sys
+import time
+import tracemalloc
+from types import SimpleNamespace
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+
+from core.compression import ZSTD_AVAILABLE, BodyCompressor
+from core.history import RequestHistory
+
+
+class EagerRequestHistory(RequestHistory):
+    """Reproduz o comportamento anterior: os bodies viram str no momento da captura."""
+
+    def __init__(self):
+        super().__init__(compress_bodies=False)
+
+    def add_request(self, flow, vulnerabilities=None):
+        entry_id = super().add_request(flow, vulnerabilities)
+        entry = self.get_entry_by_id(entry_id)
+        entry['request_body'] = flow.request.content.decode('utf-8', errors='ignore') if flow.request.content else ''
+        entry['response_body'] = flow.response.content.decode('utf-8', errors='ignore') if flow.response.content else ''
+        dict.pop(entry, 'request_body_raw')
+        dict.pop(entry, 'response_body_raw')
+        return entry_id
+
+
+def synthetic_corpus(count: int = 1000):
+    """Gera fluxos com tamanhos e tipos de conteúdo parecidos com uma navegação real."""
+    rng = random.Random(42)
+    texts = ["conteúdo çã", "ação rápida", "价格 ✓"]
+    kinds = [
+        ("text/html; charset=utf-8", lambda n: (f"<div class='item'>{rng.choice(texts)}</div>\n" * (n // 36)).encode('utf-8')),
+        ("application/json", lambda n: ('{"id": 1, "nome": "usuário", "ativo": true}, ' * (n // 46)).encode('utf-8')),
+        ("application/javascript", lambda n: ("function f(a){return a+1};\n" * (n // 28)).encode('ascii')),
+        ("image/png", lambda n: rng.randbytes(n)),
+        ("font/woff2", lambda n: rng.randbytes(n)),
+    ]
+    for i in range(count):
+        content_type, make_body = kinds[i % len(kinds)]
+        size = rng.choice([2 * 1024, 20 * 1024, 200 * 1024])
+        yield SimpleNamespace(
+            request=SimpleNamespace(pretty_host="exemplo.com", method="GET", path=f"/recurso/{i}",
+                                    pretty_url=f"http://exemplo.com/recurso/{i}",
+                                    headers={"User-Agent": "bench"}, content=b""),
+            response=SimpleNamespace(status_code=200, headers={"Content-Type": content_type},
+                                     content=make_body(size)),
+        )
+
+
+def recorded_corpus(path: str):
+    """Lê os fluxos HTTP de um arquivo gravado pelo mitmproxy."""
+    from mitmproxy import http, io
+
+    with open(path, 'rb') as f:
+        for flow in io.FlowReader(f).stream():
+            if isinstance(flow, http.HTTPFlow) and flow.response:
+                yield flow
+
+
+def measure(make_history, make_flows):
+    """
+    Captura os fluxos um a um (cada fluxo é descartado depois, como no proxy) e
+    retorna (fluxos, bytes de body, memória retida pelo histórico, tempo gasto no add_request).
+    """
+    history = make_history()
+    history.max_items = sys.maxsize
+    count = body_bytes = 0
+    elapsed = 0.0
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    for flow in make_flows():
+        count += 1
+        body_bytes += len(flow.request.content or b'') + len(flow.response.content or b'')
+        start = time.perf_counter()
+        history.add_request(flow)
+        elapsed += time.perf_counter() - start
+    del flow
+    retained = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+    return count, body_bytes, retained, elapsed, history
+
+
+def main():
+    if len(sys.argv) > 1:
+        make_flows = lambda: recorded_corpus(sys.argv[1])
+        source = sys.argv[1]
+    else:
+        make_flows = synthetic_corpus
+        source = "corpus sintético"
+
+    modes = [
+        ("Decodificado na captura (antes)", EagerRequestHistory),
+        ("Bytes crus, texto sob demanda", lambda: RequestHistory(compress_bodies=False)),
+        ("Bytes crus + zlib (> 1 KB)", lambda: RequestHistory(compressor=BodyCompressor('zlib'))),
+    ]
+    if ZSTD_AVAILABLE:
+        modes.append(("Bytes crus + zstd (> 1 KB)", lambda: RequestHistory(compressor=BodyCompressor('zstd'))))
+
+    results = []
+    for name, make_history in modes:
+        count, body_bytes, retained, elapsed, history = measure(make_history, make_flows)
+        results.append((name, retained, elapsed, history.get_stats()['compression']))
+
+    print("=" * 78)
+    print(f"Memória do histórico - {source}: {count} fluxos, {body_bytes / 1024 / 1024:.1f} MB de bodies")
+    print("=" * 78)
+    print(f"{'Modo':<34}{'Memória retida':>18}{'add_request':>14}{'Taxa':>10}")
+    print("-" * 78)
+    for name, retained, elapsed, compression in results:
+        ratio = f"{compression['ratio']:.1f}x" if compression else "-"
+        print(f"{name:<34}{retained / 1024 / 1024:>15.1f} MB{elapsed * 1000:>11.1f} ms{ratio:>10}")
+    print("=" * 78)
+
+
+if __name__ == "__main__":
+    main()
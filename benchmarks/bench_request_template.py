@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""
+Benchmark: template pré-compilado vs. reanálise da requisição crua
+
+Mede requisições geradas por segundo no Intruder (payloads -> método, URL,
+headers e body prontos para envio):
+  - caminho antigo: replace_positions (regex §...§ na requisição inteira) +
+    nova separação de head/body, headers e URL a cada requisição;
+  - caminho novo: RequestTemplate.build(), que só preenche os slots.
+
+Uso:
+    python benchmarks/bench_request_template.py [requisições]
+"""
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+
+from core.advanced_sender import PayloadPositionParser
+from core.request_template import RequestTemplate
+
+RAW_REQUEST = (
+    "POST /api/v1/login?next=§/dashboard§ HTTP/1.1\n"
+    "Host: app.example.com\n"
+    "User-Agent: Mozilla/5.0 (X11; Linux x86_64; rv:128.0) Gecko/20100101 Firefox/128.0\n"
+    "Accept: text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8\n"
+    "Accept-Language: pt-BR,pt;q=0.8,en-US;q=0.5,en;q=0.3\n"
+    "Accept-Encoding: gzip, deflate, br\n"
+    "Content-Type: application/x-www-form-urlencoded\n"
+    "Origin: https://app.example.com\n"
+    "Referer: https://app.example.com/login\n"
+    "Cookie: session=8f14e45fceea167a5a36dedd4bea2543; theme=dark; lang=pt-BR\n"
+    "Connection: keep-alive\n"
+    "\n"
+    "username=§admin§&password=§password§&remember=1&csrf=" + "a1b2c3d4" * 8
+)
+
+
+def legacy_build(raw_request: str, payloads):
+    """Caminho anterior: substitui os marcadores e reanalisa a requisição inteira (send_request antigo)."""
+    raw = PayloadPositionParser.replace_positions(raw_request, payloads)
+    head, body = raw.strip().split('\n\n', 1) if '\n\n' in raw else (raw.strip(), "")
+    request_lines = head.split('\n')
+    method, path, _ = request_lines[0].split(' ')
+    headers = {}
+    for line in request_lines[1:]:
+        if ':' in line:
+            key, value = line.split(':', 1)
+            headers[key.strip()] = value.strip()
+    host = headers.get("Host")
+    scheme = "http" if host.startswith(('127.0.0.1', 'localhost', '192.168.', '10.', '172.')) else "https"
+    headers_to_send = {k: v for k, v in headers.items() if k.lower() not in ['host', 'content-length']}
+    return method, f"{scheme}://{host}{path}", headers_to_send, body.encode('utf-8') if body else None
+
+
+def rate(func, payload_list) -> float:
+    start = time.perf_counter()
+    for payloads in payload_list:
+        func(payloads)
+    return len(payload_list) / (time.perf_counter() - start)
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    payload_list = [[f"/p{i}", f"user{i}", f"senha{i}"] for i in range(count)]
+
+    template = RequestTemplate(RAW_REQUEST)
+    sample = payload_list[count // 2]
+    new = template.build(sample)
+    assert legacy_build(RAW_REQUEST, sample) == (new.method, new.url, new.headers, new.body)
+
+    legacy_rate = rate(lambda payloads: legacy_build(RAW_REQUEST, payloads), payload_list)
+    template_rate = rate(template.build, payload_list)
+    render_rate = rate(template.render, payload_list)
+
+    print(f"{count} requisições com {template.num_positions} posições e {RAW_REQUEST.count(chr(10))} linhas")
+    print(f"  antigo (regex + reanálise): {legacy_rate:>12,.0f} req/s")
+    print(f"  template.build():          {template_rate:>12,.0f} req/s ({template_rate / legacy_rate:.1f}x)")
+    print(f"  template.render() (texto): {render_rate:>12,.0f} req/s")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+"""
+Benchmark: impressão digital de respostas vs. difflib
+
+Mede, para bodies de 1 KB, 100 KB e 1 MB:
+  - o custo de calcular a impressão digital (uma vez por resposta);
+  - o custo de comparar 200 respostas com uma base, como o Intruder faz:
+    SequenceMatcher.ratio() por par vs. similarity() entre impressões (O(1)).
+
+Uso:
+    python benchmarks/bench_response_fingerprint.py [repetições]
+"""
+import difflib
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+
+from core.response_fingerprint import fingerprint
+
+
+SIZES = [("1 KB", 1024), ("100 KB", 100 * 1024), ("1 MB", 1024 * 1024)]
+COMPARISONS = 200
+
+
+def build_body(size: int, seed: int) -> str:
+    """HTML sintético com vocabulário variado e partes dinâmicas (IDs)."""
+    rng = random.Random(seed)
+    vocab = ["".join(rng.choice("abcdefghijklmnopqrstuvwxyz") for _ in range(rng.randint(2, 9))) for _ in range(3000)]
+    parts = []
+    total = 0
+    while total < size:
+        line = f"<div class=\"item\" id=\"row{rng.randint(1, 10 ** 6)}\">{' '.join(rng.choice(vocab) for _ in range(8))}</div>"
+        parts.append(line)
+        total += len(line) + 1
+    return "\n".join(parts)[:size]
+
+
+def timed(func, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    repeat = int(sys.argv[1]) if len(sys.argv) > 1 else 3
+    print(f"{'Body':>8} | {'impressão':>10} | {'difflib x' + str(COMPARISONS):>14} | {'similarity x' + str(COMPARISONS):>17}")
+    for label, size in SIZES:
+        base = build_body(size, 1)
+        other = build_body(size, 2)
+        base_fp = fingerprint(base)
+        other_fp = fingerprint(other)
+
+        fingerprint_time = timed(lambda: fingerprint(base), repeat)
+        # difflib é quadrático no pior caso: limita a medição a poucas comparações e extrapola
+        sample = max(1, min(COMPARISONS, 2_000_000 // size))
+        difflib_time = timed(lambda: [difflib.SequenceMatcher(None, base, other).quick_ratio()
+                                      for _ in range(sample)], 1) * COMPARISONS / sample
+        similarity_time = timed(lambda: [base_fp.similarity(other_fp) for _ in range(COMPARISONS)], repeat)
+
+        print(f"{label:>8} | {fingerprint_time * 1000:>8.2f}ms | {difflib_time * 1000:>12.1f}ms | "
+              f"{similarity_time * 1000:>15.3f}ms")
+
+
+if __name__ == '__main__':
+    main()
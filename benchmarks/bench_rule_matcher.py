@@ -0,0 +1,166 @@
+#!/usr/bin/env python3
+"""
+Benchmark: regras de interceptação - loop por regra vs. índice compilado
+
+Mede o custo do hook `request` (casamento das regras + reescrita da query e do
+body form-urlencoded) com 10, 100 e 1000 regras configuradas:
+  - loop antigo: normaliza host/path, reparseia query e body a cada regra
+  - CompiledRuleMatcher: uma busca na trie de hosts + índice de paths, um parse, uma reescrita
+
+Uso:
+    python benchmarks/bench_rule_matcher.py [requisições]
+"""
+import os
+import random
+import sys
+import time
+from urllib.parse import parse_qs, urlencode, urlparse
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+
+from core.rule_matcher import CompiledRuleMatcher
+
+
+RULE_COUNTS = [10, 100, 1000]
+
+
+class FakeRequest:
+    """Requisição mínima com a mesma interface usada pelo addon."""
+
+    def __init__(self, host, path, query, body):
+        self.pretty_host = host
+        self.path = path
+        self.pretty_url = f"http://{host}{path}"
+        self.query = dict(query)
+        self.method = "POST"
+        self.headers = {"content-type": "application/x-www-form-urlencoded"}
+        self.content = body
+
+
+def build_rules(count, rng):
+    rules = []
+    for i in range(count):
+        rules.append({
+            'host': f"app{i % 50}.exemplo{i % 7}.com",
+            'path': rng.choice(['/api', '/login', '/conta', '/busca', '']),
+            'param_name': f"param{i % 20}",
+            'param_value': f"valor{i}",
+            'enabled': True,
+        })
+    # Regras que realmente casam com o tráfego do benchmark
+    rules[0] = {'host': 'alvo.com', 'path': '/api', 'param_name': 'id', 'param_value': '1', 'enabled': True}
+    rules[-1] = {'host': 'alvo.com', 'path': '', 'param_name': 'token', 'param_value': 'x', 'enabled': True}
+    return rules
+
+
+def split_host_and_path(raw_host):
+    if not raw_host:
+        return "", ""
+    parsed = urlparse(raw_host) if "://" in raw_host else urlparse(f"//{raw_host}")
+    host = (parsed.hostname or parsed.netloc or "").lower()
+    extra_path = parsed.path if (parsed.scheme or parsed.netloc) else ""
+    return host or raw_host.lower(), extra_path
+
+
+def legacy_request(rules, request):
+    """Reproduz o loop por regra do InterceptAddon.request anterior."""
+    for rule in rules:
+        if not rule.get('enabled', True):
+            continue
+        rule_host, host_path = split_host_and_path(rule.get('host', ''))
+        rule_path = rule.get('path', '') or host_path or ""
+        if rule_path and not rule_path.startswith('/'):
+            rule_path = f"/{rule_path}"
+        host = request.pretty_host.lower()
+        host_match = not rule_host or host == rule_host or host.endswith(f".{rule_host}")
+        path_match = True if not rule_path else request.path.startswith(rule_path)
+        if host_match and path_match:
+            if request.query:
+                query_dict = dict(request.query)
+                if rule['param_name'] in query_dict:
+                    query_dict[rule['param_name']] = rule['param_value']
+                    request.query.clear()
+                    request.query.update(query_dict)
+            if request.method == "POST" and request.content:
+                params = parse_qs(request.content.decode('utf-8', errors='ignore'), keep_blank_values=True)
+                if rule['param_name'] in params:
+                    params[rule['param_name']] = [rule['param_value']]
+                    request.content = urlencode(params, doseq=True).encode('utf-8')
+
+
+def compiled_request(matcher, request):
+    """Mesmo trabalho com o índice compilado (espelha o InterceptAddon.request atual)."""
+    matched_rules = matcher.match(request.pretty_host, request.path)
+    if not matched_rules:
+        return
+    if request.query:
+        query_dict = dict(request.query)
+        applied = [rule for rule in matched_rules if rule['param_name'] in query_dict]
+        if applied:
+            for rule in applied:
+                query_dict[rule['param_name']] = rule['param_value']
+            request.query.clear()
+            request.query.update(query_dict)
+    if request.method == "POST" and request.content:
+        params = parse_qs(request.content.decode('utf-8', errors='ignore'), keep_blank_values=True)
+        applied = [rule for rule in matched_rules if rule['param_name'] in params]
+        if applied:
+            for rule in applied:
+                params[rule['param_name']] = [rule['param_value']]
+            request.content = urlencode(params, doseq=True).encode('utf-8')
+
+
+def build_traffic(count, rng):
+    traffic = []
+    for i in range(count):
+        host = rng.choice(['alvo.com', 'www.alvo.com', 'app3.exemplo3.com', 'cdn.outro.net'])
+        path = rng.choice(['/api/v1/usuarios?id=7', '/login', '/busca?q=teste', '/static/app.js'])
+        traffic.append((host, path, {'id': '7', 'q': 'teste'}, b"id=7&token=abc&nome=fulano"))
+    return traffic
+
+
+def main():
+    requests_count = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    rng = random.Random(1)
+    traffic = build_traffic(requests_count, rng)
+
+    print("=" * 76)
+    print("Regras de interceptação - custo médio do hook request (µs por requisição)")
+    print("=" * 76)
+    print(f"{'Regras':<10}{'Loop por regra':>18}{'Compilado':>16}{'Compilação':>16}{'Speedup':>12}")
+    print("-" * 76)
+
+    for count in RULE_COUNTS:
+        rules = build_rules(count, rng)
+
+        start = time.perf_counter()
+        matcher = CompiledRuleMatcher(rules)
+        compile_time = time.perf_counter() - start
+
+        # Os dois caminhos devem produzir exatamente a mesma reescrita
+        for host, path, query, body in traffic[:200]:
+            legacy_req, compiled_req = FakeRequest(host, path, query, body), FakeRequest(host, path, query, body)
+            legacy_request(rules, legacy_req)
+            compiled_request(matcher, compiled_req)
+            assert (legacy_req.query, legacy_req.content) == (compiled_req.query, compiled_req.content)
+
+        requests_legacy = [FakeRequest(*item) for item in traffic]
+        start = time.perf_counter()
+        for request in requests_legacy:
+            legacy_request(rules, request)
+        legacy = (time.perf_counter() - start) / len(traffic)
+
+        requests_compiled = [FakeRequest(*item) for item in traffic]
+        start = time.perf_counter()
+        for request in requests_compiled:
+            compiled_request(matcher, request)
+        compiled = (time.perf_counter() - start) / len(traffic)
+
+        print(f"{count:<10}{legacy * 1e6:>15.1f} µs{compiled * 1e6:>13.1f} µs"
+              f"{compile_time * 1000:>13.2f} ms{legacy / compiled:>11.1f}x")
+
+    print("=" * 76)
+
+
+if __name__ == "__main__":
+    main()
@@ -24,27 +24,46 @@ config_instance = InterceptConfig()
 from core.history import RequestHistory
 history_instance = RequestHistory()
 from core.addon import InterceptAddon
+from core.active_scanner import ActiveScanner
+from core.scan_cache import DEFAULT_CACHE_FILE as SCAN_CACHE_FILE
 addon_instance = InterceptAddon(config_instance, history_instance)
 
 
 @cli.command('scan')
 @click.argument('request_id', type=int)
-def scan_request(request_id):
+@click.option('--history-db', type=click.Path(), default=None, help="Banco SQLite gravado pelo 'run --history-db'.")
+@click.option('--workers', type=int, default=8, show_default=True, help="Máximo de requisições de teste simultâneas.")
+@click.option('--per-host', type=int, default=4, show_default=True, help="Máximo de requisições de teste simultâneas por host.")
+@click.option('--cache-file', type=click.Path(), default=SCAN_CACHE_FILE, show_default=True,
+              help="Cache dos pontos de inserção já testados.")
+@click.option('--force', is_flag=True, help="Ignora o cache e testa de novo todos os parâmetros.")
+def scan_request(request_id, history_db, workers, per_host, cache_file, force):
     """
     Executa o Scanner Ativo em uma requisição do histórico.
 
     Nota: O proxy precisa ter capturado requisições na sessão atual
-    para que o histórico contenha itens a serem escaneados.
+    para que o histórico contenha itens a serem escaneados, ou o histórico
+    precisa ter sido persistido com 'run --history-db'.
     """
+    global history_instance, addon_instance
+    if history_db:
+        from core.sqlite_history import SQLiteRequestHistory
+        history_instance = SQLiteRequestHistory(history_db)
+        addon_instance = InterceptAddon(config_instance, history_instance)
+    if workers < 1 or per_host < 1:
+        click.echo(click.style("--workers e --per-host devem ser maiores que zero.", fg="red"))
+        return
+    addon_instance.active_scanner = ActiveScanner(max_workers=workers, max_per_host=per_host, cache_file=cache_file)
+
     click.echo(f"Executando varredura ativa na requisição ID: {request_id}...")
 
     # Simula a captura de alguns dados para que o histórico não esteja vazio
     if not history_instance.get_history():
         click.echo(click.style("Histórico vazio. O proxy precisa capturar tráfego primeiro.", fg="yellow"))
-        click.echo("Para fins de demonstração, o histórico não é persistido entre execuções.")
+        click.echo("Use 'run --history-db arquivo.db' para persistir o histórico entre execuções.")
         return
 
-    addon_instance.run_active_scan_on_request(request_id)
+    addon_instance.run_active_scan_on_request(request_id, force=force)
 
     entry = history_instance.get_entry_by_id(request_id)
     if entry and entry['vulnerabilities']:
@@ -55,6 +74,88 @@ def scan_request(request_id):
         click.echo(click.style("✓ Varredura concluída. Nenhuma nova vulnerabilidade encontrada.", fg="green"))
 
 
+@cli.command('scan-bulk')
+@click.option('--history-db', type=click.Path(), default=None, help="Banco SQLite gravado pelo 'run --history-db'.")
+@click.option('--host', default=None, help="Varre apenas este host (e subdomínios).")
+@click.option('--method', default=None, help="Varre apenas este método HTTP.")
+@click.option('--status', type=int, default=None, help="Varre apenas respostas com este status.")
+@click.option('--checkpoint', type=click.Path(), default="scan_job.json", show_default=True,
+              help="Arquivo de checkpoint atualizado a cada endpoint concluído.")
+@click.option('--resume', is_flag=True, help="Retoma o job salvo em --checkpoint.")
+@click.option('--jobs', 'job_workers', type=int, default=2, show_default=True, help="Endpoints varridos ao mesmo tempo.")
+@click.option('--workers', type=int, default=8, show_default=True, help="Máximo de requisições de teste simultâneas.")
+@click.option('--per-host', type=int, default=4, show_default=True, help="Máximo de requisições de teste simultâneas por host.")
+@click.option('--cache-file', type=click.Path(), default=SCAN_CACHE_FILE, show_default=True,
+              help="Cache dos pontos de inserção já testados.")
+@click.option('--force', is_flag=True, help="Ignora o cache e testa de novo todos os parâmetros.")
+def scan_bulk(history_db, host, method, status, checkpoint, resume, job_workers, workers, per_host, cache_file, force):
+    """
+    Executa o Scanner Ativo em todas as requisições do histórico que passam pelo filtro.
+
+    Endpoints repetidos (mesmo método, path e nomes de parâmetros) são varridos uma vez.
+    Interrompa com Ctrl+C e continue depois com --resume.
+    """
+    from core.scan_jobs import BulkScanJob, targets_from_history
+
+    history = history_instance
+    if history_db:
+        from core.sqlite_history import SQLiteRequestHistory
+        history = SQLiteRequestHistory(history_db)
+    if job_workers < 1 or workers < 1 or per_host < 1:
+        click.echo(click.style("--jobs, --workers e --per-host devem ser maiores que zero.", fg="red"))
+        return
+    scanner = ActiveScanner(max_workers=workers, max_per_host=per_host, cache_file=cache_file)
+
+    if resume:
+        if not os.path.exists(checkpoint):
+            click.echo(click.style(f"Checkpoint não encontrado: {checkpoint}", fg="red"))
+            return
+        job = BulkScanJob.from_checkpoint(checkpoint, scanner, workers=job_workers, history=history)
+        job.force = job.force or force
+    else:
+        targets = targets_from_history(history, host=host, method=method, status=status)
+        if not targets:
+            click.echo(click.style("Nenhuma requisição do histórico passa pelo filtro.", fg="yellow"))
+            click.echo("Use 'run --history-db arquivo.db' para persistir o histórico entre execuções.")
+            return
+        job = BulkScanJob(scanner, targets, workers=job_workers, checkpoint_file=checkpoint, history=history,
+                          force=force)
+
+    progress = job.get_progress()
+    click.echo(f"Varrendo {progress['remaining']} de {progress['total']} endpoint(s) "
+               f"({progress['duplicates']} repetido(s) descartado(s))...")
+    job.start()
+    try:
+        while not job.wait(timeout=2):
+            progress = job.get_progress()
+            eta = f"{progress['eta']:.0f}s" if progress['eta'] is not None else "-"
+            click.echo(f"  {progress['completed']}/{progress['total']} ({progress['percent']:.0f}%) "
+                       f"- {progress['findings']} vulnerabilidade(s) - ETA {eta}")
+    except KeyboardInterrupt:
+        job.cancel()
+        job.wait()
+        job.save_checkpoint()
+        click.echo(click.style(f"\nJob interrompido. Continue com: python cli.py scan-bulk --resume --checkpoint {checkpoint}", fg="yellow"))
+        return
+    finally:
+        scanner.close()
+
+    progress = job.get_progress()
+    click.echo(click.style(f"✓ Job concluído: {progress['completed']} endpoint(s), "
+                           f"{progress['findings']} vulnerabilidade(s).", fg="green"))
+    for vuln in job.findings:
+        click.echo(f"  - [{vuln['severity']}] {vuln['type']} em {vuln['url']}")
+    for target_host, stats in scanner.rate_limiter.get_stats().items():
+        limit = 'sem limite' if stats['rate_limit'] is None else f"limite final {stats['rate_limit']:.1f} req/s"
+        click.echo(f"  Limitador {target_host}: {stats['sent']} envio(s), {stats['throttled']} resposta(s) 429/503, "
+                   f"{stats['errors']} erro(s), {limit}")
+    transport_stats = scanner.transport.get_stats()
+    if transport_stats['requests']:
+        click.echo(f"  Conexões: {transport_stats['requests']} requisição(ões) em {transport_stats['connections']} "
+                   f"conexão(ões) (reuso {transport_stats['reuse_rate']:.0%}), "
+                   f"{transport_stats['tls_handshakes']} handshake(s) TLS")
+
+
 @cli.command('list')
 def list_rules():
     """Lista todas as regras de interceptação configuradas."""
@@ -162,7 +263,8 @@ def get_port():
 
 @cli.command('run')
 @click.option('--port', type=int, default=None, help="Porta para o proxy escutar (padrão: configuração salva ou 9507)")
-def run_proxy(port):
+@click.option('--history-db', type=click.Path(), default=None, help="Persiste o histórico neste banco SQLite.")
+def run_proxy(port, history_db):
     """Inicia o proxy em modo headless."""
     config = InterceptConfig()
     
@@ -184,7 +286,7 @@ def run_proxy(port):
     log.info(f"Proxy (CLI) iniciando na porta {actual_port}...")
     loop = asyncio.get_event_loop()
     try:
-        loop.run_until_complete(start_proxy_headless(config, actual_port))
+        loop.run_until_complete(start_proxy_headless(config, actual_port, history_db))
     except KeyboardInterrupt:
         click.echo("\n✓ Proxy encerrado pelo usuário.")
         log.info("Proxy (CLI) encerrado pelo usuário.")
@@ -193,11 +295,20 @@ def run_proxy(port):
         log.error(f"Erro ao executar proxy (CLI): {e}", exc_info=True)
 
 
-async def start_proxy_headless(config, port):
+async def start_proxy_headless(config, port, history_db=None):
     """Função assíncrona para iniciar o mitmdump."""
     proxy_options = options.Options(listen_host='127.0.0.1', listen_port=port)
     master = DumpMaster(proxy_options, with_termlog=True, with_dumper=False)
-    master.addons.add(InterceptAddon(config))
+
+    # Regras editadas no arquivo (ou via 'add'/'toggle' em outro terminal) valem sem reiniciar o proxy
+    config.start_watching()
+
+    history = None
+    if history_db:
+        from core.sqlite_history import SQLiteRequestHistory
+        history = SQLiteRequestHistory(history_db)
+        click.echo(click.style(f"Histórico persistido em {history_db}", fg="cyan"))
+    master.addons.add(InterceptAddon(config, history))
 
     click.echo(click.style(f"\nProxy escutando em http://127.0.0.1:{port}", fg="green"))
     click.echo("Pressione Ctrl+C para parar.")
@@ -236,5 +347,96 @@ def send_requests(url, file_path, param_name, threads):
     run_sender(url, file_path, param_name, threads)
 
 
+
+def _parse_shard(ctx, param, value):
+    """Converte 'K/N' (K de 1 a N) em (índice do shard, total de shards)."""
+    if value is None:
+        return None
+    try:
+        shard, shards = (int(part) for part in value.split('/'))
+    except ValueError:
+        raise click.BadParameter("use o formato K/N, ex.: 2/4")
+    if not 1 <= shard <= shards:
+        raise click.BadParameter("K deve estar entre 1 e N")
+    return shard - 1, shards
+
+
+@cli.command('intruder')
+@click.option('--request', 'request_file', required=True, type=click.Path(exists=True),
+              help="Arquivo com a requisição crua e as posições marcadas com §...§.")
+@click.option('--attack', 'attack_type', default='sniper', show_default=True,
+              type=click.Choice(['sniper', 'battering_ram', 'pitchfork', 'cluster_bomb']))
+@click.option('--payloads', 'payload_files', required=True, multiple=True, type=click.Path(exists=True),
+              help="Arquivo de payloads (repita a opção para cada posição).")
+@click.option('--threads', type=int, default=10, show_default=True, help="Número de threads simultâneas.")
+@click.option('--engine', default='threads', show_default=True,
+              type=click.Choice(['threads', 'async', 'turbo', 'h2']),
+              help="threads: pool de --threads threads; async: um event loop com até --in-flight requisições; "
+                   "turbo: pipelining HTTP/1.1 direto no alvo; h2: streams HTTP/2 multiplexados direto no alvo "
+                   "(turbo e h2 não passam pelo proxy).")
+@click.option('--in-flight', 'in_flight', type=int, default=500, show_default=True,
+              help="Requisições simultâneas do motor async.")
+@click.option('--connections', type=int, default=4, show_default=True,
+              help="Conexões persistentes dos motores turbo e h2.")
+@click.option('--pipeline', type=int, default=32, show_default=True,
+              help="Requisições enviadas à frente das respostas em cada conexão do motor turbo.")
+@click.option('--streams', type=int, default=100, show_default=True,
+              help="Streams simultâneos em cada conexão do motor h2 (também limitado pelo servidor).")
+@click.option('--race', 'race_size', type=int, default=0, show_default=True,
+              help="Motores turbo e h2: envia em grupos de N liberados no mesmo instante "
+                   "(turbo: último byte; h2: frames finais em um único pacote).")
+@click.option('--shard', callback=_parse_shard, default=None,
+              help="Executa só a parte K de N do ataque (ex.: 2/4), para dividir entre processos ou máquinas.")
+@click.option('--checkpoint', type=click.Path(), default=None,
+              help="Arquivo de checkpoint; se já existir, o ataque continua de onde parou.")
+def intruder(request_file, attack_type, payload_files, threads, engine, in_flight, connections, pipeline, streams,
+             race_size, shard, checkpoint):
+    """
+    Executa um ataque do Intruder pelo proxy em execução ('run' em outro terminal).
+
+    Todos os processos de um ataque dividido com --shard devem usar a mesma
+    requisição, tipo de ataque e arquivos de payload.
+    """
+    from core.advanced_sender import AdvancedSender, load_payloads_from_file
+    from core.send_stats import format_summary
+
+    with open(request_file, 'r', encoding='utf-8') as f:
+        raw_request = f.read()
+    try:
+        sender = AdvancedSender(raw_request, attack_type=attack_type,
+                                payload_sets=[load_payloads_from_file(path) for path in payload_files],
+                                num_threads=threads, proxy_port=config_instance.get_port(),
+                                engine=engine, in_flight=in_flight,
+                                connections=connections, pipeline=pipeline, streams=streams,
+                                race_size=race_size)
+    except ValueError as e:
+        click.echo(click.style(str(e), fg="red"))
+        return
+    index_range = sender.shard(*shard) if shard else range(0, len(sender.generate_requests()))
+    click.echo(f"Ataque {attack_type} (id {sender.attack_id()}): índices {index_range.start}-{index_range.stop} "
+               f"de {len(sender.generate_requests())}")
+
+    anomalies = []
+
+    def report(message):
+        if message['type'] == 'result' and message['data']['anomaly']:
+            data = message['data']
+            anomalies.append(data)
+            click.echo(f"  ! {data['status']} {data['length']}B {data['payloads']}")
+
+    try:
+        sender.run_attack(report, start=index_range.start, stop=index_range.stop, checkpoint_file=checkpoint)
+    except ValueError as e:
+        click.echo(click.style(str(e), fg="red"))
+        return
+    except KeyboardInterrupt:
+        if checkpoint:
+            click.echo(click.style(f"\nAtaque interrompido. Execute o mesmo comando para continuar ({checkpoint}).",
+                                   fg="yellow"))
+        return
+    click.echo(click.style(f"✓ Ataque concluído: {len(anomalies)} resposta(s) diferente(s) da original.", fg="green"))
+    click.echo(f"  {format_summary(sender.last_stats)}")
+
+
 if __name__ == "__main__":
     cli()
@@ -5,22 +5,63 @@ enviando payloads específicos e analisando as respostas.
 """
 import requests
 import re
-from typing import Dict, List, Any
+import threading
+from typing import Dict, List, Any, Optional
 from urllib.parse import urlparse, parse_qs, urlencode, urlunparse
+from .http_transport import HttpTransport, shared_transport
 from .logger_config import log
+from .rate_limiter import AdaptiveRateLimiter, shared_limiter
+from .response_fingerprint import fingerprint_response
+from .scan_cache import ScanCache, insertion_point_key
+from .scan_scheduler import ScanJob, ScanScheduler
+from .scanner import compile_rules
+from .timing_oracle import TimingOracle, TimingVerdict
 
 
 class ActiveScanner:
     """
     Realiza a varredura ativa em requisições HTTP para encontrar vulnerabilidades.
+    Cada par (ponto de inserção, check) é um job independente executado pelo
+    `ScanScheduler`; checks baseados em tempo rodam isolados no host.
+    Pares já testados no mesmo endpoint são lidos do `ScanCache`.
     """
 
-    def __init__(self):
+    # (id, método, sensível a tempo)
+    CHECKS = (
+        ('sqli_error', '_check_sql_injection', False),
+        ('sqli_boolean', '_check_boolean_sqli', False),
+        ('sqli_time', '_check_time_based_sqli', True),
+        ('cmd_injection', '_check_command_injection', False),
+        ('cmd_injection_time', '_check_time_based_command_injection', True),
+        ('xss', '_check_xss', False),
+    )
+
+    # Folga abaixo da similaridade entre duas respostas normais para considerar páginas diferentes
+    BOOLEAN_SIMILARITY_MARGIN = 0.1
+
+    def __init__(self, max_workers: int = 8, max_per_host: int = 4, cache_file: Optional[str] = None,
+                 rate_limiter: Optional[AdaptiveRateLimiter] = None, transport: Optional[HttpTransport] = None):
         """
         Inicializa o ActiveScanner.
+
+        Args:
+            max_workers: Máximo de requisições de teste simultâneas no total
+            max_per_host: Máximo de requisições de teste simultâneas por host
+            cache_file: JSON onde os checks já testados são persistidos (None = apenas em memória)
+            rate_limiter: Limitador adaptativo por host (padrão: o compartilhado com Intruder e Sender)
+            transport: Sessões HTTP com pool por host (padrão: o transporte compartilhado)
         """
-        self.session = requests.Session()
-        self.session.verify = False  # Desabilita verificação de certificado SSL
+        # Conexões keep-alive reutilizadas entre checks, scans e os demais motores
+        self.transport = transport or shared_transport()
+        self.scheduler = ScanScheduler(max_workers=max_workers, max_per_host=max_per_host)
+        # Reage a 429/503, Retry-After e aumento de latência do alvo
+        self.rate_limiter = rate_limiter or shared_limiter()
+        # Latência normal por endpoint, atrasos adaptativos e confirmação com parada antecipada
+        self.timing_oracle = TimingOracle()
+        # Checks já testados por endpoint/ponto de inserção
+        self.cache = ScanCache(cache_file)
+        # Marca, por thread de job, se alguma requisição do check falhou (resultado não vai para o cache)
+        self._local = threading.local()
 
         # Padrões de erro para SQL Injection
         self.sql_error_patterns = [
@@ -28,6 +69,7 @@ class ActiveScanner:
             r"(?i)quoted\s+string\s+not\s+properly\s+terminated", r"(?i)ora-\d{5}",
             r"(?i)postgresql.*error", r"(?i)microsoft\s+sql\s+server", r"(?i)odbc\s+driver"
         ]
+        self.sql_error_rules = compile_rules(tuple((p, p) for p in self.sql_error_patterns), re.IGNORECASE)
 
         log.info("Scanner Ativo inicializado.")
 
@@ -54,13 +96,25 @@ class ActiveScanner:
         log.debug(f"Pontos de inserção encontrados: {len(points)}")
         return points
 
-    def _send_modified_request(self, original_request: Dict, insertion_point: Dict, payload: str) -> requests.Response:
+    def _send_modified_request(self, original_request: Dict, insertion_point: Dict, payload: str,
+                               track_latency: bool = True) -> requests.Response:
         """
         Envia uma requisição HTTP modificada com um payload em um ponto de inserção.
+        Com `track_latency=False` o tempo de resposta não alimenta o limitador (atrasos propositais).
         """
+        try:
+            return self._send_payload(original_request, insertion_point, payload, track_latency)
+        except requests.exceptions.RequestException:
+            self._local.failed = True
+            raise
+
+    def _send_payload(self, original_request: Dict, insertion_point: Dict, payload: str,
+                      track_latency: bool = True) -> requests.Response:
+        """Monta a requisição com o payload no ponto de inserção e a envia pelo limitador do host."""
         method = original_request['method']
         url = original_request['url']
-        headers = original_request.get('headers', {})
+        # Cópia: os jobs rodam em paralelo sobre a mesma requisição base
+        headers = dict(original_request.get('headers', {}))
         body = original_request.get('body', '')
         parsed_url = urlparse(url)
 
@@ -70,17 +124,21 @@ class ActiveScanner:
             new_query = urlencode(query_params, doseq=True)
             url_parts = list(parsed_url)
             url_parts[4] = new_query
-            new_url = urlunparse(url_parts)
-            return self.session.request(method, new_url, headers=headers, data=body.encode('utf-8'), timeout=10)
+            url = urlunparse(url_parts)
 
         elif insertion_point['type'] == 'body':
             body_params = parse_qs(body, keep_blank_values=True)
             body_params[insertion_point['name']] = [payload]
-            new_body = urlencode(body_params, doseq=True)
-            headers['Content-Length'] = str(len(new_body))
-            return self.session.request(method, url, headers=headers, data=new_body.encode('utf-8'), timeout=10)
+            body = urlencode(body_params, doseq=True)
+            headers['Content-Length'] = str(len(body))
 
-        return self.session.request(method, url, headers=headers, data=body.encode('utf-8'), timeout=10)
+        data = body.encode('utf-8')
+        return self.rate_limiter.send(
+            parsed_url.netloc,
+            lambda: self.transport.request(method, url, headers=headers, data=data, timeout=10),
+            track_latency=track_latency,
+            retries=2,
+        )
 
     def _check_sql_injection(self, base_request: Dict, point: Dict) -> List[Dict]:
         """Testa a vulnerabilidade de SQL Injection (Error-Based)."""
@@ -92,185 +150,206 @@ class ActiveScanner:
                 full_payload = f"{point['value']}{payload}"
                 response = self._send_modified_request(base_request, point, full_payload)
 
-                for pattern in self.sql_error_patterns:
-                    if re.search(pattern, response.text, re.IGNORECASE):
-                        vuln = {
-                            'type': 'SQL Injection (Error-Based)',
-                            'severity': 'High',
-                            'url': base_request['url'],
-                            'method': base_request['method'],
-                            'description': f"Possível SQL Injection detectado no parâmetro '{point['name']}' com o payload '{payload}'.",
-                            'evidence': re.search(pattern, response.text, re.IGNORECASE).group(0),
-                        }
-                        vulnerabilities.append(vuln)
-                        log.warning(f"SQL Injection detectado em {base_request['url']} no parâmetro {point['name']}")
-                        return vulnerabilities # Retorna na primeira detecção
+                rule_match = self.sql_error_rules.search(response.text)
+                if rule_match:
+                    vuln = {
+                        'type': 'SQL Injection (Error-Based)',
+                        'severity': 'High',
+                        'url': base_request['url'],
+                        'method': base_request['method'],
+                        'description': f"Possível SQL Injection detectado no parâmetro '{point['name']}' com o payload '{payload}'.",
+                        'evidence': rule_match.evidence,
+                    }
+                    vulnerabilities.append(vuln)
+                    log.warning(f"SQL Injection detectado em {base_request['url']} no parâmetro {point['name']}")
+                    return vulnerabilities # Retorna na primeira detecção
             except requests.exceptions.RequestException as e:
                 log.error(f"Erro no teste de SQLi para {base_request['url']}: {e}")
         return vulnerabilities
 
     def _check_boolean_sqli(self, base_request: Dict, point: Dict) -> List[Dict]:
-        """Testa SQL Injection Boolean-Based (TRUE vs FALSE)."""
+        """
+        Testa SQL Injection Boolean-Based (TRUE vs FALSE) comparando impressões digitais
+        das respostas em vez do tamanho. Os payloads TRUE e FALSE diferem só em um dígito,
+        que a normalização neutraliza: um payload refletido na página não gera diferença.
+        """
         vulnerabilities = []
-        
+        true_payload = f"{point['value']}' AND '1'='1"
+        false_payload = f"{point['value']}' AND '1'='2"
+
+        def send(payload):
+            return fingerprint_response(self._send_modified_request(base_request, point, payload))
+
         try:
-            # Obtém resposta original
-            original_response = self._send_modified_request(base_request, point, point['value'])
-            original_len = len(original_response.text)
-            original_status = original_response.status_code
-            
-            # Testa payload TRUE (condição verdadeira)
-            true_payload = f"{point['value']}' AND '1'='1"
-            true_response = self._send_modified_request(base_request, point, true_payload)
-            true_len = len(true_response.text)
-            
-            # Testa payload FALSE (condição falsa)
-            false_payload = f"{point['value']}' AND '1'='2"
-            false_response = self._send_modified_request(base_request, point, false_payload)
-            false_len = len(false_response.text)
-            
-            # Se TRUE é similar ao original mas FALSE é diferente, há SQL Injection
-            true_diff = abs(original_len - true_len)
-            false_diff = abs(original_len - false_len)
-            
-            # Considera que há diferença se variar mais que 10% ou 100 bytes
-            threshold = max(100, original_len * 0.1)
-            
-            if true_diff < threshold and false_diff > threshold:
+            original = send(point['value'])
+            # Segunda resposta normal: mede quanto a página muda sozinha (conteúdo dinâmico)
+            again = send(point['value'])
+            if not original.same_shape(again):
+                log.debug(f"Boolean SQLi ignorado em {base_request['url']}: status/headers instáveis")
+                return vulnerabilities
+            stable = original.content_hash == again.content_hash
+            # Em páginas dinâmicas só diferenças acima da variação natural contam
+            threshold = max(0.0, original.similarity(again) - self.BOOLEAN_SIMILARITY_MARGIN)
+
+            def differ(a, b):
+                if not a.same_shape(b):
+                    return True
+                return a.content_hash != b.content_hash if stable else a.similarity(b) < threshold
+
+            true_fp = send(true_payload)
+            false_fp = send(false_payload)
+            looks_vulnerable = (
+                true_fp.same_shape(original)
+                and original.similarity(true_fp) >= threshold
+                and differ(true_fp, false_fp)
+            )
+            # Confirma: TRUE e FALSE repetidos devem reproduzir as mesmas respostas
+            if looks_vulnerable and not differ(true_fp, send(true_payload)) and not differ(false_fp, send(false_payload)):
+                page = "estável" if stable else f"dinâmica (similaridade entre cargas normais {original.similarity(again):.0%})"
                 vuln = {
                     'type': 'SQL Injection (Boolean-Based)',
                     'severity': 'High',
                     'url': base_request['url'],
                     'method': base_request['method'],
                     'description': f"SQL Injection Boolean-Based detectado no parâmetro '{point['name']}'. "
-                                   f"Respostas TRUE e FALSE diferem significativamente.",
-                    'evidence': f"Original: {original_len} bytes, TRUE: {true_len} bytes, FALSE: {false_len} bytes",
+                                   f"Respostas TRUE e FALSE diferem de forma reproduzível.",
+                    'evidence': f"Página {page}; similaridade original/TRUE {original.similarity(true_fp):.0%}, "
+                                f"TRUE/FALSE {true_fp.similarity(false_fp):.0%}; status {true_fp.status}/{false_fp.status}; "
+                                f"palavras: original {original.words}, TRUE {true_fp.words}, FALSE {false_fp.words}",
                 }
                 vulnerabilities.append(vuln)
                 log.warning(f"Boolean-Based SQL Injection detectado em {base_request['url']} no parâmetro {point['name']}")
-                
+
         except requests.exceptions.RequestException as e:
             log.error(f"Erro no teste de Boolean SQLi para {base_request['url']}: {e}")
-        
+
         return vulnerabilities
 
+    def _timing_key(self, base_request: Dict) -> tuple:
+        """Endpoint cuja latência normal é compartilhada por todos os payloads e parâmetros."""
+        parsed_url = urlparse(base_request['url'])
+        return base_request['method'], parsed_url.netloc.lower(), parsed_url.path
+
+    def _timed_request(self, base_request: Dict, point: Dict, payload: str, delayed: bool = False) -> float:
+        """Envia a requisição modificada e retorna o tempo de resposta em segundos (sem a espera no limitador)."""
+        self._send_modified_request(base_request, point, payload, track_latency=not delayed)
+        return self.rate_limiter.last_latency()
+
+    def _test_delay_payload(self, base_request: Dict, point: Dict, template: str) -> TimingVerdict:
+        """Testa um payload com atraso `{delay}` usando o oráculo de tempo."""
+        return self.timing_oracle.test(
+            self._timing_key(base_request),
+            probe=lambda delay: self._timed_request(base_request, point, f"{point['value']}{template.format(delay=delay)}",
+                                                    delayed=delay > 0),
+            sample=lambda: self._timed_request(base_request, point, point['value']),
+        )
+
     def _check_time_based_sqli(self, base_request: Dict, point: Dict) -> List[Dict]:
         """Testa SQL Injection Time-Based (SLEEP/WAITFOR)."""
         vulnerabilities = []
-        
-        # Payloads para diferentes bancos de dados
+
+        # Payloads para diferentes bancos de dados; {delay} é escolhido pelo oráculo
         time_payloads = [
-            ("' OR SLEEP(5)--", "MySQL"),
-            ("'; WAITFOR DELAY '0:0:5'--", "MSSQL"),
-            ("'||pg_sleep(5)--", "PostgreSQL"),
+            ("' OR SLEEP({delay})--", "MySQL"),
+            ("'; WAITFOR DELAY '0:0:{delay}'--", "MSSQL"),
+            ("'||pg_sleep({delay})--", "PostgreSQL"),
         ]
-        
-        try:
-            # Mede tempo de resposta normal
-            import time
-            start = time.time()
-            self._send_modified_request(base_request, point, point['value'])
-            normal_time = time.time() - start
-            
-            for payload, db_type in time_payloads:
-                try:
-                    full_payload = f"{point['value']}{payload}"
-                    start = time.time()
-                    self._send_modified_request(base_request, point, full_payload)
-                    delay_time = time.time() - start
-                    
-                    # Se demorou pelo menos 4 segundos a mais, detectou
-                    if delay_time - normal_time >= 4:
-                        vuln = {
-                            'type': 'SQL Injection (Time-Based)',
-                            'severity': 'High',
-                            'url': base_request['url'],
-                            'method': base_request['method'],
-                            'description': f"SQL Injection Time-Based detectado no parâmetro '{point['name']}'. "
-                                           f"Possível banco de dados: {db_type}",
-                            'evidence': f"Delay detectado: {delay_time - normal_time:.2f} segundos",
-                        }
-                        vulnerabilities.append(vuln)
-                        log.warning(f"Time-Based SQL Injection ({db_type}) detectado em {base_request['url']} no parâmetro {point['name']}")
-                        return vulnerabilities  # Retorna na primeira detecção
-                        
-                except requests.exceptions.RequestException as e:
-                    log.debug(f"Erro no teste time-based para {db_type}: {e}")
-                    
-        except requests.exceptions.RequestException as e:
-            log.error(f"Erro no teste de Time-Based SQLi para {base_request['url']}: {e}")
-        
+
+        for template, db_type in time_payloads:
+            try:
+                verdict = self._test_delay_payload(base_request, point, template)
+            except requests.exceptions.RequestException as e:
+                log.debug(f"Erro no teste time-based para {db_type}: {e}")
+                continue
+
+            if verdict.vulnerable:
+                vuln = {
+                    'type': 'SQL Injection (Time-Based)',
+                    'severity': 'High',
+                    'url': base_request['url'],
+                    'method': base_request['method'],
+                    'description': f"SQL Injection Time-Based detectado no parâmetro '{point['name']}'. "
+                                   f"Possível banco de dados: {db_type}",
+                    'evidence': verdict.evidence,
+                }
+                vulnerabilities.append(vuln)
+                log.warning(f"Time-Based SQL Injection ({db_type}) detectado em {base_request['url']} no parâmetro {point['name']}")
+                return vulnerabilities  # Retorna na primeira detecção
+
         return vulnerabilities
 
     def _check_command_injection(self, base_request: Dict, point: Dict) -> List[Dict]:
-        """Testa Command Injection."""
+        """Testa Command Injection pela saída do comando."""
         vulnerabilities = []
-        
+
         # Comandos que podem indicar execução
         cmd_payloads = [
-            ("; sleep 5", "Unix/Linux"),
-            ("| sleep 5", "Unix/Linux"),
-            ("& timeout /t 5", "Windows"),
             ("; whoami", "Unix/Linux"),
             ("| whoami", "Unix/Linux"),
         ]
-        
+
         # Padrões que indicam sucesso de execução
         success_patterns = [
             r"uid=\d+",  # Output do whoami no Unix
             r"root|daemon|www-data",  # Usuários comuns
         ]
-        
-        try:
-            # Testa cada payload
-            for payload, os_type in cmd_payloads:
-                try:
-                    full_payload = f"{point['value']}{payload}"
-                    
-                    if "sleep" in payload or "timeout" in payload:
-                        # Testa time-based
-                        import time
-                        start = time.time()
-                        response = self._send_modified_request(base_request, point, full_payload)
-                        delay = time.time() - start
-                        
-                        if delay >= 4:
-                            vuln = {
-                                'type': 'Command Injection (Time-Based)',
-                                'severity': 'Critical',
-                                'url': base_request['url'],
-                                'method': base_request['method'],
-                                'description': f"Command Injection detectado no parâmetro '{point['name']}'. "
-                                               f"Sistema operacional: {os_type}",
-                                'evidence': f"Delay detectado: {delay:.2f} segundos com payload '{payload}'",
-                            }
-                            vulnerabilities.append(vuln)
-                            log.critical(f"Command Injection detectado em {base_request['url']} no parâmetro {point['name']}")
-                            return vulnerabilities
-                    else:
-                        # Testa output-based
-                        response = self._send_modified_request(base_request, point, full_payload)
-                        for pattern in success_patterns:
-                            if re.search(pattern, response.text, re.IGNORECASE):
-                                vuln = {
-                                    'type': 'Command Injection',
-                                    'severity': 'Critical',
-                                    'url': base_request['url'],
-                                    'method': base_request['method'],
-                                    'description': f"Command Injection detectado no parâmetro '{point['name']}'. "
-                                                   f"Sistema operacional: {os_type}",
-                                    'evidence': re.search(pattern, response.text, re.IGNORECASE).group(0),
-                                }
-                                vulnerabilities.append(vuln)
-                                log.critical(f"Command Injection detectado em {base_request['url']} no parâmetro {point['name']}")
-                                return vulnerabilities
-                                
-                except requests.exceptions.RequestException as e:
-                    log.debug(f"Erro no teste de command injection: {e}")
-                    
-        except Exception as e:
-            log.error(f"Erro no teste de Command Injection para {base_request['url']}: {e}")
-        
+
+        for payload, os_type in cmd_payloads:
+            try:
+                full_payload = f"{point['value']}{payload}"
+                response = self._send_modified_request(base_request, point, full_payload)
+                for pattern in success_patterns:
+                    match = re.search(pattern, response.text, re.IGNORECASE)
+                    if match:
+                        vuln = {
+                            'type': 'Command Injection',
+                            'severity': 'Critical',
+                            'url': base_request['url'],
+                            'method': base_request['method'],
+                            'description': f"Command Injection detectado no parâmetro '{point['name']}'. "
+                                           f"Sistema operacional: {os_type}",
+                            'evidence': match.group(0),
+                        }
+                        vulnerabilities.append(vuln)
+                        log.critical(f"Command Injection detectado em {base_request['url']} no parâmetro {point['name']}")
+                        return vulnerabilities
+            except requests.exceptions.RequestException as e:
+                log.debug(f"Erro no teste de command injection: {e}")
+
+        return vulnerabilities
+
+    def _check_time_based_command_injection(self, base_request: Dict, point: Dict) -> List[Dict]:
+        """Testa Command Injection pelo atraso de um comando sleep/timeout."""
+        vulnerabilities = []
+
+        cmd_payloads = [
+            ("; sleep {delay}", "Unix/Linux"),
+            ("| sleep {delay}", "Unix/Linux"),
+            ("& timeout /t {delay}", "Windows"),
+        ]
+
+        for template, os_type in cmd_payloads:
+            try:
+                verdict = self._test_delay_payload(base_request, point, template)
+            except requests.exceptions.RequestException as e:
+                log.debug(f"Erro no teste de command injection: {e}")
+                continue
+
+            if verdict.vulnerable:
+                payload = template.format(delay=verdict.delay)
+                vuln = {
+                    'type': 'Command Injection (Time-Based)',
+                    'severity': 'Critical',
+                    'url': base_request['url'],
+                    'method': base_request['method'],
+                    'description': f"Command Injection detectado no parâmetro '{point['name']}'. "
+                                   f"Sistema operacional: {os_type}",
+                    'evidence': f"{verdict.evidence} com payload '{payload}'",
+                }
+                vulnerabilities.append(vuln)
+                log.critical(f"Command Injection detectado em {base_request['url']} no parâmetro {point['name']}")
+                return vulnerabilities
+
         return vulnerabilities
 
     def _check_xss(self, base_request: Dict, point: Dict) -> List[Dict]:
@@ -298,32 +377,51 @@ class ActiveScanner:
 
         return vulnerabilities
 
-    def scan_request(self, base_request: Dict[str, Any]) -> List[Dict[str, Any]]:
+    def _run_check(self, check, key, base_request: Dict, point: Dict) -> List[Dict]:
+        """Executa um check e registra o resultado no cache se nenhuma requisição falhou."""
+        self._local.failed = False
+        result = check(base_request, point)
+        if not self._local.failed:
+            self.cache.put(key, result)
+        return result
+
+    def scan_request(self, base_request: Dict[str, Any], force: bool = False) -> List[Dict[str, Any]]:
         """
         Orquestra a varredura de uma única requisição, executando todos os checks.
+
+        Args:
+            base_request: Requisição a ser testada
+            force: Ignora o cache e testa de novo todos os pontos de inserção
         """
         vulnerabilities = []
         log.info(f"Iniciando varredura ativa em: {base_request.get('method')} {base_request.get('url')}")
         insertion_points = self._get_insertion_points(base_request)
+        host = urlparse(base_request['url']).netloc.lower()
 
+        jobs = []
+        cached = 0
         for point in insertion_points:
-            log.debug(f"Testando ponto de inserção: {point['type']} - {point['name']}")
-
-            # Executa os checks de vulnerabilidade
-            # Error-Based SQL Injection
-            vulnerabilities.extend(self._check_sql_injection(base_request, point))
-            
-            # Boolean-Based SQL Injection (novo)
-            vulnerabilities.extend(self._check_boolean_sqli(base_request, point))
-            
-            # Time-Based SQL Injection (novo)
-            vulnerabilities.extend(self._check_time_based_sqli(base_request, point))
-            
-            # Command Injection (novo)
-            vulnerabilities.extend(self._check_command_injection(base_request, point))
-            
-            # XSS
-            vulnerabilities.extend(self._check_xss(base_request, point))
+            for check_id, method_name, timing_sensitive in self.CHECKS:
+                key = insertion_point_key(base_request, point, check_id)
+                result = None if force else self.cache.get(key)
+                if result is not None:
+                    vulnerabilities.extend(result)
+                    cached += 1
+                    continue
+                check = getattr(self, method_name)
+                jobs.append(ScanJob(
+                    host=host,
+                    func=lambda check=check, key=key, point=point: self._run_check(check, key, base_request, point),
+                    exclusive=timing_sensitive,
+                    label=f"{check_id}:{point['type']}:{point['name']}",
+                ))
+        if cached:
+            log.info(f"{cached} checks já testados neste endpoint reaproveitados do cache")
+
+        # Os resultados voltam na ordem dos jobs, independente da ordem de execução
+        for result in self.scheduler.run(jobs):
+            vulnerabilities.extend(result)
+        self.cache.save()
 
         # Remove duplicatas
         unique_vulns = [dict(t) for t in {tuple(d.items()) for d in vulnerabilities}]
@@ -332,3 +430,7 @@ class ActiveScanner:
             log.warning(f"{len(unique_vulns)} vulnerabilidades ativas encontradas para {base_request['url']}")
 
         return unique_vulns
+
+    def close(self):
+        """Encerra o pool de workers (as conexões ficam no transporte, compartilhado)."""
+        self.scheduler.shutdown()
@@ -1,11 +1,12 @@
 from mitmproxy import http, websocket
-from urllib.parse import parse_qs, urlencode, urlparse
+from urllib.parse import parse_qs, urlencode
 
 from .config import InterceptConfig
 from .cookie_manager import CookieManager
+from .flow_view import FlowView
 from .history import RequestHistory
 from .logger_config import log
-from .scanner import VulnerabilityScanner
+from .scan_pipeline import PassiveScanPipeline
 from .spider import Spider
 from .websocket_history import WebSocketHistory
 from .active_scanner import ActiveScanner
@@ -14,18 +15,21 @@ from .active_scanner import ActiveScanner
 class InterceptAddon:
     """Addon do mitmproxy para interceptar e modificar requisições"""
 
-    def __init__(self, config: InterceptConfig, history: RequestHistory = None, cookie_manager: CookieManager = None, spider: Spider = None, websocket_history: WebSocketHistory = None):
+    def __init__(self, config: InterceptConfig, history: RequestHistory = None, cookie_manager: CookieManager = None, spider: Spider = None, websocket_history: WebSocketHistory = None, scan_pipeline: PassiveScanPipeline = None):
         self.config = config
         self.history = history
         self.cookie_manager = cookie_manager
-        self.passive_scanner = VulnerabilityScanner()  # Scanner passivo
+        # Scanner passivo executado fora do event loop do mitmproxy
+        self.scan_pipeline = scan_pipeline or PassiveScanPipeline(history=history)
+        self.passive_scanner = self.scan_pipeline.scanner
         self.active_scanner = ActiveScanner()  # Scanner ativo
         self.spider = spider
         self.websocket_history = websocket_history
 
-    def run_active_scan_on_request(self, request_id: int):
+    def run_active_scan_on_request(self, request_id: int, force: bool = False):
         """
         Executa o scanner ativo em uma requisição específica do histórico.
+        Com `force`, ignora os checks já registrados no cache do scanner.
         """
         if not self.history:
             log.error("Histórico não está disponível para a varredura ativa.")
@@ -45,36 +49,13 @@ class InterceptAddon:
         }
 
         # Executa o scan
-        vulnerabilities = self.active_scanner.scan_request(base_request)
+        vulnerabilities = self.active_scanner.scan_request(base_request, force=force)
 
         # Adiciona as vulnerabilidades encontradas ao histórico
         if vulnerabilities:
             self.history.add_vulnerabilities_to_entry(request_id, vulnerabilities)
             log.info(f"{len(vulnerabilities)} novas vulnerabilidades ativas adicionadas ao histórico para o ID {request_id}.")
 
-    @staticmethod
-    def _split_host_and_path(raw_host: str):
-        """Normaliza host configurado, aceitando entradas com esquema ou URL completa."""
-        if not raw_host:
-            return "", ""
-        parsed = urlparse(raw_host) if "://" in raw_host else urlparse(f"//{raw_host}")
-        host = (parsed.hostname or parsed.netloc or "").lower()
-        extra_path = parsed.path if (parsed.scheme or parsed.netloc) else ""
-        if not host:
-            host = raw_host.lower()
-        return host, extra_path
-
-    @staticmethod
-    def _host_matches(request_host: str, rule_host: str) -> bool:
-        """Verifica se o host da requisição corresponde ao host da regra."""
-        if not rule_host:
-            return True
-        request_host = request_host.lower()
-        rule_host = rule_host.lower()
-        if request_host == rule_host:
-            return True
-        return request_host.endswith(f".{rule_host}")
-
     def request(self, flow: http.HTTPFlow) -> None:
         """Intercepta requisições HTTP"""
         # Força upstream HTTP para servidores locais que não suportam TLS
@@ -86,139 +67,110 @@ class InterceptAddon:
         if self.config.is_paused():
             return
 
-        # Se a interceptação manual está ativada, pausa a requisição
+        self._apply_rules(flow)
+
+        # Se a interceptação manual está ativada, retém a requisição (já com as regras aplicadas)
+        # até a decisão do usuário. O hook retorna na hora: o flow fica suspenso e o restante
+        # do tráfego segue normalmente.
         if self.config.is_intercept_enabled():
-            # Prepara os dados da requisição para a fila
-            flow_data = {
-                'flow': flow,
+            # Fora do escopo (assets, telemetria, outros hosts): passa sem entrar na fila
+            if not self.config.get_intercept_scope().matches_request(flow.request):
+                self.config.intercept_registry.note_passed()
+                return
+
+            flow_id = self.config.intercept_registry.hold(flow)
+            self.config.add_to_intercept_queue({
+                'flow_id': flow_id,
                 'method': flow.request.method,
                 'url': flow.request.pretty_url,
                 'headers': dict(flow.request.headers),
                 'body': flow.request.content.decode('utf-8', errors='ignore') if flow.request.content else '',
                 'host': flow.request.pretty_host,
                 'path': flow.request.path,
-            }
-            
-            # Adiciona à fila de interceptação
-            self.config.add_to_intercept_queue(flow_data)
+            })
             log.info(f"Requisição interceptada: {flow.request.method} {flow.request.pretty_url}")
-            
-            # Aguarda decisão do usuário (Forward ou Drop)
-            response = self.config.get_intercept_response(timeout=300)  # 5 minutos de timeout
-            
-            if response is None:
-                # Timeout - cancela a requisição
-                log.warning(f"Timeout na interceptação: {flow.request.pretty_url}")
-                flow.kill()
-                return
-            
-            if response['action'] == 'drop':
-                # Usuário escolheu cancelar a requisição
-                log.info(f"Requisição cancelada pelo usuário: {flow.request.pretty_url}")
-                flow.kill()
-                return
-            
-            if response['action'] == 'forward':
-                # Usuário escolheu enviar a requisição (possivelmente modificada)
-                if 'modified_body' in response:
-                    flow.request.content = response['modified_body'].encode('utf-8')
-                if 'modified_headers' in response:
-                    flow.request.headers.clear()
-                    for key, value in response['modified_headers'].items():
-                        flow.request.headers[key] = value
-                log.info(f"Requisição enviada pelo usuário: {flow.request.pretty_url}")
-                # Continua o processamento normal
 
+    def _apply_rules(self, flow: http.HTTPFlow) -> None:
+        """Aplica as regras de substituição de parâmetros que casam com a requisição"""
         request = flow.request
 
-        for rule in self.config.get_rules():
-            if not rule.get('enabled', True):
-                continue
-
-            # Verifica se a URL corresponde ao host e caminho configurados
-            rule_host, host_path = self._split_host_and_path(rule.get('host', ''))
-            normalized_rule_path = rule.get('path', '') or host_path or ""
-            if normalized_rule_path and not normalized_rule_path.startswith('/'):
-                normalized_rule_path = f"/{normalized_rule_path}"
-            host_match = self._host_matches(request.pretty_host, rule_host)
-            path_match = True if not normalized_rule_path else request.path.startswith(normalized_rule_path)
-
-            if host_match and path_match:
-                # Modifica parâmetros na query string (GET)
-                if request.query:
-                    query_dict = dict(request.query)
-                    if rule['param_name'] in query_dict:
-                        query_dict[rule['param_name']] = rule['param_value']
-                        request.query.clear()
-                        for key, value in query_dict.items():
-                            request.query[key] = value
-                        log.info(f"Regra GET aplicada: '{rule['param_name']}' -> '{rule['param_value']}' em {request.pretty_url}")
-
-                # Modifica parâmetros no corpo (POST)
-                if request.method == "POST" and request.content:
-                    content_type = request.headers.get("content-type", "")
-
-                    if "application/x-www-form-urlencoded" in content_type:
-                        # Parse form data
-                        body = request.content.decode('utf-8', errors='ignore')
-                        params = parse_qs(body, keep_blank_values=True)
-
-                        # Modifica o parâmetro se existir
-                        if rule['param_name'] in params:
-                            params[rule['param_name']] = [rule['param_value']]
-                            # Reconstrói o corpo
-                            new_body = urlencode(params, doseq=True)
-                            request.content = new_body.encode('utf-8')
-                            log.info(f"Regra POST aplicada: '{rule['param_name']}' -> '{rule['param_value']}' em {request.pretty_url}")
+        # Uma busca no índice compilado retorna todas as regras que casam, em ordem
+        matched_rules = self.config.get_rule_matcher().match(request.pretty_host, request.path)
+        if not matched_rules:
+            return
+
+        # Modifica parâmetros na query string (GET): um parse e uma reescrita para todas as regras
+        if request.query:
+            query_dict = dict(request.query)
+            applied = [rule for rule in matched_rules if rule['param_name'] in query_dict]
+            if applied:
+                for rule in applied:
+                    query_dict[rule['param_name']] = rule['param_value']
+                request.query.clear()
+                for key, value in query_dict.items():
+                    request.query[key] = value
+                for rule in applied:
+                    log.info(f"Regra GET aplicada: '{rule['param_name']}' -> '{rule['param_value']}' em {request.pretty_url}")
+
+        # Modifica parâmetros no corpo (POST)
+        if request.method == "POST" and request.content:
+            content_type = request.headers.get("content-type", "")
+
+            if "application/x-www-form-urlencoded" in content_type:
+                # Parse form data
+                body = request.content.decode('utf-8', errors='ignore')
+                params = parse_qs(body, keep_blank_values=True)
+
+                # Modifica os parâmetros que existirem
+                applied = [rule for rule in matched_rules if rule['param_name'] in params]
+                if applied:
+                    for rule in applied:
+                        params[rule['param_name']] = [rule['param_value']]
+                    # Reconstrói o corpo
+                    new_body = urlencode(params, doseq=True)
+                    request.content = new_body.encode('utf-8')
+                    for rule in applied:
+                        log.info(f"Regra POST aplicada: '{rule['param_name']}' -> '{rule['param_value']}' em {request.pretty_url}")
 
     def response(self, flow: http.HTTPFlow) -> None:
         """Intercepta respostas HTTP e armazena no histórico"""
-        
-        # Escaneia a resposta em busca de vulnerabilidades
-        vulnerabilities = []
-        if self.passive_scanner and flow.response:
-            request_data = {
-                'method': flow.request.method,
-                'url': flow.request.pretty_url,
-                'headers': dict(flow.request.headers),
-                'body': flow.request.content.decode('utf-8', errors='ignore') if flow.request.content else '',
-            }
-            response_data = {
-                'status': flow.response.status_code,
-                'headers': dict(flow.response.headers),
-                'body': flow.response.content.decode('utf-8', errors='ignore') if flow.response.content else '',
-            }
-            
-            vulnerabilities = self.passive_scanner.scan_response(request_data, response_data)
-            
-            # Preenche URL e método nas vulnerabilidades
-            for vuln in vulnerabilities:
-                if not vuln.get('url'):
-                    vuln['url'] = flow.request.pretty_url
-                if not vuln.get('method'):
-                    vuln['method'] = flow.request.method
-            
-            # Log se vulnerabilidades foram encontradas
-            if vulnerabilities:
-                log.warning(f"Vulnerabilidades encontradas em {flow.request.pretty_url}: {len(vulnerabilities)}")
-        
-        # Armazena a requisição no histórico com vulnerabilidades
+
+        # Uma única visão do flow: headers copiados e bodies decodificados no máximo uma vez
+        view = FlowView(flow)
+
+        # Armazena a requisição no histórico; as vulnerabilidades são anexadas depois
+        entry_id = None
         if self.history is not None:
-            self.history.add_request(flow, vulnerabilities=vulnerabilities)
+            entry_id = self.history.add_request(flow, view=view)
+
+        # Envia um snapshot leve para o scanner passivo (bodies em bytes, decodificados no worker).
+        # A política de varredura é consultada antes, para não acessar bodies de imagens, fontes etc.
+        if self.scan_pipeline is not None and flow.response:
+            if self.scan_pipeline.admit(view.response_headers):
+                request_data = {
+                    'method': view.method,
+                    'url': view.url,
+                    'headers': view.request_headers,
+                    'body': view.request_content,
+                }
+                response_data = {
+                    'status': view.status,
+                    'headers': view.response_headers,
+                    'body': view.response_content,
+                }
+                self.scan_pipeline.submit(entry_id, request_data, response_data)
 
         # Processa e armazena os cookies
         if self.cookie_manager is not None and flow.response:
             self.cookie_manager.parse_and_store_cookies(
-                host=flow.request.pretty_host,
-                request_headers=dict(flow.request.headers),
-                response_headers=dict(flow.response.headers)
+                host=view.host,
+                request_headers=view.request_headers_lower,
+                response_headers=view.response_headers_lower
             )
         
         # Processa com o Spider se estiver ativo
         if self.spider is not None and self.spider.is_running() and flow.response:
-            content_type = flow.response.headers.get('content-type', '')
-            response_body = flow.response.content.decode('utf-8', errors='ignore') if flow.response.content else ''
-            self.spider.process_response(flow.request.pretty_url, response_body, content_type)
+            self.spider.process_response(view.url, view.response_text, view.content_type)
 
     def websocket_start(self, flow: http.HTTPFlow) -> None:
         """Chamado quando uma conexão WebSocket é estabelecida"""
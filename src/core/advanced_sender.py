@@ -4,16 +4,31 @@ Advanced Intruder/Sender module with support for:
 - Attack types (Sniper, Battering Ram, Pitchfork, Cluster Bomb)
 - Payload processing (encode, hash, prefix, suffix)
 - Grep extraction from responses
+- Anomaly detection against a baseline response (response fingerprints)
 """
 import concurrent.futures
+import itertools
+import json
+import math
+import os
+import time
 import requests
 import re
 import hashlib
 import base64
 import urllib.parse
 import html
-from typing import List, Dict, Tuple, Optional, Callable, Any
+from collections.abc import Sequence
+from typing import List, Dict, Iterator, Tuple, Optional, Callable, Any
+from .async_engine import AsyncHttpEngine
+from .h2_engine import H2_AVAILABLE, Http2Engine
+from .http_transport import HttpTransport, shared_transport
 from .logger_config import log
+from .rate_limiter import AdaptiveRateLimiter, shared_limiter
+from .request_template import PreparedRequest, RequestTemplate
+from .response_fingerprint import ResponseFingerprint, fingerprint_response
+from .send_stats import SendStats, format_summary
+from .turbo_engine import TurboEngine
 
 
 class PayloadProcessor:
@@ -152,11 +167,125 @@ class PayloadPositionParser:
         return len(PayloadPositionParser.find_positions(raw_request))
 
 
+class PayloadCombinations(Sequence):
+    """
+    Lazy, sized sequence of the payload combinations of an attack.
+
+    Combinations are produced on demand while iterating, so memory stays
+    constant no matter how large the attack is; `len()` is computed from the
+    payload set sizes without generating anything. Combination k is computed
+    directly from the set sizes (`combination(k)`), so an attack can resume from
+    an index or be split into disjoint index ranges.
+    """
+
+    def __init__(self, attack_type: str, payload_sets: List[List[str]], num_positions: int,
+                 defaults: Optional[List[str]] = None):
+        """
+        Args:
+            attack_type: 'sniper', 'battering_ram', 'pitchfork', or 'cluster_bomb'
+            payload_sets: Payload lists (sets missing for some positions reuse the first one)
+            num_positions: Number of payload positions in the request
+            defaults: Values kept in the positions Sniper is not attacking (default: '§ORIGINAL§')
+        """
+        self.attack_type = attack_type
+        self.num_positions = num_positions
+        self.payload_sets = [list(pset) for pset in payload_sets]
+        if attack_type in ('pitchfork', 'cluster_bomb') and self.payload_sets:
+            # Ensure we have enough sets
+            while len(self.payload_sets) < num_positions:
+                self.payload_sets.append(self.payload_sets[0])
+            self.payload_sets = self.payload_sets[:num_positions]
+        defaults = list(defaults or [])
+        self.defaults = defaults[:num_positions] + ['§ORIGINAL§'] * (num_positions - len(defaults))
+
+    def __len__(self) -> int:
+        sets = self.payload_sets
+        if not sets:
+            return 0
+        if self.attack_type == 'sniper':
+            return len(sets[0]) * self.num_positions
+        if self.attack_type == 'battering_ram':
+            return len(sets[0])
+        if self.attack_type == 'pitchfork':
+            return min((len(pset) for pset in sets), default=0)
+        if self.attack_type == 'cluster_bomb':
+            return math.prod(len(pset) for pset in sets)
+        return 0
+
+    def __iter__(self) -> Iterator[List[str]]:
+        sets = self.payload_sets
+        if not sets:
+            return
+        if self.attack_type == 'sniper':
+            for pos_idx in range(self.num_positions):
+                for payload in sets[0]:
+                    combo = list(self.defaults)
+                    combo[pos_idx] = payload
+                    yield combo
+        elif self.attack_type == 'battering_ram':
+            for payload in sets[0]:
+                yield [payload] * self.num_positions
+        elif self.attack_type == 'pitchfork':
+            for combo in zip(*sets):
+                yield list(combo)
+        elif self.attack_type == 'cluster_bomb':
+            for combo in itertools.product(*sets):
+                yield list(combo)
+
+    def combination(self, index: int) -> List[str]:
+        """Combination at `index` (same order as iteration), computed in O(positions)."""
+        sets = self.payload_sets
+        if self.attack_type == 'sniper':
+            pos_idx, payload_idx = divmod(index, len(sets[0]))
+            combo = list(self.defaults)
+            combo[pos_idx] = sets[0][payload_idx]
+            return combo
+        if self.attack_type == 'battering_ram':
+            return [sets[0][index]] * self.num_positions
+        if self.attack_type == 'pitchfork':
+            return [pset[index] for pset in sets]
+        # Cluster bomb: index in mixed radix, the last position changes fastest
+        combo = []
+        for pset in reversed(sets):
+            index, digit = divmod(index, len(pset))
+            combo.append(pset[digit])
+        combo.reverse()
+        return combo
+
+    def iter_range(self, start: int = 0, stop: Optional[int] = None) -> Iterator[List[str]]:
+        """Lazily iterate the combinations with index in [start, stop)."""
+        start, stop, _ = slice(start, stop).indices(len(self))
+        if start == 0 and stop == len(self):
+            return iter(self)
+        return map(self.combination, range(start, stop))
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self.combination(i) for i in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("combination index out of range")
+        return self.combination(index)
+
+
+def shard_range(total: int, shard: int, shards: int) -> range:
+    """
+    Index range of `shard` (0-based) when `total` combinations are split into
+    `shards` contiguous, disjoint and balanced parts.
+    """
+    if shards < 1 or not 0 <= shard < shards:
+        raise ValueError(f"Invalid shard {shard} of {shards}")
+    size, extra = divmod(total, shards)
+    start = shard * size + min(shard, extra)
+    return range(start, start + size + (shard < extra))
+
+
 class AttackTypeGenerator:
     """Generates payload combinations for different attack types"""
     
     @staticmethod
-    def sniper(payload_sets: List[List[str]], num_positions: int) -> List[List[str]]:
+    def sniper(payload_sets: List[List[str]], num_positions: int) -> PayloadCombinations:
         """
         Sniper: Uses one payload set, iterates through each position one at a time.
         Other positions use original values.
@@ -167,25 +296,10 @@ class AttackTypeGenerator:
             - [original1, a]
             - [original1, b]
         """
-        if not payload_sets or not payload_sets[0]:
-            return []
-        
-        payloads = payload_sets[0]  # Use first set
-        positions = PayloadPositionParser.find_positions
-        combinations = []
-        
-        # For each position
-        for pos_idx in range(num_positions):
-            # For each payload
-            for payload in payloads:
-                combo = ['§ORIGINAL§'] * num_positions
-                combo[pos_idx] = payload
-                combinations.append(combo)
-        
-        return combinations
+        return PayloadCombinations('sniper', payload_sets[:1] if payload_sets else [], num_positions)
     
     @staticmethod
-    def battering_ram(payload_sets: List[List[str]], num_positions: int) -> List[List[str]]:
+    def battering_ram(payload_sets: List[List[str]], num_positions: int) -> PayloadCombinations:
         """
         Battering Ram: Uses same payload in all positions simultaneously.
         
@@ -193,20 +307,10 @@ class AttackTypeGenerator:
             - [a, a]
             - [b, b]
         """
-        if not payload_sets or not payload_sets[0]:
-            return []
-        
-        payloads = payload_sets[0]
-        combinations = []
-        
-        for payload in payloads:
-            combo = [payload] * num_positions
-            combinations.append(combo)
-        
-        return combinations
+        return PayloadCombinations('battering_ram', payload_sets[:1] if payload_sets else [], num_positions)
     
     @staticmethod
-    def pitchfork(payload_sets: List[List[str]], num_positions: int) -> List[List[str]]:
+    def pitchfork(payload_sets: List[List[str]], num_positions: int) -> PayloadCombinations:
         """
         Pitchfork: Uses multiple payload sets, iterates through them in parallel.
         Stops when shortest set is exhausted.
@@ -215,24 +319,10 @@ class AttackTypeGenerator:
             - [a, x]
             - [b, y]
         """
-        if not payload_sets:
-            return []
-        
-        # Ensure we have enough sets
-        while len(payload_sets) < num_positions:
-            payload_sets.append(payload_sets[0] if payload_sets else [])
-        
-        combinations = []
-        min_length = min(len(pset) for pset in payload_sets[:num_positions])
-        
-        for i in range(min_length):
-            combo = [payload_sets[j][i] for j in range(num_positions)]
-            combinations.append(combo)
-        
-        return combinations
+        return PayloadCombinations('pitchfork', payload_sets, num_positions)
     
     @staticmethod
-    def cluster_bomb(payload_sets: List[List[str]], num_positions: int) -> List[List[str]]:
+    def cluster_bomb(payload_sets: List[List[str]], num_positions: int) -> PayloadCombinations:
         """
         Cluster Bomb: Uses multiple payload sets, tries all combinations.
         
@@ -242,24 +332,33 @@ class AttackTypeGenerator:
             - [b, x]
             - [b, y]
         """
-        if not payload_sets:
-            return []
-        
-        # Ensure we have enough sets
-        while len(payload_sets) < num_positions:
-            payload_sets.append(payload_sets[0] if payload_sets else [])
-        
-        # Generate all combinations recursively
-        def generate_combinations(sets: List[List[str]], current: List[str] = []) -> List[List[str]]:
-            if not sets:
-                return [current]
-            
-            results = []
-            for payload in sets[0]:
-                results.extend(generate_combinations(sets[1:], current + [payload]))
-            return results
-        
-        return generate_combinations(payload_sets[:num_positions])
+        return PayloadCombinations('cluster_bomb', payload_sets, num_positions)
+
+
+class AttackRequests(Sequence):
+    """Lazy sequence of (request_string, payloads_used) tuples rendered from payload combinations."""
+
+    def __init__(self, template: RequestTemplate, combinations: PayloadCombinations):
+        self.template = template
+        self.combinations = combinations
+
+    def __len__(self) -> int:
+        return len(self.combinations)
+
+    def _render(self, combo: List[str]) -> Tuple[str, List[str]]:
+        return self.template.render(combo), combo
+
+    def __iter__(self) -> Iterator[Tuple[str, List[str]]]:
+        return map(self._render, self.combinations)
+
+    def iter_range(self, start: int = 0, stop: Optional[int] = None) -> Iterator[Tuple[str, List[str]]]:
+        """Lazily render the requests with index in [start, stop)."""
+        return map(self._render, self.combinations.iter_range(start, stop))
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self._render(combo) for combo in self.combinations[index]]
+        return self._render(self.combinations[index])
 
 
 class GrepExtractor:
@@ -286,6 +385,18 @@ class GrepExtractor:
         return matches
 
 
+# Version of the attack checkpoint file format
+CHECKPOINT_VERSION = 1
+# Minimum interval (s) between checkpoint writes during an attack
+CHECKPOINT_INTERVAL = 1.0
+# Send engines: a thread pool (num_threads), an asyncio event loop (in_flight),
+# HTTP/1.1 pipelining on a few persistent sockets (connections x pipeline) or
+# HTTP/2 streams multiplexed on a few connections (connections x streams)
+ENGINES = ('threads', 'async', 'turbo', 'h2')
+# Engines that talk to the target directly and support race_size
+RACE_ENGINES = ('turbo', 'h2')
+
+
 class AdvancedSender:
     """Advanced sender with intruder capabilities"""
     
@@ -296,7 +407,16 @@ class AdvancedSender:
                  processors: List[List[Dict[str, Any]]] = None,
                  grep_patterns: List[str] = None,
                  num_threads: int = 10,
-                 proxy_port: int = 9507):
+                 proxy_port: int = 9507,
+                 anomaly_threshold: float = 0.9,
+                 rate_limiter: Optional[AdaptiveRateLimiter] = None,
+                 transport: Optional[HttpTransport] = None,
+                 engine: str = 'threads',
+                 in_flight: int = 500,
+                 connections: int = 4,
+                 pipeline: int = 32,
+                 streams: int = 100,
+                 race_size: int = 0):
         """
         Args:
             raw_request: Base request with §markers§ for payload positions
@@ -306,7 +426,29 @@ class AdvancedSender:
             grep_patterns: Regex patterns to extract from responses
             num_threads: Number of concurrent threads
             proxy_port: Port for the proxy server
+            anomaly_threshold: Responses less similar than this to the baseline are flagged as anomalies
+            rate_limiter: Per-host adaptive limiter (defaults to the one shared with the scanner and Sender)
+            transport: Pooled per-host HTTP sessions (defaults to the shared transport)
+            engine: 'threads' (thread pool with num_threads workers), 'async' (one event loop
+                keeping up to in_flight requests in flight) or 'turbo' (rendered requests written
+                straight to persistent sockets with HTTP/1.1 pipelining) or 'h2' (HTTP/2 streams
+                multiplexed on a few connections); turbo and h2 bypass the proxy and the rate limiter.
+                No engine follows redirects: a 3xx is the result, so status, length and the
+                baseline comparison mean the same thing whatever the engine
+            in_flight: Concurrent requests of the async engine
+            connections: Persistent connections of the turbo and h2 engines
+            pipeline: Requests written ahead of the responses on each turbo connection
+            streams: Concurrent streams on each h2 connection (also capped by the server)
+            race_size: Turbo and h2 engines only: send the requests in groups of race_size
+                released at the same instant (turbo: last-byte sync; h2: the final DATA frames
+                of the group in a single packet) instead of pipelining/multiplexing; 0 = off
         """
+        if engine not in ENGINES:
+            raise ValueError(f"Unknown send engine: {engine}")
+        if engine == 'h2' and not H2_AVAILABLE:
+            raise ValueError("The h2 engine requires the 'h2' package")
+        if race_size and engine not in RACE_ENGINES:
+            raise ValueError("Synchronized sending (race_size) requires the turbo or h2 engine")
         self.raw_request = raw_request
         self.attack_type = attack_type
         self.payload_sets = payload_sets or [[]]
@@ -314,17 +456,35 @@ class AdvancedSender:
         self.grep_extractor = GrepExtractor(grep_patterns or [])
         self.num_threads = num_threads
         self.proxy_port = proxy_port
-        self.num_positions = PayloadPositionParser.count_positions(raw_request)
+        self.anomaly_threshold = anomaly_threshold
+        self.engine = engine
+        self.in_flight = in_flight
+        self.connections = connections
+        self.pipeline = pipeline
+        self.streams = streams
+        self.race_size = race_size
+        if rate_limiter is None and engine == 'async':
+            # The shared limiter caps each host at a few dozen concurrent requests; the async
+            # engine gets its own limiter (still adaptive) sized for in_flight
+            rate_limiter = AdaptiveRateLimiter(max_concurrency=in_flight)
+        self.rate_limiter = rate_limiter or shared_limiter()
+        self.transport = transport or shared_transport()
+        # Throughput, latency percentiles and error rates of the last run_attack
+        self.last_stats: Optional[Dict[str, Any]] = None
+        # Parsed once: every request of the attack is rendered by filling the template slots
+        self.template = RequestTemplate(raw_request)
+        self.num_positions = self.template.num_positions
         
         # Store original values for Sniper attack
-        self.original_values = [val for _, _, val in PayloadPositionParser.find_positions(raw_request)]
+        self.original_values = self.template.original_values
     
-    def generate_requests(self) -> List[Tuple[str, List[str]]]:
+    def generate_requests(self) -> AttackRequests:
         """
         Generate all requests based on attack type.
         
         Returns:
-            List of (request_string, payloads_used) tuples
+            Lazy sequence of (request_string, payloads_used) tuples: requests are
+            rendered while iterating and len() does not generate anything
         """
         # Apply processors to payloads
         processed_sets = []
@@ -333,33 +493,17 @@ class AdvancedSender:
             processed = [PayloadProcessor.apply_processors(p, proc_chain) for p in pset]
             processed_sets.append(processed)
         
-        # Generate payload combinations based on attack type
-        if self.attack_type == 'sniper':
-            combinations = AttackTypeGenerator.sniper(processed_sets, self.num_positions)
-        elif self.attack_type == 'battering_ram':
-            combinations = AttackTypeGenerator.battering_ram(processed_sets, self.num_positions)
-        elif self.attack_type == 'pitchfork':
-            combinations = AttackTypeGenerator.pitchfork(processed_sets, self.num_positions)
-        elif self.attack_type == 'cluster_bomb':
-            combinations = AttackTypeGenerator.cluster_bomb(processed_sets, self.num_positions)
-        else:
+        if self.attack_type not in ('sniper', 'battering_ram', 'pitchfork', 'cluster_bomb'):
             log.error(f"Unknown attack type: {self.attack_type}")
-            return []
-        
-        # Replace §ORIGINAL§ markers with actual original values for Sniper
-        if self.attack_type == 'sniper':
-            for combo in combinations:
-                for i in range(len(combo)):
-                    if combo[i] == '§ORIGINAL§' and i < len(self.original_values):
-                        combo[i] = self.original_values[i]
-        
-        # Generate requests
-        requests = []
-        for combo in combinations:
-            request = PayloadPositionParser.replace_positions(self.raw_request, combo)
-            requests.append((request, combo))
-        
-        return requests
+            processed_sets = []
+        elif self.attack_type in ('sniper', 'battering_ram'):
+            # These attack types use only the first payload set
+            processed_sets = processed_sets[:1]
+        
+        # Sniper keeps the original values in the positions it is not attacking
+        combinations = PayloadCombinations(self.attack_type, processed_sets, self.num_positions,
+                                           defaults=self.original_values)
+        return AttackRequests(self.template, combinations)
     
     def send_request(self, raw_request: str) -> Optional[requests.Response]:
         """
@@ -372,110 +516,262 @@ class AdvancedSender:
             Response object or None on error
         """
         try:
-            # Parse request (simplified version from sender.py)
-            head, body = raw_request.strip().split('\n\n', 1) if '\n\n' in raw_request else (raw_request.strip(), "")
-            request_lines = head.split('\n')
-            
-            method, path, _ = request_lines[0].split(' ')
-            
-            headers = {}
-            for line in request_lines[1:]:
-                if ':' in line:
-                    key, value = line.split(':', 1)
-                    headers[key.strip()] = value.strip()
-            
-            host = headers.get("Host")
-            if not host:
-                raise ValueError("Header 'Host' not found")
-            
-            # Use HTTP for local hosts, HTTPS for others
-            if host.startswith(('127.0.0.1', 'localhost', '192.168.', '10.', '172.')):
-                scheme = "http"
-            else:
-                scheme = "https"
-            full_url = f"{scheme}://{host}{path}"
-            
-            headers_to_send = {k: v for k, v in headers.items() if k.lower() not in ['host', 'content-length']}
-            proxies = {"http": f"http://127.0.0.1:{self.proxy_port}", "https": f"http://127.0.0.1:{self.proxy_port}"}
-            
-            response = requests.request(
-                method=method,
-                url=full_url,
-                headers=headers_to_send,
-                data=body.encode('utf-8') if body else None,
+            prepared = RequestTemplate(raw_request).build()
+        except ValueError as e:
+            log.error(f"Error sending request: {e}")
+            return None
+        return self.send_prepared(prepared)
+
+    def proxy_url(self) -> str:
+        return f"http://127.0.0.1:{self.proxy_port}"
+
+    def send_prepared(self, prepared: PreparedRequest) -> Optional[requests.Response]:
+        """Send a request built from a template; returns None on error."""
+        proxies = {"http": self.proxy_url(), "https": self.proxy_url()}
+        try:
+            return self.rate_limiter.send(prepared.host, lambda: self.transport.request(
+                method=prepared.method,
+                url=prepared.url,
+                headers=prepared.headers,
+                data=prepared.body,
                 proxies=proxies,
                 verify=False,
-                timeout=30
-            )
-            
-            return response
-            
+                timeout=30,
+                # Like the event-loop engines: the 3xx itself is the result
+                allow_redirects=False
+            ))
         except Exception as e:
             log.error(f"Error sending request: {e}")
             return None
     
-    def run_attack(self, queue=None):
+    def attack_id(self) -> str:
+        """Hash of the attack configuration: checkpoints and shards are only valid for the same attack."""
+        config = [self.raw_request, self.attack_type, self.payload_sets, self.processors]
+        return hashlib.sha256(json.dumps(config, ensure_ascii=False).encode('utf-8')).hexdigest()[:16]
+
+    def shard(self, shard: int, shards: int) -> range:
+        """Index range of one of `shards` disjoint parts of the attack (for parallel processes or machines)."""
+        return shard_range(len(self.generate_requests()), shard, shards)
+
+    def load_checkpoint(self, checkpoint_file: str, start: int, stop: int) -> int:
+        """
+        Index to resume the range [start, stop) from.
+
+        Returns `start` when the checkpoint does not exist yet; raises ValueError
+        if it was written by a different attack or range.
+        """
+        if not os.path.exists(checkpoint_file):
+            return start
+        with open(checkpoint_file, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        if data.get('version') != CHECKPOINT_VERSION:
+            raise ValueError(f"Unsupported checkpoint version: {data.get('version')}")
+        if data.get('attack_id') != self.attack_id() or (data.get('start'), data.get('stop')) != (start, stop):
+            raise ValueError(f"Checkpoint {checkpoint_file} belongs to a different attack or index range")
+        completed_until = data.get('completed_until', start)
+        log.info(f"Advanced Sender: resuming from index {completed_until} ({completed_until - start}/{stop - start} done)")
+        return completed_until
+
+    def save_checkpoint(self, checkpoint_file: str, start: int, stop: int, completed_until: int):
+        """Record that every index in [start, completed_until) is done (temp file + rename)."""
+        data = {
+            'version': CHECKPOINT_VERSION,
+            'attack_id': self.attack_id(),
+            'attack_type': self.attack_type,
+            'start': start,
+            'stop': stop,
+            'completed_until': completed_until,
+        }
+        tmp_file = f"{checkpoint_file}.tmp"
+        try:
+            with open(tmp_file, 'w', encoding='utf-8') as f:
+                json.dump(data, f)
+            os.replace(tmp_file, checkpoint_file)
+        except OSError as e:
+            log.error(f"Error saving attack checkpoint: {e}")
+
+    def baseline_request(self) -> str:
+        """The base request with the original value in every payload position."""
+        return self.template.render(self.original_values)
+
+    def _send_and_fingerprint(self, payloads: List[str]) -> Tuple[Optional[requests.Response], Optional[ResponseFingerprint], float]:
+        """Build the request for `payloads`, send it and fingerprint the response in the worker thread."""
+        started = time.perf_counter()
+        try:
+            prepared = self.template.build(payloads)
+        except ValueError as e:
+            log.error(f"Error sending request: {e}")
+            return None, None, time.perf_counter() - started
+        response = self.send_prepared(prepared)
+        latency = time.perf_counter() - started
+        return response, fingerprint_response(response) if response is not None else None, latency
+
+    def _result_data(self, response: Optional[requests.Response], response_fingerprint: Optional[ResponseFingerprint],
+                     payloads_used: List[str], baseline: Optional[ResponseFingerprint]) -> Dict[str, Any]:
+        """Build the result entry reported for one request of the attack."""
+        if response is None:
+            return {
+                'url': 'N/A',
+                'status': 'Error',
+                'success': False,
+                'response': None,
+                'payloads': payloads_used,
+                'extracted': [],
+                'length': 0,
+                'words': 0,
+                'similarity': None,
+                'anomaly': False,
+                'timing': None,
+            }
+        return {
+            'url': response.request.url,
+            'status': response.status_code,
+            'success': 200 <= response.status_code < 300,
+            'response': response,
+            'payloads': payloads_used,
+            # Extract grep matches
+            'extracted': self.grep_extractor.extract(response.text),
+            'length': len(response.content),
+            'words': response_fingerprint.words,
+            'similarity': baseline.similarity(response_fingerprint) if baseline else None,
+            'anomaly': bool(baseline) and not baseline.matches(response_fingerprint, self.anomaly_threshold),
+            # Per-stream timing (h2 engine only)
+            'timing': getattr(response, 'timing', None),
+        }
+
+    def run_attack(self, queue=None, start: int = 0, stop: Optional[int] = None,
+                   checkpoint_file: Optional[str] = None):
         """
         Execute the attack and send all generated requests.
         
         Args:
-            queue: Optional queue for progress updates and results
+            queue: Optional queue (or callable) for progress updates and results
+            start: First combination index to send
+            stop: Index after the last combination to send (None = end of the attack)
+            checkpoint_file: JSON recording "completed up to index N"; an existing
+                checkpoint for the same attack and range resumes from there
         """
+        emit = queue.put if hasattr(queue, 'put') else queue
         requests_to_send = self.generate_requests()
-        total_requests = len(requests_to_send)
+        start, stop, _ = slice(start, stop).indices(len(requests_to_send))
+        stop = max(start, stop)
+        resume_from = self.load_checkpoint(checkpoint_file, start, stop) if checkpoint_file else start
+        total_requests = stop - resume_from
         
-        log.info(f"Advanced Sender: Starting {self.attack_type} attack with {total_requests} requests")
+        log.info(f"Advanced Sender: Starting {self.attack_type} attack with {total_requests} requests "
+                 f"(indexes {resume_from}-{stop} of {len(requests_to_send)}, {self.engine} engine)")
         
-        if queue:
-            queue.put({'type': 'progress_start', 'total': total_requests})
+        if emit:
+            emit({'type': 'progress_start', 'total': total_requests})
+
+        # Baseline: every result is compared with the response to the unmodified request
+        _, baseline, _ = self._send_and_fingerprint(self.original_values)
+        if baseline is None:
+            log.warning("Advanced Sender: baseline request failed, anomaly detection disabled")
         
         completed_requests = 0
+        # Requests are built from their payloads when sent: nothing is rendered or parsed twice
+        requests_iter = enumerate(requests_to_send.combinations.iter_range(resume_from, stop), resume_from)
+        # Requests finish out of order: the checkpoint records the first index not yet done
+        completed_until = resume_from
+        finished_ahead = set()
+        saved_at = time.monotonic()
+        stats = SendStats()
+
+        def record(index: int, payloads_used: List[str], response, response_fingerprint, latency: float):
+            nonlocal completed_requests, completed_until, saved_at
+            completed_requests += 1
+            stats.record(latency, response.status_code if response is not None else None)
+            finished_ahead.add(index)
+            while completed_until in finished_ahead:
+                finished_ahead.remove(completed_until)
+                completed_until += 1
+
+            if emit:
+                progress = (completed_requests / total_requests) * 100
+                emit({'type': 'progress_update', 'value': progress})
+                emit({'type': 'result',
+                      'data': self._result_data(response, response_fingerprint, payloads_used, baseline)})
+            if checkpoint_file and time.monotonic() - saved_at >= CHECKPOINT_INTERVAL:
+                self.save_checkpoint(checkpoint_file, start, stop, completed_until)
+                saved_at = time.monotonic()
         
+        try:
+            if self.engine == 'async':
+                self._run_async(requests_iter, record)
+            elif self.engine == 'turbo':
+                self._run_turbo(requests_iter, record)
+            elif self.engine == 'h2':
+                self._run_h2(requests_iter, record)
+            else:
+                self._run_threads(requests_iter, record)
+        finally:
+            # Also on errors and Ctrl+C: a new run resumes after the last contiguous index done
+            if checkpoint_file:
+                self.save_checkpoint(checkpoint_file, start, stop, completed_until)
+            stats.finish()
+            self.last_stats = stats.summary()
+        
+        log.info(f"Advanced Sender: Attack completed: {format_summary(self.last_stats)}")
+        if emit:
+            emit({'type': 'stats', 'data': self.last_stats})
+            emit({'type': 'progress_done'})
+
+    def _run_threads(self, requests_iter: Iterator[Tuple[int, List[str]]], record: Callable):
+        """Send the requests with a pool of num_threads worker threads."""
+        # Only a few requests per worker are queued at a time: memory does not grow with the attack size
+        max_pending = self.num_threads * 4
         with concurrent.futures.ThreadPoolExecutor(max_workers=self.num_threads) as executor:
-            future_to_payloads = {
-                executor.submit(self.send_request, req): payloads 
-                for req, payloads in requests_to_send
-            }
-            
-            for future in concurrent.futures.as_completed(future_to_payloads):
-                response = future.result()
-                payloads_used = future_to_payloads[future]
-                completed_requests += 1
-                
-                if queue:
-                    progress = (completed_requests / total_requests) * 100
-                    queue.put({'type': 'progress_update', 'value': progress})
-                    
-                    if response:
-                        # Extract grep matches
-                        extracted = self.grep_extractor.extract(response.text)
-                        
-                        success = 200 <= response.status_code < 300
-                        result_data = {
-                            'url': response.request.url,
-                            'status': response.status_code,
-                            'success': success,
-                            'response': response,
-                            'payloads': payloads_used,
-                            'extracted': extracted,
-                            'length': len(response.content)
-                        }
-                    else:
-                        result_data = {
-                            'url': 'N/A',
-                            'status': 'Error',
-                            'success': False,
-                            'response': None,
-                            'payloads': payloads_used,
-                            'extracted': [],
-                            'length': 0
-                        }
-                    
-                    queue.put({'type': 'result', 'data': result_data})
-        
-        log.info("Advanced Sender: Attack completed")
-        if queue:
-            queue.put({'type': 'progress_done'})
+            pending = {}
+
+            def submit_more():
+                for index, payloads in itertools.islice(requests_iter, max_pending - len(pending)):
+                    pending[executor.submit(self._send_and_fingerprint, payloads)] = (index, payloads)
+
+            submit_more()
+            while pending:
+                done, _ = concurrent.futures.wait(pending, return_when=concurrent.futures.FIRST_COMPLETED)
+                for future in done:
+                    response, response_fingerprint, latency = future.result()
+                    index, payloads_used = pending.pop(future)
+                    record(index, payloads_used, response, response_fingerprint, latency)
+                submit_more()
+
+    def _run_async(self, requests_iter: Iterator[Tuple[int, List[str]]], record: Callable):
+        """Send the requests from one event loop with up to in_flight requests in flight."""
+        engine = AsyncHttpEngine(in_flight=self.in_flight, proxy=self.proxy_url(), timeout=30,
+                                 rate_limiter=self.rate_limiter)
+        engine.run(requests_iter, lambda job: self.template.build(job[1]), self._fingerprinting(record))
+
+    def _run_turbo(self, requests_iter: Iterator[Tuple[int, List[str]]], record: Callable):
+        """Write the rendered requests straight to persistent sockets (pipelining or last-byte sync)."""
+        engine = TurboEngine(connections=self.connections, pipeline=self.pipeline, timeout=30)
+        engine.run(requests_iter, lambda job: self.template.render(job[1]), self._fingerprinting(record),
+                   race_size=self.race_size)
+        if engine.last_race:
+            log.info(f"Advanced Sender: last race group answered between {engine.last_race['first_response'] * 1000:.1f} "
+                     f"and {engine.last_race['last_response'] * 1000:.1f} ms after the release")
+
+    def _run_h2(self, requests_iter: Iterator[Tuple[int, List[str]]], record: Callable):
+        """Multiplex the requests as HTTP/2 streams (or single-packet race groups)."""
+        engine = Http2Engine(connections=self.connections, max_streams=self.streams, timeout=30)
+        engine.run(requests_iter, lambda job: self.template.build(job[1]), self._fingerprinting(record),
+                   race_size=self.race_size)
+        stats = engine.get_stats()
+        log.info(f"Advanced Sender: HTTP/2 used {stats['connections']} connection(s), up to {stats['peak_streams']} "
+                 f"concurrent streams, {stats['resent']} stream(s) resent")
+        if engine.last_race:
+            log.info(f"Advanced Sender: last race group answered between {engine.last_race['first_response'] * 1000:.1f} "
+                     f"and {engine.last_race['last_response'] * 1000:.1f} ms after the release")
+
+    @staticmethod
+    def _fingerprinting(record: Callable) -> Callable:
+        """Adapt `record` to the (job, response, latency) callback of the event-loop engines."""
+        def on_result(job: Tuple[int, List[str]], response, latency: float):
+            index, payloads_used = job
+            record(index, payloads_used, response, fingerprint_response(response) if response is not None else None,
+                   latency)
+        return on_result
 
 
 def load_payloads_from_file(file_path: str) -> List[str]:
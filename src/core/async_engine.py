@@ -0,0 +1,371 @@
+"""
+Motor de envio assíncrono (asyncio) para o Intruder e o Sender.
+
+Alternativa ao ThreadPoolExecutor quando são necessárias centenas de
+requisições simultâneas: `in_flight` corrotinas em um único event loop, sem
+uma thread por requisição. Cada corrotina pega o próximo job do iterador
+apenas quando termina o anterior, então a memória não cresce com o tamanho
+do ataque.
+
+O cliente HTTP/1.1 usa só a biblioteca padrão (asyncio streams):
+  - keep-alive: conexões ociosas são reutilizadas por host;
+  - proxy HTTP (requisição em forma absoluta; túnel CONNECT para HTTPS);
+  - body por Content-Length, chunked ou até o fechamento; gzip/deflate;
+  - limitador adaptativo por host (try_acquire/release), com reenvio após
+    429/503 como em `AdaptiveRateLimiter.send`.
+"""
+import asyncio
+import socket
+import ssl
+import time
+import zlib
+from collections import defaultdict
+from datetime import timedelta
+from types import SimpleNamespace
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+from urllib.parse import SplitResult, urlsplit
+
+from requests.structures import CaseInsensitiveDict
+from requests.utils import default_headers, requote_uri
+
+from .charset import decode_body
+from .logger_config import log
+from .rate_limiter import THROTTLE_STATUSES, AdaptiveRateLimiter, parse_retry_after
+from .request_template import PreparedRequest
+
+# Intervalo (s) para checar de novo uma vaga de concorrência liberada por outra thread
+_SLOT_POLL = 0.05
+
+
+class AsyncResponse:
+    """Resposta do motor assíncrono com a parte da interface de `requests.Response` usada pelos motores e pela GUI."""
+
+    def __init__(self, method: str, url: str, request_headers: Dict[str, str], request_body: Optional[bytes],
+                 status_code: int, reason: str, headers: CaseInsensitiveDict, content: bytes, elapsed: float):
+        self.url = url
+        self.status_code = status_code
+        self.reason = reason
+        self.headers = headers
+        self.content = content
+        self.elapsed = timedelta(seconds=elapsed)
+        self.request = SimpleNamespace(method=method, url=url, headers=request_headers, body=request_body)
+        # Tempos do stream (só no motor HTTP/2)
+        self.timing = None
+        self._text: Optional[str] = None
+
+    @property
+    def text(self) -> str:
+        if self._text is None:
+            self._text = decode_body(self.content, self.headers)
+        return self._text
+
+    @property
+    def ok(self) -> bool:
+        return self.status_code < 400
+
+
+class _Connection:
+    """Conexão aberta para um destino (host ou proxy)."""
+
+    __slots__ = ('reader', 'writer')
+
+    def __init__(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        self.reader = reader
+        self.writer = writer
+
+    def close(self):
+        self.writer.close()
+
+
+def insecure_ssl_context() -> ssl.SSLContext:
+    """Contexto TLS sem validação de certificado (alvos de teste costumam ter certificados inválidos)."""
+    context = ssl.create_default_context()
+    context.check_hostname = False
+    context.verify_mode = ssl.CERT_NONE
+    return context
+
+
+def _parse_status_line(line: bytes) -> Tuple[str, int, str]:
+    parts = line.decode('latin-1').rstrip('\r\n').split(' ', 2)
+    if len(parts) < 2 or not parts[0].startswith('HTTP/') or not parts[1].isdigit():
+        raise ConnectionError(f"Resposta HTTP inválida: {line[:80]!r}")
+    return parts[0], int(parts[1]), parts[2] if len(parts) > 2 else ''
+
+
+async def _read_headers(reader: asyncio.StreamReader) -> CaseInsensitiveDict:
+    """Headers até a linha em branco; repetidos são unidos com ', ' (como no requests)."""
+    headers = CaseInsensitiveDict()
+    while True:
+        line = await reader.readline()
+        if line in (b'\r\n', b'\n', b''):
+            return headers
+        name, _, value = line.decode('latin-1').partition(':')
+        name, value = name.strip(), value.strip()
+        headers[name] = f"{headers[name]}, {value}" if name in headers else value
+
+
+async def _read_chunked(reader: asyncio.StreamReader) -> bytes:
+    chunks = []
+    while True:
+        size_line = await reader.readline()
+        if not size_line:
+            raise asyncio.IncompleteReadError(b'', None)
+        size = int(size_line.split(b';', 1)[0].strip(), 16)
+        if size == 0:
+            break
+        chunks.append(await reader.readexactly(size))
+        await reader.readexactly(2)
+    # Trailers
+    while (await reader.readline()) not in (b'\r\n', b'\n', b''):
+        pass
+    return b''.join(chunks)
+
+
+def decode_content(body: bytes, content_encoding: Optional[str]) -> bytes:
+    """Remove gzip/deflate (na ordem inversa da aplicada); outras codificações ficam como estão."""
+    for encoding in reversed([e.strip().lower() for e in (content_encoding or '').split(',') if e.strip()]):
+        try:
+            if encoding in ('gzip', 'x-gzip'):
+                body = zlib.decompress(body, 16 + zlib.MAX_WBITS)
+            elif encoding == 'deflate':
+                try:
+                    body = zlib.decompress(body)
+                except zlib.error:
+                    body = zlib.decompress(body, -zlib.MAX_WBITS)
+            else:
+                break
+        except zlib.error:
+            break
+    return body
+
+
+async def read_response(reader: asyncio.StreamReader, method: str) -> Tuple[int, str, CaseInsensitiveDict, bytes, bool]:
+    """Lê uma resposta HTTP/1.x: (status, reason, headers, body, conexão reutilizável)."""
+    while True:
+        status_line = await reader.readline()
+        if not status_line:
+            raise ConnectionError("Conexão fechada sem resposta")
+        version, status, reason = _parse_status_line(status_line)
+        headers = await _read_headers(reader)
+        # Respostas informativas (100 Continue, 103 Early Hints) precedem a resposta final
+        if not 100 <= status < 200 or status == 101:
+            break
+    connection = headers.get('Connection', '').lower()
+    keep_alive = 'close' not in connection and (version != 'HTTP/1.0' or 'keep-alive' in connection)
+    if method == 'HEAD' or status in (204, 304) or 100 <= status < 200:
+        body = b''
+    elif 'chunked' in headers.get('Transfer-Encoding', '').lower():
+        body = await _read_chunked(reader)
+    elif 'Content-Length' in headers:
+        body = await reader.readexactly(int(headers['Content-Length']))
+    else:
+        body = await reader.read()
+        keep_alive = False
+    return status, reason, headers, decode_content(body, headers.get('Content-Encoding')), keep_alive
+
+
+class AsyncHttpEngine:
+    """Envia jobs com até `in_flight` requisições simultâneas em um event loop."""
+
+    def __init__(self, in_flight: int = 500, proxy: Optional[str] = None, timeout: float = 30.0,
+                 rate_limiter: Optional[AdaptiveRateLimiter] = None, retries: int = 0):
+        """
+        Args:
+            in_flight: Número máximo de requisições em voo
+            proxy: URL do proxy HTTP (ex.: http://127.0.0.1:9507); None = conexão direta
+            timeout: Tempo máximo (s) de cada requisição, da conexão ao fim do body
+            rate_limiter: Limitador por host (padrão: um próprio, com concorrência por host até `in_flight`)
+            retries: Reenvios após respostas 429/503 (padrão: nenhum; o 429/503 é o resultado)
+        """
+        if in_flight < 1:
+            raise ValueError("in_flight deve ser positivo")
+        self.in_flight = in_flight
+        self.proxy: Optional[SplitResult] = urlsplit(proxy) if proxy else None
+        self.timeout = timeout
+        self.rate_limiter = rate_limiter or AdaptiveRateLimiter(max_concurrency=in_flight)
+        self.retries = retries
+        self.ssl_context = insecure_ssl_context()
+        self.requests_sent = 0
+        self.connections_opened = 0
+        self._idle: Dict[Tuple[str, str], List[_Connection]] = defaultdict(list)
+        self._slot_freed: Optional[asyncio.Condition] = None
+
+    # --- Execução ---
+
+    def run(self, jobs: Iterable[Any], build: Callable[[Any], PreparedRequest],
+            on_result: Callable[[Any, Optional[AsyncResponse], float], None]):
+        """
+        Envia todos os jobs e bloqueia até o fim.
+
+        Args:
+            jobs: Iterável consumido sob demanda (um job por vez em cada corrotina)
+            build: Monta a requisição de um job; exceções viram resultado sem resposta
+            on_result: Chamado na thread do loop com (job, resposta ou None, latência em s)
+        """
+        asyncio.run(self._run(iter(jobs), build, on_result))
+
+    async def _run(self, jobs: Iterator[Any], build, on_result):
+        self._idle = defaultdict(list)
+        self._slot_freed = asyncio.Condition()
+        workers = [asyncio.ensure_future(self._worker(jobs, build, on_result)) for _ in range(self.in_flight)]
+        try:
+            await asyncio.gather(*workers)
+        finally:
+            for worker in workers:
+                worker.cancel()
+            await asyncio.gather(*workers, return_exceptions=True)
+            await self._close_idle()
+
+    async def _worker(self, jobs: Iterator[Any], build, on_result):
+        # As corrotinas dividem o mesmo iterador: cada uma pega o próximo job ao terminar o anterior
+        for job in jobs:
+            start = time.perf_counter()
+            try:
+                response = await self.send(build(job))
+            except Exception as e:
+                log.error(f"Motor assíncrono: erro no envio: {e}")
+                response = None
+            on_result(job, response, time.perf_counter() - start)
+
+    async def _close_idle(self):
+        connections = [conn for idle in self._idle.values() for conn in idle]
+        self._idle.clear()
+        for conn in connections:
+            conn.close()
+        await asyncio.gather(*(conn.writer.wait_closed() for conn in connections), return_exceptions=True)
+
+    # --- Limitador ---
+
+    async def _acquire(self, host: str):
+        while True:
+            wait = self.rate_limiter.try_acquire(host)
+            if wait == 0:
+                return
+            if wait is not None:
+                await asyncio.sleep(wait)
+                continue
+            # Sem vaga: espera uma requisição deste loop terminar (ou de outra thread que use o mesmo limitador)
+            async with self._slot_freed:
+                try:
+                    await asyncio.wait_for(self._slot_freed.wait(), _SLOT_POLL)
+                except asyncio.TimeoutError:
+                    pass
+
+    async def _release(self, host: str, **result):
+        self.rate_limiter.release(host, **result)
+        async with self._slot_freed:
+            self._slot_freed.notify()
+
+    async def send(self, prepared: PreparedRequest) -> AsyncResponse:
+        """Envia uma requisição respeitando o limitador do host (429/503 reenviados até `retries` vezes)."""
+        for attempt in range(self.retries + 1):
+            await self._acquire(prepared.host)
+            start = time.perf_counter()
+            try:
+                response = await asyncio.wait_for(self._exchange(prepared), self.timeout)
+            except BaseException:
+                await self._release(prepared.host, error=True)
+                raise
+            status = response.status_code
+            retry_after = parse_retry_after(response.headers.get('Retry-After')) if status in THROTTLE_STATUSES else None
+            await self._release(prepared.host, status=status, retry_after=retry_after,
+                                latency=time.perf_counter() - start)
+            if status not in THROTTLE_STATUSES or attempt == self.retries:
+                return response
+        return response
+
+    # --- HTTP/1.1 ---
+
+    def _serialize(self, method: str, url: SplitResult, headers: Dict[str, str],
+                   body: Optional[bytes]) -> Tuple[bytes, CaseInsensitiveDict]:
+        target = url.path or '/'
+        if url.query:
+            target += '?' + url.query
+        if self.proxy is not None and url.scheme == 'http':
+            target = f"http://{url.netloc}{target}"
+        # Mesmos headers padrão do requests, sobrescritos pelos da requisição
+        request_headers = default_headers()
+        request_headers.update(headers)
+        if body:
+            request_headers['Content-Length'] = str(len(body))
+        elif method not in ('GET', 'HEAD'):
+            request_headers['Content-Length'] = '0'
+        lines = [f"{method} {target} HTTP/1.1", f"Host: {url.netloc}"]
+        lines.extend(f"{name}: {value}" for name, value in request_headers.items())
+        return ('\r\n'.join(lines) + '\r\n\r\n').encode('latin-1') + (body or b''), request_headers
+
+    async def _tunnel(self, authority: str) -> socket.socket:
+        """Socket já conectado ao destino através do proxy (CONNECT), pronto para o TLS."""
+        loop = asyncio.get_running_loop()
+        family, sock_type, proto, _, address = (await loop.getaddrinfo(
+            self.proxy.hostname, self.proxy.port, type=socket.SOCK_STREAM))[0]
+        sock = socket.socket(family, sock_type, proto)
+        sock.setblocking(False)
+        try:
+            await loop.sock_connect(sock, address)
+            await loop.sock_sendall(sock, f"CONNECT {authority} HTTP/1.1\r\nHost: {authority}\r\n\r\n".encode('latin-1'))
+            reply = b''
+            while b'\r\n\r\n' not in reply:
+                chunk = await loop.sock_recv(sock, 4096)
+                if not chunk:
+                    raise ConnectionError("O proxy fechou a conexão durante o CONNECT")
+                reply += chunk
+            status_line = reply.split(b'\r\n', 1)[0]
+            if _parse_status_line(status_line)[1] != 200:
+                raise ConnectionError(f"CONNECT {authority} recusado pelo proxy: {status_line.decode('latin-1')}")
+        except BaseException:
+            sock.close()
+            raise
+        return sock
+
+    async def _connect(self, url: SplitResult) -> _Connection:
+        tls = url.scheme == 'https'
+        port = url.port or (443 if tls else 80)
+        if self.proxy is None:
+            reader, writer = await asyncio.open_connection(url.hostname, port, ssl=self.ssl_context if tls else None,
+                                                           server_hostname=url.hostname if tls else None)
+        elif not tls:
+            reader, writer = await asyncio.open_connection(self.proxy.hostname, self.proxy.port)
+        else:
+            authority = url.netloc if url.port else f"{url.netloc}:{port}"
+            reader, writer = await asyncio.open_connection(sock=await self._tunnel(authority), ssl=self.ssl_context,
+                                                           server_hostname=url.hostname)
+        self.connections_opened += 1
+        return _Connection(reader, writer)
+
+    async def _exchange(self, prepared: PreparedRequest) -> AsyncResponse:
+        url_text = requote_uri(prepared.url)
+        url = urlsplit(url_text)
+        key = (url.scheme, url.netloc.lower())
+        data, request_headers = self._serialize(prepared.method, url, prepared.headers, prepared.body)
+        start = time.perf_counter()
+        while True:
+            idle = self._idle[key]
+            conn = idle.pop() if idle else None
+            reused = conn is not None
+            if conn is None:
+                conn = await self._connect(url)
+            try:
+                conn.writer.write(data)
+                await conn.writer.drain()
+                status, reason, headers, body, keep_alive = await read_response(conn.reader, prepared.method)
+            except (ConnectionError, asyncio.IncompleteReadError):
+                conn.close()
+                if reused:
+                    continue  # O servidor fechou a conexão ociosa: tenta em uma nova
+                raise
+            except BaseException:
+                conn.close()
+                raise
+            break
+        self.requests_sent += 1
+        if keep_alive:
+            self._idle[key].append(conn)
+        else:
+            conn.close()
+        return AsyncResponse(prepared.method, url_text, dict(request_headers), prepared.body,
+                             status, reason, headers, body, time.perf_counter() - start)
+
+    def get_stats(self) -> Dict[str, int]:
+        """Requisições enviadas e conexões abertas (a diferença foi atendida por conexões reutilizadas)."""
+        return {'requests': self.requests_sent, 'connections': self.connections_opened}
@@ -0,0 +1,79 @@
+"""
+Detecção de charset e decodificação sob demanda de bodies HTTP
+O histórico e o scanner guardam os bodies como bytes; o texto só é produzido
+quando alguém (GUI, scanner, exportação) realmente precisa dele.
+"""
+import codecs
+import re
+from typing import Dict, Optional
+
+_CHARSET_PARAM = re.compile(r'charset\s*=\s*["\']?([\w.:-]+)', re.IGNORECASE)
+_META_CHARSET = re.compile(rb'<meta[^>]+charset\s*=\s*["\']?([\w.:-]+)', re.IGNORECASE)
+_XML_ENCODING = re.compile(rb'<\?xml[^>]+encoding\s*=\s*["\']([\w.:-]+)', re.IGNORECASE)
+
+_BOMS = (
+    (codecs.BOM_UTF8, 'utf-8-sig'),
+    (codecs.BOM_UTF32_LE, 'utf-32'),
+    (codecs.BOM_UTF32_BE, 'utf-32'),
+    (codecs.BOM_UTF16_LE, 'utf-16'),
+    (codecs.BOM_UTF16_BE, 'utf-16'),
+)
+
+# Quantos bytes do início do documento são inspecionados atrás de <meta charset> / <?xml encoding?>
+SNIFF_BYTES = 2048
+
+
+def _header(headers: Dict[str, str], name: str) -> str:
+    """Busca um header sem diferenciar maiúsculas/minúsculas."""
+    name = name.lower()
+    for key, value in (headers or {}).items():
+        if key.lower() == name:
+            return value
+    return ''
+
+
+def _valid_codec(name: str) -> Optional[str]:
+    try:
+        return codecs.lookup(name).name
+    except LookupError:
+        return None
+
+
+def detect_charset(raw: bytes, headers: Dict[str, str] = None) -> str:
+    """
+    Descobre o charset de um body: parâmetro charset do Content-Type, BOM,
+    <meta charset>/<?xml encoding?> no início do documento e, por fim, UTF-8
+    se os bytes forem UTF-8 válido ou cp1252 caso contrário.
+    """
+    match = _CHARSET_PARAM.search(_header(headers, 'Content-Type'))
+    if match:
+        charset = _valid_codec(match.group(1))
+        if charset:
+            return charset
+
+    for bom, charset in _BOMS:
+        if raw.startswith(bom):
+            return charset
+
+    head = raw[:SNIFF_BYTES]
+    match = _META_CHARSET.search(head) or _XML_ENCODING.search(head)
+    if match:
+        charset = _valid_codec(match.group(1).decode('ascii', errors='ignore'))
+        if charset:
+            return charset
+
+    try:
+        raw.decode('utf-8')
+        return 'utf-8'
+    except UnicodeDecodeError:
+        return 'cp1252'
+
+
+def decode_body(raw, headers: Dict[str, str] = None) -> str:
+    """Decodifica um body (bytes/memoryview) para texto usando o charset detectado."""
+    if not raw:
+        return ''
+    if isinstance(raw, str):
+        return raw
+    raw = bytes(raw)
+    return raw.decode(detect_charset(raw, headers), errors='replace')
@@ -0,0 +1,140 @@
+"""
+Compressão transparente dos bodies guardados no histórico
+HTML/JSON/JS capturados comprimem muito bem; bodies acima de um limite são
+guardados comprimidos (zlib por padrão, zstd se o pacote `zstandard` estiver
+instalado) e descomprimidos apenas quando são lidos.
+"""
+import threading
+import time
+import zlib
+from typing import Any, Dict
+
+from .logger_config import log
+
+# zstd é opcional: só é usado se o pacote estiver instalado
+try:
+    import zstandard
+    ZSTD_AVAILABLE = True
+except ImportError:
+    zstandard = None
+    ZSTD_AVAILABLE = False
+
+
+class CompressedBody:
+    """Body comprimido; `decompress()` devolve os bytes originais."""
+
+    __slots__ = ('compressor', 'data', 'original_size')
+
+    def __init__(self, compressor: 'BodyCompressor', data: bytes, original_size: int):
+        self.compressor = compressor
+        self.data = data
+        self.original_size = original_size
+
+    def __len__(self):
+        return len(self.data)
+
+    def decompress(self) -> bytes:
+        return self.compressor.decompress(self)
+
+
+class BodyCompressor:
+    """Comprime bodies acima de `threshold` bytes e contabiliza taxa e custo de CPU."""
+
+    CODECS = ('zlib', 'zstd')
+
+    # Amostra comprimida antes do body inteiro para descartar conteúdo incompressível
+    PROBE_SIZE = 4096
+    MIN_PROBE_RATIO = 1.1
+
+    def __init__(self, codec: str = 'zlib', threshold: int = 1024, level: int = None):
+        """
+        Args:
+            codec: 'zlib' ou 'zstd' (se o zstandard não estiver instalado, usa zlib)
+            threshold: Bodies menores que isso são guardados sem compressão
+            level: Nível de compressão (padrão: 1 para zlib, 3 para zstd; a compressão roda no hook do proxy)
+        """
+        if codec not in self.CODECS:
+            raise ValueError(f"Codec de compressão inválido: {codec}")
+        if codec == 'zstd' and not ZSTD_AVAILABLE:
+            log.warning("zstandard não está instalado; usando zlib para comprimir o histórico")
+            codec = 'zlib'
+
+        self.codec = codec
+        self.threshold = threshold
+        if codec == 'zstd':
+            self.level = 3 if level is None else level
+            self._compressor = zstandard.ZstdCompressor(level=self.level)
+            self._decompressor = zstandard.ZstdDecompressor()
+        else:
+            self.level = 1 if level is None else level
+
+        self.lock = threading.Lock()
+        self.bodies_compressed = 0
+        self.bodies_stored_raw = 0
+        self.bytes_in = 0
+        self.bytes_out = 0
+        self.compress_time = 0.0
+        self.decompressions = 0
+        self.decompress_time = 0.0
+
+    def compress(self, data: bytes):
+        """Retorna um `CompressedBody`, ou os próprios bytes se não valer a pena comprimir."""
+        if not data or len(data) < self.threshold:
+            with self.lock:
+                self.bodies_stored_raw += 1
+            return data
+
+        started = time.perf_counter()
+        packed = None
+        if len(data) > 4 * self.PROBE_SIZE:
+            probe = self._compress(data[:self.PROBE_SIZE])
+            if self.PROBE_SIZE / len(probe) < self.MIN_PROBE_RATIO:
+                packed = data
+        if packed is None:
+            packed = self._compress(data)
+        elapsed = time.perf_counter() - started
+
+        with self.lock:
+            self.compress_time += elapsed
+            if len(packed) >= len(data):
+                # Conteúdo já comprimido (imagens, gzip...): guarda como está
+                self.bodies_stored_raw += 1
+                return data
+            self.bodies_compressed += 1
+            self.bytes_in += len(data)
+            self.bytes_out += len(packed)
+        return CompressedBody(self, packed, len(data))
+
+    def _compress(self, data: bytes) -> bytes:
+        if self.codec == 'zstd':
+            # O zstandard devolve um bytes com o tamanho do pior caso alocado;
+            # a cópia libera essa sobra, que ficaria presa no histórico
+            return bytes(memoryview(self._compressor.compress(data)))
+        return zlib.compress(data, self.level)
+
+    def decompress(self, body: CompressedBody) -> bytes:
+        started = time.perf_counter()
+        if self.codec == 'zstd':
+            data = self._decompressor.decompress(body.data, max_output_size=body.original_size)
+        else:
+            data = zlib.decompress(body.data)
+        with self.lock:
+            self.decompressions += 1
+            self.decompress_time += time.perf_counter() - started
+        return data
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Retorna a taxa de compressão e o tempo de CPU gasto comprimindo/descomprimindo."""
+        with self.lock:
+            return {
+                'codec': self.codec,
+                'threshold': self.threshold,
+                'bodies_compressed': self.bodies_compressed,
+                'bodies_stored_raw': self.bodies_stored_raw,
+                'bytes_in': self.bytes_in,
+                'bytes_out': self.bytes_out,
+                'ratio': self.bytes_in / self.bytes_out if self.bytes_out else 1.0,
+                'compress_time_ms': self.compress_time * 1000,
+                'decompressions': self.decompressions,
+                'decompress_time_ms': self.decompress_time * 1000,
+            }
@@ -1,49 +1,244 @@
+import atexit
 import json
 import os
 import queue
 import threading
+from types import MappingProxyType
+from typing import Any, Callable, Dict, Iterable, NamedTuple, Optional, Tuple
+
+from .intercept_registry import InterceptRegistry
+from .intercept_scope import InterceptScope, default_scope
+from .logger_config import log
+from .rule_matcher import CompiledRuleMatcher
+
+
+class RuleSnapshot(NamedTuple):
+    """Conjunto imutável de regras com versão e índice compilado."""
+    version: int
+    rules: Tuple[MappingProxyType, ...]
+    matcher: CompiledRuleMatcher
+
+
+def _build_snapshot(version: int, rules: Iterable[Dict[str, Any]]) -> RuleSnapshot:
+    frozen = tuple(MappingProxyType(dict(rule)) for rule in rules)
+    return RuleSnapshot(version, frozen, CompiledRuleMatcher(frozen))
 
 
 class InterceptConfig:
     """Gerencia a configuração do interceptador"""
 
-    def __init__(self, config_file="intercept_config.json"):
+    def __init__(self, config_file="intercept_config.json", save_debounce: float = 0.0):
+        """
+        Args:
+            config_file: Arquivo JSON da configuração
+            save_debounce: Segundos para agrupar alterações em uma única gravação (0 = grava na hora)
+        """
         self.config_file = config_file
-        self.rules = []
+        self.save_debounce = save_debounce
         self.port = 9507  # Porta padrão
+        self.history_memory_mb = 512  # Orçamento de memória do histórico
         self.paused = False
         self.intercept_enabled = False
         self.intercept_queue = queue.Queue()
         self.intercept_response_queue = queue.Queue()
         self.intercept_lock = threading.Lock()
+        # Flows retidos pela interceptação manual, cada um com sua decisão
+        self.intercept_registry = InterceptRegistry()
+        # Filtro compilado: só requisições dentro do escopo são retidas
+        self.intercept_scope = InterceptScope(default_scope())
+
+        # As regras são um snapshot imutável trocado atomicamente (copy-on-write):
+        # a thread do proxy lê o snapshot sem lock enquanto a GUI o substitui
+        self.rules_lock = threading.RLock()
+        self._snapshot = _build_snapshot(0, ())
+
+        # Gravação adiada e observador de alterações externas no arquivo
+        self._save_lock = threading.Lock()
+        self._save_timer = None
+        self._dirty = False
+        # Erro da última gravação (None = gravada) e aviso de falha de uma gravação adiada,
+        # que acontece na thread do timer, depois de save_config já ter retornado
+        self.save_error: Optional[str] = None
+        self.on_save_error: Optional[Callable[[str], None]] = None
+        self._last_written_mtime = None
+        # mtime de uma edição externa ignorada por haver alterações locais (avisada uma única vez)
+        self._conflict_mtime = None
+        self._watcher = None
+        self._stop_watching = threading.Event()
+        if save_debounce > 0:
+            atexit.register(self.flush)
         self.load_config()
 
+    # --- Snapshot de regras ---
+
+    @property
+    def rules(self):
+        """Regras atuais (somente leitura)."""
+        return self._snapshot.rules
+
+    @rules.setter
+    def rules(self, rules):
+        self._swap_rules(rules)
+
+    @property
+    def rules_version(self) -> int:
+        return self._snapshot.version
+
+    def _swap_rules(self, rules: Iterable[Dict[str, Any]]) -> RuleSnapshot:
+        """Compila um novo snapshot e o publica com uma única atribuição."""
+        with self.rules_lock:
+            snapshot = _build_snapshot(self._snapshot.version + 1, rules)
+            self._snapshot = snapshot
+        return snapshot
+
+    def get_rule_snapshot(self) -> RuleSnapshot:
+        """Retorna o snapshot atual (regras + índice compilado, consistentes entre si)."""
+        return self._snapshot
+
+    def get_rule_matcher(self) -> CompiledRuleMatcher:
+        """Retorna o índice compilado das regras atuais."""
+        return self._snapshot.matcher
+
+    # --- Persistência ---
+
+    def _read_file(self):
+        with open(self.config_file, 'r', encoding='utf-8') as f:
+            return json.load(f)
+
     def load_config(self):
         """Carrega configuração do arquivo"""
         if os.path.exists(self.config_file):
             try:
-                with open(self.config_file, 'r', encoding='utf-8') as f:
-                    data = json.load(f)
-                    self.rules = data.get('rules', [])
-                    self.port = data.get('port', 9507)
+                data = self._read_file()
+                self._swap_rules(data.get('rules', []))
+                self.port = data.get('port', 9507)
+                self.history_memory_mb = data.get('history_memory_mb', 512)
+                self.intercept_scope = InterceptScope(data.get('intercept_scope', default_scope()))
+                self._last_written_mtime = os.stat(self.config_file).st_mtime_ns
             except Exception as e:
                 print(f"Erro ao carregar config: {e}")
-                self.rules = []
+                self._swap_rules([])
                 self.port = 9507
         else:
-            self.rules = []
+            self._swap_rules([])
             self.port = 9507
 
     def save_config(self):
-        """Salva configuração no arquivo"""
+        """
+        Salva configuração no arquivo (agrupando alterações se `save_debounce` > 0).
+
+        Gravação adiada: True só indica que foi agendada; uma falha é informada depois
+        por `on_save_error`. Enquanto a última gravação estiver com erro, as próximas
+        são feitas na hora, e o retorno volta a indicar o resultado real (o chamador
+        desfaz a alteração).
+        """
+        with self._save_lock:
+            self._dirty = True
+            if self.save_debounce > 0 and self.save_error is None:
+                if self._save_timer is None:
+                    self._save_timer = threading.Timer(self.save_debounce, self._deferred_flush)
+                    self._save_timer.daemon = True
+                    self._save_timer.start()
+                return True
+        return self.flush()
+
+    def flush(self):
+        """Grava imediatamente alterações pendentes."""
+        # A gravação acontece com o lock: o observador nunca vê `_dirty` limpo antes
+        # de `_last_written_mtime` apontar para o arquivo recém-gravado
+        with self._save_lock:
+            if self._save_timer is not None:
+                self._save_timer.cancel()
+                self._save_timer = None
+            if not self._dirty:
+                return True
+            # Em caso de falha, o que está em memória continua sem gravar
+            self._dirty = not self._write_config()
+            return not self._dirty
+
+    def _deferred_flush(self):
+        if not self.flush() and self.on_save_error is not None:
+            self.on_save_error(self.save_error)
+
+    def _write_config(self):
+        """Grava em um arquivo temporário e o renomeia: leitores nunca veem um JSON pela metade."""
+        data = {
+            'rules': [dict(rule) for rule in self._snapshot.rules],
+            'port': self.port,
+            'history_memory_mb': self.history_memory_mb,
+            'intercept_scope': self.intercept_scope.to_dict(),
+        }
+        tmp_file = f"{self.config_file}.tmp"
         try:
-            with open(self.config_file, 'w', encoding='utf-8') as f:
-                json.dump({'rules': self.rules, 'port': self.port}, f, indent=2, ensure_ascii=False)
+            with open(tmp_file, 'w', encoding='utf-8') as f:
+                json.dump(data, f, indent=2, ensure_ascii=False)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_file, self.config_file)
+            self._last_written_mtime = os.stat(self.config_file).st_mtime_ns
+            self.save_error = None
             return True
         except Exception as e:
             print(f"Erro ao salvar config: {e}")
+            self.save_error = str(e)
             return False
 
+    # --- Recarga a quente ---
+
+    def start_watching(self, interval: float = 1.0):
+        """Inicia uma thread que recarrega as regras quando o arquivo é editado externamente."""
+        if self._watcher is not None and self._watcher.is_alive():
+            return
+        self._stop_watching.clear()
+        self._watcher = threading.Thread(target=self._watch_loop, args=(interval,),
+                                         name="ConfigWatcher", daemon=True)
+        self._watcher.start()
+
+    def stop_watching(self):
+        """Para o observador do arquivo de configuração."""
+        self._stop_watching.set()
+        if self._watcher is not None:
+            self._watcher.join(timeout=2)
+            self._watcher = None
+
+    def _watch_loop(self, interval: float):
+        while not self._stop_watching.wait(interval):
+            self.reload_if_changed()
+
+    def reload_if_changed(self) -> bool:
+        """Recarrega as regras se o arquivo mudou desde a última leitura/gravação."""
+        # Verificação e troca sob os locks: uma alteração local (add_rule, flush) não
+        # se intercala entre ver o arquivo sem alterações pendentes e substituir as regras
+        with self.rules_lock, self._save_lock:
+            try:
+                mtime = os.stat(self.config_file).st_mtime_ns
+            except OSError:
+                return False
+            if mtime == self._last_written_mtime:
+                return False
+            if self._dirty:
+                # Há alterações locais ainda não gravadas: elas prevalecem
+                if mtime != self._conflict_mtime:
+                    self._conflict_mtime = mtime
+                    log.warning("Arquivo de configuração alterado externamente com alterações locais pendentes; "
+                                "mantendo as locais")
+                return False
+
+            try:
+                data = self._read_file()
+            except (OSError, ValueError) as e:
+                # Provavelmente o arquivo está sendo escrito; tenta de novo na próxima verificação
+                log.debug(f"Não foi possível recarregar a configuração: {e}")
+                return False
+
+            self._last_written_mtime = mtime
+            snapshot = self._swap_rules(data.get('rules', []))
+            self.intercept_scope = InterceptScope(data.get('intercept_scope', default_scope()))
+        log.info(f"Configuração recarregada de {self.config_file}: {len(snapshot.rules)} regra(s), versão {snapshot.version}")
+        return True
+
+    # --- Regras ---
+
     def add_rule(self, host, path, param_name, param_value):
         """Adiciona uma regra de interceptação com validação."""
         # Validação
@@ -57,31 +252,41 @@ class InterceptConfig:
             'param_value': str(param_value).strip(),
             'enabled': True
         }
-        self.rules.append(rule)
 
-        if self.save_config():
-            return True, "Regra adicionada com sucesso!"
-        else:
-            # Em caso de falha ao salvar, remove a regra que foi adicionada
-            self.rules.pop()
-            return False, "Erro ao salvar a configuração."
+        with self.rules_lock:
+            previous = self._snapshot.rules
+            self._swap_rules(previous + (rule,))
+
+            if self.save_config():
+                return True, "Regra adicionada com sucesso!"
+            else:
+                # Em caso de falha ao salvar, restaura as regras anteriores
+                self._swap_rules(previous)
+                return False, "Erro ao salvar a configuração."
 
     def remove_rule(self, index):
         """Remove uma regra de interceptação"""
-        if 0 <= index < len(self.rules):
-            self.rules.pop(index)
-            return self.save_config()
+        with self.rules_lock:
+            rules = self._snapshot.rules
+            if 0 <= index < len(rules):
+                self._swap_rules(rules[:index] + rules[index + 1:])
+                return self.save_config()
         return False
 
     def get_rules(self):
         """Retorna todas as regras"""
-        return self.rules
+        return self._snapshot.rules
 
     def toggle_rule(self, index):
         """Ativa/desativa uma regra"""
-        if 0 <= index < len(self.rules):
-            self.rules[index]['enabled'] = not self.rules[index]['enabled']
-            return self.save_config()
+        with self.rules_lock:
+            rules = list(self._snapshot.rules)
+            if 0 <= index < len(rules):
+                toggled = dict(rules[index])
+                toggled['enabled'] = not toggled.get('enabled', True)
+                rules[index] = toggled
+                self._swap_rules(rules)
+                return self.save_config()
         return False
 
     def toggle_pause(self):
@@ -124,6 +329,27 @@ class InterceptConfig:
         except queue.Empty:
             return None
 
+    def get_intercept_scope(self):
+        """Retorna o filtro de escopo compilado da interceptação manual."""
+        return self.intercept_scope
+
+    def set_intercept_scope(self, scope):
+        """Compila e publica um novo escopo de interceptação e salva a configuração."""
+        previous = self.intercept_scope
+        self.intercept_scope = InterceptScope(scope)
+        if self.save_config():
+            return True, "Escopo de interceptação atualizado."
+        self.intercept_scope = previous
+        return False, "Erro ao salvar a configuração."
+
+    def resolve_intercept(self, flow_id, decision):
+        """Aplica Forward/Drop ao flow retido com o id informado."""
+        return self.intercept_registry.resolve(flow_id, decision)
+
+    def release_intercepts(self):
+        """Libera (Forward sem alterações) todos os flows retidos."""
+        return self.intercept_registry.release_all()
+
     def clear_intercept_queues(self):
         """Limpa todas as filas de interceptação."""
         while not self.intercept_queue.empty():
@@ -158,3 +384,23 @@ class InterceptConfig:
         else:
             return False, "Erro ao salvar a configuração."
 
+    def get_history_memory_mb(self):
+        """Retorna o orçamento de memória do histórico em MB (0 = sem limite)."""
+        return self.history_memory_mb
+
+    def set_history_memory_mb(self, megabytes):
+        """Define o orçamento de memória do histórico e salva a configuração."""
+        if not isinstance(megabytes, int):
+            try:
+                megabytes = int(megabytes)
+            except (ValueError, TypeError):
+                return False, "O limite de memória deve ser um número inteiro (MB)."
+
+        if megabytes < 0:
+            return False, "O limite de memória não pode ser negativo."
+
+        self.history_memory_mb = megabytes
+        if self.save_config():
+            return True, f"Limite de memória do histórico configurado para {megabytes} MB"
+        else:
+            return False, "Erro ao salvar a configuração."
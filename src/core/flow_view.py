@@ -0,0 +1,79 @@
+"""
+Visão preguiçosa de um flow do mitmproxy
+Construída uma vez por flow no `InterceptAddon`, memoiza headers, bodies
+e texto decodificado para que histórico, scanner, cookies e spider
+não repitam cópias de headers nem decodificações do mesmo body.
+"""
+from functools import cached_property
+from typing import Dict
+
+from mitmproxy import http
+
+from .charset import decode_body
+
+
+class FlowView:
+    """Acesso memoizado aos dados de um `http.HTTPFlow`."""
+
+    def __init__(self, flow: http.HTTPFlow):
+        self.flow = flow
+        self.request = flow.request
+        self.response = flow.response
+
+    # --- Requisição ---
+
+    @cached_property
+    def host(self) -> str:
+        return self.request.pretty_host
+
+    @cached_property
+    def url(self) -> str:
+        return self.request.pretty_url
+
+    @cached_property
+    def path(self) -> str:
+        return self.request.path
+
+    @cached_property
+    def method(self) -> str:
+        return self.request.method
+
+    @cached_property
+    def request_headers(self) -> Dict[str, str]:
+        """Cópia única dos headers da requisição."""
+        return dict(self.request.headers)
+
+    @cached_property
+    def request_headers_lower(self) -> Dict[str, str]:
+        return {name.lower(): value for name, value in self.request_headers.items()}
+
+    @cached_property
+    def request_content(self) -> bytes:
+        return self.request.content or b''
+
+    # --- Resposta ---
+
+    @cached_property
+    def status(self) -> int:
+        return self.response.status_code if self.response else 0
+
+    @cached_property
+    def response_headers(self) -> Dict[str, str]:
+        """Cópia única dos headers da resposta."""
+        return dict(self.response.headers) if self.response else {}
+
+    @cached_property
+    def response_headers_lower(self) -> Dict[str, str]:
+        return {name.lower(): value for name, value in self.response_headers.items()}
+
+    @cached_property
+    def content_type(self) -> str:
+        return self.response_headers_lower.get('content-type', '')
+
+    @cached_property
+    def response_content(self) -> bytes:
+        return (self.response.content or b'') if self.response else b''
+
+    @cached_property
+    def response_text(self) -> str:
+        return decode_body(self.response_content, self.response_headers)
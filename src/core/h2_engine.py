@@ -0,0 +1,554 @@
+"""
+Motor HTTP/2 do Intruder: centenas de streams simultâneos sobre poucas conexões.
+
+Cada conexão multiplexa até `max_streams` requisições (ou o limite
+SETTINGS_MAX_CONCURRENT_STREAMS do servidor, se menor); um novo stream é
+aberto assim que outro termina. Bodies são enviados respeitando as janelas
+de controle de fluxo do stream e da conexão (o envio espera WINDOW_UPDATE),
+e os dados recebidos são confirmados na hora para o servidor não travar.
+
+  - HTTPS negocia HTTP/2 por ALPN; alvos HTTP usam h2c com conhecimento prévio.
+  - Streams recusados (REFUSED_STREAM) ou acima do last_stream_id de um GOAWAY
+    são reenviados até `refused_retries` vezes; a queda da conexão sem
+    resposta conta uma tentativa (até `retries`). Depois disso o job vira erro.
+  - Após um GOAWAY a conexão não abre novos streams, mas continua lendo até os
+    streams aceitos pelo servidor (até last_stream_id) terminarem.
+  - Ataque de pacote único (`race_size`): os streams de um grupo são abertos
+    com os headers e o body sem o último byte; após uma pausa, os frames DATA
+    finais (END_STREAM) de todos saem em uma única escrita no socket, que
+    cabe em um pacote TCP: o servidor recebe o grupo inteiro no mesmo instante.
+
+Cada resposta leva os tempos do seu stream (`AsyncResponse.timing`). Como o
+modo turbo, não passa pelo proxy nem pelo limitador de taxa.
+"""
+import asyncio
+import time
+from collections import deque
+from typing import Any, Callable, Deque, Dict, Iterable, Iterator, List, NamedTuple, Optional, Tuple
+from urllib.parse import urlsplit
+
+from requests.structures import CaseInsensitiveDict
+
+from .async_engine import AsyncResponse, decode_content, insecure_ssl_context
+from .logger_config import log
+from .request_template import PreparedRequest
+
+# h2 é opcional: normalmente já vem instalado como dependência do mitmproxy
+try:
+    import h2.config
+    import h2.connection
+    import h2.errors
+    import h2.events
+    import h2.exceptions
+    from h2.settings import SettingCodes
+    H2_AVAILABLE = True
+except ImportError:
+    h2 = None
+    H2_AVAILABLE = False
+
+# Headers específicos de conexão, proibidos no HTTP/2 (RFC 9113, 8.2.2)
+_CONNECTION_HEADERS = ('connection', 'keep-alive', 'proxy-connection', 'transfer-encoding', 'upgrade', 'host',
+                       'content-length')
+# Janela de recepção anunciada ao servidor (stream e conexão)
+_RECEIVE_WINDOW = 16 * 1024 * 1024
+
+# Erros que encerram uma conexão (ou o envio de um stream)
+_CONNECTION_ERRORS = (OSError, EOFError, asyncio.TimeoutError)
+if H2_AVAILABLE:
+    _CONNECTION_ERRORS += (h2.exceptions.ProtocolError,)
+
+    class _DrainingH2Connection(h2.connection.H2Connection):
+        """
+        H2Connection que continua aceitando frames dos streams abertos depois de um GOAWAY.
+
+        O h2 fecha a máquina de estados da conexão ao receber GOAWAY, e os frames
+        seguintes (respostas dos streams até last_stream_id) virariam ProtocolError.
+        """
+
+        def _receive_goaway_frame(self, frame):
+            state = self.state_machine.state
+            events = super()._receive_goaway_frame(frame)
+            self.state_machine.state = state
+            return events
+
+
+class StreamTiming(NamedTuple):
+    """Tempos de um stream, em segundos a partir do envio dos headers."""
+    connection: int  # Conexão do stream (ordem de abertura)
+    stream_id: int
+    first_byte: float  # Headers da resposta recebidos
+    complete: float  # Fim do stream (body completo)
+
+
+class _Stream:
+    """Job do ataque com a requisição montada e o estado do stream."""
+
+    __slots__ = ('job', 'request', 'target', 'path', 'attempts', 'refusals', 'stream_id', 'sent_at',
+                 'first_byte_at', 'status', 'headers', 'body', 'done', 'error', 'retry')
+
+    def __init__(self, job: Any, request: PreparedRequest):
+        self.job = job
+        self.request = request
+        url = urlsplit(request.url)
+        self.target = (url.scheme, url.hostname, url.port or (443 if url.scheme == 'https' else 80))
+        self.path = (url.path or '/') + (f"?{url.query}" if url.query else '')
+        self.attempts = 0
+        self.refusals = 0
+        self.reset()
+
+    def reset(self):
+        """Estado de um novo envio (também ao reenviar em outra conexão)."""
+        self.stream_id = 0
+        self.sent_at = 0.0
+        self.first_byte_at = 0.0
+        self.status = 0
+        self.headers = CaseInsensitiveDict()
+        self.body: List[bytes] = []
+        self.done: Optional[asyncio.Future] = None
+        self.error: Optional[BaseException] = None
+        # O servidor garantiu que não processou o stream (conta em `refusals`, não em `attempts`)
+        self.retry = False
+
+    def h2_headers(self) -> List[Tuple[str, str]]:
+        request = self.request
+        headers = [(':method', request.method), (':scheme', self.target[0]), (':authority', request.host),
+                   (':path', self.path)]
+        headers += [(name.lower(), value) for name, value in request.headers.items()
+                    if name.lower() not in _CONNECTION_HEADERS]
+        if request.body or request.method not in ('GET', 'HEAD'):
+            headers.append(('content-length', str(len(request.body or b''))))
+        return headers
+
+
+class _H2Connection:
+    """Conexão HTTP/2: estado do protocolo (h2), streams abertos e a corrotina de leitura."""
+
+    def __init__(self, number: int, reader: asyncio.StreamReader, writer: asyncio.StreamWriter, max_streams: int):
+        self.number = number
+        self.reader = reader
+        self.writer = writer
+        self.max_streams = max_streams
+        self.h2 = _DrainingH2Connection(
+            config=h2.config.H2Configuration(client_side=True, header_encoding='utf-8'))
+        self.streams: Dict[int, _Stream] = {}
+        self.closed: Optional[BaseException] = None
+        # GOAWAY recebido: nenhum stream novo; a conexão fecha quando os restantes terminarem
+        self.goaway: Optional[BaseException] = None
+        self.settings_received = asyncio.Event()
+        self._changed = asyncio.Event()
+        self._reader_task: Optional[asyncio.Future] = None
+
+    def start(self):
+        self.h2.initiate_connection()
+        self.h2.update_settings({SettingCodes.ENABLE_PUSH: 0, SettingCodes.INITIAL_WINDOW_SIZE: _RECEIVE_WINDOW})
+        self.h2.increment_flow_control_window(_RECEIVE_WINDOW)
+        self.flush()
+        self._reader_task = asyncio.ensure_future(self._read_loop())
+
+    def close(self):
+        if self._reader_task is not None:
+            self._reader_task.cancel()
+        self.writer.close()
+
+    def flush(self):
+        data = self.h2.data_to_send()
+        if data:
+            self.writer.write(data)
+
+    async def drain(self):
+        try:
+            await self.writer.drain()
+        except OSError:
+            pass  # A queda aparece para os streams pela corrotina de leitura
+
+    async def wait(self):
+        """Espera uma mudança de estado (stream encerrado, janela ou settings atualizados, conexão fechada)."""
+        await self._changed.wait()
+
+    def _notify(self):
+        self._changed.set()
+        self._changed = asyncio.Event()
+
+    def capacity(self) -> int:
+        """Streams que ainda podem ser abertos agora."""
+        if self.closed is not None or self.goaway is not None:
+            return 0
+        limit = min(self.max_streams, self.h2.remote_settings.max_concurrent_streams)
+        return limit - self.h2.open_outbound_streams
+
+    # --- Envio ---
+
+    def open(self, stream: _Stream, end_stream: bool):
+        """Abre o stream com os headers da requisição (HEADERS com END_STREAM se não há body a enviar)."""
+        stream.stream_id = self.h2.get_next_available_stream_id()
+        stream.done = asyncio.get_running_loop().create_future()
+        self.h2.send_headers(stream.stream_id, stream.h2_headers(), end_stream=end_stream)
+        stream.sent_at = time.perf_counter()
+        self.streams[stream.stream_id] = stream
+        self.flush()
+
+    async def send_data(self, stream: _Stream, data: bytes, end_stream: bool):
+        """Envia `data` em frames DATA conforme as janelas de controle de fluxo permitem."""
+        if not data and not end_stream:
+            return
+        view = memoryview(data)
+        while True:
+            if self.closed is not None:
+                raise self.closed
+            if stream.done.done():
+                # Resposta (ou RST_STREAM) antes do fim do body: encerra o nosso lado do stream
+                self.cancel(stream)
+                return
+            window = min(self.h2.local_flow_control_window(stream.stream_id), self.h2.max_outbound_frame_size)
+            if window <= 0 and view:
+                await self.wait()
+                continue
+            chunk, view = view[:window], view[window:]
+            self.h2.send_data(stream.stream_id, chunk.tobytes(), end_stream=end_stream and not view)
+            self.flush()
+            if not view:
+                return
+
+    def cancel(self, stream: _Stream):
+        """RST_STREAM (CANCEL) de um stream abandonado (ex.: timeout)."""
+        self.streams.pop(stream.stream_id, None)
+        try:
+            self.h2.reset_stream(stream.stream_id, h2.errors.ErrorCodes.CANCEL)
+            self.flush()
+        except h2.exceptions.ProtocolError:
+            pass
+        self._check_drained()
+
+    # --- Recepção ---
+
+    async def _read_loop(self):
+        try:
+            while True:
+                data = await self.reader.read(65536)
+                if not data:
+                    raise ConnectionError("Conexão fechada pelo servidor")
+                for event in self.h2.receive_data(data):
+                    self._handle(event)
+                self.flush()
+                self._notify()
+        except _CONNECTION_ERRORS as e:
+            self._fail_all(e)
+
+    def _handle(self, event):
+        stream = self.streams.get(getattr(event, 'stream_id', None))
+        if isinstance(event, h2.events.ResponseReceived) and stream:
+            stream.first_byte_at = time.perf_counter()
+            for name, value in event.headers:
+                if name == ':status':
+                    stream.status = int(value)
+                elif not name.startswith(':'):
+                    stream.headers[name] = f"{stream.headers[name]}, {value}" if name in stream.headers else value
+        elif isinstance(event, h2.events.DataReceived):
+            # Confirma na hora: a janela de recepção nunca esgota
+            self.h2.acknowledge_received_data(event.flow_controlled_length, event.stream_id)
+            if stream:
+                stream.body.append(event.data)
+        elif isinstance(event, h2.events.StreamEnded) and stream:
+            self._finish(stream)
+        elif isinstance(event, h2.events.StreamReset) and stream:
+            stream.retry = event.error_code == h2.errors.ErrorCodes.REFUSED_STREAM
+            self._finish(stream, ConnectionError(f"RST_STREAM ({event.error_code!r})"))
+        elif isinstance(event, h2.events.RemoteSettingsChanged):
+            self.settings_received.set()
+        elif isinstance(event, h2.events.ConnectionTerminated):
+            self.goaway = ConnectionError(f"GOAWAY ({event.error_code!r})")
+            # Streams acima de last_stream_id não foram processados: podem ser reenviados;
+            # os demais continuam até a resposta (ou a queda da conexão)
+            last_stream_id = event.last_stream_id or 0
+            for stream in [stream for stream in self.streams.values() if stream.stream_id > last_stream_id]:
+                stream.retry = True
+                self._finish(stream, self.goaway)
+            self._check_drained()
+
+    def _finish(self, stream: _Stream, error: Optional[BaseException] = None):
+        self.streams.pop(stream.stream_id, None)
+        stream.error = error
+        if not stream.done.done():
+            stream.done.set_result(None)
+        self._check_drained()
+
+    def _check_drained(self):
+        """Após um GOAWAY, fecha a conexão assim que o último stream aceito termina."""
+        if self.goaway is not None and not self.streams and self.closed is None:
+            self._fail_all(self.goaway)
+
+    def _fail_all(self, error: BaseException):
+        if self.closed is None:
+            self.closed = error
+        for stream in list(self.streams.values()):
+            self._finish(stream, error)
+        self.settings_received.set()
+        self._notify()
+
+
+class Http2Engine:
+    """Streams HTTP/2 multiplexados em `connections` conexões, ou grupos em pacote único."""
+
+    def __init__(self, connections: int = 2, max_streams: int = 100, timeout: float = 30.0, retries: int = 2,
+                 refused_retries: int = 10, race_warmup: float = 0.1):
+        """
+        Args:
+            connections: Conexões HTTP/2 simultâneas
+            max_streams: Streams simultâneos por conexão (limitado também pelo servidor)
+            timeout: Tempo máximo (s) para conectar e para cada resposta
+            retries: Novas tentativas de uma requisição cuja conexão caiu sem resposta
+            refused_retries: Reenvios de um stream recusado (REFUSED_STREAM ou acima do GOAWAY)
+            race_warmup: Pausa (s) entre abrir os streams do grupo e liberar os frames finais
+        """
+        if not H2_AVAILABLE:
+            raise RuntimeError("O motor HTTP/2 requer o pacote 'h2'")
+        if connections < 1 or max_streams < 1:
+            raise ValueError("connections e max_streams devem ser positivos")
+        self.connections = connections
+        self.max_streams = max_streams
+        self.timeout = timeout
+        self.retries = retries
+        self.refused_retries = refused_retries
+        self.race_warmup = race_warmup
+        self.ssl_context = insecure_ssl_context()
+        self.ssl_context.set_alpn_protocols(['h2'])
+        self.requests_done = 0
+        self.connections_opened = 0
+        self.resent = 0
+        self.peak_streams = 0
+        # Intervalo entre a liberação e a primeira/última resposta da rajada mais recente
+        self.last_race: Optional[Dict[str, float]] = None
+
+    # --- Execução ---
+
+    def run(self, jobs: Iterable[Any], build: Callable[[Any], PreparedRequest],
+            on_result: Callable[[Any, Optional[AsyncResponse], float], None], race_size: int = 0):
+        """
+        Envia todos os jobs e bloqueia até o fim.
+
+        Args:
+            jobs: Iterável consumido sob demanda
+            build: Requisição pronta de um job (ex.: RequestTemplate.build)
+            on_result: Chamado com (job, resposta ou None, latência em s), na ordem de chegada
+            race_size: Se > 0, envia em grupos deste tamanho liberados em um único pacote
+        """
+        asyncio.run(self._run(iter(jobs), build, on_result, race_size))
+
+    async def _run(self, jobs: Iterator[Any], build, on_result, race_size: int):
+        if race_size > 0:
+            while True:
+                group = []
+                while len(group) < race_size:
+                    stream = self._next(jobs, build, on_result)
+                    if stream is None:
+                        break
+                    group.append(stream)
+                if not group:
+                    return
+                await self._race(group, on_result)
+        workers = [asyncio.ensure_future(self._connection_worker(jobs, build, on_result))
+                   for _ in range(self.connections)]
+        try:
+            await asyncio.gather(*workers)
+        finally:
+            for worker in workers:
+                worker.cancel()
+            await asyncio.gather(*workers, return_exceptions=True)
+
+    def _next(self, jobs: Iterator[Any], build, on_result) -> Optional[_Stream]:
+        """Próximo job do iterador compartilhado; requisições inválidas viram resultado sem resposta."""
+        for job in jobs:
+            try:
+                return _Stream(job, build(job))
+            except ValueError as e:
+                log.error(f"HTTP/2: requisição inválida: {e}")
+                on_result(job, None, 0.0)
+        return None
+
+    async def _connect(self, target: Tuple[str, str, int]) -> _H2Connection:
+        scheme, host, port = target
+        tls = scheme == 'https'
+        reader, writer = await asyncio.wait_for(asyncio.open_connection(
+            host, port, ssl=self.ssl_context if tls else None, server_hostname=host if tls else None), self.timeout)
+        if tls and writer.get_extra_info('ssl_object').selected_alpn_protocol() != 'h2':
+            writer.close()
+            raise ConnectionError(f"{host} não negociou HTTP/2 (ALPN)")
+        self.connections_opened += 1
+        connection = _H2Connection(self.connections_opened, reader, writer, self.max_streams)
+        connection.start()
+        try:
+            # Só abre streams depois de saber o limite do servidor
+            await asyncio.wait_for(connection.settings_received.wait(), self.timeout)
+        except asyncio.TimeoutError:
+            connection.close()
+            raise
+        if connection.closed is not None:
+            connection.close()
+            raise connection.closed
+        return connection
+
+    def _give_up_or_retry(self, queue: Deque[_Stream], error: BaseException, on_result) -> None:
+        """A requisição na frente da fila conta uma tentativa; após `retries` reenvios vira erro."""
+        stream = queue[0]
+        stream.attempts += 1
+        if stream.attempts > self.retries:
+            queue.popleft()
+            log.error(f"HTTP/2: erro no envio para {stream.request.url}: {error!r}")
+            on_result(stream.job, None, 0.0)
+
+    def _deliver(self, connection: _H2Connection, stream: _Stream, on_result, retry: Deque[_Stream]):
+        """Resultado de um stream encerrado; recusados voltam para a fila de reenvio."""
+        now = time.perf_counter()
+        latency = now - stream.sent_at
+        if stream.error is not None:
+            # Recusado/GOAWAY e queda da conexão têm limites de reenvio separados
+            if stream.retry:
+                resend = stream.refusals < self.refused_retries
+                stream.refusals += 1
+            else:
+                resend = stream.error is connection.closed and stream.attempts < self.retries
+                stream.attempts += 1
+            if resend:
+                stream.reset()
+                retry.append(stream)
+                self.resent += 1
+                return
+            log.error(f"HTTP/2: erro no stream para {stream.request.url}: {stream.error!r}")
+            on_result(stream.job, None, latency)
+            return
+        self.requests_done += 1
+        request = stream.request
+        response = AsyncResponse(request.method, request.url, request.headers, request.body, stream.status, '',
+                                 stream.headers, decode_content(b''.join(stream.body), stream.headers.get('Content-Encoding')),
+                                 latency)
+        response.timing = StreamTiming(connection.number, stream.stream_id,
+                                       (stream.first_byte_at or now) - stream.sent_at, latency)
+        on_result(stream.job, response, latency)
+
+    async def _wait_stream(self, connection: _H2Connection, stream: _Stream):
+        try:
+            await asyncio.wait_for(asyncio.shield(stream.done), self.timeout)
+        except asyncio.TimeoutError as e:
+            connection.cancel(stream)
+            stream.error = e
+
+    # --- Multiplexação ---
+
+    async def _connection_worker(self, jobs: Iterator[Any], build, on_result):
+        # Jobs a (re)enviar na próxima conexão desta corrotina
+        carry: Deque[_Stream] = deque()
+        while True:
+            if not carry:
+                first = self._next(jobs, build, on_result)
+                if first is None:
+                    return
+                carry.append(first)
+            target = carry[0].target
+            try:
+                connection = await self._connect(target)
+            except _CONNECTION_ERRORS as e:
+                self._give_up_or_retry(carry, e, on_result)
+                continue
+            active = set()
+            try:
+                while connection.closed is None:
+                    if connection.capacity() <= 0:
+                        await connection.wait()
+                        continue
+                    stream = carry.popleft() if carry else self._next(jobs, build, on_result)
+                    if stream is None:
+                        break
+                    if stream.target != target:
+                        carry.appendleft(stream)
+                        break
+                    try:
+                        connection.open(stream, end_stream=not stream.request.body)
+                    except h2.exceptions.ProtocolError as e:
+                        # Ex.: header com caractere inválido no HTTP/2
+                        log.error(f"HTTP/2: requisição inválida para {stream.request.url}: {e!r}")
+                        on_result(stream.job, None, 0.0)
+                        continue
+                    self.peak_streams = max(self.peak_streams, connection.h2.open_outbound_streams)
+                    task = asyncio.ensure_future(self._send_stream(connection, stream, on_result, carry))
+                    active.add(task)
+                    task.add_done_callback(active.discard)
+                if active:
+                    await asyncio.gather(*active)
+            finally:
+                connection.close()
+
+    async def _send_stream(self, connection: _H2Connection, stream: _Stream, on_result, retry: Deque[_Stream]):
+        if stream.request.body:
+            try:
+                await connection.send_data(stream, stream.request.body, end_stream=True)
+            except _CONNECTION_ERRORS as e:
+                connection.cancel(stream)
+                stream.error = e
+        if stream.error is None:
+            await self._wait_stream(connection, stream)
+        self._deliver(connection, stream, on_result, retry)
+
+    # --- Ataque de pacote único ---
+
+    async def _race(self, group: List[_Stream], on_result):
+        by_target: Dict[Tuple[str, str, int], List[_Stream]] = {}
+        for stream in group:
+            by_target.setdefault(stream.target, []).append(stream)
+        timings = await asyncio.gather(*(self._race_target(target, streams, on_result)
+                                         for target, streams in by_target.items()))
+        timings = [t for target_timings in timings for t in target_timings]
+        if timings:
+            self.last_race = {'first_response': min(timings), 'last_response': max(timings)}
+
+    async def _race_target(self, target: Tuple[str, str, int], streams: List[_Stream], on_result) -> List[float]:
+        retry: Deque[_Stream] = deque()
+        timings = []
+        while streams:
+            try:
+                connection = await self._connect(target)
+            except _CONNECTION_ERRORS as e:
+                for stream in streams:
+                    log.error(f"HTTP/2: erro ao conectar em {stream.request.url}: {e!r}")
+                    on_result(stream.job, None, 0.0)
+                return timings
+            try:
+                # Grupos maiores que o limite de streams do servidor saem em mais de uma rajada
+                size = max(connection.capacity(), 1)
+                batch, streams = streams[:size], streams[size:]
+                opened = []
+                for stream in batch:
+                    body = stream.request.body or b''
+                    try:
+                        connection.open(stream, end_stream=False)
+                        await connection.send_data(stream, body[:-1], end_stream=False)
+                        opened.append(stream)
+                    except _CONNECTION_ERRORS as e:
+                        stream.error = e
+                        self._deliver(connection, stream, on_result, retry)
+                await connection.drain()
+                # Só faltam os frames finais: o servidor ainda não pode processar nenhum stream
+                await asyncio.sleep(self.race_warmup)
+                released = time.perf_counter()
+                for stream in opened:
+                    stream.sent_at = released
+                    try:
+                        connection.h2.send_data(stream.stream_id, (stream.request.body or b'')[-1:], end_stream=True)
+                    except h2.exceptions.ProtocolError as e:
+                        stream.error = e
+                # Uma única escrita com todos os END_STREAM
+                connection.flush()
+                await asyncio.gather(*(self._wait_stream(connection, stream) for stream in opened if stream.error is None))
+                for stream in opened:
+                    if stream.error is None:
+                        timings.append(stream.first_byte_at - released)
+                    self._deliver(connection, stream, on_result, retry)
+            finally:
+                connection.close()
+            streams = list(retry) + streams
+            retry.clear()
+        return timings
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Respostas recebidas, conexões abertas, streams reenviados e o pico de streams simultâneos."""
+        return {'requests': self.requests_done, 'connections': self.connections_opened, 'resent': self.resent,
+                'peak_streams': self.peak_streams, 'last_race': self.last_race}
@@ -1,82 +1,210 @@
+import threading
+from collections import deque
 from datetime import datetime
+from itertools import islice
 from mitmproxy import http
 
+from .charset import decode_body
+from .compression import BodyCompressor, CompressedBody
+from .flow_view import FlowView
+
+
+class HistoryEntry(dict):
+    """
+    Entrada do histórico que guarda os bodies como bytes (`request_body_raw`,
+    `response_body_raw`). As chaves `request_body`/`response_body` continuam
+    disponíveis, mas o texto é decodificado a cada acesso com o charset
+    detectado, sem manter uma segunda cópia do body em memória.
+
+    Bodies grandes ficam em `*_body_compressed` e são descomprimidos quando a
+    chave `*_body_raw` correspondente é lida.
+    """
+
+    BODY_KEYS = {
+        'request_body': ('request_body_raw', 'request_headers'),
+        'response_body': ('response_body_raw', 'response_headers'),
+    }
+    COMPRESSED_KEYS = {
+        'request_body_raw': 'request_body_compressed',
+        'response_body_raw': 'response_body_compressed',
+    }
+
+    def __missing__(self, key):
+        if key in self.BODY_KEYS:
+            raw_key, headers_key = self.BODY_KEYS[key]
+            return decode_body(self[raw_key], dict.get(self, headers_key))
+        if key in self.COMPRESSED_KEYS:
+            packed = dict.get(self, self.COMPRESSED_KEYS[key])
+            if packed is not None:
+                return packed.decompress()
+        raise KeyError(key)
+
+    def __contains__(self, key):
+        if key in self.COMPRESSED_KEYS:
+            return dict.__contains__(self, key) or dict.__contains__(self, self.COMPRESSED_KEYS[key])
+        return key in self.BODY_KEYS or dict.__contains__(self, key)
+
+    def store_body(self, raw_key: str, data: bytes, compressor: BodyCompressor = None):
+        """Guarda um body, comprimido se o compressor achar que vale a pena."""
+        stored = compressor.compress(data) if compressor is not None else data
+        if isinstance(stored, CompressedBody):
+            dict.__setitem__(self, self.COMPRESSED_KEYS[raw_key], stored)
+        else:
+            dict.__setitem__(self, raw_key, stored)
+
+    def stored_size(self) -> int:
+        """Estimativa dos bytes ocupados pela entrada (bodies como guardados + headers)."""
+        size = 512  # overhead aproximado do dict e dos campos fixos
+        for raw_key, compressed_key in self.COMPRESSED_KEYS.items():
+            size += len(dict.get(self, raw_key) or dict.get(self, compressed_key) or b'')
+        for headers_key in ('request_headers', 'response_headers'):
+            for name, value in (dict.get(self, headers_key) or {}).items():
+                size += len(name) + len(value)
+        return size
+
+    def get(self, key, default=None):
+        try:
+            return self[key]
+        except KeyError:
+            return default
+
 
 class RequestHistory:
     """Gerencia o histórico de requisições"""
 
-    def __init__(self):
-        self.history = []
+    def __init__(self, compressor: BodyCompressor = None, max_memory_bytes: int = None,
+                 compress_bodies: bool = True):
+        """
+        Args:
+            compressor: Compressor dos bodies (padrão: zlib acima de 1 KB)
+            compress_bodies: False guarda os bodies sempre sem compressão
+            max_memory_bytes: Orçamento de memória; as entradas mais antigas são descartadas ao ultrapassá-lo
+        """
+        # Ring buffer: IDs são sequenciais, então a entrada mais antiga está sempre à esquerda
+        self.history = deque()
+        self.entries_by_id = {}
+        self.entry_sizes = {}
         self.max_items = 1000
+        self.max_memory_bytes = max_memory_bytes
+        self.memory_used = 0
+        self.evicted = 0
         self.current_id = 0
-
-    def add_request(self, flow: http.HTTPFlow, vulnerabilities=None):
-        """Adiciona uma requisição ao histórico"""
-        request = flow.request
-        response = flow.response
-
-        # Incrementa o ID para cada nova requisição
-        self.current_id += 1
-
-        # Extrai informações da requisição
-        entry = {
-            'id': self.current_id,
+        self.compressor = (compressor or BodyCompressor()) if compress_bodies else None
+        # Protege o histórico: o scanner passivo anexa achados a partir de outras threads
+        self.lock = threading.RLock()
+
+    def add_request(self, flow: http.HTTPFlow, vulnerabilities=None, view: FlowView = None):
+        """
+        Adiciona uma requisição ao histórico e retorna o ID da nova entrada.
+        `view` permite reaproveitar os headers/bodies já extraídos pelo addon.
+        """
+        view = view or FlowView(flow)
+
+        # Extrai informações da requisição. Os bodies são guardados como os bytes
+        # do mitmproxy (sem cópia) e só viram texto quando alguém os lê.
+        entry = HistoryEntry({
+            'id': None,
             'timestamp': datetime.now(),
-            'host': request.pretty_host,
-            'method': request.method,
-            'url': request.pretty_url,
-            'path': request.path,
-            'status': response.status_code if response else 0,
-            'request_headers': dict(request.headers),
-            'request_body': request.content.decode('utf-8', errors='ignore') if request.content else '',
-            'response_headers': dict(response.headers) if response else {},
-            'response_body': response.content.decode('utf-8', errors='ignore') if response and response.content else '',
+            'host': view.host,
+            'method': view.method,
+            'url': view.url,
+            'path': view.path,
+            'status': view.status,
+            'request_headers': view.request_headers,
+            'response_headers': view.response_headers,
             'vulnerabilities': vulnerabilities or [],  # Adiciona lista de vulnerabilidades
-        }
-
-        self.history.append(entry)
-
-        # Limita o tamanho do histórico
-        if len(self.history) > self.max_items:
-            self.history.pop(0)
+        })
+        entry.store_body('request_body_raw', view.request_content, self.compressor)
+        entry.store_body('response_body_raw', view.response_content, self.compressor)
+        size = entry.stored_size()
+
+        with self.lock:
+            # Incrementa o ID para cada nova requisição
+            self.current_id += 1
+            entry['id'] = self.current_id
+            self.history.append(entry)
+            self.entries_by_id[entry['id']] = entry
+            self.entry_sizes[entry['id']] = size
+            self.memory_used += size
+
+            # Limita o tamanho do histórico
+            self._evict()
+
+        return entry['id']
+
+    def _evict(self):
+        """Descarta as entradas mais antigas acima do limite de itens ou do orçamento de memória."""
+        while self.history and (
+            len(self.history) > self.max_items
+            or (self.max_memory_bytes and self.memory_used > self.max_memory_bytes and len(self.history) > 1)
+        ):
+            evicted = self.history.popleft()
+            del self.entries_by_id[evicted['id']]
+            self.memory_used -= self.entry_sizes.pop(evicted['id'])
+            self.evicted += 1
+
+    def set_memory_budget(self, max_memory_bytes: int = None):
+        """Define o orçamento de memória (None = sem limite) e descarta o excedente."""
+        with self.lock:
+            self.max_memory_bytes = max_memory_bytes
+            self._evict()
+
+    def get_oldest_id(self):
+        """Retorna o ID da entrada mais antiga ainda no histórico (None se vazio)."""
+        with self.lock:
+            return self.history[0]['id'] if self.history else None
+
+    def get_stats(self):
+        """Retorna ocupação de memória, descartes e estatísticas de compressão."""
+        with self.lock:
+            stats = {
+                'entries': len(self.history),
+                'memory_used': self.memory_used,
+                'max_memory_bytes': self.max_memory_bytes,
+                'evicted': self.evicted,
+            }
+        stats['compression'] = self.compressor.get_stats() if self.compressor is not None else None
+        return stats
 
     def get_history(self):
         """Retorna todo o histórico"""
-        return self.history
+        with self.lock:
+            return list(self.history)
 
     def clear_history(self):
         """Limpa o histórico"""
-        self.history = []
-        self.current_id = 0
+        with self.lock:
+            self.history = deque()
+            self.entries_by_id = {}
+            self.entry_sizes = {}
+            self.memory_used = 0
+            self.current_id = 0
 
     def get_new_entries(self, last_id=0):
         """Retorna apenas as entradas mais novas que o último ID conhecido."""
-        if not last_id or not self.history:
-            return self.history
-
-        # Encontra o índice da primeira nova entrada
-        first_new_index = -1
-        for i, entry in enumerate(reversed(self.history)):
-            if entry['id'] <= last_id:
-                break
-            first_new_index = len(self.history) - 1 - i
-
-        if first_new_index != -1:
-            return self.history[first_new_index:]
-        else:
-            return []
+        with self.lock:
+            if not last_id or not self.history:
+                return list(self.history)
+
+            # IDs são contíguos no buffer: as novas entradas são as últimas (current_id - last_id)
+            count = min(self.current_id - last_id, len(self.history))
+            if count <= 0:
+                return []
+            new_entries = list(islice(reversed(self.history), count))
+        new_entries.reverse()
+        return new_entries
 
     def get_entry_by_id(self, entry_id: int):
         """Retorna uma entrada do histórico pelo seu ID."""
-        for entry in reversed(self.history):
-            if entry['id'] == entry_id:
-                return entry
-        return None
+        return self.entries_by_id.get(entry_id)
 
     def add_vulnerabilities_to_entry(self, entry_id: int, new_vulnerabilities: list):
         """Adiciona uma lista de vulnerabilidades a uma entrada existente no histórico."""
-        entry = self.get_entry_by_id(entry_id)
-        if entry:
+        with self.lock:
+            entry = self.get_entry_by_id(entry_id)
+            if not entry:
+                return False
+
             # Garante que a lista de vulnerabilidades exista
             if 'vulnerabilities' not in entry or not isinstance(entry['vulnerabilities'], list):
                 entry['vulnerabilities'] = []
@@ -87,4 +215,3 @@ class RequestHistory:
                 if str(vuln) not in existing_vulns_str:
                     entry['vulnerabilities'].append(vuln)
             return True
-        return False
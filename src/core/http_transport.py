@@ -0,0 +1,216 @@
+"""
+Transporte HTTP compartilhado pelos motores de envio (Scanner Ativo, Intruder,
+Sender e Repeater).
+
+  - uma `requests.Session` por host de destino, com pool de conexões
+    dimensionado e keep-alive: requisições seguidas ao mesmo host reutilizam
+    a conexão TCP/TLS em vez de abrir uma nova a cada envio;
+  - cache de DNS com TTL: a conexão é aberta para o IP em cache, enquanto o
+    SNI, a validação do certificado e o header Host continuam usando o nome;
+  - estatísticas por host: requisições, conexões abertas, handshakes TLS e
+    taxa de reuso de conexões.
+"""
+import ipaddress
+import socket
+import threading
+import time
+from http.cookiejar import DefaultCookiePolicy
+from typing import Any, Dict, Optional, Tuple
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.connection import HTTPConnection, HTTPSConnection
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+from urllib3.exceptions import NameResolutionError
+
+from .logger_config import log
+
+
+class DnsCache:
+    """Resolução de nomes com cache por TTL (thread-safe)."""
+
+    def __init__(self, ttl: float = 300.0):
+        self.ttl = ttl
+        self.lock = threading.Lock()
+        self.entries: Dict[Tuple[str, int], Tuple[str, float]] = {}
+        self.hits = 0
+        self.misses = 0
+
+    def resolve(self, host: str, port: int) -> str:
+        """Endereço IP de `host` (IPs literais são devolvidos sem consulta). Levanta socket.gaierror."""
+        try:
+            ipaddress.ip_address(host)
+            return host
+        except ValueError:
+            pass
+        key = (host.lower(), port)
+        now = time.monotonic()
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is not None and entry[1] > now:
+                self.hits += 1
+                return entry[0]
+        address = socket.getaddrinfo(host, port, type=socket.SOCK_STREAM)[0][4][0]
+        with self.lock:
+            self.misses += 1
+            self.entries[key] = (address, now + self.ttl)
+        return address
+
+    def invalidate(self, host: str, port: int):
+        """Descarta o endereço em cache (ex.: a conexão ao IP falhou)."""
+        with self.lock:
+            self.entries.pop((host.lower(), port), None)
+
+    def get_stats(self) -> Dict[str, int]:
+        with self.lock:
+            return {'entries': len(self.entries), 'hits': self.hits, 'misses': self.misses}
+
+
+class _PooledConnectionMixin:
+    """Abre o socket para o IP em cache e conta as conexões novas do host da sessão."""
+
+    transport: 'HttpTransport' = None
+    stats_key: str = None
+
+    def _new_conn(self):
+        dns_host = self._dns_host
+        dns_cache = self.transport.dns_cache
+        try:
+            self._dns_host = dns_cache.resolve(dns_host, self.port)
+        except socket.gaierror as e:
+            # Mesmo erro do urllib3, sem repetir a consulta que acabou de falhar
+            raise NameResolutionError(self.host, self, e) from e
+        try:
+            sock = super()._new_conn()
+        except Exception:
+            dns_cache.invalidate(dns_host, self.port)
+            raise
+        finally:
+            self._dns_host = dns_host
+        self.transport._count(self.stats_key, 'connections')
+        if isinstance(self, HTTPSConnection):
+            self.transport._count(self.stats_key, 'tls_handshakes')
+        return sock
+
+
+class _PooledAdapter(HTTPAdapter):
+    """HTTPAdapter cujos pools (diretos ou via proxy HTTP) usam as conexões com cache de DNS e contadores."""
+
+    def __init__(self, pool_classes: Dict[str, type], **kwargs):
+        # Definido antes do __init__ da base, que já cria o PoolManager
+        self._pool_classes = pool_classes
+        super().__init__(**kwargs)
+
+    def init_poolmanager(self, *args, **kwargs):
+        super().init_poolmanager(*args, **kwargs)
+        self.poolmanager.pool_classes_by_scheme = self._pool_classes
+
+    def proxy_manager_for(self, proxy, **proxy_kwargs):
+        manager = super().proxy_manager_for(proxy, **proxy_kwargs)
+        # Proxies SOCKS usam pools próprios
+        if not proxy.lower().startswith('socks'):
+            manager.pool_classes_by_scheme = self._pool_classes
+        return manager
+
+
+class HttpTransport:
+    """Sessões HTTP por host, com pool dimensionado, keep-alive, cache de DNS e estatísticas."""
+
+    def __init__(self, pool_maxsize: int = 32, pool_connections: int = 4, dns_ttl: float = 300.0):
+        """
+        Args:
+            pool_maxsize: Conexões mantidas abertas por destino (host ou proxy) em cada sessão
+            pool_connections: Destinos com pool mantido por sessão (ex.: http e https do mesmo host)
+            dns_ttl: Tempo (s) que um endereço resolvido fica em cache
+        """
+        if pool_maxsize < 1 or pool_connections < 1:
+            raise ValueError("pool_maxsize e pool_connections devem ser positivos")
+        self.pool_maxsize = pool_maxsize
+        self.pool_connections = pool_connections
+        self.dns_cache = DnsCache(dns_ttl)
+        self.lock = threading.Lock()
+        self.sessions: Dict[str, requests.Session] = {}
+        self.hosts: Dict[str, Dict[str, int]] = {}
+
+    def _count(self, host: str, counter: str):
+        with self.lock:
+            stats = self.hosts.get(host)
+            if stats is None:
+                stats = self.hosts[host] = {'requests': 0, 'connections': 0, 'tls_handshakes': 0}
+            stats[counter] += 1
+
+    def _pool_classes(self, host: str) -> Dict[str, type]:
+        attrs = {'transport': self, 'stats_key': host}
+        http_conn = type('PooledHTTPConnection', (_PooledConnectionMixin, HTTPConnection), attrs)
+        https_conn = type('PooledHTTPSConnection', (_PooledConnectionMixin, HTTPSConnection), attrs)
+        return {
+            'http': type('PooledHTTPConnectionPool', (HTTPConnectionPool,), {'ConnectionCls': http_conn}),
+            'https': type('PooledHTTPSConnectionPool', (HTTPSConnectionPool,), {'ConnectionCls': https_conn}),
+        }
+
+    def session_for(self, host: str) -> requests.Session:
+        """Sessão do host (criada no primeiro uso). Os pools do urllib3 são thread-safe."""
+        host = host.lower()
+        with self.lock:
+            session = self.sessions.get(host)
+            if session is not None:
+                return session
+            session = requests.Session()
+            session.verify = False  # Alvos de teste costumam ter certificados inválidos
+            # Cada motor envia os cookies da requisição capturada: Set-Cookie de uma
+            # resposta não deve vazar para as requisições de outro motor
+            session.cookies.set_policy(DefaultCookiePolicy(allowed_domains=[]))
+            adapter = _PooledAdapter(self._pool_classes(host), pool_connections=self.pool_connections,
+                                     pool_maxsize=self.pool_maxsize)
+            session.mount('http://', adapter)
+            session.mount('https://', adapter)
+            self.sessions[host] = session
+        log.debug(f"Transporte HTTP: nova sessão para {host}")
+        return session
+
+    def request(self, method: str, url: str, **kwargs) -> requests.Response:
+        """Envia a requisição pela sessão do host da URL (mesmos argumentos de `requests.request`)."""
+        host = urlsplit(url).netloc.lower()
+        self._count(host, 'requests')
+        return self.session_for(host).request(method, url, **kwargs)
+
+    def get(self, url: str, **kwargs) -> requests.Response:
+        return self.request('GET', url, **kwargs)
+
+    def close(self):
+        """Fecha todas as sessões e conexões abertas."""
+        with self.lock:
+            sessions = list(self.sessions.values())
+            self.sessions.clear()
+        for session in sessions:
+            session.close()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Requisições, conexões abertas, handshakes TLS e taxa de reuso (total e por host)."""
+        def with_reuse(stats: Dict[str, int]) -> Dict[str, Any]:
+            reused = stats['requests'] - stats['connections']
+            return dict(stats, reuse_rate=max(0.0, reused / stats['requests']) if stats['requests'] else None)
+
+        with self.lock:
+            hosts = {host: dict(stats) for host, stats in self.hosts.items()}
+        totals = {counter: sum(stats[counter] for stats in hosts.values())
+                  for counter in ('requests', 'connections', 'tls_handshakes')}
+        return dict(
+            with_reuse(totals),
+            hosts={host: with_reuse(stats) for host, stats in hosts.items()},
+            dns=self.dns_cache.get_stats(),
+        )
+
+
+_shared_transport: Optional[HttpTransport] = None
+_shared_lock = threading.Lock()
+
+
+def shared_transport() -> HttpTransport:
+    """Transporte único do processo: todos os motores de envio reutilizam as mesmas conexões."""
+    global _shared_transport
+    with _shared_lock:
+        if _shared_transport is None:
+            _shared_transport = HttpTransport()
+        return _shared_transport
@@ -0,0 +1,167 @@
+"""
+Registro de flows retidos pela interceptação manual
+Cada requisição interceptada é suspensa com `flow.intercept()` e guardada
+pelo id do flow. O hook do mitmproxy retorna imediatamente: o tráfego não
+retido continua fluindo e centenas de flows podem aguardar decisão ao mesmo
+tempo. A decisão da GUI é aplicada ao flow certo no event loop do proxy.
+"""
+import asyncio
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+from mitmproxy import http
+
+from .logger_config import log
+
+
+class PendingIntercept:
+    """Flow retido aguardando Forward/Drop."""
+
+    __slots__ = ('flow', 'loop', 'held_at', 'timeout_handle')
+
+    def __init__(self, flow: http.HTTPFlow, loop: Optional[asyncio.AbstractEventLoop]):
+        self.flow = flow
+        self.loop = loop
+        self.held_at = time.time()
+        self.timeout_handle = None
+
+
+class InterceptRegistry:
+    """Flows interceptados indexados por `flow.id`, cada um com sua própria decisão."""
+
+    def __init__(self, timeout: float = 300):
+        """
+        Args:
+            timeout: Segundos até um flow sem decisão ser cancelado (0 = sem limite)
+        """
+        self.timeout = timeout
+        self.lock = threading.Lock()
+        self.pending: Dict[str, PendingIntercept] = {}
+        self.held = 0
+        self.passed = 0
+        self.forwarded = 0
+        self.dropped = 0
+        self.expired = 0
+
+    def hold(self, flow: http.HTTPFlow) -> str:
+        """
+        Suspende o flow e o registra. Deve ser chamado no hook do mitmproxy:
+        o event loop corrente é guardado para aplicar a decisão depois.
+        """
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            loop = None
+
+        entry = PendingIntercept(flow, loop)
+        flow.intercept()
+        with self.lock:
+            self.pending[flow.id] = entry
+            self.held += 1
+        if loop is not None and self.timeout > 0:
+            entry.timeout_handle = loop.call_later(self.timeout, self._expire, flow.id)
+        return flow.id
+
+    def note_passed(self):
+        """Contabiliza uma requisição liberada por estar fora do escopo."""
+        with self.lock:
+            self.passed += 1
+
+    def is_pending(self, flow_id: str) -> bool:
+        with self.lock:
+            return flow_id in self.pending
+
+    def pending_count(self) -> int:
+        with self.lock:
+            return len(self.pending)
+
+    def pending_ids(self) -> List[str]:
+        """Ids dos flows retidos, do mais antigo para o mais novo."""
+        with self.lock:
+            return list(self.pending)
+
+    def resolve(self, flow_id: str, decision: Dict[str, Any]) -> bool:
+        """
+        Aplica a decisão (`{'action': 'forward'|'drop', ...}`) ao flow indicado.
+        Pode ser chamado de qualquer thread. Retorna False se o flow não está
+        mais retido (já decidido, expirado ou desconhecido).
+        """
+        with self.lock:
+            entry = self.pending.pop(flow_id, None)
+        if entry is None:
+            return False
+        self._dispatch(entry, lambda: self._apply(entry, decision))
+        return True
+
+    def release_all(self, decision: Dict[str, Any] = None) -> int:
+        """Libera todos os flows retidos (padrão: Forward sem alterações)."""
+        decision = decision or {'action': 'forward'}
+        with self.lock:
+            entries = list(self.pending.values())
+            self.pending.clear()
+        for entry in entries:
+            self._dispatch(entry, lambda entry=entry: self._apply(entry, decision))
+        return len(entries)
+
+    def get_stats(self) -> Dict[str, int]:
+        with self.lock:
+            return {
+                'pending': len(self.pending),
+                'held': self.held,
+                'passed': self.passed,
+                'forwarded': self.forwarded,
+                'dropped': self.dropped,
+                'expired': self.expired,
+            }
+
+    def _dispatch(self, entry: PendingIntercept, callback: Callable[[], None]):
+        """Executa `callback` no event loop do flow (os objetos do mitmproxy não são thread-safe)."""
+        if entry.loop is None:
+            callback()
+            return
+        try:
+            entry.loop.call_soon_threadsafe(callback)
+        except RuntimeError:
+            # Event loop já encerrado: o flow não tem mais para onde ir
+            log.debug(f"Event loop encerrado; decisão descartada para {entry.flow.id}")
+
+    def _apply(self, entry: PendingIntercept, decision: Dict[str, Any]):
+        if entry.timeout_handle is not None:
+            entry.timeout_handle.cancel()
+        flow = entry.flow
+        action = decision.get('action')
+
+        if action == 'drop':
+            # resume() acorda o hook suspenso; kill() faz o mitmproxy descartar o flow
+            flow.resume()
+            if flow.killable:
+                flow.kill()
+            with self.lock:
+                self.dropped += 1
+            log.info(f"Requisição cancelada pelo usuário: {flow.request.pretty_url}")
+            return
+
+        # Forward: aplica as alterações feitas pelo usuário, se houver
+        if 'modified_body' in decision:
+            flow.request.content = decision['modified_body'].encode('utf-8')
+        if 'modified_headers' in decision:
+            flow.request.headers.clear()
+            for key, value in decision['modified_headers'].items():
+                flow.request.headers[key] = value
+        flow.resume()
+        with self.lock:
+            self.forwarded += 1
+        log.info(f"Requisição enviada pelo usuário: {flow.request.pretty_url}")
+
+    def _expire(self, flow_id: str):
+        """Cancela um flow que ficou retido além do timeout (executa no event loop)."""
+        with self.lock:
+            entry = self.pending.pop(flow_id, None)
+            if entry is None:
+                return
+            self.expired += 1
+        log.warning(f"Timeout na interceptação: {entry.flow.request.pretty_url}")
+        entry.flow.resume()
+        if entry.flow.killable:
+            entry.flow.kill()
@@ -0,0 +1,156 @@
+"""
+Escopo da interceptação manual
+Filtro compilado avaliado no hook antes de reter um flow: requisições fora do
+escopo (assets estáticos, telemetria, outros hosts...) passam direto sem
+entrar na fila. Cada critério é resolvido com lookups em set/dict ou busca
+binária, independente de quantos itens o escopo tem.
+"""
+import bisect
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+# Extensões ignoradas por padrão: recursos estáticos raramente interessam no Intercept
+DEFAULT_EXCLUDE_EXTENSIONS = (
+    'js', 'css', 'map', 'png', 'jpg', 'jpeg', 'gif', 'ico', 'svg', 'webp', 'bmp',
+    'woff', 'woff2', 'ttf', 'otf', 'eot', 'mp4', 'webm', 'mp3', 'wav',
+)
+
+SCOPE_FIELDS = ('hosts', 'exclude_hosts', 'paths', 'methods', 'exclude_extensions', 'content_types')
+
+
+def default_scope() -> Dict[str, List[str]]:
+    """Escopo padrão: tudo, exceto recursos estáticos."""
+    return {
+        'hosts': [],
+        'exclude_hosts': [],
+        'paths': [],
+        'methods': [],
+        'exclude_extensions': list(DEFAULT_EXCLUDE_EXTENSIONS),
+        'content_types': [],
+    }
+
+
+def _clean(values: Optional[Iterable[str]]) -> List[str]:
+    return [str(value).strip() for value in (values or ()) if str(value).strip()]
+
+
+class _HostSuffixSet:
+    """Trie de rótulos invertidos: casa o host igual ou subdomínio de algum item."""
+
+    __slots__ = ('root',)
+
+    _END = ''
+
+    def __init__(self, hosts: Iterable[str]):
+        self.root: Dict[str, Any] = {}
+        for host in hosts:
+            node = self.root
+            for label in reversed(host.lower().lstrip('*.').split('.')):
+                node = node.setdefault(label, {})
+            node[self._END] = True
+
+    def __bool__(self):
+        return bool(self.root)
+
+    def matches(self, host: str) -> bool:
+        node = self.root
+        for label in reversed(host.lower().split('.')):
+            node = node.get(label)
+            if node is None:
+                return False
+            if self._END in node:
+                return True
+        return False
+
+
+class _PrefixSet:
+    """Prefixos de path em lista ordenada sem prefixos redundantes: uma busca binária por consulta."""
+
+    __slots__ = ('prefixes',)
+
+    def __init__(self, prefixes: Iterable[str]):
+        normalized = sorted({p if p.startswith('/') else f'/{p}' for p in prefixes})
+        # Descarta prefixos cobertos por outro mais curto ('/api/v1' já está em '/api')
+        self.prefixes: List[str] = []
+        for prefix in normalized:
+            if not self.prefixes or not prefix.startswith(self.prefixes[-1]):
+                self.prefixes.append(prefix)
+
+    def __bool__(self):
+        return bool(self.prefixes)
+
+    def matches(self, path: str) -> bool:
+        # Sem prefixos aninhados, o único candidato é o maior prefixo <= path
+        index = bisect.bisect_right(self.prefixes, path)
+        return index > 0 and path.startswith(self.prefixes[index - 1])
+
+
+def path_extension(path: str) -> str:
+    """Extensão do último segmento do path, sem query string (minúscula, sem o ponto)."""
+    path = path.split('?', 1)[0].split('#', 1)[0]
+    segment = path.rsplit('/', 1)[-1]
+    if '.' not in segment:
+        return ''
+    return segment.rsplit('.', 1)[-1].lower()
+
+
+class InterceptScope:
+    """
+    Decide se uma requisição deve ser retida pela interceptação manual.
+    Critérios vazios não restringem; os preenchidos precisam casar todos.
+    """
+
+    def __init__(self, scope: Dict[str, Iterable[str]] = None):
+        scope = scope if scope is not None else default_scope()
+        self.scope = {field: _clean(scope.get(field)) for field in SCOPE_FIELDS}
+
+        self.hosts = _HostSuffixSet(self.scope['hosts'])
+        self.exclude_hosts = _HostSuffixSet(self.scope['exclude_hosts'])
+        self.paths = _PrefixSet(self.scope['paths'])
+        self.methods = frozenset(m.upper() for m in self.scope['methods'])
+        self.exclude_extensions = frozenset(e.lower().lstrip('.') for e in self.scope['exclude_extensions'])
+        self.content_types = frozenset(c.lower() for c in self.scope['content_types'])
+
+    def to_dict(self) -> Dict[str, List[str]]:
+        return {field: list(values) for field, values in self.scope.items()}
+
+    def matches(self, host: str, path: str, method: str, content_type: str = '') -> bool:
+        if self.methods and method.upper() not in self.methods:
+            return False
+        if self.exclude_extensions and path_extension(path) in self.exclude_extensions:
+            return False
+        if self.hosts and not self.hosts.matches(host):
+            return False
+        if self.exclude_hosts and self.exclude_hosts.matches(host):
+            return False
+        if self.paths and not self.paths.matches(path):
+            return False
+        if self.content_types:
+            media_type = content_type.split(';', 1)[0].strip().lower()
+            if not media_type:
+                return False
+            if media_type not in self.content_types and \
+                    f"{media_type.split('/', 1)[0]}/*" not in self.content_types:
+                return False
+        return True
+
+    def matches_request(self, request) -> bool:
+        """Atalho para um `http.Request` do mitmproxy."""
+        return self.matches(request.pretty_host, request.path, request.method,
+                            request.headers.get('content-type', ''))
+
+
+def parse_scope_text(fields: Dict[str, str]) -> Tuple[bool, Any]:
+    """
+    Converte campos de texto separados por vírgula (como digitados na GUI) em um escopo.
+    Retorna (True, escopo) ou (False, mensagem de erro).
+    """
+    scope = {}
+    for field in SCOPE_FIELDS:
+        scope[field] = [item.strip() for item in fields.get(field, '').split(',') if item.strip()]
+    invalid = [m for m in scope['methods'] if not m.isalpha()]
+    if invalid:
+        return False, f"Método(s) inválido(s): {', '.join(invalid)}"
+    invalid = [c for c in scope['content_types'] if '/' not in c]
+    if invalid:
+        return False, f"Content-Type(s) inválido(s): {', '.join(invalid)} (use tipo/subtipo ou tipo/*)"
+    return True, scope
@@ -0,0 +1,295 @@
+"""
+Limitador de taxa adaptativo por host, compartilhado pelos motores de envio
+(Scanner Ativo, Intruder e Sender).
+
+Cada host tem um token bucket e um limite de requisições simultâneas:
+  - enquanto o host responde bem, não há limite de taxa; ao primeiro sinal de
+    throttling (429/503) a taxa passa a ser controlada por AIMD: cai pela
+    metade (no máximo uma vez por RTT) e sobe ~`increase` req/s a cada segundo
+    sem throttling;
+  - erros sem resposta (timeout, conexão recusada/resetada) reduzem apenas a
+    concorrência: uma porta fechada não deve derrubar a taxa do host;
+  - Retry-After bloqueia novos envios ao host até o prazo indicado;
+  - se a latência média sobe muito acima da menor latência observada, o limite
+    de concorrência do host cai pela metade e volta a crescer aos poucos.
+"""
+import threading
+import time
+from collections import deque
+from email.utils import parsedate_to_datetime
+from typing import Any, Callable, Dict, Optional
+
+from .logger_config import log
+
+# Respostas que indicam que o servidor está limitando ou sobrecarregado
+THROTTLE_STATUSES = frozenset({429, 503})
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Segundos indicados por um header Retry-After (número ou data HTTP)."""
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError, IndexError):
+        return None
+
+
+class _HostState:
+    """Estado do limitador para um host (protegido pelo lock do limitador)."""
+
+    __slots__ = ('cond', 'rate', 'tokens', 'refilled_at', 'blocked_until', 'concurrency', 'concurrency_credit',
+                 'in_flight', 'latency', 'latency_floor', 'latency_samples', 'decreased_at', 'completions',
+                 'sent', 'succeeded', 'throttled', 'errors')
+
+    def __init__(self, lock: threading.Lock, concurrency: int):
+        self.cond = threading.Condition(lock)
+        self.rate: Optional[float] = None  # None = sem limite de taxa (até o primeiro throttling)
+        self.tokens = 1.0
+        self.refilled_at = time.monotonic()
+        self.blocked_until = 0.0
+        self.concurrency = concurrency
+        self.concurrency_credit = 0.0
+        self.in_flight = 0
+        self.latency: Optional[float] = None
+        self.latency_floor: Optional[float] = None
+        self.latency_samples = 0
+        self.decreased_at = 0.0
+        self.completions = deque()
+        self.sent = 0
+        self.succeeded = 0
+        self.throttled = 0
+        self.errors = 0
+
+    def rtt(self) -> float:
+        return self.latency if self.latency is not None else 1.0
+
+
+class AdaptiveRateLimiter:
+    """Token bucket por host com adaptação AIMD, Retry-After e limite de concorrência por latência."""
+
+    def __init__(self, min_rate: float = 1.0, max_rate: Optional[float] = None, increase: float = 1.0,
+                 decrease: float = 0.5, max_concurrency: int = 32, latency_factor: float = 3.0,
+                 latency_slack: float = 0.05, max_retry_after: float = 60.0, window: float = 1.0):
+        """
+        Args:
+            min_rate: Menor taxa (req/s) a que um host pode ser reduzido
+            max_rate: Teto de taxa por host (None = sem teto)
+            increase: Aumento aditivo da taxa, em req/s por segundo sem throttling
+            decrease: Fator multiplicativo aplicado à taxa quando há throttling
+            max_concurrency: Limite inicial (e máximo) de requisições simultâneas por host
+            latency_factor: Latência média acima de `latency_factor` x a menor observada reduz a concorrência
+            latency_slack: Folga absoluta (s) antes de considerar a latência degradada (evita ruído em hosts locais)
+            max_retry_after: Maior espera (s) honrada de um Retry-After
+            window: Janela (s) usada para medir a vazão atual de um host
+        """
+        if not 0 < decrease < 1:
+            raise ValueError("decrease deve estar entre 0 e 1")
+        if min_rate <= 0 or max_concurrency < 1:
+            raise ValueError("min_rate e max_concurrency devem ser positivos")
+        self.min_rate = min_rate
+        self.max_rate = max_rate
+        self.increase = increase
+        self.decrease = decrease
+        self.max_concurrency = max_concurrency
+        self.latency_factor = latency_factor
+        self.latency_slack = latency_slack
+        self.max_retry_after = max_retry_after
+        self.window = window
+
+        self.lock = threading.Lock()
+        self.hosts: Dict[str, _HostState] = {}
+        self._local = threading.local()
+
+    def _state(self, host: str) -> _HostState:
+        host = host.lower()
+        state = self.hosts.get(host)
+        if state is None:
+            state = self.hosts[host] = _HostState(self.lock, self.max_concurrency)
+            state.rate = self.max_rate
+        return state
+
+    # --- Aquisição ---
+
+    def _admit(self, state: _HostState) -> Optional[float]:
+        """
+        Libera uma requisição se o host permitir (lock já adquirido).
+        Retorna 0 se liberou, os segundos até poder tentar de novo, ou None
+        se é preciso esperar o fim de uma requisição em voo.
+        """
+        now = time.monotonic()
+        if now < state.blocked_until:
+            return state.blocked_until - now
+        if state.in_flight >= state.concurrency:
+            return None
+        if state.rate is not None:
+            capacity = max(1.0, state.rate)
+            state.tokens = min(capacity, state.tokens + (now - state.refilled_at) * state.rate)
+            state.refilled_at = now
+            if state.tokens < 1:
+                return (1 - state.tokens) / state.rate
+            state.tokens -= 1
+        state.in_flight += 1
+        state.sent += 1
+        return 0.0
+
+    def acquire(self, host: str):
+        """Bloqueia até o host aceitar mais uma requisição (token, vaga de concorrência e Retry-After)."""
+        with self.lock:
+            state = self._state(host)
+            while True:
+                wait = self._admit(state)
+                if wait == 0:
+                    return
+                state.cond.wait(wait)
+
+    def try_acquire(self, host: str) -> Optional[float]:
+        """
+        Versão sem bloqueio de `acquire`, para motores assíncronos: retorna 0 se
+        a requisição foi liberada (chame `release` depois), os segundos a esperar
+        antes de tentar de novo, ou None se o host está no limite de concorrência.
+        """
+        with self.lock:
+            return self._admit(self._state(host))
+
+    def release(self, host: str, status: Optional[int] = None, retry_after: Optional[float] = None,
+                latency: Optional[float] = None, error: bool = False):
+        """
+        Registra o resultado de uma requisição liberada por `acquire`.
+
+        Args:
+            status: Status HTTP da resposta
+            retry_after: Segundos pedidos pelo servidor antes de novos envios
+            latency: Tempo de resposta (None = não usar na adaptação, ex.: payloads com atraso proposital)
+            error: A requisição falhou sem resposta (timeout, conexão recusada)
+        """
+        with self.lock:
+            state = self._state(host)
+            state.in_flight -= 1
+            now = time.monotonic()
+            if error:
+                state.errors += 1
+                self._back_off(host, state, now, reduce_rate=False)
+            elif status in THROTTLE_STATUSES:
+                state.throttled += 1
+                if retry_after:
+                    state.blocked_until = max(state.blocked_until, now + min(retry_after, self.max_retry_after))
+                self._back_off(host, state, now)
+            else:
+                state.succeeded += 1
+                state.completions.append(now)
+                if latency is not None:
+                    self._observe_latency(state, latency, now)
+                if state.rate is not None:
+                    # +`increase` req/s por segundo: cada sucesso soma increase / rate
+                    state.rate += self.increase / state.rate
+                    if self.max_rate is not None:
+                        state.rate = min(state.rate, self.max_rate)
+            state.cond.notify_all()
+
+    def _observed_rate(self, state: _HostState, now: float) -> float:
+        while state.completions and now - state.completions[0] > self.window:
+            state.completions.popleft()
+        return len(state.completions) / self.window
+
+    def _back_off(self, host: str, state: _HostState, now: float, reduce_rate: bool = True):
+        """Redução multiplicativa, no máximo uma vez por RTT (respostas já em voo não reduzem de novo)."""
+        if now - state.decreased_at < state.rtt():
+            return
+        state.decreased_at = now
+        state.concurrency = max(1, state.concurrency // 2)
+        if not reduce_rate:
+            return
+        current = state.rate if state.rate is not None else max(self._observed_rate(state, now), self.min_rate)
+        state.rate = max(self.min_rate, current * self.decrease)
+        state.tokens = min(state.tokens, 1.0)
+        state.refilled_at = now
+        log.warning(f"Limitador: {host} sinalizou sobrecarga; taxa reduzida para {state.rate:.1f} req/s, "
+                    f"concorrência {state.concurrency}")
+
+    def _observe_latency(self, state: _HostState, latency: float, now: float):
+        state.latency = latency if state.latency is None else 0.2 * latency + 0.8 * state.latency
+        state.latency_samples += 1
+        if state.latency_samples < 3:
+            return
+        if state.latency_floor is None or state.latency < state.latency_floor:
+            state.latency_floor = state.latency
+        degraded = (state.latency > self.latency_factor * state.latency_floor
+                    and state.latency - state.latency_floor > self.latency_slack)
+        if degraded:
+            if now - state.decreased_at >= state.rtt() and state.concurrency > 1:
+                state.decreased_at = now
+                state.concurrency = max(1, state.concurrency // 2)
+        elif state.concurrency < self.max_concurrency:
+            # +1 vaga por "RTT" de respostas saudáveis
+            state.concurrency_credit += 1 / state.concurrency
+            if state.concurrency_credit >= 1:
+                state.concurrency_credit = 0.0
+                state.concurrency += 1
+
+    # --- Uso direto ---
+
+    def send(self, host: str, func: Callable[[], Any], track_latency: bool = True, retries: int = 0):
+        """
+        Executa `func()` (que faz a requisição e retorna a resposta) respeitando o limite do host.
+
+        Com `retries` > 0, respostas 429/503 são reenviadas até `retries` vezes, após o
+        Retry-After. Só o Scanner Ativo usa: no Intruder e no Sender cada payload é enviado
+        uma única vez e o 429/503 chega ao resultado (o Retry-After ainda pausa o host).
+        """
+        for attempt in range(retries + 1):
+            self.acquire(host)
+            start = time.perf_counter()
+            try:
+                response = func()
+            except Exception:
+                self.release(host, error=True)
+                raise
+            latency = time.perf_counter() - start
+            self._local.latency = latency
+            status = getattr(response, 'status_code', None)
+            retry_after = parse_retry_after(response.headers.get('Retry-After')) if status in THROTTLE_STATUSES else None
+            self.release(host, status=status, retry_after=retry_after, latency=latency if track_latency else None)
+            if status not in THROTTLE_STATUSES or attempt == retries:
+                return response
+        return response
+
+    def last_latency(self) -> Optional[float]:
+        """Tempo da última requisição feita por esta thread via `send` (sem a espera no limitador)."""
+        return getattr(self._local, 'latency', None)
+
+    def get_stats(self) -> Dict[str, Dict[str, Any]]:
+        """Contadores e limites atuais por host."""
+        now = time.monotonic()
+        with self.lock:
+            return {
+                host: {
+                    'rate_limit': state.rate,
+                    'current_rate': self._observed_rate(state, now),
+                    'concurrency': state.concurrency,
+                    'in_flight': state.in_flight,
+                    'sent': state.sent,
+                    'succeeded': state.succeeded,
+                    'throttled': state.throttled,
+                    'errors': state.errors,
+                    'latency_ms': state.latency * 1000 if state.latency is not None else None,
+                    'blocked_for': max(0.0, state.blocked_until - now),
+                }
+                for host, state in self.hosts.items()
+            }
+
+
+_shared_limiter: Optional[AdaptiveRateLimiter] = None
+_shared_lock = threading.Lock()
+
+
+def shared_limiter() -> AdaptiveRateLimiter:
+    """Limitador único do processo: todos os motores de envio respeitam os mesmos limites por host."""
+    global _shared_limiter
+    with _shared_lock:
+        if _shared_limiter is None:
+            _shared_limiter = AdaptiveRateLimiter()
+        return _shared_limiter
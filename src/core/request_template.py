@@ -0,0 +1,152 @@
+"""
+Templates de requisição pré-compilados para o Intruder e o Sender.
+
+A requisição crua é analisada uma única vez: as posições de payload (§...§)
+viram slots e cada parte da requisição (método, path, nome e valor de cada
+header, body) é guardada como um formato `%s` com os trechos fixos. Gerar uma
+requisição é só preencher os slots das partes que têm payload; as demais já
+estão prontas (método, headers fixos, esquema e host).
+"""
+import re
+from typing import Dict, List, NamedTuple, Optional, Sequence, Tuple
+
+MARKER_PATTERN = re.compile(r'§(.+?)§')
+
+# Hosts acessados por HTTP; os demais por HTTPS
+_PLAIN_HTTP_PREFIXES = ('127.0.0.1', 'localhost', '192.168.', '10.', '172.')
+# Headers recalculados pela biblioteca HTTP
+_SKIPPED_HEADERS = ('host', 'content-length')
+# Marca interna de slot (área de uso privado do Unicode: não aparece em requisições reais)
+_SLOT = '\ue000'
+
+
+class PreparedRequest(NamedTuple):
+    """Requisição pronta para envio."""
+    method: str
+    url: str
+    host: str
+    headers: Dict[str, str]
+    body: Optional[bytes]
+
+
+class _Part:
+    """Trecho da requisição: texto fixo ou formato `%s` preenchido pelos slots [first, first + count)."""
+
+    __slots__ = ('text', 'format', 'first', 'count')
+
+    def __init__(self, text: str, first_slot: int):
+        self.count = text.count(_SLOT)
+        self.first = first_slot
+        self.text = text if not self.count else None
+        self.format = text.replace('%', '%%').replace(_SLOT, '%s') if self.count else None
+
+    def render(self, values: Sequence[str]) -> str:
+        if self.text is not None:
+            return self.text
+        return self.format % tuple(values[self.first:self.first + self.count])
+
+
+def scheme_for_host(host: str) -> str:
+    """HTTP para hosts locais e de rede privada, HTTPS para os demais."""
+    return "http" if host.startswith(_PLAIN_HTTP_PREFIXES) else "https"
+
+
+class RequestTemplate:
+    """Requisição crua compilada: trechos fixos, slots de payload e head já analisado."""
+
+    def __init__(self, raw_request: str, pattern: re.Pattern = MARKER_PATTERN):
+        """
+        Args:
+            raw_request: Requisição crua (head, linha em branco, body) com as posições marcadas
+            pattern: Regex das posições; o grupo 1 é o valor original
+        """
+        self.raw_request = raw_request
+        self.markers: List[str] = []
+        self.original_values: List[str] = []
+        statics = []
+        last = 0
+        for match in pattern.finditer(raw_request):
+            statics.append(raw_request[last:match.start()])
+            self.markers.append(match.group(0))
+            self.original_values.append(match.group(1))
+            last = match.end()
+        statics.append(raw_request[last:])
+        self.num_positions = len(self.markers)
+        # Texto completo: render() equivale a PayloadPositionParser.replace_positions
+        self._full = _Part(_SLOT.join(statics), 0)
+
+        # Head e body analisados uma vez, com os slots no lugar dos payloads. Uma requisição
+        # malformada ainda pode ser renderizada; o erro aparece ao montar o envio (build)
+        self._parse_error: Optional[ValueError] = None
+        try:
+            self._parse(_SLOT.join(statics))
+        except ValueError as e:
+            self._parse_error = e
+
+    def _parse(self, marked: str):
+        # strip() antes de procurar a linha em branco: um GET terminado em "\n\n" não tem body
+        marked = marked.strip()
+        head, body = marked.split('\n\n', 1) if '\n\n' in marked else (marked, "")
+        request_lines = head.split('\n')
+        slot = 0
+
+        def part(text: str) -> _Part:
+            nonlocal slot
+            compiled = _Part(text, slot)
+            slot += compiled.count
+            return compiled
+
+        method, path, _ = request_lines[0].split(' ')
+        self._method = part(method)
+        self._path = part(path)
+        self._headers: List[Tuple[_Part, _Part]] = []
+        self._host: Optional[_Part] = None
+        for line in request_lines[1:]:
+            if ':' in line:
+                key, value = line.split(':', 1)
+                compiled = (part(key.strip()), part(value.strip()))
+                if compiled[0].text is not None and compiled[0].text.lower() == 'host':
+                    self._host = compiled[1]
+                self._headers.append(compiled)
+        self._body = part(body)
+        # Headers sem payload já ficam prontos
+        self._static_headers = {key.text: value.text for key, value in self._headers
+                                if key.text is not None and value.text is not None
+                                and key.text.lower() not in _SKIPPED_HEADERS}
+        self._dynamic_headers = [(key, value) for key, value in self._headers
+                                 if key.text is None or value.text is None]
+
+    def _values(self, payloads: Sequence[str]) -> Sequence[str]:
+        """Payloads faltantes mantêm o marcador original, como em replace_positions."""
+        if len(payloads) >= self.num_positions:
+            return payloads
+        return list(payloads) + self.markers[len(payloads):]
+
+    def render(self, payloads: Sequence[str]) -> str:
+        """Requisição crua com os payloads nas posições."""
+        return self._full.render(self._values(payloads))
+
+    def build(self, payloads: Sequence[str] = ()) -> PreparedRequest:
+        """Requisição pronta para envio com os payloads nas posições."""
+        if self._parse_error is not None:
+            raise self._parse_error
+        values = self._values(payloads)
+        if self._host is None:
+            raise ValueError("Header 'Host' not found")
+        host = self._host.render(values)
+        if not host:
+            raise ValueError("Header 'Host' not found")
+        headers = dict(self._static_headers)
+        if self._dynamic_headers:
+            for key, value in self._dynamic_headers:
+                name = key.render(values)
+                if name.lower() not in _SKIPPED_HEADERS:
+                    headers[name] = value.render(values)
+        body = self._body.render(values)
+        return PreparedRequest(
+            method=self._method.render(values),
+            url=f"{scheme_for_host(host)}://{host}{self._path.render(values)}",
+            host=host,
+            headers=headers,
+            body=body.encode('utf-8') if body else None,
+        )
@@ -0,0 +1,132 @@
+"""
+Impressão digital de respostas HTTP para comparações rápidas
+Calculada uma vez por resposta, em tempo linear no tamanho do body:
+  - SimHash de 64 bits sobre shingles de 3 tokens (similaridade = distância de Hamming);
+  - hash do conteúdo com as partes dinâmicas neutralizadas (números, IDs, tokens aleatórios);
+  - contagem de palavras e tamanho;
+  - assinatura de status + nomes dos headers estáveis + content-type.
+Comparar duas impressões é O(1). Usada pelo check booleano do Scanner Ativo,
+pela detecção de anomalias do Intruder e pelo Comparador.
+"""
+import hashlib
+import re
+import zlib
+from itertools import repeat
+from typing import Any, List, Mapping, NamedTuple, Optional, Union
+
+SIMHASH_BITS = 64
+_MASK64 = (1 << SIMHASH_BITS) - 1
+_SHINGLE = 3
+
+_TOKEN = re.compile(r'\w+')
+_DIGIT = re.compile(r'\d')
+# Tokens a partir deste tamanho não são palavras: CSRF, nonces, hashes
+_RANDOM_TOKEN_LENGTH = 20
+
+# Headers que variam a cada resposta ou com o tamanho do body
+VOLATILE_HEADERS = frozenset({
+    'date', 'expires', 'age', 'last-modified', 'etag', 'content-length', 'set-cookie',
+    'x-request-id', 'x-runtime', 'x-response-time', 'server-timing', 'cf-ray',
+    'x-amzn-trace-id', 'x-amz-cf-id', 'via', 'report-to', 'nel', 'transfer-encoding',
+})
+
+
+def normalize_tokens(text: str) -> List[str]:
+    """Palavras do texto com as partes dinâmicas (números, datas, IDs, tokens aleatórios) trocadas por '0'."""
+    tokens = _TOKEN.findall(text)
+    # Páginas repetem muito as mesmas palavras: cada token distinto é classificado uma vez
+    normalized = {token: '0' if len(token) >= _RANDOM_TOKEN_LENGTH or _DIGIT.search(token) else token
+                  for token in set(tokens)}
+    return list(map(normalized.__getitem__, tokens))
+
+
+def simhash(tokens: List[str]) -> int:
+    """SimHash de 64 bits sobre shingles de `_SHINGLE` tokens consecutivos."""
+    if not tokens:
+        return 0
+    token_hashes = {token: zlib.crc32(token.encode('utf-8')) for token in set(tokens)}
+    hashes = list(map(token_hashes.__getitem__, tokens))
+    hashes += [0] * (_SHINGLE - len(hashes))
+    # hash() de uma tupla de inteiros é determinístico (não depende de PYTHONHASHSEED).
+    # Tudo roda em laços C: hash de cada shingle -> 8 bytes, concatenados.
+    shingle_hashes = map(_MASK64.__and__, map(hash, zip(*(hashes[offset:] for offset in range(_SHINGLE)))))
+    packed = b''.join(map(int.to_bytes, shingle_hashes, repeat(8), repeat('little')))
+    total = len(packed) // 8
+
+    # Conta, para cada bit, quantos shingles o têm ligado: a coluna de cada byte vira
+    # um inteiro grande e o bit k de todos os shingles é contado com um bit_count()
+    result = 0
+    low_bits = int.from_bytes(b'\x01' * total, 'little')
+    for byte_index in range(8):
+        column = int.from_bytes(packed[byte_index::8], 'little')
+        for bit in range(8):
+            if (column >> bit & low_bits).bit_count() * 2 > total:
+                result |= 1 << (byte_index * 8 + bit)
+    return result
+
+
+def header_signature(status: int, headers: Optional[Mapping[str, str]]) -> int:
+    """Hash do status, dos nomes dos headers estáveis e do tipo do conteúdo."""
+    names = []
+    content_type = ''
+    for name, value in (headers or {}).items():
+        name = name.lower()
+        if name == 'content-type':
+            content_type = str(value).split(';', 1)[0].strip().lower()
+        if name not in VOLATILE_HEADERS:
+            names.append(name)
+    names.sort()
+    return zlib.crc32(f"{status}|{content_type}|{','.join(names)}".encode('utf-8'))
+
+
+class ResponseFingerprint(NamedTuple):
+    """Resumo de uma resposta; todas as comparações são O(1)."""
+    status: int
+    signature: int
+    length: int
+    words: int
+    content_hash: str
+    simhash: int
+
+    def similarity(self, other: 'ResponseFingerprint') -> float:
+        """Similaridade do conteúdo entre 0 e 1 (1 = iguais, ignorando partes dinâmicas)."""
+        if self.content_hash == other.content_hash:
+            return 1.0
+        if not self.words or not other.words:
+            return 0.0
+        return 1.0 - (self.simhash ^ other.simhash).bit_count() / SIMHASH_BITS
+
+    def same_shape(self, other: 'ResponseFingerprint') -> bool:
+        """Mesmo status, mesmo content-type e mesmo conjunto de headers estáveis."""
+        return self.signature == other.signature
+
+    def matches(self, other: 'ResponseFingerprint', threshold: float = 0.9) -> bool:
+        return self.same_shape(other) and self.similarity(other) >= threshold
+
+
+def fingerprint(body: Union[str, bytes, None], status: int = 0,
+                headers: Optional[Mapping[str, str]] = None) -> ResponseFingerprint:
+    """Calcula a impressão digital de uma resposta (body em texto ou bytes)."""
+    if isinstance(body, (bytes, bytearray)):
+        body = bytes(body).decode('utf-8', errors='replace')
+    body = body or ''
+    tokens = normalize_tokens(body)
+    content_hash = hashlib.blake2b(' '.join(tokens).encode('utf-8'), digest_size=8).hexdigest()
+    return ResponseFingerprint(
+        status=status,
+        signature=header_signature(status, headers),
+        length=len(body),
+        words=len(tokens),
+        content_hash=content_hash,
+        simhash=simhash(tokens),
+    )
+
+
+def fingerprint_response(response: Any) -> ResponseFingerprint:
+    """Impressão digital de um `requests.Response`."""
+    return fingerprint(response.text, response.status_code, response.headers)
+
+
+def fingerprint_entry(entry: Mapping[str, Any]) -> ResponseFingerprint:
+    """Impressão digital da resposta de uma entrada do histórico."""
+    return fingerprint(entry.get('response_body'), entry.get('status') or 0, entry.get('response_headers'))
@@ -0,0 +1,104 @@
+"""
+Índice compilado das regras de interceptação
+As regras são compiladas quando são carregadas/alteradas em uma trie de sufixos
+de host (rótulos invertidos: exemplo.com -> com -> exemplo) com um índice de
+prefixos de path em cada nó. Cada requisição faz uma única busca em vez de
+normalizar e comparar todas as regras.
+"""
+from typing import Any, Dict, List, Tuple
+from urllib.parse import urlparse
+
+
+def split_host_and_path(raw_host: str) -> Tuple[str, str]:
+    """Normaliza host configurado, aceitando entradas com esquema ou URL completa."""
+    if not raw_host:
+        return "", ""
+    parsed = urlparse(raw_host) if "://" in raw_host else urlparse(f"//{raw_host}")
+    host = (parsed.hostname or parsed.netloc or "").lower()
+    extra_path = parsed.path if (parsed.scheme or parsed.netloc) else ""
+    if not host:
+        host = raw_host.lower()
+    return host, extra_path
+
+
+def normalize_rule(rule: Dict[str, Any]) -> Tuple[str, str]:
+    """Retorna (host, prefixo de path) de uma regra, como usados na comparação."""
+    rule_host, host_path = split_host_and_path(rule.get('host', ''))
+    rule_path = rule.get('path', '') or host_path or ""
+    if rule_path and not rule_path.startswith('/'):
+        rule_path = f"/{rule_path}"
+    return rule_host, rule_path
+
+
+class _PathIndex:
+    """Regras de um nó da trie, indexadas por prefixo de path."""
+
+    __slots__ = ('by_prefix', 'lengths')
+
+    def __init__(self):
+        self.by_prefix: Dict[str, List[Tuple[int, Dict[str, Any]]]] = {}
+        self.lengths: List[int] = []
+
+    def add(self, prefix: str, order: int, rule: Dict[str, Any]):
+        if prefix not in self.by_prefix:
+            self.by_prefix[prefix] = []
+            if len(prefix) not in self.lengths:
+                self.lengths.append(len(prefix))
+                self.lengths.sort()
+        self.by_prefix[prefix].append((order, rule))
+
+    def collect(self, path: str, out: List[Tuple[int, Dict[str, Any]]]):
+        # Um lookup por tamanho de prefixo distinto (normalmente poucos)
+        for length in self.lengths:
+            if length > len(path):
+                break
+            rules = self.by_prefix.get(path[:length])
+            if rules:
+                out.extend(rules)
+
+
+class _HostNode:
+    __slots__ = ('children', 'paths')
+
+    def __init__(self):
+        self.children: Dict[str, '_HostNode'] = {}
+        self.paths: _PathIndex = None
+
+
+class CompiledRuleMatcher:
+    """Encontra, em uma busca, todas as regras ativas que casam com host + path."""
+
+    def __init__(self, rules: List[Dict[str, Any]]):
+        self.root = _HostNode()
+        self.rule_count = 0
+        for order, rule in enumerate(rules):
+            if not rule.get('enabled', True):
+                continue
+            rule_host, rule_path = normalize_rule(rule)
+            node = self.root
+            # Host vazio casa com qualquer host: as regras ficam na raiz
+            for label in reversed(rule_host.split('.')) if rule_host else ():
+                node = node.children.setdefault(label, _HostNode())
+            if node.paths is None:
+                node.paths = _PathIndex()
+            node.paths.add(rule_path, order, rule)
+            self.rule_count += 1
+
+    def match(self, host: str, path: str) -> List[Dict[str, Any]]:
+        """
+        Retorna as regras que casam, na ordem em que foram configuradas.
+        O host casa se for igual ao da regra ou um subdomínio dele.
+        """
+        matched: List[Tuple[int, Dict[str, Any]]] = []
+        node = self.root
+        if node.paths is not None:
+            node.paths.collect(path, matched)
+        for label in reversed(host.lower().split('.')):
+            node = node.children.get(label)
+            if node is None:
+                break
+            if node.paths is not None:
+                node.paths.collect(path, matched)
+        if len(matched) > 1:
+            matched.sort(key=lambda item: item[0])
+        return [rule for _, rule in matched]
@@ -0,0 +1,145 @@
+"""
+Cache de pontos de inserção já testados pelo Scanner Ativo
+Cada par (ponto de inserção, check) é identificado por
+(host, método, path normalizado, tipo do ponto, nome do parâmetro, check).
+Quando o mesmo endpoint aparece várias vezes no histórico com valores
+diferentes, os checks já executados são reaproveitados em vez de reenviados.
+O cache é persistido em JSON para valer entre sessões e scans em massa.
+"""
+import json
+import os
+import threading
+import time
+from typing import Any, Dict, List, NamedTuple, Optional
+from urllib.parse import urlparse
+
+from .logger_config import log
+from .scan_jobs import normalize_path
+
+CACHE_VERSION = 1
+DEFAULT_CACHE_FILE = "scan_cache.json"
+
+
+class CacheKey(NamedTuple):
+    host: str
+    method: str
+    path: str
+    point_type: str
+    name: str
+    check_id: str
+
+
+def insertion_point_key(request: Dict[str, Any], point: Dict[str, Any], check_id: str) -> CacheKey:
+    """Chave do cache para um check em um ponto de inserção; o valor do parâmetro não entra."""
+    parsed = urlparse(request['url'])
+    return CacheKey(parsed.netloc.lower(), request['method'].upper(), normalize_path(parsed.path),
+                    point['type'], point['name'], check_id)
+
+
+class ScanCache:
+    """Resultados de checks já executados, opcionalmente persistidos em `cache_file`."""
+
+    def __init__(self, cache_file: Optional[str] = None, ttl: Optional[float] = None):
+        """
+        Args:
+            cache_file: JSON onde o cache é persistido (None = apenas em memória)
+            ttl: Segundos até um resultado precisar ser testado de novo (None = não expira)
+        """
+        self.cache_file = cache_file
+        self.ttl = ttl
+        self.lock = threading.Lock()
+        self._save_lock = threading.Lock()
+        self.entries: Dict[CacheKey, Dict[str, Any]] = {}
+        self._dirty = False
+        self.hits = 0
+        self.misses = 0
+        if cache_file:
+            self.load()
+
+    def get(self, key: CacheKey) -> Optional[List[Dict[str, Any]]]:
+        """Vulnerabilidades registradas para `key`, ou None se o check ainda não foi feito (ou expirou)."""
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is not None and self.ttl is not None and time.time() - entry['tested_at'] > self.ttl:
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            return [dict(vuln) for vuln in entry['result']]
+
+    def put(self, key: CacheKey, result: List[Dict[str, Any]]):
+        with self.lock:
+            self.entries[key] = {'result': [dict(vuln) for vuln in result], 'tested_at': time.time()}
+            self._dirty = True
+
+    def invalidate(self, host: Optional[str] = None) -> int:
+        """Esquece os resultados de um host (ou de todos). Retorna quantos foram removidos."""
+        with self.lock:
+            if host is None:
+                removed = len(self.entries)
+                self.entries.clear()
+            else:
+                host = host.lower()
+                stale = [key for key in self.entries if key.host == host]
+                for key in stale:
+                    del self.entries[key]
+                removed = len(stale)
+            self._dirty = self._dirty or removed > 0
+        return removed
+
+    # --- Persistência ---
+
+    def load(self):
+        """Carrega o cache do arquivo; um arquivo ausente ou inválido resulta em cache vazio."""
+        if not self.cache_file or not os.path.exists(self.cache_file):
+            return
+        try:
+            with open(self.cache_file, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            if data.get('version') != CACHE_VERSION:
+                log.warning(f"Versão de cache de scan não suportada em {self.cache_file}; ignorando")
+                return
+            entries = {CacheKey(*item['key']): {'result': item['result'], 'tested_at': item['tested_at']}
+                       for item in data.get('entries', [])}
+        except (OSError, ValueError, TypeError, KeyError) as e:
+            log.error(f"Erro ao carregar cache de scan {self.cache_file}: {e}")
+            return
+        with self.lock:
+            self.entries = entries
+            self._dirty = False
+        log.info(f"Cache de scan carregado: {len(entries)} checks já testados")
+
+    def save(self) -> bool:
+        """Grava o cache se houve alterações (arquivo temporário + rename)."""
+        if not self.cache_file:
+            return False
+        with self._save_lock:
+            with self.lock:
+                if not self._dirty:
+                    return False
+                data = {
+                    'version': CACHE_VERSION,
+                    'entries': [{'key': list(key), 'result': entry['result'], 'tested_at': entry['tested_at']}
+                                for key, entry in self.entries.items()],
+                }
+                self._dirty = False
+            tmp_file = f"{self.cache_file}.tmp"
+            try:
+                with open(tmp_file, 'w', encoding='utf-8') as f:
+                    json.dump(data, f, ensure_ascii=False, default=str)
+                os.replace(tmp_file, self.cache_file)
+                return True
+            except OSError as e:
+                with self.lock:
+                    self._dirty = True
+                log.error(f"Erro ao salvar cache de scan: {e}")
+                return False
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self.lock:
+            return {
+                'entries': len(self.entries),
+                'hits': self.hits,
+                'misses': self.misses,
+            }
@@ -0,0 +1,376 @@
+"""
+Jobs de varredura ativa em massa
+Monta uma lista de alvos a partir do histórico (com filtro), dos formulários e
+URLs descobertos pelo Spider, remove endpoints repetidos e os varre com um pool
+de workers. O progresso (com ETA) pode ser consultado a qualquer momento, o job
+pode ser pausado, cancelado e retomado a partir de um arquivo de checkpoint;
+endpoints cuja varredura falhou ficam registrados à parte e são varridos de
+novo ao retomar.
+"""
+import json
+import os
+import re
+import threading
+import time
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+from urllib.parse import parse_qs, urlencode, urlparse, urlunparse
+
+from .logger_config import log
+
+CHECKPOINT_VERSION = 1
+
+# Segmentos de path que variam por recurso (/user/42, /doc/3f2a...) viram um marcador
+_ID_SEGMENT = re.compile(
+    r'^(?:\d+|[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}|[0-9a-f]{16,})$',
+    re.IGNORECASE,
+)
+
+
+def normalize_path(path: str) -> str:
+    """Path sem query, sem barra final e com segmentos de ID substituídos por `{id}`."""
+    path = path.split('?', 1)[0] or '/'
+    segments = ['{id}' if _ID_SEGMENT.match(segment) else segment for segment in path.split('/')]
+    normalized = '/'.join(segments)
+    return normalized.rstrip('/') or '/'
+
+
+def _header(headers: Dict[str, str], name: str) -> str:
+    name = name.lower()
+    for key, value in (headers or {}).items():
+        if key.lower() == name:
+            return value
+    return ''
+
+
+def parameter_names(target: Dict[str, Any]) -> Tuple[str, ...]:
+    """Nomes dos parâmetros da query e do body urlencoded de um alvo."""
+    names = set(parse_qs(urlparse(target['url']).query, keep_blank_values=True))
+    if 'application/x-www-form-urlencoded' in _header(target.get('headers'), 'content-type'):
+        names.update(parse_qs(target.get('body') or '', keep_blank_values=True))
+    return tuple(sorted(names))
+
+
+def endpoint_key(target: Dict[str, Any]) -> Tuple[str, str, str, Tuple[str, ...]]:
+    """Identifica um endpoint: (método, origem, path normalizado, nomes dos parâmetros)."""
+    parsed = urlparse(target['url'])
+    origin = f"{parsed.scheme}://{parsed.netloc.lower()}"
+    return target['method'].upper(), origin, normalize_path(parsed.path), parameter_names(target)
+
+
+def make_target(method: str, url: str, headers: Dict[str, str] = None, body: str = '',
+                source: str = '', history_id: int = None) -> Dict[str, Any]:
+    return {
+        'method': method.upper(),
+        'url': url,
+        'headers': dict(headers or {}),
+        'body': body or '',
+        'source': source,
+        'history_id': history_id,
+    }
+
+
+def targets_from_history(history, host: str = None, method: str = None, status: int = None,
+                         url_contains: str = None, ids: Iterable[int] = None) -> List[Dict[str, Any]]:
+    """Alvos a partir das entradas do histórico que passam pelo filtro."""
+    wanted_ids = set(ids) if ids is not None else None
+    host = host.lower() if host else None
+    targets = []
+    for entry in history.get_history():
+        if wanted_ids is not None and entry['id'] not in wanted_ids:
+            continue
+        if host and not (entry['host'].lower() == host or entry['host'].lower().endswith(f".{host}")):
+            continue
+        if method and entry['method'].upper() != method.upper():
+            continue
+        if status is not None and entry['status'] != status:
+            continue
+        if url_contains and url_contains not in entry['url']:
+            continue
+        targets.append(make_target(entry['method'], entry['url'], entry['request_headers'],
+                                   entry['request_body'], source='history', history_id=entry['id']))
+    return targets
+
+
+def targets_from_forms(forms: Iterable[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Alvos a partir dos formulários do Spider (`Spider.get_forms()`)."""
+    targets = []
+    for form in forms:
+        fields = [(field['name'], field.get('value', '')) for field in form.get('inputs', []) if field.get('name')]
+        if not fields:
+            continue
+        url = form.get('url') or form.get('page_url')
+        if not url:
+            continue
+        if form.get('method', 'GET').upper() == 'POST':
+            targets.append(make_target('POST', url, {'Content-Type': 'application/x-www-form-urlencoded'},
+                                       urlencode(fields), source='form'))
+        else:
+            parts = list(urlparse(url))
+            parts[4] = urlencode(fields)
+            targets.append(make_target('GET', urlunparse(parts), source='form'))
+    return targets
+
+
+def targets_from_urls(urls: Iterable[str]) -> List[Dict[str, Any]]:
+    """Alvos GET a partir de URLs descobertas; URLs sem parâmetros não têm o que testar."""
+    return [make_target('GET', url, source='spider') for url in urls if urlparse(url).query]
+
+
+def targets_from_spider(spider) -> List[Dict[str, Any]]:
+    """Formulários e URLs com parâmetros descobertos pelo Spider."""
+    return targets_from_forms(spider.get_forms()) + targets_from_urls(spider.get_discovered_urls())
+
+
+def dedupe_targets(targets: Iterable[Dict[str, Any]]) -> Tuple[List[Dict[str, Any]], int]:
+    """Mantém o primeiro alvo de cada endpoint. Retorna (alvos únicos, quantidade descartada)."""
+    seen = set()
+    unique = []
+    duplicates = 0
+    for target in targets:
+        key = endpoint_key(target)
+        if key in seen:
+            duplicates += 1
+            continue
+        seen.add(key)
+        unique.append(target)
+    return unique, duplicates
+
+
+class BulkScanJob:
+    """
+    Varre uma lista de alvos com um pool de workers.
+    Cada worker varre um endpoint por vez com `ActiveScanner.scan_request`, que
+    por sua vez paraleliza os checks respeitando os limites por host.
+
+    Estados: 'pending', 'running', 'paused', 'cancelled', 'completed'.
+    """
+
+    def __init__(self, scanner, targets: Iterable[Dict[str, Any]], workers: int = 2,
+                 checkpoint_file: str = None, history=None,
+                 on_progress: Callable[[Dict[str, Any]], None] = None, force: bool = False):
+        """
+        Args:
+            scanner: `ActiveScanner` usado para os testes
+            targets: Alvos (ver `make_target`); endpoints repetidos são descartados
+            workers: Endpoints varridos ao mesmo tempo
+            checkpoint_file: JSON atualizado a cada endpoint concluído (permite retomar)
+            history: Se informado, as vulnerabilidades são anexadas às entradas de origem
+            on_progress: Chamado (na thread do worker) após cada endpoint concluído
+            force: Ignora o cache do scanner e testa de novo todos os pontos de inserção
+        """
+        if workers < 1:
+            raise ValueError("O job precisa de pelo menos um worker")
+        self.scanner = scanner
+        self.targets, self.duplicates = dedupe_targets(targets)
+        self.workers = workers
+        self.checkpoint_file = checkpoint_file
+        self.history = history
+        self.on_progress = on_progress
+        self.force = force
+
+        self.lock = threading.Lock()
+        self._checkpoint_lock = threading.Lock()
+        self.done = set()
+        # Endpoints cuja varredura falhou nesta execução (gravados no checkpoint, refeitos ao retomar)
+        self.failed = set()
+        self.findings: List[Dict[str, Any]] = []
+        self.errors = 0
+        self.state = 'pending'
+        self._next_index = 0
+        self._resume_event = threading.Event()
+        self._resume_event.set()
+        self._cancelled = False
+        self._threads: List[threading.Thread] = []
+        self._finished = threading.Event()
+        self._started_at = None
+        self._paused_at = None
+        self._paused_time = 0.0
+        self._completed_this_run = 0
+
+    # --- Checkpoint ---
+
+    @classmethod
+    def from_checkpoint(cls, checkpoint_file: str, scanner, workers: int = 2, history=None,
+                        on_progress: Callable[[Dict[str, Any]], None] = None) -> 'BulkScanJob':
+        """
+        Recria um job a partir do checkpoint; os endpoints já concluídos não são varridos
+        de novo, os que falharam são.
+        """
+        with open(checkpoint_file, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        if data.get('version') != CHECKPOINT_VERSION:
+            raise ValueError(f"Versão de checkpoint não suportada: {data.get('version')}")
+
+        job = cls(scanner, data['targets'], workers=workers, checkpoint_file=checkpoint_file,
+                  history=history, on_progress=on_progress, force=data.get('force', False))
+        job.duplicates = data.get('duplicates', 0)
+        job.done = set(data.get('done', []))
+        job.findings = data.get('findings', [])
+        job.errors = data.get('errors', 0)
+        log.info(f"Job de scan retomado de {checkpoint_file}: {len(job.done)}/{len(job.targets)} endpoints concluídos, "
+                 f"{len(data.get('failed', []))} com falha a varrer de novo")
+        return job
+
+    def save_checkpoint(self):
+        """Grava o estado atual (arquivo temporário + rename: nunca fica um JSON pela metade)."""
+        if not self.checkpoint_file:
+            return
+        # O snapshot é tirado dentro do lock de gravação: um worker nunca sobrescreve
+        # o checkpoint de outro com um estado mais antigo
+        with self._checkpoint_lock:
+            with self.lock:
+                data = {
+                    'version': CHECKPOINT_VERSION,
+                    'targets': self.targets,
+                    'duplicates': self.duplicates,
+                    'done': sorted(self.done),
+                    'failed': sorted(self.failed),
+                    'findings': list(self.findings),
+                    'errors': self.errors,
+                    'force': self.force,
+                }
+            tmp_file = f"{self.checkpoint_file}.tmp"
+            try:
+                with open(tmp_file, 'w', encoding='utf-8') as f:
+                    json.dump(data, f, ensure_ascii=False, default=str)
+                os.replace(tmp_file, self.checkpoint_file)
+            except OSError as e:
+                log.error(f"Erro ao salvar checkpoint do job de scan: {e}")
+
+    # --- Controle ---
+
+    def start(self):
+        """Inicia os workers em segundo plano."""
+        with self.lock:
+            if self.state != 'pending':
+                raise RuntimeError(f"O job já foi iniciado (estado: {self.state})")
+            self.state = 'running'
+            self._started_at = time.time()
+        log.info(f"Job de scan iniciado: {len(self.targets)} endpoints ({self.duplicates} repetidos descartados), "
+                 f"{self.workers} worker(s)")
+        for number in range(self.workers):
+            thread = threading.Thread(target=self._worker, name=f"BulkScan-{number}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+        threading.Thread(target=self._finish, name="BulkScan-finish", daemon=True).start()
+
+    def pause(self):
+        """Os workers terminam o endpoint atual e aguardam `resume()`."""
+        with self.lock:
+            if self.state == 'running':
+                self.state = 'paused'
+                self._paused_at = time.time()
+                self._resume_event.clear()
+        self.save_checkpoint()
+
+    def resume(self):
+        with self.lock:
+            if self.state == 'paused':
+                self.state = 'running'
+                self._paused_time += time.time() - self._paused_at
+                self._paused_at = None
+                self._resume_event.set()
+
+    def cancel(self):
+        """Interrompe o job; o checkpoint permite retomá-lo depois."""
+        with self.lock:
+            if self.state in ('completed', 'cancelled'):
+                return
+            self._cancelled = True
+            self.state = 'cancelled'
+            self._resume_event.set()
+
+    def wait(self, timeout: float = None) -> bool:
+        """Aguarda o job terminar (estado final e checkpoint gravados). Retorna False se o timeout expirou."""
+        return self._finished.wait(timeout)
+
+    # --- Execução ---
+
+    def _take_next(self) -> Optional[int]:
+        with self.lock:
+            while self._next_index < len(self.targets):
+                index = self._next_index
+                self._next_index += 1
+                if index not in self.done:
+                    return index
+            return None
+
+    def _worker(self):
+        while True:
+            self._resume_event.wait()
+            if self._cancelled:
+                return
+            index = self._take_next()
+            if index is None:
+                return
+            self._scan(index)
+
+    def _scan(self, index: int):
+        target = self.targets[index]
+        request = {key: target[key] for key in ('method', 'url', 'headers', 'body')}
+        try:
+            vulnerabilities = self.scanner.scan_request(request, force=self.force)
+            failed = False
+        except Exception as e:
+            log.error(f"Erro ao varrer {target['method']} {target['url']}: {e}")
+            vulnerabilities, failed = [], True
+
+        if vulnerabilities and self.history is not None and target.get('history_id') is not None:
+            self.history.add_vulnerabilities_to_entry(target['history_id'], vulnerabilities)
+
+        with self.lock:
+            if failed:
+                self.failed.add(index)
+            else:
+                self.done.add(index)
+            self.errors += failed
+            self._completed_this_run += 1
+            for vuln in vulnerabilities:
+                self.findings.append(dict(vuln, history_id=target.get('history_id'), source=target.get('source')))
+        self.save_checkpoint()
+        if self.on_progress is not None:
+            self.on_progress(self.get_progress())
+
+    def _finish(self):
+        for thread in self._threads:
+            thread.join()
+        with self.lock:
+            if self.state in ('running', 'paused') and len(self.done) + len(self.failed) == len(self.targets):
+                self.state = 'completed'
+            state = self.state
+            failed = len(self.failed)
+        self.save_checkpoint()
+        log.info(f"Job de scan {state}: {len(self.done)}/{len(self.targets)} endpoints, {failed} com falha, "
+                 f"{len(self.findings)} vulnerabilidade(s)")
+        self._finished.set()
+
+    def get_progress(self) -> Dict[str, Any]:
+        """
+        Estado, contadores e ETA (baseada no ritmo desta execução, sem contar pausas).
+        `failed` conta os endpoints que falharam nesta execução; eles não entram em `completed`.
+        """
+        with self.lock:
+            total = len(self.targets)
+            completed = len(self.done)
+            failed = len(self.failed)
+            elapsed = 0.0
+            if self._started_at:
+                paused = self._paused_time + (time.time() - self._paused_at if self._paused_at else 0.0)
+                elapsed = time.time() - self._started_at - paused
+            remaining = total - completed - failed
+            eta = None
+            if self._completed_this_run and remaining and self.state != 'cancelled':
+                eta = elapsed / self._completed_this_run * remaining
+            return {
+                'state': self.state,
+                'total': total,
+                'completed': completed,
+                'failed': failed,
+                'remaining': remaining,
+                'duplicates': self.duplicates,
+                'findings': len(self.findings),
+                'errors': self.errors,
+                'percent': 100.0 * (completed + failed) / total if total else 100.0,
+                'elapsed': elapsed,
+                'eta': eta,
+            }
@@ -0,0 +1,254 @@
+"""
+Pipeline assíncrono do Scanner Passivo
+Retira a varredura de regex do hook do mitmproxy: o hook apenas enfileira um
+snapshot leve do flow e um pool de threads executa o scanner em segundo plano.
+"""
+import queue
+import random
+import threading
+import time
+from collections import deque
+from typing import Any, Dict, List, Optional
+
+from .charset import decode_body
+from .logger_config import log
+from .scanner import VulnerabilityScanner
+from .scan_policy import ScanPolicy
+
+
+class PassiveScanPipeline:
+    """
+    Fila limitada de snapshots de flows drenada por um pool de threads.
+
+    Políticas de overflow (quando a fila enche):
+        - 'block': aplica backpressure, aguardando até `block_timeout` segundos por espaço
+        - 'sample': acima da marca d'água aceita apenas uma fração (`sample_rate`) do tráfego
+        - 'drop': descarta imediatamente os snapshots que não cabem na fila
+    """
+
+    OVERFLOW_POLICIES = ('block', 'sample', 'drop')
+
+    def __init__(self, scanner: VulnerabilityScanner = None, history=None, num_workers: int = 2,
+                 max_queue_size: int = 500, overflow_policy: str = 'sample',
+                 block_timeout: float = 0.05, sample_rate: float = 0.1, high_watermark: float = 0.8,
+                 policy: ScanPolicy = None):
+        if overflow_policy not in self.OVERFLOW_POLICIES:
+            raise ValueError(f"Política de overflow inválida: {overflow_policy}")
+
+        self.scanner = scanner or VulnerabilityScanner()
+        self.history = history
+        self.policy = policy or ScanPolicy()
+        self.num_workers = max(1, num_workers)
+        self.max_queue_size = max(1, max_queue_size)
+        self.overflow_policy = overflow_policy
+        self.block_timeout = block_timeout
+        self.sample_rate = sample_rate
+        self.high_watermark = max(1, int(self.max_queue_size * high_watermark))
+
+        self.queue = queue.Queue(maxsize=self.max_queue_size)
+        self.workers: List[threading.Thread] = []
+        self.running = False
+        self.lock = threading.Lock()
+
+        # Métricas
+        self.submitted = 0
+        self.scanned = 0
+        self.dropped = 0
+        self.sampled_out = 0
+        self.findings = 0
+        self.errors = 0
+        self.skipped = 0
+        self.max_queue_depth = 0
+        self.scan_latencies = deque(maxlen=1000)   # Tempo gasto no scanner (s)
+        self.queue_latencies = deque(maxlen=1000)  # Tempo de espera na fila (s)
+
+    def start(self):
+        """Inicia as threads de varredura (idempotente)."""
+        with self.lock:
+            if self.running:
+                return
+            self.running = True
+            self.workers = []
+            for i in range(self.num_workers):
+                worker = threading.Thread(target=self._worker_loop, name=f"PassiveScan-{i}", daemon=True)
+                worker.start()
+                self.workers.append(worker)
+        log.info(f"Pipeline do scanner passivo iniciado com {self.num_workers} worker(s)")
+
+    def stop(self, timeout: float = 2.0):
+        """Para as threads de varredura, descartando o que ainda estiver na fila."""
+        with self.lock:
+            if not self.running:
+                return
+            self.running = False
+            workers = self.workers
+            self.workers = []
+
+        for worker in workers:
+            worker.join(timeout)
+        log.info("Pipeline do scanner passivo parado")
+
+    def admit(self, response_headers: Dict[str, str], body_size: int = None) -> bool:
+        """
+        Consulta a política antes de montar o snapshot, para que o hook nem
+        acesse o body de respostas que não serão escaneadas (imagens, fontes...).
+        """
+        if self.policy.admit(response_headers, body_size):
+            return True
+        with self.lock:
+            self.skipped += 1
+        return False
+
+    def submit(self, entry_id: Optional[int], request_data: Dict[str, Any], response_data: Dict[str, Any]) -> bool:
+        """
+        Enfileira um snapshot para varredura. Nunca bloqueia por mais que `block_timeout`.
+
+        Args:
+            entry_id: ID da entrada no histórico (None se não houver histórico)
+            request_data: Dados da requisição (method, url, headers, body)
+            response_data: Dados da resposta (status, headers, body)
+
+        Returns:
+            True se o snapshot foi aceito na fila
+        """
+        if not self.running:
+            self.start()
+
+        with self.lock:
+            self.submitted += 1
+
+        depth = self.queue.qsize()
+        if self.overflow_policy == 'sample' and depth >= self.high_watermark:
+            if random.random() >= self.sample_rate:
+                with self.lock:
+                    self.sampled_out += 1
+                return False
+
+        job = (entry_id, request_data, response_data, time.perf_counter())
+        try:
+            if self.overflow_policy == 'block':
+                self.queue.put(job, timeout=self.block_timeout)
+            else:
+                self.queue.put_nowait(job)
+        except queue.Full:
+            with self.lock:
+                self.dropped += 1
+            log.debug(f"Fila do scanner passivo cheia, snapshot descartado: {request_data.get('url', '')}")
+            return False
+
+        with self.lock:
+            self.max_queue_depth = max(self.max_queue_depth, depth + 1)
+        return True
+
+    def wait_idle(self, timeout: float = None) -> bool:
+        """Aguarda até que todos os snapshots enfileirados sejam processados."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while self.queue.unfinished_tasks:
+            if deadline is not None and time.monotonic() >= deadline:
+                return False
+            time.sleep(0.01)
+        return True
+
+    def _worker_loop(self):
+        """Consome snapshots da fila até o pipeline ser parado."""
+        while self.running:
+            try:
+                job = self.queue.get(timeout=0.2)
+            except queue.Empty:
+                continue
+            try:
+                self._process(*job)
+            finally:
+                self.queue.task_done()
+
+    def _process(self, entry_id, request_data, response_data, enqueued_at):
+        """Executa o scanner em um snapshot e anexa os achados ao histórico."""
+        started = time.perf_counter()
+        try:
+            body = self.policy.response_body(response_data)
+            cache_key = self.policy.cache_key(request_data, response_data)
+            cached = self.policy.cached_findings(cache_key, len(body))
+            if cached is not None:
+                # Resposta idêntica já escaneada: a nova entrada do histórico recebe os mesmos achados
+                with self.lock:
+                    self.skipped += 1
+                if cached and self.history is not None and entry_id is not None:
+                    self.history.add_vulnerabilities_to_entry(entry_id, cached)
+                return
+            response_data = dict(response_data, body=self.policy.truncate(body, request_data.get('url', '')))
+            request_data = self._decode_bodies(request_data)
+            response_data = self._decode_bodies(response_data)
+            vulnerabilities = self.scanner.scan_response(request_data, response_data)
+        except Exception as e:
+            with self.lock:
+                self.errors += 1
+            log.error(f"Erro no scanner passivo para {request_data.get('url', '')}: {e}")
+            return
+        finished = time.perf_counter()
+
+        # Preenche URL e método nas vulnerabilidades
+        for vuln in vulnerabilities:
+            if not vuln.get('url'):
+                vuln['url'] = request_data.get('url', '')
+            if not vuln.get('method'):
+                vuln['method'] = request_data.get('method', '')
+        # Só uma varredura concluída marca a resposta como escaneada
+        self.policy.remember(cache_key, vulnerabilities)
+
+        with self.lock:
+            self.scanned += 1
+            self.findings += len(vulnerabilities)
+            self.queue_latencies.append(started - enqueued_at)
+            self.scan_latencies.append(finished - started)
+
+        if vulnerabilities:
+            log.warning(f"Vulnerabilidades encontradas em {request_data.get('url', '')}: {len(vulnerabilities)}")
+            if self.history is not None and entry_id is not None:
+                self.history.add_vulnerabilities_to_entry(entry_id, vulnerabilities)
+
+    @staticmethod
+    def _decode_bodies(data: Dict[str, Any]) -> Dict[str, Any]:
+        """Decodifica o body do snapshot (bytes) apenas na thread de varredura."""
+        body = data.get('body', '')
+        if isinstance(body, (bytes, bytearray, memoryview)):
+            data = dict(data)
+            data['body'] = decode_body(body, data.get('headers'))
+        return data
+
+    @staticmethod
+    def _percentile(values, percent: float) -> float:
+        if not values:
+            return 0.0
+        ordered = sorted(values)
+        index = min(len(ordered) - 1, int(round(percent / 100.0 * (len(ordered) - 1))))
+        return ordered[index]
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Retorna métricas do pipeline (profundidade da fila e latências em ms)."""
+        with self.lock:
+            scan_latencies = list(self.scan_latencies)
+            queue_latencies = list(self.queue_latencies)
+            stats = {
+                'running': self.running,
+                'workers': self.num_workers,
+                'overflow_policy': self.overflow_policy,
+                'queue_depth': self.queue.qsize(),
+                'max_queue_depth': self.max_queue_depth,
+                'queue_capacity': self.max_queue_size,
+                'submitted': self.submitted,
+                'scanned': self.scanned,
+                'dropped': self.dropped,
+                'sampled_out': self.sampled_out,
+                'findings': self.findings,
+                'errors': self.errors,
+                'skipped': self.skipped,
+            }
+
+        avg_scan = sum(scan_latencies) / len(scan_latencies) if scan_latencies else 0.0
+        stats['scan_latency_avg_ms'] = avg_scan * 1000
+        stats['scan_latency_p95_ms'] = self._percentile(scan_latencies, 95) * 1000
+        stats['scan_latency_max_ms'] = max(scan_latencies) * 1000 if scan_latencies else 0.0
+        avg_wait = sum(queue_latencies) / len(queue_latencies) if queue_latencies else 0.0
+        stats['queue_wait_avg_ms'] = avg_wait * 1000
+        stats['policy'] = self.policy.get_stats()
+        return stats
@@ -0,0 +1,178 @@
+"""
+Política de varredura do Scanner Passivo
+Decide, antes de decodificar o body, o que vale a pena escanear: ignora tipos de
+conteúdo binários, trunca bodies enormes (apenas início e fim) e não reescaneia
+assets estáticos idênticos (mesma URL + ETag/hash do conteúdo): uma resposta só
+entra no cache depois de escaneada com sucesso, junto com os seus achados, que
+são repetidos para as cópias seguintes.
+"""
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional
+
+from .logger_config import log
+
+
+class ScanPolicy:
+    """Camada de gating na frente do `VulnerabilityScanner.scan_response`"""
+
+    # Tipos de conteúdo que nunca contêm texto útil para o scanner
+    DEFAULT_SKIP_CONTENT_TYPES = (
+        'image/',
+        'font/',
+        'video/',
+        'audio/',
+        'application/wasm',
+        'application/font',
+        'application/x-font',
+        'application/vnd.ms-fontobject',
+        'application/octet-stream',
+        'application/pdf',
+        'application/zip',
+        'application/gzip',
+        'application/x-protobuf',
+        'application/grpc',
+    )
+
+    # Métodos cujas respostas podem ser cacheadas como "já escaneadas"
+    CACHEABLE_METHODS = ('GET', 'HEAD')
+
+    def __init__(self, skip_content_types=None, max_body_size: int = 1024 * 1024,
+                 head_bytes: int = 256 * 1024, tail_bytes: int = 64 * 1024,
+                 cache_size: int = 10000):
+        """
+        Args:
+            skip_content_types: Prefixos de Content-Type que não são escaneados
+            max_body_size: Acima deste tamanho apenas início e fim do body são escaneados
+            head_bytes: Bytes do início do body escaneados quando truncado
+            tail_bytes: Bytes do fim do body escaneados quando truncado
+            cache_size: Número de (URL, ETag/hash) lembrados como já escaneados, com seus achados
+        """
+        self.skip_content_types = tuple(
+            ct.lower() for ct in (skip_content_types if skip_content_types is not None else self.DEFAULT_SKIP_CONTENT_TYPES)
+        )
+        self.max_body_size = max_body_size
+        self.head_bytes = head_bytes
+        self.tail_bytes = tail_bytes
+        self.cache_size = cache_size
+        self.scanned_cache: OrderedDict = OrderedDict()
+        self.lock = threading.Lock()
+
+        # Contadores por política: quantidade de respostas e bytes afetados
+        self.counters = {
+            'content_type': {'responses': 0, 'bytes': 0},   # ignoradas pelo Content-Type
+            'cached': {'responses': 0, 'bytes': 0},         # já escaneadas (URL + ETag/hash)
+            'truncated': {'responses': 0, 'bytes': 0},      # bytes descartados do meio do body
+            'scanned': {'responses': 0, 'bytes': 0},        # bytes efetivamente escaneados
+        }
+
+    @staticmethod
+    def _header(headers: Dict[str, str], name: str) -> str:
+        """Busca um header sem diferenciar maiúsculas/minúsculas."""
+        value = headers.get(name)
+        if value is not None:
+            return value
+        name = name.lower()
+        for key, value in headers.items():
+            if key.lower() == name:
+                return value
+        return ''
+
+    def _count(self, policy: str, num_bytes: int):
+        with self.lock:
+            self.counters[policy]['responses'] += 1
+            self.counters[policy]['bytes'] += num_bytes
+
+    def admit(self, response_headers: Dict[str, str], body_size: int = None) -> bool:
+        """
+        Verificação barata feita no hook do proxy, antes de acessar o body.
+
+        Returns:
+            False se o Content-Type da resposta não deve ser escaneado
+        """
+        content_type = self._header(response_headers, 'Content-Type').lower()
+        if content_type and content_type.startswith(self.skip_content_types):
+            if body_size is None:
+                try:
+                    body_size = int(self._header(response_headers, 'Content-Length') or 0)
+                except ValueError:
+                    body_size = 0
+            self._count('content_type', body_size)
+            return False
+        return True
+
+    @staticmethod
+    def response_body(response_data: Dict[str, Any]) -> bytes:
+        """Body da resposta do snapshot, em bytes."""
+        body = response_data.get('body') or b''
+        if isinstance(body, str):
+            body = body.encode('utf-8', errors='ignore')
+        return body
+
+    def cache_key(self, request_data: Dict[str, Any], response_data: Dict[str, Any]) -> Optional[tuple]:
+        """Chave (URL, ETag/hash) da resposta, ou None se ela não é cacheável."""
+        if request_data.get('method', '').upper() not in self.CACHEABLE_METHODS or self.cache_size <= 0:
+            return None
+        url = request_data.get('url', '')
+        etag = self._header(response_data.get('headers', {}), 'ETag')
+        if etag:
+            return (url, 'etag', etag)
+        return (url, 'sha1', hashlib.sha1(self.response_body(response_data)).hexdigest())
+
+    def cached_findings(self, key: Optional[tuple], body_size: int = 0) -> Optional[List[Dict[str, Any]]]:
+        """
+        Achados de uma resposta idêntica já escaneada.
+
+        Returns:
+            Cópia da lista de achados (possivelmente vazia), ou None se a resposta ainda precisa ser escaneada
+        """
+        if key is None:
+            return None
+        with self.lock:
+            findings = self.scanned_cache.get(key)
+            if findings is None:
+                return None
+            self.scanned_cache.move_to_end(key)
+            self.counters['cached']['responses'] += 1
+            self.counters['cached']['bytes'] += body_size
+        return [dict(finding) for finding in findings]
+
+    def remember(self, key: Optional[tuple], findings: List[Dict[str, Any]]):
+        """Registra a resposta como escaneada (só depois de uma varredura bem-sucedida)."""
+        if key is None:
+            return
+        with self.lock:
+            self.scanned_cache[key] = tuple(dict(finding) for finding in findings)
+            self.scanned_cache.move_to_end(key)
+            if len(self.scanned_cache) > self.cache_size:
+                self.scanned_cache.popitem(last=False)
+
+    def truncate(self, body: bytes, url: str = '') -> bytes:
+        """Reduz bodies enormes ao início e ao fim (executado na thread de varredura)."""
+        if self.max_body_size and len(body) > self.max_body_size:
+            kept = body[:self.head_bytes] + b'\n' + (body[-self.tail_bytes:] if self.tail_bytes else b'')
+            self._count('truncated', len(body) - self.head_bytes - self.tail_bytes)
+            log.debug(f"Body truncado para o scanner passivo ({len(body)} bytes): {url}")
+            body = kept
+
+        self._count('scanned', len(body))
+        return body
+
+    def clear_cache(self):
+        """Esquece as respostas já escaneadas."""
+        with self.lock:
+            self.scanned_cache.clear()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Retorna os contadores por política e o total de bytes escaneados vs. ignorados."""
+        with self.lock:
+            counters = {name: dict(values) for name, values in self.counters.items()}
+            cached_entries = len(self.scanned_cache)
+        skipped = sum(counters[name]['bytes'] for name in ('content_type', 'cached', 'truncated'))
+        return {
+            'policies': counters,
+            'bytes_scanned': counters['scanned']['bytes'],
+            'bytes_skipped': skipped,
+            'cache_entries': cached_entries,
+        }
@@ -0,0 +1,154 @@
+"""
+Agendador de jobs do Scanner Ativo
+Executa jobs independentes (ponto de inserção x check) em um pool de threads
+com limite global (tamanho do pool) e limite por host. Checks sensíveis a
+tempo rodam em modo exclusivo: enquanto um deles mede latência, nenhum outro
+job envia requisições ao mesmo host, para que a carga paralela não distorça
+a medição.
+"""
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Deque, Dict, Iterable, List, NamedTuple, Tuple
+
+from .logger_config import log
+
+
+class ScanJob(NamedTuple):
+    """Unidade de trabalho do scanner: `func()` retorna uma lista de vulnerabilidades."""
+    host: str
+    func: Callable[[], List[Dict[str, Any]]]
+    exclusive: bool = False
+    label: str = ''
+
+
+class HostGate:
+    """
+    Controla a concorrência em um host: até `max_concurrent` jobs compartilhados
+    ou um único job exclusivo. Jobs que não cabem esperam em `pending`, em ordem
+    de chegada, fora do pool: um exclusivo na frente da fila segura os
+    compartilhados de trás, para não ficar faminto atrás de um fluxo contínuo deles.
+    """
+
+    def __init__(self, max_concurrent: int):
+        self.max_concurrent = max_concurrent
+        self.active = 0
+        self.exclusive_active = False
+        self.pending: Deque[Tuple[ScanJob, Future]] = deque()
+
+    def try_acquire(self, exclusive: bool = False) -> bool:
+        if self.exclusive_active:
+            return False
+        if exclusive:
+            if self.active:
+                return False
+            self.exclusive_active = True
+        else:
+            if self.active >= self.max_concurrent:
+                return False
+            self.active += 1
+        return True
+
+    def release(self, exclusive: bool = False):
+        if exclusive:
+            self.exclusive_active = False
+        else:
+            self.active -= 1
+
+
+class ScanScheduler:
+    """Pool de threads compartilhado pelas varreduras ativas."""
+
+    def __init__(self, max_workers: int = 8, max_per_host: int = 4):
+        """
+        Args:
+            max_workers: Máximo de jobs simultâneos no total
+            max_per_host: Máximo de jobs simultâneos por host
+        """
+        if max_workers < 1 or max_per_host < 1:
+            raise ValueError("Os limites de concorrência devem ser maiores que zero")
+        self.max_workers = max_workers
+        self.max_per_host = max_per_host
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="ActiveScan")
+        # Protege os HostGates e as estatísticas
+        self.lock = threading.Lock()
+        self.gates: Dict[str, HostGate] = {}
+
+        self.jobs_completed = 0
+        self.jobs_failed = 0
+        self.exclusive_jobs = 0
+        self.busy_time = 0.0
+
+    def _gate(self, host: str) -> HostGate:
+        gate = self.gates.get(host)
+        if gate is None:
+            gate = self.gates[host] = HostGate(self.max_per_host)
+        return gate
+
+    def _dispatch(self, gate: HostGate):
+        """Envia ao pool os jobs da frente da fila do host que cabem agora (chamado com `lock`)."""
+        while gate.pending and gate.try_acquire(gate.pending[0][0].exclusive):
+            job, future = gate.pending.popleft()
+            try:
+                self.executor.submit(self._run_job, gate, job, future)
+            except RuntimeError as e:
+                # Pool encerrado (shutdown) com jobs ainda na fila
+                gate.release(job.exclusive)
+                future.set_exception(e)
+
+    def _run_job(self, gate: HostGate, job: ScanJob, future: Future):
+        started = time.perf_counter()
+        try:
+            result = job.func() or []
+            failed = False
+        except Exception as e:
+            # Um check com erro não deve derrubar os demais jobs da varredura
+            log.error(f"Erro no job do scanner ativo {job.label or job.func}: {e}")
+            result, failed = [], True
+        finally:
+            with self.lock:
+                gate.release(job.exclusive)
+                self.busy_time += time.perf_counter() - started
+                self.jobs_completed += 1
+                self.jobs_failed += failed
+                self.exclusive_jobs += job.exclusive
+                self._dispatch(gate)
+        future.set_result(result)
+
+    def run(self, jobs: Iterable[ScanJob]) -> List[List[Dict[str, Any]]]:
+        """
+        Executa os jobs e aguarda todos terminarem.
+        Retorna os resultados na mesma ordem dos jobs.
+
+        Os jobs compartilhados são enfileirados antes dos exclusivos: assim o
+        paralelismo é aproveitado primeiro e as medições de tempo ficam para o
+        final, quando o host já está livre. Só entram no pool os jobs que o
+        host comporta; os demais são liberados à medida que outros terminam.
+        """
+        jobs = list(jobs)
+        order = sorted(range(len(jobs)), key=lambda index: jobs[index].exclusive)
+        futures = {index: Future() for index in order}
+        with self.lock:
+            gates = set()
+            for index in order:
+                gate = self._gate(jobs[index].host)
+                gate.pending.append((jobs[index], futures[index]))
+                gates.add(gate)
+            for gate in gates:
+                self._dispatch(gate)
+        return [futures[index].result() for index in range(len(jobs))]
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self.lock:
+            return {
+                'max_workers': self.max_workers,
+                'max_per_host': self.max_per_host,
+                'jobs_completed': self.jobs_completed,
+                'jobs_failed': self.jobs_failed,
+                'exclusive_jobs': self.exclusive_jobs,
+                'busy_time': self.busy_time,
+            }
+
+    def shutdown(self, wait: bool = True):
+        self.executor.shutdown(wait=wait)
@@ -3,10 +3,146 @@ Módulo de Scanner de Vulnerabilidades
 Detecta vulnerabilidades comuns em requisições e respostas HTTP
 """
 import re
-from typing import Dict, List, Any
+from functools import lru_cache
+from typing import Dict, List, Any, Iterator, NamedTuple, Optional, Sequence, Tuple
 from .logger_config import log
 
 
+try:
+    from re import _parser as sre_parse  # Python 3.11+
+except ImportError:  # pragma: no cover - versões anteriores
+    import sre_parse
+
+
+class RuleMatch(NamedTuple):
+    """Resultado de um CompiledRuleSet: índice/rótulo da regra e o match"""
+    index: int
+    label: str
+    match: 're.Match'
+
+    @property
+    def evidence(self) -> str:
+        return self.match.group(0)
+
+
+def _required_literals(items) -> Optional[Tuple[str, ...]]:
+    """
+    Extrai de uma sequência do sre_parse um conjunto de literais do qual pelo menos
+    um precisa aparecer em qualquer match (ex.: 'sql' em r'sql\s+syntax').
+    Retorna None quando não há literal útil.
+    """
+    options = []
+    run = []
+    for op, av in items:
+        if op is sre_parse.LITERAL:
+            run.append(chr(av))
+            continue
+        if run:
+            options.append((''.join(run),))
+            run = []
+        if op is sre_parse.SUBPATTERN:
+            inner = _required_literals(av[-1])
+            if inner:
+                options.append(inner)
+        elif op is sre_parse.BRANCH:
+            branches = [_required_literals(branch) for branch in av[1]]
+            if branches and all(branches):
+                options.append(tuple(lit for branch in branches for lit in branch))
+        elif op in (sre_parse.MAX_REPEAT, sre_parse.MIN_REPEAT) and av[0] >= 1:
+            inner = _required_literals(av[2])
+            if inner:
+                options.append(inner)
+    if run:
+        options.append((''.join(run),))
+
+    # Prefere o conjunto cujo menor literal é o mais longo (filtro mais seletivo)
+    best = max(options, key=lambda lits: min(len(lit) for lit in lits), default=None)
+    if best is None or min(len(lit) for lit in best) < 2:
+        return None
+    return tuple(sorted({lit.lower() for lit in best}))
+
+
+class CompiledRuleSet:
+    """
+    Motor de regras pré-compilado para uma categoria de padrões.
+
+    As regras são combinadas em uma única alternação com grupos nomeados (r0, r1, ...),
+    que identifica qual regra casou. Como o `re` do CPython não otimiza alternações
+    grandes, cada regra também tem um literal obrigatório extraído do padrão: uma
+    passada em C (`in`) sobre o texto em minúsculas descarta as regras impossíveis, e
+    bodies sem nenhum candidato nem chegam ao motor de regex.
+    """
+
+    _GLOBAL_FLAGS = re.compile(r'^\(\?([aiLmsux]+)\)')
+
+    def __init__(self, rules: Sequence[Tuple[str, str]], flags: int = 0):
+        """
+        Args:
+            rules: Lista de (padrão, rótulo)
+            flags: Flags do re aplicadas a todas as regras
+        """
+        self.rules = list(rules)
+        self.labels = [label for _, label in self.rules]
+        parts = [f"(?P<r{i}>{self._scope_flags(pattern)})" for i, (pattern, _) in enumerate(self.rules)]
+        self.regex = re.compile('|'.join(parts) if parts else r'(?!)', flags)
+        self.rule_regexes = [re.compile(pattern, flags) for pattern, _ in self.rules]
+        self.literals = [_required_literals(sre_parse.parse(pattern, flags)) for pattern, _ in self.rules]
+
+    @classmethod
+    def _scope_flags(cls, pattern: str) -> str:
+        """Converte flags globais como '(?i)' em flags locais '(?i:...)' para a alternação."""
+        match = cls._GLOBAL_FLAGS.match(pattern)
+        if not match:
+            return pattern
+        return f"(?{match.group(1)}:{pattern[match.end():]})"
+
+    def candidates(self, text: str) -> List[int]:
+        """Índices das regras cujo literal obrigatório aparece no texto."""
+        lowered = None
+        result = []
+        for index, literals in enumerate(self.literals):
+            if literals is None:
+                result.append(index)
+                continue
+            if lowered is None:
+                lowered = text.lower()
+            if any(lit in lowered for lit in literals):
+                result.append(index)
+        return result
+
+    def search(self, text: str) -> Optional[RuleMatch]:
+        """Retorna a primeira ocorrência (mais à esquerda) de qualquer regra."""
+        best = None
+        for index in self.candidates(text):
+            match = self.rule_regexes[index].search(text)
+            if match and (best is None or match.start() < best.match.start()):
+                best = RuleMatch(index, self.labels[index], match)
+        return best
+
+    def finditer(self, text: str) -> Iterator[RuleMatch]:
+        """Itera sobre todas as ocorrências, em uma única passada da alternação combinada."""
+        if not self.candidates(text):
+            return
+        for match in self.regex.finditer(text):
+            index = int(match.lastgroup[1:])
+            yield RuleMatch(index, self.labels[index], match)
+
+    def first_per_rule(self, text: str) -> List[RuleMatch]:
+        """Primeira ocorrência de cada regra que casou, na ordem das regras."""
+        found = []
+        for index in self.candidates(text):
+            match = self.rule_regexes[index].search(text)
+            if match:
+                found.append(RuleMatch(index, self.labels[index], match))
+        return found
+
+
+@lru_cache(maxsize=None)
+def compile_rules(rules: Tuple[Tuple[str, str], ...], flags: int = 0) -> CompiledRuleSet:
+    """Compila (uma única vez por processo) um conjunto de regras."""
+    return CompiledRuleSet(rules, flags)
+
+
 class VulnerabilityScanner:
     """Scanner de vulnerabilidades para detecção automática de problemas de segurança"""
     
@@ -88,6 +224,17 @@ class VulnerabilityScanner:
             'authenticity_token',
             'anti-forgery',
         ]
+
+        # Motor de regras pré-compilado: uma alternação por categoria, construída uma vez
+        self.sql_injection_rules = compile_rules(
+            tuple((p, p) for p in self.sql_injection_patterns), re.IGNORECASE)
+        self.xss_reflection_rules = compile_rules(
+            tuple((p, p) for p in self.xss_reflection_patterns), re.IGNORECASE)
+        self.path_traversal_rules = compile_rules(
+            tuple((p, p) for p in self.path_traversal_patterns))
+        self.sensitive_info_rules = compile_rules(tuple(self.sensitive_info_patterns), re.IGNORECASE)
+        self.cve_rules = compile_rules(tuple(self.cve_patterns), re.IGNORECASE)
+        self.system_file_regex = re.compile(r'root:.*:0:0:|daemon:|bin:|sys:')
     
     def scan_response(self, request_data: Dict[str, Any], response_data: Dict[str, Any]) -> List[Dict[str, Any]]:
         """
@@ -133,18 +280,18 @@ class VulnerabilityScanner:
         vulnerabilities = []
         response_body = response_data.get('body', '')
         
-        for pattern in self.sql_injection_patterns:
-            if re.search(pattern, response_body, re.IGNORECASE):
-                vulnerabilities.append({
-                    'type': 'SQL Injection',
-                    'severity': 'High',
-                    'description': 'Possível SQL Injection detectado - Mensagem de erro de banco de dados na resposta',
-                    'evidence': re.search(pattern, response_body, re.IGNORECASE).group(0),
-                    'url': request_data.get('url', ''),
-                    'method': request_data.get('method', ''),
-                })
-                log.warning(f"SQL Injection detectado em {request_data.get('url', '')}")
-                break  # Reporta apenas uma vez por resposta
+        # Reporta apenas uma vez por resposta
+        rule_match = self.sql_injection_rules.search(response_body)
+        if rule_match:
+            vulnerabilities.append({
+                'type': 'SQL Injection',
+                'severity': 'High',
+                'description': 'Possível SQL Injection detectado - Mensagem de erro de banco de dados na resposta',
+                'evidence': rule_match.evidence,
+                'url': request_data.get('url', ''),
+                'method': request_data.get('method', ''),
+            })
+            log.warning(f"SQL Injection detectado em {request_data.get('url', '')}")
         
         return vulnerabilities
     
@@ -155,20 +302,19 @@ class VulnerabilityScanner:
         request_params = request_data.get('body', '') + request_data.get('url', '')
         
         # Verifica se algum payload de XSS foi refletido na resposta
-        for pattern in self.xss_reflection_patterns:
-            matches_in_request = re.findall(pattern, request_params, re.IGNORECASE)
-            for match in matches_in_request:
-                if match in response_body:
-                    vulnerabilities.append({
-                        'type': 'XSS (Cross-Site Scripting)',
-                        'severity': 'High',
-                        'description': 'Possível XSS refletido - Payload encontrado na resposta',
-                        'evidence': match[:100],  # Limita o tamanho da evidência
-                        'url': request_data.get('url', ''),
-                        'method': request_data.get('method', ''),
-                    })
-                    log.warning(f"XSS refletido detectado em {request_data.get('url', '')}")
-                    return vulnerabilities  # Retorna após encontrar o primeiro
+        for rule_match in self.xss_reflection_rules.finditer(request_params):
+            match = rule_match.evidence
+            if match in response_body:
+                vulnerabilities.append({
+                    'type': 'XSS (Cross-Site Scripting)',
+                    'severity': 'High',
+                    'description': 'Possível XSS refletido - Payload encontrado na resposta',
+                    'evidence': match[:100],  # Limita o tamanho da evidência
+                    'url': request_data.get('url', ''),
+                    'method': request_data.get('method', ''),
+                })
+                log.warning(f"XSS refletido detectado em {request_data.get('url', '')}")
+                return vulnerabilities  # Retorna após encontrar o primeiro
         
         return vulnerabilities
     
@@ -180,31 +326,29 @@ class VulnerabilityScanner:
         response_body = response_data.get('body', '')
         
         # Verifica se há tentativa de path traversal na requisição
-        for pattern in self.path_traversal_patterns:
-            if re.search(pattern, request_url) or re.search(pattern, request_body):
-                # Verifica se obteve sucesso (arquivos sistema na resposta)
-                if re.search(r'root:.*:0:0:|daemon:|bin:|sys:', response_body):
-                    vulnerabilities.append({
-                        'type': 'Path Traversal',
-                        'severity': 'Critical',
-                        'description': 'Path Traversal confirmado - Arquivo do sistema detectado na resposta',
-                        'evidence': 'Conteúdo de arquivo do sistema encontrado',
-                        'url': request_data.get('url', ''),
-                        'method': request_data.get('method', ''),
-                    })
-                    log.critical(f"Path Traversal crítico detectado em {request_data.get('url', '')}")
-                    break
-                elif response_data.get('status', 0) == 200:
-                    vulnerabilities.append({
-                        'type': 'Path Traversal',
-                        'severity': 'Medium',
-                        'description': 'Possível Path Traversal - Tentativa detectada com resposta 200',
-                        'evidence': re.search(pattern, request_url or request_body).group(0),
-                        'url': request_data.get('url', ''),
-                        'method': request_data.get('method', ''),
-                    })
-                    log.warning(f"Possível Path Traversal detectado em {request_data.get('url', '')}")
-                    break
+        rule_match = self.path_traversal_rules.search(request_url) or self.path_traversal_rules.search(request_body)
+        if rule_match:
+            # Verifica se obteve sucesso (arquivos sistema na resposta)
+            if self.system_file_regex.search(response_body):
+                vulnerabilities.append({
+                    'type': 'Path Traversal',
+                    'severity': 'Critical',
+                    'description': 'Path Traversal confirmado - Arquivo do sistema detectado na resposta',
+                    'evidence': 'Conteúdo de arquivo do sistema encontrado',
+                    'url': request_data.get('url', ''),
+                    'method': request_data.get('method', ''),
+                })
+                log.critical(f"Path Traversal crítico detectado em {request_data.get('url', '')}")
+            elif response_data.get('status', 0) == 200:
+                vulnerabilities.append({
+                    'type': 'Path Traversal',
+                    'severity': 'Medium',
+                    'description': 'Possível Path Traversal - Tentativa detectada com resposta 200',
+                    'evidence': rule_match.evidence,
+                    'url': request_data.get('url', ''),
+                    'method': request_data.get('method', ''),
+                })
+                log.warning(f"Possível Path Traversal detectado em {request_data.get('url', '')}")
         
         return vulnerabilities
     
@@ -214,20 +358,17 @@ class VulnerabilityScanner:
         response_body = response_data.get('body', '')
         response_headers = response_data.get('headers', {})
         
-        # Verifica no corpo da resposta
-        for pattern, description in self.sensitive_info_patterns:
-            matches = re.finditer(pattern, response_body, re.IGNORECASE)
-            for match in matches:
-                vulnerabilities.append({
-                    'type': 'Informação Sensível Exposta',
-                    'severity': 'Medium',
-                    'description': description,
-                    'evidence': match.group(0)[:100],  # Limita tamanho
-                    'url': '',  # Será preenchido pelo caller
-                    'method': '',
-                })
-                log.warning(f"Informação sensível detectada: {description}")
-                break  # Uma ocorrência por padrão é suficiente
+        # Verifica no corpo da resposta (uma ocorrência por padrão é suficiente)
+        for rule_match in self.sensitive_info_rules.first_per_rule(response_body):
+            vulnerabilities.append({
+                'type': 'Informação Sensível Exposta',
+                'severity': 'Medium',
+                'description': rule_match.label,
+                'evidence': rule_match.evidence[:100],  # Limita tamanho
+                'url': '',  # Será preenchido pelo caller
+                'method': '',
+            })
+            log.warning(f"Informação sensível detectada: {rule_match.label}")
         
         # Verifica headers sensíveis
         sensitive_headers = ['X-Api-Key', 'X-Auth-Token', 'Authorization']
@@ -253,31 +394,29 @@ class VulnerabilityScanner:
         # Verifica Server header
         server_header = response_headers.get('Server', '') or response_headers.get('server', '')
         
-        for pattern, description in self.cve_patterns:
-            if re.search(pattern, server_header, re.IGNORECASE):
-                vulnerabilities.append({
-                    'type': 'CVE / Vulnerabilidade Conhecida',
-                    'severity': 'High',
-                    'description': description,
-                    'evidence': server_header,
-                    'url': '',
-                    'method': '',
-                })
-                log.warning(f"CVE detectada: {description}")
-            
-            # Também verifica no corpo (para frameworks JavaScript, etc)
-            if re.search(pattern, response_body, re.IGNORECASE):
-                match = re.search(pattern, response_body, re.IGNORECASE)
-                vulnerabilities.append({
-                    'type': 'CVE / Vulnerabilidade Conhecida',
-                    'severity': 'Medium',
-                    'description': description,
-                    'evidence': match.group(0),
-                    'url': '',
-                    'method': '',
-                })
-                log.warning(f"CVE detectada no body: {description}")
-                break
+        for rule_match in self.cve_rules.first_per_rule(server_header):
+            vulnerabilities.append({
+                'type': 'CVE / Vulnerabilidade Conhecida',
+                'severity': 'High',
+                'description': rule_match.label,
+                'evidence': server_header,
+                'url': '',
+                'method': '',
+            })
+            log.warning(f"CVE detectada: {rule_match.label}")
+
+        # Também verifica no corpo (para frameworks JavaScript, etc) - reporta apenas uma vez
+        rule_match = self.cve_rules.search(response_body)
+        if rule_match:
+            vulnerabilities.append({
+                'type': 'CVE / Vulnerabilidade Conhecida',
+                'severity': 'Medium',
+                'description': rule_match.label,
+                'evidence': rule_match.evidence,
+                'url': '',
+                'method': '',
+            })
+            log.warning(f"CVE detectada no body: {rule_match.label}")
         
         return vulnerabilities
     
@@ -0,0 +1,82 @@
+"""
+Métricas de envios em massa (Intruder e Sender): vazão, percentis de latência
+e taxas de erro. A memória é limitada: os percentis vêm de uma amostra
+uniforme (reservoir sampling) de no máximo `max_samples` latências, exata
+enquanto o envio tem menos requisições que isso.
+"""
+import random
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+# Percentis de latência reportados
+PERCENTILES = (50, 95, 99)
+
+
+def percentile(sorted_values: List[float], pct: float) -> Optional[float]:
+    """Percentil pelo método nearest-rank de uma lista já ordenada."""
+    if not sorted_values:
+        return None
+    rank = max(1, -(-len(sorted_values) * pct // 100))
+    return sorted_values[int(rank) - 1]
+
+
+class SendStats:
+    """Contadores e amostra de latências de um envio em massa (thread-safe)."""
+
+    def __init__(self, max_samples: int = 10000, seed: int = 0):
+        self.max_samples = max_samples
+        self.lock = threading.Lock()
+        self.started = time.perf_counter()
+        self.finished: Optional[float] = None
+        self.requests = 0
+        self.errors = 0
+        self.server_errors = 0
+        self.samples: List[float] = []
+        self._rng = random.Random(seed)
+
+    def record(self, latency: Optional[float], status: Optional[int] = None):
+        """Registra uma requisição concluída; sem `status` ela conta como erro (sem resposta)."""
+        with self.lock:
+            self.requests += 1
+            if status is None:
+                self.errors += 1
+            elif status >= 500:
+                self.server_errors += 1
+            if latency is None:
+                return
+            if len(self.samples) < self.max_samples:
+                self.samples.append(latency)
+            else:
+                slot = self._rng.randrange(self.requests)
+                if slot < self.max_samples:
+                    self.samples[slot] = latency
+
+    def finish(self):
+        """Fixa o fim da medição (as taxas deixam de considerar o tempo depois disto)."""
+        self.finished = time.perf_counter()
+
+    def summary(self) -> Dict[str, Any]:
+        """Requisições, req/s, percentis de latência (ms) e taxas de erro."""
+        with self.lock:
+            samples = sorted(self.samples)
+            requests, errors, server_errors = self.requests, self.errors, self.server_errors
+        elapsed = (self.finished or time.perf_counter()) - self.started
+        return {
+            'requests': requests,
+            'elapsed': elapsed,
+            'requests_per_second': requests / elapsed if elapsed > 0 else 0.0,
+            'latency_ms': {f'p{pct}': percentile(samples, pct) * 1000 if samples else None for pct in PERCENTILES},
+            'errors': errors,
+            'error_rate': errors / requests if requests else 0.0,
+            'server_errors': server_errors,
+            'server_error_rate': server_errors / requests if requests else 0.0,
+        }
+
+
+def format_summary(summary: Dict[str, Any]) -> str:
+    """Resumo de uma linha para logs e para a CLI."""
+    latency = ", ".join(f"{name} {value:.0f} ms" if value is not None else f"{name} -"
+                        for name, value in summary['latency_ms'].items())
+    return (f"{summary['requests']} req em {summary['elapsed']:.1f}s ({summary['requests_per_second']:.0f} req/s) | "
+            f"{latency} | erros {summary['error_rate']:.1%}, 5xx {summary['server_error_rate']:.1%}")
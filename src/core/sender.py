@@ -1,10 +1,20 @@
 import concurrent.futures
 import requests
 import os
-from urllib.parse import urlencode, parse_qs
+import time
+from urllib.parse import urlencode, parse_qs, urlparse
+from .async_engine import AsyncHttpEngine
+from .http_transport import shared_transport
 from .logger_config import log
+from .rate_limiter import shared_limiter
+from .request_template import PreparedRequest, RequestTemplate
+from .send_stats import SendStats, format_summary
 import re
 
+# Marks the substituted parameter value in a compiled request (never typed in a raw request)
+_VALUE_SLOT = "\x00value\x00"
+_VALUE_SLOT_PATTERN = re.compile("\x00(value)\x00")
+
 def _substitute_value(source: str, param_name: str, new_value: str) -> str:
     """Helper to substitute a value in a query string or form-urlencoded body."""
     # Pattern to find the parameter and its value
@@ -20,79 +30,98 @@ def _substitute_value(source: str, param_name: str, new_value: str) -> str:
         else:
             return f"{source}&{param_name}={new_value}"
 
-def send_from_raw(raw_request: str, param_name: str = None, new_value: str = None, proxy_port: int = 9507):
+def compile_raw_request(raw_request: str, param_name: str = None) -> RequestTemplate:
     """
-    Parses a raw HTTP request, optionally substitutes a parameter,
-    and resends it, returning the response object.
+    Parses a raw HTTP request once. When `param_name` is given, its value
+    (in the URL, in a urlencoded body, or appended to the URL) becomes a
+    template slot, so each new value only fills the slot.
     """
-    full_url = ""
-    try:
-        # Separate the request into head and body
-        head, body = raw_request.strip().split('\n\n', 1) if '\n\n' in raw_request else (raw_request.strip(), "")
+    if param_name:
+        raw_request = raw_request.strip()
+        head, body = raw_request.split('\n\n', 1) if '\n\n' in raw_request else (raw_request, "")
         request_lines = head.split('\n')
-
-        # 1. Parse the first line
-        method, path, _ = request_lines[0].split(' ')
-
-        # 2. Parse Headers
-        headers = {}
+        method, path, version = request_lines[0].split(' ')
+        content_type = ""
         for line in request_lines[1:]:
             if ':' in line:
                 key, value = line.split(':', 1)
-                headers[key.strip()] = value.strip()
-
-        # 3. Build URL
-        host = headers.get("Host")
-        if not host:
-            raise ValueError("Header 'Host' não encontrado.")
-        # Use HTTP for local hosts, HTTPS for others
-        if host.startswith(('127.0.0.1', 'localhost', '192.168.', '10.', '172.')):
-            scheme = "http"
+                if key.strip() == "Content-Type":
+                    content_type = value.strip()
+
+        # Try in URL path/query, then in urlencoded body, otherwise add to URL
+        if param_name not in path and body and "application/x-www-form-urlencoded" in content_type:
+            body = _substitute_value(body, param_name, _VALUE_SLOT)
         else:
-            scheme = "https"
-        base_url = f"{scheme}://{host}"
-
-        # 4. Substitute parameter
-        if param_name and new_value is not None:
-            new_value = str(new_value).strip()
-            # Try in URL path/query
-            if param_name in path:
-                path = _substitute_value(path, param_name, new_value)
-            # Try in urlencoded body
-            elif body and "application/x-www-form-urlencoded" in headers.get("Content-Type", ""):
-                 body = _substitute_value(body, param_name, new_value)
-            # Otherwise, add to URL
-            else:
-                path = _substitute_value(path, param_name, new_value)
+            path = _substitute_value(path, param_name, _VALUE_SLOT)
+        request_lines[0] = f"{method} {path} {version}"
+        raw_request = '\n'.join(request_lines) + '\n\n' + body
+    return RequestTemplate(raw_request, pattern=_VALUE_SLOT_PATTERN)
 
-        full_url = f"{base_url}{path}"
 
-        # 5. Prepare for resending
-        headers_to_send = {k: v for k, v in headers.items() if k.lower() not in ['host', 'content-length']}
+def _send_prepared(prepared: PreparedRequest, proxy_port: int):
+    """Sends a request built from a template through the proxy."""
+    proxies = {"http": f"http://127.0.0.1:{proxy_port}", "https": f"http://127.0.0.1:{proxy_port}"}
 
-        proxies = {"http": f"http://127.0.0.1:{proxy_port}", "https": f"http://127.0.0.1:{proxy_port}"}
+    log.info(f"Resending request: {prepared.method} {prepared.url}")
 
-        log.info(f"Resending request: {method} {full_url}")
+    # Throttled per target host, shared with the scanner and Intruder
+    response = shared_limiter().send(prepared.host, lambda: shared_transport().request(
+        method=prepared.method,
+        url=prepared.url,
+        headers=prepared.headers,
+        data=prepared.body,
+        proxies=proxies,
+        verify=False,
+        # Same result as the async engine: redirects are not followed
+        allow_redirects=False
+    ))
 
-        response = requests.request(
-            method=method,
-            url=full_url,
-            headers=headers_to_send,
-            data=body.encode('utf-8') if body else None,
-            proxies=proxies,
-            verify=False
-        )
+    log.info(f"Response received: {response.status_code}")
+    return response
 
-        log.info(f"Response received: {response.status_code}")
-        return response
 
+def _build_value(template: RequestTemplate, new_value) -> PreparedRequest:
+    """Fills the parameter slots of a compiled request with `new_value`."""
+    return template.build([str(new_value).strip()] * template.num_positions)
+
+
+def _send_value(template: RequestTemplate, new_value, proxy_port: int):
+    """Fills the parameter slots of a compiled request with `new_value` and sends it."""
+    try:
+        return _send_prepared(_build_value(template, new_value), proxy_port)
+    except Exception as e:
+        log.error(f"Error resending request: {e}", exc_info=True)
+        return None
+
+
+def _timed_send_value(template: RequestTemplate, new_value, proxy_port: int):
+    """_send_value returning (response, latency in seconds)."""
+    started = time.perf_counter()
+    response = _send_value(template, new_value, proxy_port)
+    return response, time.perf_counter() - started
+
+
+def send_from_raw(raw_request: str, param_name: str = None, new_value: str = None, proxy_port: int = 9507):
+    """
+    Parses a raw HTTP request, optionally substitutes a parameter,
+    and resends it, returning the response object.
+    """
+    try:
+        template = compile_raw_request(raw_request, param_name if new_value is not None else None)
     except Exception as e:
         log.error(f"Error resending request: {e}", exc_info=True)
         return None
+    return _send_value(template, new_value, proxy_port)
 
-def run_sender_from_file(raw_request: str, file_path: str, param_name: str, num_threads: int, queue=None, proxy_port: int = 9507):
+def run_sender_from_file(raw_request: str, file_path: str, param_name: str, num_threads: int, queue=None,
+                         proxy_port: int = 9507, engine: str = 'threads', in_flight: int = 500):
     """
     Reads a file and resends the base request for each value in the file, in parallel.
+
+    `engine` selects a pool of `num_threads` threads ('threads') or one asyncio
+    event loop keeping up to `in_flight` requests in flight ('async'). Returns
+    the throughput, latency percentiles and error rates of the run. Neither
+    engine follows redirects: a 3xx response is the result.
     """
     if not os.path.exists(file_path):
         log.error(f"Sender: File '{file_path}' not found.")
@@ -108,28 +137,52 @@ def run_sender_from_file(raw_request: str, file_path: str, param_name: str, num_
     if queue:
         queue.put({'type': 'progress_start', 'total': total_requests})
 
+    try:
+        # Parsed once; each value only fills the parameter slot
+        template = compile_raw_request(raw_request, param_name)
+    except Exception as e:
+        log.error(f"Sender: Invalid request: {e}")
+        if queue:
+            queue.put({'type': 'error', 'data': f"Invalid request: {e}"})
+        return
+
     completed_requests = 0
-    with concurrent.futures.ThreadPoolExecutor(max_workers=num_threads) as executor:
-        futures = [executor.submit(send_from_raw, raw_request, param_name, value, proxy_port) for value in values]
+    stats = SendStats()
 
-        for future in concurrent.futures.as_completed(futures):
-            response = future.result()
-            completed_requests += 1
-            if queue:
-                progress = (completed_requests / total_requests) * 100
-                queue.put({'type': 'progress_update', 'value': progress})
+    def record(response, latency):
+        nonlocal completed_requests
+        completed_requests += 1
+        stats.record(latency, response.status_code if response is not None else None)
+        if queue:
+            progress = (completed_requests / total_requests) * 100
+            queue.put({'type': 'progress_update', 'value': progress})
 
-                if response:
-                    success = 200 <= response.status_code < 300
-                    result_data = {'url': response.request.url, 'status': response.status_code, 'success': success, 'response': response}
-                else:
-                    result_data = {'url': 'N/A', 'status': 'Error', 'success': False, 'response': None}
+            if response is not None:
+                success = 200 <= response.status_code < 300
+                result_data = {'url': response.request.url, 'status': response.status_code, 'success': success, 'response': response}
+            else:
+                result_data = {'url': 'N/A', 'status': 'Error', 'success': False, 'response': None}
 
-                queue.put({'type': 'result', 'data': result_data})
+            queue.put({'type': 'result', 'data': result_data})
 
-    log.info("Sender: Bulk send completed.")
+    if engine == 'async':
+        # Limiter sized for in_flight: the shared one caps each host at a few dozen concurrent requests
+        AsyncHttpEngine(in_flight=in_flight, proxy=f"http://127.0.0.1:{proxy_port}").run(
+            values, lambda value: _build_value(template, value), lambda _, response, latency: record(response, latency))
+    else:
+        with concurrent.futures.ThreadPoolExecutor(max_workers=num_threads) as executor:
+            futures = [executor.submit(_timed_send_value, template, value, proxy_port) for value in values]
+
+            for future in concurrent.futures.as_completed(futures):
+                record(*future.result())
+
+    stats.finish()
+    summary = stats.summary()
+    log.info(f"Sender: Bulk send completed: {format_summary(summary)}")
     if queue:
+        queue.put({'type': 'stats', 'data': summary})
         queue.put({'type': 'progress_done'})
+    return summary
 
 def run_sender(url: str, file_path: str, param_name: str, num_threads: int):
     """
@@ -160,7 +213,7 @@ def run_sender(url: str, file_path: str, param_name: str, num_threads: int):
         for future in concurrent.futures.as_completed(futures):
             response = future.result()
             completed_requests += 1
-            if response:
+            if response is not None:
                 log.info(f"[{completed_requests}/{total_requests}] {response.request.url} -> {response.status_code}")
             else:
                 log.error(f"[{completed_requests}/{total_requests}] Failed")
@@ -170,7 +223,7 @@ def run_sender(url: str, file_path: str, param_name: str, num_threads: int):
 def _send_get_request(url: str):
     """Helper function to send a GET request without proxy."""
     try:
-        response = requests.get(url, verify=False, timeout=10)
+        response = shared_limiter().send(urlparse(url).netloc, lambda: shared_transport().get(url, verify=False, timeout=10))
         return response
     except Exception as e:
         log.error(f"Error sending request to {url}: {e}")
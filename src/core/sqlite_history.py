@@ -0,0 +1,241 @@
+"""
+Histórico de requisições persistido em SQLite (modo WAL)
+Mantém a mesma API do `RequestHistory` em memória, mas guarda as entradas em
+disco: os metadados ficam em uma tabela indexada e os bodies em uma tabela de
+blobs, carregados apenas quando a entrada realmente precisa deles.
+"""
+import json
+import sqlite3
+import threading
+from datetime import datetime
+from typing import List, Optional
+
+from mitmproxy import http
+
+from .flow_view import FlowView
+from .history import HistoryEntry
+from .logger_config import log
+
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS entries (
+    id INTEGER PRIMARY KEY,
+    timestamp REAL NOT NULL,
+    host TEXT NOT NULL,
+    method TEXT NOT NULL,
+    url TEXT NOT NULL,
+    path TEXT NOT NULL,
+    status INTEGER NOT NULL,
+    request_headers TEXT NOT NULL,
+    response_headers TEXT NOT NULL,
+    vulnerabilities TEXT NOT NULL DEFAULT '[]'
+);
+CREATE INDEX IF NOT EXISTS idx_entries_host ON entries(host);
+CREATE INDEX IF NOT EXISTS idx_entries_method ON entries(method);
+CREATE INDEX IF NOT EXISTS idx_entries_status ON entries(status);
+CREATE INDEX IF NOT EXISTS idx_entries_timestamp ON entries(timestamp);
+CREATE TABLE IF NOT EXISTS bodies (
+    entry_id INTEGER PRIMARY KEY,
+    request_body BLOB,
+    response_body BLOB
+);
+"""
+
+ENTRY_COLUMNS = "id, timestamp, host, method, url, path, status, request_headers, response_headers, vulnerabilities"
+
+
+class LazyHistoryEntry(HistoryEntry):
+    """
+    Entrada do histórico que só busca os bodies no banco quando são acessados.
+    Se comporta como o `HistoryEntry` das entradas em memória.
+    """
+
+    RAW_KEYS = ('request_body_raw', 'response_body_raw')
+
+    def __init__(self, store, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._store = store
+
+    def __missing__(self, key):
+        if key in self.RAW_KEYS:
+            self._store._load_bodies(self)
+            return dict.__getitem__(self, key)
+        return super().__missing__(key)
+
+    def __contains__(self, key):
+        return key in self.RAW_KEYS or super().__contains__(key)
+
+
+class SQLiteRequestHistory:
+    """Gerencia o histórico de requisições em um banco SQLite"""
+
+    def __init__(self, db_path: str = "history.db", max_items: Optional[int] = None):
+        """
+        Args:
+            db_path: Caminho do arquivo do banco (':memory:' para testes)
+            max_items: Número máximo de entradas mantidas (None = ilimitado)
+        """
+        self.db_path = db_path
+        self.max_items = max_items
+        self.lock = threading.RLock()
+
+        # O scanner passivo e a GUI acessam o histórico de threads diferentes
+        self.conn = sqlite3.connect(db_path, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript(SCHEMA)
+        self.conn.commit()
+
+        row = self.conn.execute("SELECT MAX(id) FROM entries").fetchone()
+        self.current_id = row[0] or 0
+        log.info(f"Histórico SQLite aberto em {db_path} ({self.current_id} entradas)")
+
+    def _row_to_entry(self, row) -> LazyHistoryEntry:
+        return LazyHistoryEntry(self, {
+            'id': row[0],
+            'timestamp': datetime.fromtimestamp(row[1]),
+            'host': row[2],
+            'method': row[3],
+            'url': row[4],
+            'path': row[5],
+            'status': row[6],
+            'request_headers': json.loads(row[7]),
+            'response_headers': json.loads(row[8]),
+            'vulnerabilities': json.loads(row[9]),
+        })
+
+    def _load_bodies(self, entry: LazyHistoryEntry):
+        """Carrega os bodies de uma entrada a partir da tabela de blobs."""
+        with self.lock:
+            row = self.conn.execute(
+                "SELECT request_body, response_body FROM bodies WHERE entry_id = ?", (entry['id'],)
+            ).fetchone()
+        request_body, response_body = row if row else (b'', b'')
+        dict.__setitem__(entry, 'request_body_raw', bytes(request_body or b''))
+        dict.__setitem__(entry, 'response_body_raw', bytes(response_body or b''))
+
+    def add_request(self, flow: http.HTTPFlow, vulnerabilities=None, view: FlowView = None):
+        """Adiciona uma requisição ao histórico e retorna o ID da nova entrada"""
+        view = view or FlowView(flow)
+
+        values = (
+            datetime.now().timestamp(),
+            view.host,
+            view.method,
+            view.url,
+            view.path,
+            view.status,
+            json.dumps(view.request_headers),
+            json.dumps(view.response_headers),
+            json.dumps(vulnerabilities or [], default=str),
+        )
+        request_body = view.request_content
+        response_body = view.response_content
+
+        with self.lock:
+            self.current_id += 1
+            entry_id = self.current_id
+            self.conn.execute(
+                f"INSERT INTO entries ({ENTRY_COLUMNS}) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (entry_id,) + values
+            )
+            self.conn.execute(
+                "INSERT INTO bodies (entry_id, request_body, response_body) VALUES (?, ?, ?)",
+                (entry_id, sqlite3.Binary(request_body), sqlite3.Binary(response_body))
+            )
+
+            # Limita o tamanho do histórico (IDs são sequenciais)
+            if self.max_items:
+                oldest_kept = entry_id - self.max_items
+                self.conn.execute("DELETE FROM entries WHERE id <= ?", (oldest_kept,))
+                self.conn.execute("DELETE FROM bodies WHERE entry_id <= ?", (oldest_kept,))
+            self.conn.commit()
+
+        return entry_id
+
+    def get_history(self) -> List[LazyHistoryEntry]:
+        """Retorna todo o histórico (sem os bodies, carregados sob demanda)"""
+        with self.lock:
+            rows = self.conn.execute(f"SELECT {ENTRY_COLUMNS} FROM entries ORDER BY id").fetchall()
+        return [self._row_to_entry(row) for row in rows]
+
+    def query(self, host: str = None, method: str = None, status: int = None,
+              since: datetime = None, limit: int = None) -> List[LazyHistoryEntry]:
+        """Busca entradas filtrando pelas colunas indexadas."""
+        conditions, params = [], []
+        if host is not None:
+            conditions.append("host = ?")
+            params.append(host)
+        if method is not None:
+            conditions.append("method = ?")
+            params.append(method)
+        if status is not None:
+            conditions.append("status = ?")
+            params.append(status)
+        if since is not None:
+            conditions.append("timestamp >= ?")
+            params.append(since.timestamp())
+
+        sql = f"SELECT {ENTRY_COLUMNS} FROM entries"
+        if conditions:
+            sql += " WHERE " + " AND ".join(conditions)
+        sql += " ORDER BY id"
+        if limit is not None:
+            sql += " LIMIT ?"
+            params.append(limit)
+
+        with self.lock:
+            rows = self.conn.execute(sql, params).fetchall()
+        return [self._row_to_entry(row) for row in rows]
+
+    def count(self) -> int:
+        """Retorna o número de entradas armazenadas."""
+        with self.lock:
+            return self.conn.execute("SELECT COUNT(*) FROM entries").fetchone()[0]
+
+    def clear_history(self):
+        """Limpa o histórico"""
+        with self.lock:
+            self.conn.execute("DELETE FROM entries")
+            self.conn.execute("DELETE FROM bodies")
+            self.conn.commit()
+            self.current_id = 0
+
+    def get_new_entries(self, last_id=0):
+        """Retorna apenas as entradas mais novas que o último ID conhecido."""
+        with self.lock:
+            rows = self.conn.execute(
+                f"SELECT {ENTRY_COLUMNS} FROM entries WHERE id > ? ORDER BY id", (last_id or 0,)
+            ).fetchall()
+        return [self._row_to_entry(row) for row in rows]
+
+    def get_entry_by_id(self, entry_id: int):
+        """Retorna uma entrada do histórico pelo seu ID."""
+        with self.lock:
+            row = self.conn.execute(f"SELECT {ENTRY_COLUMNS} FROM entries WHERE id = ?", (entry_id,)).fetchone()
+        return self._row_to_entry(row) if row else None
+
+    def add_vulnerabilities_to_entry(self, entry_id: int, new_vulnerabilities: list):
+        """Adiciona uma lista de vulnerabilidades a uma entrada existente no histórico."""
+        with self.lock:
+            row = self.conn.execute("SELECT vulnerabilities FROM entries WHERE id = ?", (entry_id,)).fetchone()
+            if not row:
+                return False
+
+            vulnerabilities = json.loads(row[0])
+            # Adiciona apenas vulnerabilidades que ainda não foram reportadas
+            existing_vulns_str = {json.dumps(v, sort_keys=True, default=str) for v in vulnerabilities}
+            for vuln in new_vulnerabilities:
+                if json.dumps(vuln, sort_keys=True, default=str) not in existing_vulns_str:
+                    vulnerabilities.append(vuln)
+
+            self.conn.execute(
+                "UPDATE entries SET vulnerabilities = ? WHERE id = ?", (json.dumps(vulnerabilities, default=str), entry_id)
+            )
+            self.conn.commit()
+            return True
+
+    def close(self):
+        """Fecha a conexão com o banco."""
+        with self.lock:
+            self.conn.close()
@@ -0,0 +1,164 @@
+"""
+Oráculo de tempo para checks baseados em atraso (SQLi time-based, command injection)
+Em vez de enviar `sleep 5` fixo e comparar com uma única requisição normal,
+o oráculo:
+  - amostra a latência normal do endpoint uma vez e guarda em cache;
+  - escolhe o menor atraso inteiro que se destaca do jitter medido;
+  - confirma um atraso observado com uma requisição de controle (atraso 0) e
+    uma repetição com o dobro do atraso, parando na primeira observação que
+    contradiz a hipótese. Picos aleatórios de latência raramente acompanham
+    o atraso pedido; um payload executado, sim.
+"""
+import math
+import statistics
+import threading
+import time
+from typing import Any, Callable, Dict, Hashable, List, NamedTuple, Optional, Tuple
+
+
+class LatencyBaseline(NamedTuple):
+    """Distribuição da latência normal de um endpoint (segundos)."""
+    median: float
+    jitter: float
+    samples: Tuple[float, ...]
+    measured_at: float
+
+
+class TimingVerdict(NamedTuple):
+    """Resultado de um teste de atraso."""
+    vulnerable: bool
+    delay: int
+    baseline: LatencyBaseline
+    observations: Tuple[Tuple[int, float], ...]
+    reason: str
+
+    @property
+    def evidence(self) -> str:
+        observed = ", ".join(f"{delay}s->{elapsed:.2f}s" for delay, elapsed in self.observations)
+        return (f"Latência normal: {self.baseline.median:.2f}s (jitter {self.baseline.jitter:.2f}s); "
+                f"atraso pedido -> observado: {observed}")
+
+
+class TimingOracle:
+    """Decide, com poucas requisições, se um payload de atraso está sendo executado."""
+
+    def __init__(self, baseline_samples: int = 5, min_delay: int = 1, max_delay: int = 4,
+                 jitter_factor: float = 4.0, confirmations: int = 1, baseline_ttl: float = 300.0):
+        """
+        Args:
+            baseline_samples: Requisições normais usadas para medir a latência do endpoint
+            min_delay: Menor atraso (segundos inteiros) usado nos payloads
+            max_delay: Maior atraso inicial (a repetição usa o dobro; mantenha abaixo do timeout HTTP)
+            jitter_factor: O atraso escolhido é pelo menos `jitter_factor` vezes o jitter medido
+            confirmations: Pares (controle, repetição) exigidos depois da primeira observação positiva
+            baseline_ttl: Segundos que a latência medida de um endpoint fica em cache
+        """
+        if baseline_samples < 2:
+            raise ValueError("São necessárias pelo menos 2 amostras de latência")
+        if not 1 <= min_delay <= max_delay:
+            raise ValueError("Intervalo de atrasos inválido")
+        self.baseline_samples = baseline_samples
+        self.min_delay = min_delay
+        self.max_delay = max_delay
+        self.jitter_factor = jitter_factor
+        self.confirmations = confirmations
+        self.baseline_ttl = baseline_ttl
+
+        self.lock = threading.Lock()
+        self.baselines: Dict[Hashable, LatencyBaseline] = {}
+        self.tests = 0
+        self.positives = 0
+        self.early_stops = 0
+        self.requests_sent = 0
+        self.delay_requested = 0.0
+
+    def get_baseline(self, key: Hashable, sample: Callable[[], float]) -> LatencyBaseline:
+        """Retorna a latência normal do endpoint `key`, medindo com `sample()` se não estiver em cache."""
+        now = time.time()
+        with self.lock:
+            baseline = self.baselines.get(key)
+        if baseline is not None and now - baseline.measured_at < self.baseline_ttl:
+            return baseline
+
+        samples = tuple(sample() for _ in range(self.baseline_samples))
+        median = statistics.median(samples)
+        # Jitter: o pior desvio observado acima da mediana ou 2 desvios padrão (poucas amostras subestimam o pico)
+        jitter = max(max(samples) - median, 2 * statistics.stdev(samples))
+        baseline = LatencyBaseline(median, jitter, samples, now)
+        with self.lock:
+            self.baselines[key] = baseline
+            self.requests_sent += len(samples)
+        return baseline
+
+    def invalidate(self, key: Hashable = None):
+        """Descarta a latência em cache de um endpoint (ou de todos)."""
+        with self.lock:
+            if key is None:
+                self.baselines.clear()
+            else:
+                self.baselines.pop(key, None)
+
+    def choose_delay(self, baseline: LatencyBaseline) -> int:
+        """Menor atraso inteiro que se destaca do jitter do endpoint."""
+        wanted = math.ceil(self.jitter_factor * baseline.jitter)
+        return min(self.max_delay, max(self.min_delay, wanted))
+
+    def test(self, key: Hashable, probe: Callable[[int], float], sample: Callable[[], float]) -> TimingVerdict:
+        """
+        Testa um payload de atraso.
+
+        Args:
+            key: Identifica o endpoint (a latência normal é compartilhada entre payloads e parâmetros)
+            probe: Envia o payload com o atraso pedido (segundos) e retorna o tempo de resposta
+            sample: Envia a requisição normal e retorna o tempo de resposta
+        """
+        baseline = self.get_baseline(key, sample)
+        delay = self.choose_delay(baseline)
+        # Alvo instável demais para o maior atraso: exige uma confirmação extra
+        confirmations = self.confirmations + (self.jitter_factor * baseline.jitter > self.max_delay)
+        plan = [delay]
+        for index in range(confirmations):
+            plan += [0, delay * 2 if index % 2 == 0 else delay]
+
+        observations: List[Tuple[int, float]] = []
+        verdict: Optional[TimingVerdict] = None
+        for step, requested in enumerate(plan):
+            elapsed = probe(requested)
+            observations.append((requested, elapsed))
+            # Ponto médio entre o atraso esperado e o vizinho (0 ou `delay` a menos):
+            # o jitter fica bem abaixo de delay / 2. Sem limite superior, pois um
+            # SLEEP pode ser executado uma vez por linha e demorar mais que o pedido.
+            if requested:
+                ok = elapsed >= baseline.median + requested - delay / 2
+            else:
+                ok = elapsed < baseline.median + delay / 2
+            if not ok:
+                if step == 0:
+                    reason = "sem atraso observado"
+                elif requested == 0:
+                    reason = "controle também atrasou (latência instável)"
+                else:
+                    reason = "atraso não se repetiu"
+                verdict = TimingVerdict(False, delay, baseline, tuple(observations), reason)
+                break
+        if verdict is None:
+            verdict = TimingVerdict(True, delay, baseline, tuple(observations), "atraso confirmado")
+
+        with self.lock:
+            self.tests += 1
+            self.positives += verdict.vulnerable
+            self.early_stops += len(observations) < len(plan)
+            self.requests_sent += len(observations)
+            self.delay_requested += sum(requested for requested, _ in observations)
+        return verdict
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self.lock:
+            return {
+                'baselines_cached': len(self.baselines),
+                'tests': self.tests,
+                'positives': self.positives,
+                'early_stops': self.early_stops,
+                'requests_sent': self.requests_sent,
+                'delay_requested': self.delay_requested,
+            }
@@ -0,0 +1,307 @@
+"""
+Modo "turbo" do Intruder: HTTP/1.1 com pipelining sobre poucas conexões persistentes.
+
+Cada requisição renderizada do template é escrita direto no socket, sem
+passar pelo requests nem pelo proxy: os headers saem na ordem e grafia da
+requisição crua, só Content-Length e Connection são recalculados. Cada
+conexão mantém até `pipeline` requisições escritas à frente das respostas; o
+parser separa o fluxo de bytes em respostas, entregues na mesma ordem das
+requisições (o que associa cada resposta ao seu payload).
+
+  - Se o servidor fecha a conexão (Connection: close, queda ou timeout), as
+    requisições ainda sem resposta são reenviadas em uma conexão nova; se a
+    conexão caiu sem entregar nenhuma resposta, a que estava na frente da fila
+    conta uma tentativa.
+  - Sincronização pelo último byte (`race_size`): as requisições são enviadas
+    em grupos, cada uma em sua conexão, com todos os bytes menos o último; após
+    uma pausa, os últimos bytes de todas saem juntos, fazendo o servidor
+    receber o grupo no mesmo instante (testes de race condition).
+
+Não há limitador de taxa: o objetivo é vazão e sincronismo máximos.
+"""
+import asyncio
+import time
+from collections import deque
+from typing import Any, Callable, Deque, Dict, Iterable, Iterator, List, NamedTuple, Optional, Tuple
+from urllib.parse import urlsplit
+
+from .async_engine import AsyncResponse, insecure_ssl_context, read_response
+from .logger_config import log
+from .request_template import scheme_for_host
+
+# Headers recalculados pelo modo turbo
+_MANAGED_HEADERS = ('content-length', 'connection')
+
+
+class WireRequest(NamedTuple):
+    """Requisição serializada para o socket."""
+    method: str
+    target: Tuple[str, str, int]  # (esquema, host, porta) da conexão
+    url: str
+    body: bytes
+    data: bytes
+
+
+def wire_request(raw_request: str) -> WireRequest:
+    """
+    Converte a requisição crua (linhas com \\n) nos bytes enviados: CRLF, headers
+    na ordem original, Connection: keep-alive e Content-Length do body real.
+    Levanta ValueError se a requisição não tem linha inicial válida ou Host.
+    """
+    text = raw_request.replace('\r\n', '\n').strip()
+    head, body = text.split('\n\n', 1) if '\n\n' in text else (text, "")
+    request_lines = head.split('\n')
+    try:
+        method, path, _ = request_lines[0].split(' ')
+    except ValueError:
+        raise ValueError(f"Invalid request line: {request_lines[0]!r}")
+    lines = [f"{method} {path} HTTP/1.1"]
+    host = None
+    chunked = False
+    for line in request_lines[1:]:
+        if ':' not in line:
+            continue
+        name, value = line.split(':', 1)
+        name_lower = name.strip().lower()
+        if name_lower == 'host' and host is None:
+            host = value.strip()
+        elif name_lower == 'transfer-encoding':
+            chunked = 'chunked' in value.lower()
+        if name_lower not in _MANAGED_HEADERS:
+            lines.append(line)
+    if not host:
+        raise ValueError("Header 'Host' not found")
+    body_bytes = body.encode('utf-8')
+    lines.append("Connection: keep-alive")
+    if not chunked and (body_bytes or method not in ('GET', 'HEAD')):
+        lines.append(f"Content-Length: {len(body_bytes)}")
+    scheme = scheme_for_host(host)
+    address = urlsplit(f"{scheme}://{host}")
+    target = (scheme, address.hostname, address.port or (443 if scheme == 'https' else 80))
+    data = ('\r\n'.join(lines) + '\r\n\r\n').encode('utf-8') + body_bytes
+    return WireRequest(method, target, f"{scheme}://{host}{path}", body_bytes, data)
+
+
+class _Job:
+    """Job do ataque com a requisição serializada e o estado de envio."""
+
+    __slots__ = ('job', 'wire', 'attempts', 'sent_at')
+
+    def __init__(self, job: Any, wire: WireRequest):
+        self.job = job
+        self.wire = wire
+        self.attempts = 0
+        self.sent_at = 0.0
+
+
+# Erros que encerram uma conexão (as requisições sem resposta são reenviadas)
+_CONNECTION_ERRORS = (OSError, EOFError, asyncio.TimeoutError, ValueError)
+
+
+class TurboEngine:
+    """Pipelining HTTP/1.1 em `connections` conexões, ou grupos sincronizados pelo último byte."""
+
+    def __init__(self, connections: int = 4, pipeline: int = 32, timeout: float = 30.0, retries: int = 2,
+                 race_warmup: float = 0.1):
+        """
+        Args:
+            connections: Conexões persistentes simultâneas (pipelining)
+            pipeline: Requisições escritas à frente das respostas em cada conexão
+            timeout: Tempo máximo (s) para conectar e para cada resposta
+            retries: Novas tentativas de uma requisição cuja conexão falhou antes da resposta
+            race_warmup: Pausa (s) entre enviar as requisições sem o último byte e liberá-lo
+        """
+        if connections < 1 or pipeline < 1:
+            raise ValueError("connections e pipeline devem ser positivos")
+        self.connections = connections
+        self.pipeline = pipeline
+        self.timeout = timeout
+        self.retries = retries
+        self.race_warmup = race_warmup
+        self.ssl_context = insecure_ssl_context()
+        self.requests_done = 0
+        self.connections_opened = 0
+        self.resent = 0
+        # Intervalo entre a liberação do último byte e a primeira/última resposta da rajada mais recente
+        self.last_race: Optional[Dict[str, float]] = None
+
+    # --- Execução ---
+
+    def run(self, jobs: Iterable[Any], render: Callable[[Any], str],
+            on_result: Callable[[Any, Optional[AsyncResponse], float], None], race_size: int = 0):
+        """
+        Envia todos os jobs e bloqueia até o fim.
+
+        Args:
+            jobs: Iterável consumido sob demanda
+            render: Requisição crua de um job (ex.: RequestTemplate.render)
+            on_result: Chamado com (job, resposta ou None, latência em s), na ordem de chegada
+            race_size: Se > 0, envia em grupos deste tamanho sincronizados pelo último byte
+        """
+        asyncio.run(self._run(iter(jobs), render, on_result, race_size))
+
+    async def _run(self, jobs: Iterator[Any], render, on_result, race_size: int):
+        if race_size > 0:
+            while True:
+                group = []
+                while len(group) < race_size:
+                    item = self._next(jobs, render, on_result)
+                    if item is None:
+                        break
+                    group.append(item)
+                if not group:
+                    return
+                await self._race(group, on_result)
+        workers = [asyncio.ensure_future(self._pipeline_worker(jobs, render, on_result))
+                   for _ in range(self.connections)]
+        try:
+            await asyncio.gather(*workers)
+        finally:
+            for worker in workers:
+                worker.cancel()
+            await asyncio.gather(*workers, return_exceptions=True)
+
+    def _next(self, jobs: Iterator[Any], render, on_result) -> Optional[_Job]:
+        """Próximo job do iterador compartilhado; requisições inválidas viram resultado sem resposta."""
+        for job in jobs:
+            try:
+                return _Job(job, wire_request(render(job)))
+            except ValueError as e:
+                log.error(f"Turbo: requisição inválida: {e}")
+                on_result(job, None, 0.0)
+        return None
+
+    async def _connect(self, target: Tuple[str, str, int]) -> Tuple[asyncio.StreamReader, asyncio.StreamWriter]:
+        scheme, host, port = target
+        tls = scheme == 'https'
+        connection = await asyncio.wait_for(asyncio.open_connection(
+            host, port, ssl=self.ssl_context if tls else None, server_hostname=host if tls else None), self.timeout)
+        self.connections_opened += 1
+        return connection
+
+    def _response(self, item: _Job, response: Tuple, elapsed: float) -> AsyncResponse:
+        status, reason, headers, body, _ = response
+        return AsyncResponse(item.wire.method, item.wire.url, {}, item.wire.body,
+                             status, reason, headers, body, elapsed)
+
+    def _give_up_or_retry(self, queue: Deque[_Job], error: BaseException, on_result) -> None:
+        """A requisição na frente da fila conta uma tentativa; após `retries` reenvios vira erro."""
+        item = queue[0]
+        item.attempts += 1
+        if item.attempts > self.retries:
+            queue.popleft()
+            log.error(f"Turbo: erro no envio para {item.wire.url}: {error!r}")
+            on_result(item.job, None, time.perf_counter() - item.sent_at if item.sent_at else 0.0)
+
+    # --- Pipelining ---
+
+    async def _pipeline_worker(self, jobs: Iterator[Any], render, on_result):
+        # Jobs a (re)enviar na próxima conexão desta corrotina, na ordem original
+        carry: Deque[_Job] = deque()
+        while True:
+            if not carry:
+                first = self._next(jobs, render, on_result)
+                if first is None:
+                    return
+                carry.append(first)
+            target = carry[0].wire.target
+            in_flight: Deque[_Job] = deque()
+            writer = None
+            answered = 0
+
+            def take() -> Optional[_Job]:
+                """Próximo job para esta conexão (None se acabou ou se é de outro destino)."""
+                item = carry.popleft() if carry else self._next(jobs, render, on_result)
+                if item is not None and item.wire.target != target:
+                    carry.appendleft(item)
+                    return None
+                return item
+
+            def send(item: _Job):
+                writer.write(item.wire.data)
+                item.sent_at = time.perf_counter()
+                in_flight.append(item)
+
+            try:
+                reader, writer = await self._connect(target)
+                while len(in_flight) < self.pipeline:
+                    item = take()
+                    if item is None:
+                        break
+                    send(item)
+                while in_flight:
+                    await writer.drain()
+                    response = await asyncio.wait_for(read_response(reader, in_flight[0].wire.method), self.timeout)
+                    item = in_flight.popleft()
+                    answered += 1
+                    self.requests_done += 1
+                    now = time.perf_counter()
+                    on_result(item.job, self._response(item, response, now - item.sent_at), now - item.sent_at)
+                    if not response[4]:
+                        break  # O servidor fecha a conexão: as demais são reenviadas em outra
+                    item = take()
+                    if item is not None:
+                        send(item)
+            except _CONNECTION_ERRORS as e:
+                carry.extendleft(reversed(in_flight))
+                # Queda depois de respostas (ex.: RST ao fechar com requisições não lidas) não é culpa da requisição
+                if not answered:
+                    self._give_up_or_retry(carry, e, on_result)
+            else:
+                carry.extendleft(reversed(in_flight))
+            finally:
+                if writer is not None:
+                    writer.close()
+            self.resent += len(in_flight)
+
+    # --- Sincronização pelo último byte ---
+
+    async def _race(self, group: List[_Job], on_result):
+        async def connect(item: _Job):
+            try:
+                return await self._connect(item.wire.target)
+            except _CONNECTION_ERRORS as e:
+                log.error(f"Turbo: erro ao conectar em {item.wire.url}: {e!r}")
+                on_result(item.job, None, 0.0)
+                return None
+
+        connections = await asyncio.gather(*(connect(item) for item in group))
+        ready = [(item, conn) for item, conn in zip(group, connections) if conn is not None]
+        released = 0.0
+
+        async def finish(item: _Job, reader: asyncio.StreamReader):
+            response = await asyncio.wait_for(read_response(reader, item.wire.method), self.timeout)
+            return response, time.perf_counter() - released
+
+        try:
+            for item, (_, writer) in ready:
+                writer.write(item.wire.data[:-1])
+            await asyncio.gather(*(writer.drain() for _, (_, writer) in ready), return_exceptions=True)
+            # Só falta o último byte de cada requisição: o servidor ainda não pode processar nenhuma
+            await asyncio.sleep(self.race_warmup)
+            released = time.perf_counter()
+            for item, (_, writer) in ready:
+                writer.write(item.wire.data[-1:])
+            results = await asyncio.gather(*(finish(item, reader) for item, (reader, _) in ready),
+                                           return_exceptions=True)
+        finally:
+            for _, (_, writer) in ready:
+                writer.close()
+
+        timings = []
+        for (item, _), result in zip(ready, results):
+            if isinstance(result, BaseException):
+                log.error(f"Turbo: erro na rajada para {item.wire.url}: {result!r}")
+                on_result(item.job, None, time.perf_counter() - released)
+                continue
+            response, latency = result
+            self.requests_done += 1
+            timings.append(latency)
+            on_result(item.job, self._response(item, response, latency), latency)
+        if timings:
+            self.last_race = {'first_response': min(timings), 'last_response': max(timings)}
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Respostas recebidas, conexões abertas e requisições reenviadas após a queda de uma conexão."""
+        return {'requests': self.requests_done, 'connections': self.connections_opened, 'resent': self.resent,
+                'last_race': self.last_race}
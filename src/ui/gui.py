@@ -1,4 +1,5 @@
 import asyncio
+import os
 import queue
 import re
 import threading
@@ -16,24 +17,43 @@ from src.core.addon import InterceptAddon
 from src.core.config import InterceptConfig
 from src.core.cookie_manager import CookieManager
 from src.core.history import RequestHistory
+from src.core.http_transport import shared_transport
+from src.core.intercept_scope import parse_scope_text
+from src.core.rate_limiter import shared_limiter
+from src.core.response_fingerprint import fingerprint_entry
+from src.core.send_stats import format_summary
+from src.core.scan_cache import DEFAULT_CACHE_FILE as SCAN_CACHE_FILE
+from src.core.scan_jobs import BulkScanJob, targets_from_history, targets_from_spider
+from src.core.scan_pipeline import PassiveScanPipeline
 from src.core.logger_config import log
 from src.core.spider import Spider
 from src.core.websocket_history import WebSocketHistory
 from src.core.browser_manager import BrowserManager
 from .tooltip import Tooltip
 
+# Checkpoint do scan ativo em massa (permite retomar após fechar a aplicação)
+BULK_SCAN_CHECKPOINT = "scan_job.json"
+
 
 class ProxyGUI:
     """Interface gráfica para configurar o proxy interceptador"""
 
     def __init__(self):
-        self.config = InterceptConfig()
-        self.history = RequestHistory()
+        # Alterações de regras são agrupadas em uma gravação atômica; edições externas do arquivo são recarregadas
+        self.config = InterceptConfig(save_debounce=0.5)
+        self.config.start_watching()
+        self.last_rules_version = self.config.rules_version
+        memory_mb = self.config.get_history_memory_mb()
+        self.history = RequestHistory(max_memory_bytes=memory_mb * 1024 * 1024 if memory_mb else None)
+        self.history.max_items = 100000  # O orçamento de memória é quem limita o histórico
         self.cookie_manager = CookieManager()
         self.cookie_manager.set_ui_callback(self._refresh_cookie_trees)
         self.spider = Spider()  # Inicializa o Spider
         self.websocket_history = WebSocketHistory()  # Inicializa histórico WebSocket
-        self.active_scanner = ActiveScanner()  # Inicializa o Scanner Ativo
+        self.active_scanner = ActiveScanner(cache_file=SCAN_CACHE_FILE)  # Inicializa o Scanner Ativo
+        self.bulk_scan_job = None  # Job de scan ativo em massa
+        self.scan_pipeline = PassiveScanPipeline(history=self.history)  # Scanner passivo em segundo plano
+        self.last_scan_findings = 0
         self.browser_manager = BrowserManager(
             proxy_port=self.config.get_port(),
             on_install_start=self.on_browser_install_start,
@@ -62,6 +82,9 @@ class ProxyGUI:
         self.root.title("InteceptProxy - Configurador")
         self.root.geometry("1000x700")
         self.root.protocol("WM_DELETE_WINDOW", self.on_closing)
+        # A gravação adiada falha depois que a alteração já foi aceita: avisa na thread da GUI
+        self.config.on_save_error = lambda error: self.root.after(0, lambda: messagebox.showerror(
+            "Erro", f"Erro ao salvar a configuração: {error}\nA próxima alteração tentará gravar de novo."))
 
         self.setup_ui()
         self.refresh_rules_list()
@@ -263,6 +286,36 @@ class ProxyGUI:
         )
         self.intercept_toggle_button.pack(side="left", padx=10)
 
+        # Contadores de requisições retidas x liberadas pelo escopo
+        self.intercept_counters_label = ttk.Label(control_frame, text="Retidas: 0 | Fora do escopo: 0", foreground="gray")
+        self.intercept_counters_label.pack(side="left", padx=20)
+
+        # Frame do escopo: só o que casa com todos os critérios preenchidos é retido
+        scope_frame = ttk.LabelFrame(intercept_tab, text="Escopo da Interceptação (separe itens por vírgula; vazio = qualquer)", padding=10)
+        scope_frame.pack(fill="x", padx=10, pady=5)
+
+        scope = self.config.get_intercept_scope().to_dict()
+        self.intercept_scope_entries = {}
+        scope_fields = [
+            ('hosts', "Hosts:", "Domínios retidos, incluindo subdomínios (ex: exemplo.com)"),
+            ('exclude_hosts', "Ignorar hosts:", "Domínios nunca retidos (ex: telemetria.exemplo.com)"),
+            ('paths', "Paths:", "Prefixos de caminho retidos (ex: /api, /login)"),
+            ('methods', "Métodos:", "Métodos HTTP retidos (ex: POST, PUT)"),
+            ('exclude_extensions', "Ignorar extensões:", "Extensões nunca retidas (ex: js, css, png)"),
+            ('content_types', "Content-Types:", "Content-Type da requisição (ex: application/json, multipart/*)"),
+        ]
+        for index, (field, label, tooltip) in enumerate(scope_fields):
+            row, column = divmod(index, 2)
+            ttk.Label(scope_frame, text=label).grid(row=row, column=column * 2, sticky="w", padx=5, pady=2)
+            entry = ttk.Entry(scope_frame, width=40)
+            entry.insert(0, ", ".join(scope[field]))
+            entry.grid(row=row, column=column * 2 + 1, sticky="ew", padx=5, pady=2)
+            Tooltip(entry, tooltip)
+            self.intercept_scope_entries[field] = entry
+        scope_frame.columnconfigure(1, weight=1)
+        scope_frame.columnconfigure(3, weight=1)
+        ttk.Button(scope_frame, text="Aplicar Escopo", command=self.save_intercept_scope).grid(row=3, column=0, sticky="w", padx=5, pady=5)
+
         # Frame da requisição interceptada
         request_frame = ttk.LabelFrame(intercept_tab, text="Requisição Interceptada", padding=10)
         request_frame.pack(fill="both", expand=True, padx=10, pady=5)
@@ -324,12 +377,12 @@ class ProxyGUI:
         Tooltip(self.drop_button, "Cancela a requisição")
 
         # Label de informação
-        info_label = ttk.Label(
+        self.intercept_pending_label = ttk.Label(
             action_frame,
             text="Aguardando requisição...",
             foreground="gray"
         )
-        info_label.pack(side="left", padx=20)
+        self.intercept_pending_label.pack(side="left", padx=20)
 
         # Frame de instruções
         instructions_frame = ttk.LabelFrame(intercept_tab, text="Instruções", padding=10)
@@ -375,6 +428,17 @@ class ProxyGUI:
         ttk.Button(filter_frame, text="Aplicar Filtros", command=self.apply_history_filter).grid(row=0, column=4, padx=5, pady=2)
         ttk.Button(filter_frame, text="Limpar Histórico", command=self.clear_history).grid(row=0, column=5, padx=5, pady=2)
 
+        # Orçamento de memória do histórico (as entradas mais antigas são descartadas ao atingi-lo)
+        ttk.Label(filter_frame, text="Memória máx. (MB):").grid(row=2, column=0, sticky="w", padx=5, pady=2)
+        self.history_memory_entry = ttk.Entry(filter_frame, width=8)
+        self.history_memory_entry.insert(0, str(self.config.get_history_memory_mb()))
+        self.history_memory_entry.grid(row=2, column=1, sticky="w", padx=5, pady=2)
+        Tooltip(self.history_memory_entry, "Limite de memória do histórico (0 = sem limite)")
+        ttk.Button(filter_frame, text="Aplicar Limite", command=self.save_history_memory_budget).grid(row=2, column=2, sticky="w", padx=5, pady=2)
+        self.history_memory_label = ttk.Label(filter_frame, text="", foreground="gray")
+        self.history_memory_label.grid(row=2, column=3, columnspan=3, sticky="w", padx=5, pady=2)
+        self.last_history_evicted = 0
+
 
         # PanedWindow para dividir lista e detalhes
         paned = ttk.PanedWindow(history_tab, orient=tk.VERTICAL)
@@ -531,7 +595,7 @@ class ProxyGUI:
                     port = self.config.get_port()
                     proxy_options = options.Options(listen_host='127.0.0.1', listen_port=port)
                     master = DumpMaster(proxy_options, with_termlog=False, with_dumper=False)
-                    master.addons.add(InterceptAddon(self.config, self.history, self.cookie_manager, self.spider, self.websocket_history))
+                    master.addons.add(InterceptAddon(self.config, self.history, self.cookie_manager, self.spider, self.websocket_history, self.scan_pipeline))
                     self.proxy_master = master
                     self.proxy_loop = loop
                     await master.run()
@@ -644,15 +708,113 @@ class ProxyGUI:
             self.port_entry.delete(0, tk.END)
             self.port_entry.insert(0, str(self.config.get_port()))
 
+    def save_history_memory_budget(self):
+        """Salva e aplica o orçamento de memória do histórico."""
+        success, message = self.config.set_history_memory_mb(self.history_memory_entry.get().strip())
+
+        if success:
+            memory_mb = self.config.get_history_memory_mb()
+            self.history.set_memory_budget(memory_mb * 1024 * 1024 if memory_mb else None)
+            messagebox.showinfo("Sucesso", message)
+            log.info(message)
+        else:
+            messagebox.showerror("Erro", message)
+            self.history_memory_entry.delete(0, tk.END)
+            self.history_memory_entry.insert(0, str(self.config.get_history_memory_mb()))
+
+    def _prune_evicted_history_rows(self, history_stats):
+        """Remove da tabela as entradas que o histórico já descartou, liberando a memória delas."""
+        if history_stats['evicted'] == self.last_history_evicted:
+            return
+        self.last_history_evicted = history_stats['evicted']
+
+        # O history_map é preenchido em ordem de ID: basta remover do início até a entrada mais antiga viva
+        oldest_id = self.history.get_oldest_id()
+        evicted_items = []
+        for item_id, entry in self.history_map.items():
+            if oldest_id is not None and entry['id'] >= oldest_id:
+                break
+            evicted_items.append(item_id)
+        for item_id in evicted_items:
+            del self.history_map[item_id]
+            if self.history_tree.exists(item_id):
+                self.history_tree.delete(item_id)
+
+    def _update_history_memory_label(self, stats):
+        """Exibe a ocupação do histórico e as estatísticas de compressão."""
+        text = f"Em uso: {stats['memory_used'] / 1024 / 1024:.1f} MB"
+        if stats['max_memory_bytes']:
+            text += f" de {stats['max_memory_bytes'] / 1024 / 1024:.0f} MB"
+        text += f" | {stats['entries']} entradas, {stats['evicted']} descartadas"
+        compression = stats['compression']
+        if compression and compression['bodies_compressed']:
+            text += (f" | {compression['codec']} {compression['ratio']:.1f}x "
+                     f"({compression['compress_time_ms']:.0f} ms de CPU)")
+        self.history_memory_label.config(text=text)
+
     def update_history_list(self):
         """Atualiza a lista de histórico adicionando apenas novas entradas."""
         new_entries = self.history.get_new_entries(self.last_history_id)
         if new_entries:
             self._add_new_history_entries(new_entries)
-            # Atualiza também a lista de vulnerabilidades
+
+        # Regras recarregadas do arquivo pelo observador da configuração
+        if self.config.rules_version != self.last_rules_version:
+            self.last_rules_version = self.config.rules_version
+            self.refresh_rules_list()
+
+        history_stats = self.history.get_stats()
+        self._prune_evicted_history_rows(history_stats)
+        self._update_history_memory_label(history_stats)
+
+        # O scanner passivo anexa achados de forma assíncrona
+        scan_stats = self.scan_pipeline.get_stats()
+        if new_entries or scan_stats['findings'] != self.last_scan_findings:
+            self.last_scan_findings = scan_stats['findings']
             self._update_scanner_list()
+        self._update_scan_pipeline_label(scan_stats)
+        self._update_rate_limiter_label()
+        self._update_transport_label()
         self.root.after(1000, self.update_history_list)
 
+    def _update_scan_pipeline_label(self, stats):
+        """Exibe as métricas do pipeline do scanner passivo."""
+        policy = stats['policy']
+        self.scan_pipeline_label.config(
+            text=f"Scanner passivo: fila {stats['queue_depth']}/{stats['queue_capacity']} | "
+                 f"escaneadas {stats['scanned']} | ignoradas {stats['skipped']} | "
+                 f"descartadas {stats['dropped'] + stats['sampled_out']} | "
+                 f"latência média {stats['scan_latency_avg_ms']:.1f} ms (p95 {stats['scan_latency_p95_ms']:.1f} ms) | "
+                 f"bytes escaneados {policy['bytes_scanned'] / 1024:.0f} KB / ignorados {policy['bytes_skipped'] / 1024:.0f} KB"
+        )
+
+    def _update_rate_limiter_label(self):
+        """Exibe a taxa e os contadores por host do limitador compartilhado pelos motores de envio."""
+        stats = shared_limiter().get_stats()
+        if not stats:
+            return
+        parts = []
+        # Hosts mais ativos primeiro; os demais ficam de fora para a linha caber na tela
+        for host, host_stats in sorted(stats.items(), key=lambda item: -item[1]['sent'])[:3]:
+            limit = 'sem limite' if host_stats['rate_limit'] is None else f"limite {host_stats['rate_limit']:.1f}"
+            text = (f"{host}: {host_stats['current_rate']:.0f} req/s ({limit}) | conc. {host_stats['concurrency']} | "
+                    f"429/503 {host_stats['throttled']} | erros {host_stats['errors']}")
+            if host_stats['blocked_for']:
+                text += f" | Retry-After {host_stats['blocked_for']:.0f}s"
+            parts.append(text)
+        self.rate_limiter_label.config(text="Limitador: " + "  •  ".join(parts))
+
+    def _update_transport_label(self):
+        """Exibe o reuso de conexões do transporte HTTP compartilhado pelos motores de envio."""
+        stats = shared_transport().get_stats()
+        if not stats['requests']:
+            return
+        self.transport_label.config(
+            text=f"Conexões: {stats['requests']} requisições em {stats['connections']} conexões "
+                 f"(reuso {stats['reuse_rate']:.0%}) | handshakes TLS {stats['tls_handshakes']} | "
+                 f"DNS em cache {stats['dns']['hits']}/{stats['dns']['hits'] + stats['dns']['misses']}"
+        )
+
     def _add_new_history_entries(self, entries):
         """Adiciona novas entradas de histórico à tabela e atualiza o ID mais recente."""
         for entry in entries:
@@ -808,6 +970,19 @@ class ProxyGUI:
         self.sender_threads_spinbox.grid(row=2, column=1, sticky="w", padx=5, pady=5)
         Tooltip(self.sender_threads_spinbox, "Número de requisições simultâneas para envios em massa.")
 
+        sender_engine_frame = ttk.Frame(config_frame)
+        sender_engine_frame.grid(row=2, column=2, columnspan=2, sticky="w", padx=5, pady=5)
+        ttk.Label(sender_engine_frame, text="Motor:").pack(side="left", padx=2)
+        self.sender_engine = ttk.Combobox(sender_engine_frame, values=["threads", "async"], width=8, state="readonly")
+        self.sender_engine.set("threads")
+        self.sender_engine.pack(side="left", padx=2)
+        ttk.Label(sender_engine_frame, text="Em voo:").pack(side="left", padx=5)
+        self.sender_in_flight = ttk.Spinbox(sender_engine_frame, from_=1, to=5000, width=6)
+        self.sender_in_flight.set("500")
+        self.sender_in_flight.pack(side="left", padx=2)
+        Tooltip(sender_engine_frame, "async: um único event loop com até 'Em voo' requisições simultâneas, "
+                                     "em vez de uma thread por requisição")
+
         # Botão de Iniciar
         start_sender_button = ttk.Button(config_frame, text="Iniciar Envio em Massa", command=self.start_sender)
         start_sender_button.grid(row=3, column=0, columnspan=4, pady=15)
@@ -931,6 +1106,7 @@ class ProxyGUI:
         thread = threading.Thread(
             target=run_sender_from_file,
             args=(raw_request, file_path, param_name, threads, self.update_sender_results, self.config.get_port()),
+            kwargs={'engine': self.sender_engine.get(), 'in_flight': int(self.sender_in_flight.get())},
             daemon=True
         )
         thread.start()
@@ -1300,6 +1476,27 @@ class ProxyGUI:
         self.intruder_threads.set("10")
         self.intruder_threads.grid(row=6, column=1, sticky="w", padx=5, pady=5)
 
+        engine_frame = ttk.Frame(config_frame)
+        engine_frame.grid(row=6, column=2, columnspan=2, sticky="w", padx=5, pady=5)
+        ttk.Label(engine_frame, text="Motor:").pack(side="left", padx=2)
+        self.intruder_engine = ttk.Combobox(engine_frame, values=["threads", "async", "turbo", "h2"], width=8,
+                                            state="readonly")
+        self.intruder_engine.set("threads")
+        self.intruder_engine.pack(side="left", padx=2)
+        ttk.Label(engine_frame, text="Em voo:").pack(side="left", padx=5)
+        self.intruder_in_flight = ttk.Spinbox(engine_frame, from_=1, to=5000, width=6)
+        self.intruder_in_flight.set("500")
+        self.intruder_in_flight.pack(side="left", padx=2)
+        ttk.Label(engine_frame, text="Rajada:").pack(side="left", padx=5)
+        self.intruder_race_size = ttk.Spinbox(engine_frame, from_=0, to=100, width=4)
+        self.intruder_race_size.set("0")
+        self.intruder_race_size.pack(side="left", padx=2)
+        Tooltip(engine_frame, "threads: uma thread por requisição simultânea (campo Threads)\n"
+                              "async: um único event loop com até 'Em voo' requisições simultâneas\n"
+                              "turbo: pipelining HTTP/1.1 em conexões persistentes direto no alvo (sem proxy)\n"
+                              "h2: streams HTTP/2 multiplexados em poucas conexões direto no alvo (sem proxy)\n"
+                              "turbo/h2 com 'Rajada' > 0: grupos desse tamanho chegam ao servidor no mesmo instante")
+
         # Row 7: Action Buttons
         button_frame = ttk.Frame(config_frame)
         button_frame.grid(row=7, column=0, columnspan=3, pady=10)
@@ -1332,24 +1529,28 @@ class ProxyGUI:
         self.intruder_progress.pack(fill="x", pady=5)
 
         # Results table
-        columns = ('Payload(s)', 'Status', 'Length', 'Extracted', 'URL')
+        columns = ('Payload(s)', 'Status', 'Length', 'Similarity', 'Extracted', 'URL')
         self.intruder_results_tree = ttk.Treeview(results_frame, columns=columns, show='headings', height=10)
         
         self.intruder_results_tree.heading('Payload(s)', text='Payload(s)')
         self.intruder_results_tree.heading('Status', text='Status')
         self.intruder_results_tree.heading('Length', text='Length')
+        self.intruder_results_tree.heading('Similarity', text='Similaridade')
         self.intruder_results_tree.heading('Extracted', text='Extracted')
         self.intruder_results_tree.heading('URL', text='URL')
         
         self.intruder_results_tree.column('Payload(s)', width=200)
         self.intruder_results_tree.column('Status', width=80, anchor="center")
         self.intruder_results_tree.column('Length', width=80, anchor="center")
+        self.intruder_results_tree.column('Similarity', width=90, anchor="center")
         self.intruder_results_tree.column('Extracted', width=150)
         self.intruder_results_tree.column('URL', width=300)
         
         # Color tags
         self.intruder_results_tree.tag_configure('success', foreground='green')
         self.intruder_results_tree.tag_configure('failure', foreground='red')
+        # Resposta diferente da requisição original (status, headers ou conteúdo)
+        self.intruder_results_tree.tag_configure('anomaly', background='#fff3cd')
         
         self.intruder_results_tree.pack(side="left", fill="both", expand=True)
         
@@ -1400,7 +1601,7 @@ class ProxyGUI:
 
     def start_intruder(self):
         """Inicia o ataque do Intruder"""
-        from src.core.advanced_sender import AdvancedSender, load_payloads_from_file
+        from src.core.advanced_sender import AdvancedSender, RACE_ENGINES, load_payloads_from_file
         
         # Get request
         raw_request = self.intruder_request_text.get("1.0", tk.END).strip()
@@ -1465,8 +1666,11 @@ class ProxyGUI:
         # Get attack type
         attack_type = self.intruder_attack_type.get()
         
-        # Get threads
+        # Get threads / send engine
         threads = int(self.intruder_threads.get())
+        engine = self.intruder_engine.get()
+        in_flight = int(self.intruder_in_flight.get())
+        race_size = int(self.intruder_race_size.get()) if engine in RACE_ENGINES else 0
         
         # Clear results
         self.clear_intruder_results()
@@ -1479,7 +1683,10 @@ class ProxyGUI:
             processors=processors_list,
             grep_patterns=grep_patterns,
             num_threads=threads,
-            proxy_port=self.config.get_port()
+            proxy_port=self.config.get_port(),
+            engine=engine,
+            in_flight=in_flight,
+            race_size=race_size
         )
         
         # Start attack in thread
@@ -1507,20 +1714,29 @@ class ProxyGUI:
                 payloads = ', '.join(str(p) for p in data.get('payloads', []))
                 status = data.get('status', 'Error')
                 length = data.get('length', 0)
+                similarity = data.get('similarity')
+                similarity = f"{similarity:.0%}" if similarity is not None else "-"
                 extracted = ', '.join(data.get('extracted', []))
                 url = data.get('url', 'N/A')
                 
-                tag = 'success' if data.get('success', False) else 'failure'
+                tags = ['success' if data.get('success', False) else 'failure']
+                if data.get('anomaly'):
+                    tags.append('anomaly')
                 
                 self.intruder_results_tree.insert(
                     '', 'end',
-                    values=(payloads, status, length, extracted, url),
-                    tags=(tag,)
+                    values=(payloads, status, length, similarity, extracted, url),
+                    tags=tuple(tags)
                 )
             
+            elif msg_type == 'stats':
+                self.intruder_last_stats = message.get('data')
+            
             elif msg_type == 'progress_done':
                 self.intruder_progress['value'] = 100
-                messagebox.showinfo("Concluído", "Ataque finalizado!")
+                summary = self.intruder_last_stats
+                messagebox.showinfo("Concluído", "Ataque finalizado!" +
+                                    (f"\n\n{format_summary(summary)}" if summary else ""))
         
         self.root.after(0, _update)
 
@@ -1529,6 +1745,7 @@ class ProxyGUI:
         for item in self.intruder_results_tree.get_children():
             self.intruder_results_tree.delete(item)
         self.intruder_progress['value'] = 0
+        self.intruder_last_stats = None
 
     def setup_decoder_tab(self):
         """Configura a aba da ferramenta Decoder."""
@@ -1634,6 +1851,10 @@ class ProxyGUI:
         ttk.Button(buttons_frame, text="Comparar", command=self.compare_requests).pack(side="left", padx=5)
         ttk.Button(buttons_frame, text="Limpar", command=self.clear_comparator).pack(side="left", padx=5)
 
+        # Resumo da similaridade das respostas (impressões digitais)
+        self.comparator_summary_label = ttk.Label(buttons_frame, text="", foreground="gray")
+        self.comparator_summary_label.pack(side="left", padx=10)
+
         # Notebook para Request/Response comparisons
         self.comparator_notebook = ttk.Notebook(comparator_tab)
         self.comparator_notebook.pack(fill="both", expand=True, padx=10, pady=5)
@@ -1731,6 +1952,17 @@ class ProxyGUI:
         self._highlight_differences(self.comparator_request1_text, self.comparator_request2_text, req1_text, req2_text)
         self._highlight_differences(self.comparator_response1_text, self.comparator_response2_text, resp1_text, resp2_text)
 
+        fingerprint_1 = fingerprint_entry(self.comparator_request_1)
+        fingerprint_2 = fingerprint_entry(self.comparator_request_2)
+        if fingerprint_1.content_hash == fingerprint_2.content_hash:
+            content = "conteúdo idêntico (ignorando partes dinâmicas)"
+        else:
+            content = f"{fingerprint_1.similarity(fingerprint_2):.0%} similares"
+        shape = "mesmos status/headers" if fingerprint_1.same_shape(fingerprint_2) else "status/headers diferentes"
+        self.comparator_summary_label.config(
+            text=f"Respostas: {content} | {shape} | palavras {fingerprint_1.words} vs {fingerprint_2.words}",
+            foreground="black")
+
         log.info("Comparação realizada")
 
     def _format_request(self, entry):
@@ -1789,6 +2021,7 @@ class ProxyGUI:
         
         self.comparator_req1_label.config(text="Nenhuma requisição selecionada", foreground="gray")
         self.comparator_req2_label.config(text="Nenhuma requisição selecionada", foreground="gray")
+        self.comparator_summary_label.config(text="")
         
         self.comparator_request1_text.delete('1.0', tk.END)
         self.comparator_request2_text.delete('1.0', tk.END)
@@ -1812,18 +2045,47 @@ class ProxyGUI:
         else:
             self.intercept_status_label.config(text="Intercept: OFF", foreground="red")
             self.intercept_toggle_button.config(text="Intercept is OFF")
-            # Limpa a fila e reseta a UI
+            # Libera os flows retidos, limpa a fila e reseta a UI
+            self.config.release_intercepts()
             self.config.clear_intercept_queues()
             self._reset_intercept_ui()
             log.info("Interceptação manual desativada.")
 
+    def save_intercept_scope(self):
+        """Valida, compila e salva o escopo da interceptação manual."""
+        fields = {field: entry.get() for field, entry in self.intercept_scope_entries.items()}
+        valid, result = parse_scope_text(fields)
+        if not valid:
+            messagebox.showerror("Erro", result)
+            return
+
+        success, message = self.config.set_intercept_scope(result)
+        if success:
+            messagebox.showinfo("Sucesso", message)
+            log.info(message)
+        else:
+            messagebox.showerror("Erro", message)
+
     def check_intercept_queue(self):
         """Verifica a fila de interceptação periodicamente."""
         if self.config.is_intercept_enabled():
-            request_data = self.config.get_from_intercept_queue(timeout=0.01)
-            if request_data:
-                self._display_intercepted_request(request_data)
-        
+            # Exibe um flow retido por vez; os demais aguardam na fila sem bloquear o proxy
+            while self.current_intercept_request is None:
+                request_data = self.config.get_from_intercept_queue(timeout=0.01)
+                if request_data is None:
+                    break
+                # Ignora flows que expiraram enquanto estavam na fila
+                if self.config.intercept_registry.is_pending(request_data['flow_id']):
+                    self._display_intercepted_request(request_data)
+
+            stats = self.config.intercept_registry.get_stats()
+            self.intercept_pending_label.config(
+                text=f"{stats['pending']} requisição(ões) retida(s)" if stats['pending'] else "Aguardando requisição..."
+            )
+            self.intercept_counters_label.config(
+                text=f"Retidas: {stats['held']} | Fora do escopo: {stats['passed']}"
+            )
+
         # Agenda próxima verificação
         self.root.after(100, self.check_intercept_queue)
 
@@ -1870,13 +2132,13 @@ class ProxyGUI:
                 key, value = line.split(':', 1)
                 modified_headers[key.strip()] = value.strip()
 
-        # Envia resposta para a fila
+        # Aplica a decisão ao flow exibido
         response_data = {
             'action': 'forward',
             'modified_headers': modified_headers,
             'modified_body': body_text
         }
-        self.config.add_intercept_response(response_data)
+        self.config.resolve_intercept(self.current_intercept_request['flow_id'], response_data)
 
         # Guarda a URL para o log e reseta a UI
         url = self.current_intercept_request.get('url') if isinstance(self.current_intercept_request, dict) else None
@@ -1888,9 +2150,9 @@ class ProxyGUI:
         if not self.current_intercept_request:
             return
 
-        # Envia resposta para a fila
+        # Aplica a decisão ao flow exibido
         response_data = {'action': 'drop'}
-        self.config.add_intercept_response(response_data)
+        self.config.resolve_intercept(self.current_intercept_request['flow_id'], response_data)
 
         # Guarda a URL para o log e reseta a UI
         url = self.current_intercept_request.get('url') if isinstance(self.current_intercept_request, dict) else None
@@ -1928,6 +2190,16 @@ class ProxyGUI:
         
         ttk.Label(info_frame, text=info_text, justify="left").pack(anchor="w")
 
+        # Métricas do pipeline do scanner passivo
+        self.scan_pipeline_label = ttk.Label(info_frame, text="Scanner passivo: aguardando tráfego", foreground="gray")
+        self.scan_pipeline_label.pack(anchor="w", pady=(5, 0))
+
+        # Taxa por host do limitador adaptativo (Scanner Ativo, Intruder e Sender)
+        self.rate_limiter_label = ttk.Label(info_frame, text="Limitador: nenhum envio ainda", foreground="gray")
+        self.rate_limiter_label.pack(anchor="w")
+        self.transport_label = ttk.Label(info_frame, text="", foreground="gray")
+        self.transport_label.pack(anchor="w")
+
         # Frame de Scanner Ativo
         active_frame = ttk.LabelFrame(scanner_frame, text="Scanner Ativo", padding=10)
         active_frame.pack(fill="x", padx=10, pady=5)
@@ -1939,10 +2211,42 @@ class ProxyGUI:
         
         self.active_scan_button = ttk.Button(active_frame, text="🔍 Scan Ativo", command=self.run_active_scan)
         self.active_scan_button.pack(side="left", padx=5)
+
+        self.force_rescan_var = tk.BooleanVar(value=False)
+        force_check = ttk.Checkbutton(active_frame, text="Forçar novo scan", variable=self.force_rescan_var)
+        force_check.pack(side="left", padx=5)
+        Tooltip(force_check, "Ignora o cache e testa de novo parâmetros já testados neste endpoint")
         
         self.active_scan_status = ttk.Label(active_frame, text="", foreground="green")
         self.active_scan_status.pack(side="left", padx=5)
 
+        # Frame de Scan Ativo em massa (histórico filtrado ou descobertas do Spider)
+        bulk_frame = ttk.LabelFrame(scanner_frame, text="Scan Ativo em Massa", padding=10)
+        bulk_frame.pack(fill="x", padx=10, pady=5)
+
+        self.bulk_history_button = ttk.Button(bulk_frame, text="Histórico Filtrado",
+                                              command=lambda: self.start_bulk_scan('history'))
+        self.bulk_history_button.pack(side="left", padx=5)
+        Tooltip(self.bulk_history_button, "Varre as requisições visíveis na aba Histórico (endpoints repetidos uma vez)")
+
+        self.bulk_spider_button = ttk.Button(bulk_frame, text="Descobertas do Spider",
+                                             command=lambda: self.start_bulk_scan('spider'))
+        self.bulk_spider_button.pack(side="left", padx=5)
+        Tooltip(self.bulk_spider_button, "Varre os formulários e URLs com parâmetros encontrados pelo Spider")
+
+        self.bulk_resume_button = ttk.Button(bulk_frame, text="Retomar Checkpoint",
+                                             command=lambda: self.start_bulk_scan('checkpoint'))
+        self.bulk_resume_button.pack(side="left", padx=5)
+
+        self.bulk_pause_button = ttk.Button(bulk_frame, text="Pausar", command=self.toggle_bulk_scan_pause, state="disabled")
+        self.bulk_pause_button.pack(side="left", padx=5)
+
+        self.bulk_cancel_button = ttk.Button(bulk_frame, text="Cancelar", command=self.cancel_bulk_scan, state="disabled")
+        self.bulk_cancel_button.pack(side="left", padx=5)
+
+        self.bulk_scan_label = ttk.Label(bulk_frame, text="", foreground="gray")
+        self.bulk_scan_label.pack(side="left", padx=10)
+
         # Filtros
         filter_frame = ttk.LabelFrame(scanner_frame, text="Filtros", padding=10)
         filter_frame.pack(fill="x", padx=10, pady=5)
@@ -2149,7 +2453,7 @@ class ProxyGUI:
             
             # Executa o scan ativo
             log.info(f"Iniciando scan ativo em {entry['method']} {entry['url']}")
-            vulnerabilities = self.active_scanner.scan_request(request_data)
+            vulnerabilities = self.active_scanner.scan_request(request_data, force=self.force_rescan_var.get())
             
             if vulnerabilities:
                 # Adiciona as vulnerabilidades à entrada do histórico
@@ -2179,6 +2483,80 @@ class ProxyGUI:
             messagebox.showerror("Erro no Scan Ativo", f"Erro ao executar scan ativo:\n{str(e)}")
             log.error(f"Erro no scan ativo: {e}")
 
+    def start_bulk_scan(self, source):
+        """Inicia um job de scan ativo em massa a partir do histórico filtrado, do Spider ou do checkpoint."""
+        if self.bulk_scan_job is not None and self.bulk_scan_job.state in ('running', 'paused'):
+            messagebox.showinfo("Scan em Massa", "Já existe um scan em massa em andamento.")
+            return
+
+        try:
+            if source == 'checkpoint':
+                if not os.path.exists(BULK_SCAN_CHECKPOINT):
+                    messagebox.showinfo("Scan em Massa", "Nenhum checkpoint salvo.")
+                    return
+                job = BulkScanJob.from_checkpoint(BULK_SCAN_CHECKPOINT, self.active_scanner, history=self.history)
+                job.force = job.force or self.force_rescan_var.get()
+            else:
+                if source == 'history':
+                    targets = targets_from_history(self.history, ids=[entry['id'] for entry in self.history_map.values()])
+                else:
+                    targets = targets_from_spider(self.spider)
+                if not targets:
+                    messagebox.showinfo("Scan em Massa", "Nenhuma requisição para varrer.")
+                    return
+                job = BulkScanJob(self.active_scanner, targets, checkpoint_file=BULK_SCAN_CHECKPOINT, history=self.history,
+                                  force=self.force_rescan_var.get())
+        except (OSError, ValueError) as e:
+            messagebox.showerror("Scan em Massa", f"Não foi possível iniciar o job:\n{e}")
+            return
+
+        if not messagebox.askyesno("Scan em Massa",
+                                   f"Varrer {job.get_progress()['remaining']} endpoint(s)?\n"
+                                   f"({job.duplicates} repetido(s) descartado(s))"):
+            return
+
+        self.bulk_scan_job = job
+        job.start()
+        self.bulk_pause_button.config(state="normal", text="Pausar")
+        self.bulk_cancel_button.config(state="normal")
+        self._poll_bulk_scan()
+
+    def toggle_bulk_scan_pause(self):
+        """Pausa ou retoma o job de scan em massa."""
+        job = self.bulk_scan_job
+        if job is None:
+            return
+        if job.state == 'paused':
+            job.resume()
+            self.bulk_pause_button.config(text="Pausar")
+        else:
+            job.pause()
+            self.bulk_pause_button.config(text="Retomar")
+
+    def cancel_bulk_scan(self):
+        """Cancela o job de scan em massa (o checkpoint permite retomar depois)."""
+        if self.bulk_scan_job is not None:
+            self.bulk_scan_job.cancel()
+
+    def _poll_bulk_scan(self):
+        """Atualiza o progresso do job de scan em massa."""
+        job = self.bulk_scan_job
+        if job is None:
+            return
+        progress = job.get_progress()
+        eta = f" - ETA {progress['eta']:.0f}s" if progress['eta'] is not None else ""
+        failed = f" - {progress['failed']} com falha" if progress['failed'] else ""
+        self.bulk_scan_label.config(
+            text=f"{progress['state']}: {progress['completed']}/{progress['total']} "
+                 f"({progress['percent']:.0f}%) - {progress['findings']} vulnerabilidade(s){failed}{eta}"
+        )
+        if job.wait(timeout=0):
+            self.bulk_pause_button.config(state="disabled", text="Pausar")
+            self.bulk_cancel_button.config(state="disabled")
+            self._update_scanner_list()
+            return
+        self.root.after(1000, self._poll_bulk_scan)
+
     def setup_spider_tab(self):
         """Configura a aba do Spider/Crawler"""
         spider_tab = ttk.Frame(self.notebook)
@@ -2742,6 +3120,13 @@ class ProxyGUI:
         log.info("Fechando aplicação...")
         if self.proxy_running:
             self.stop_proxy()
+        self.scan_pipeline.stop()
+        if self.bulk_scan_job is not None:
+            # O checkpoint fica salvo para "Retomar Checkpoint" na próxima execução
+            self.bulk_scan_job.cancel()
+            self.bulk_scan_job.save_checkpoint()
+        self.config.stop_watching()
+        self.config.flush()
         self.browser_manager.close()
         self.root.destroy()
 
@@ -17,7 +17,7 @@ def test_active_scanner_initialization():
     
     scanner = ActiveScanner()
     assert scanner is not None, "Scanner deveria ser inicializado"
-    assert scanner.session is not None, "Session deveria ser inicializada"
+    assert scanner.transport is not None, "Transporte HTTP deveria ser inicializado"
     print("✓ Scanner Ativo inicializado com sucesso")
     
     return True
@@ -13,8 +13,15 @@ from core.advanced_sender import (
     PayloadPositionParser, 
     AttackTypeGenerator,
     GrepExtractor,
-    AdvancedSender
+    AdvancedSender,
+    PayloadCombinations,
+    shard_range
 )
+import core.advanced_sender as advanced_sender
+import json
+import tempfile
+from types import SimpleNamespace
+import threading
 
 
 def test_payload_processor():
@@ -279,6 +286,211 @@ def test_payload_processing_integration():
     print("Payload processing integration test passed! ✓")
 
 
+def test_streaming_combinations():
+    """Test that combinations are generated lazily with an exact count"""
+    print("\n=== Testing Streaming Combinations ===")
+
+    words = [f"w{i}" for i in range(100000)]
+    combinations = AttackTypeGenerator.cluster_bomb([words, words], 2)
+    assert len(combinations) == 10 ** 10, f"Wrong cluster bomb count: {len(combinations)}"
+    assert combinations[0] == ["w0", "w0"], f"First combination incorrect: {combinations[0]}"
+    assert combinations[3] == ["w0", "w3"], f"Fourth combination incorrect: {combinations[3]}"
+    assert combinations[:2] == [["w0", "w0"], ["w0", "w1"]]
+
+    pitchfork = AttackTypeGenerator.pitchfork([["a", "b", "c"], ["x", "y"]], 3)
+    assert len(pitchfork) == 2 and list(pitchfork) == [["a", "x", "a"], ["b", "y", "b"]]
+
+    sender = AdvancedSender(
+        raw_request="GET /login?user=§admin§&pass=§secret§ HTTP/1.1\nHost: example.com\n\n",
+        attack_type='sniper',
+        payload_sets=[['x', 'y']],
+        num_threads=1
+    )
+    requests = sender.generate_requests()
+    assert len(requests) == 4
+    assert [payloads for _, payloads in requests] == [['x', 'secret'], ['y', 'secret'], ['admin', 'x'], ['admin', 'y']]
+    assert requests[-1][0].startswith("GET /login?user=admin&pass=y ")
+
+    print("✓ Combinations are streamed with an exact count")
+    print("Streaming combinations test passed! ✓")
+
+
+def test_run_attack_bounds_pending_requests():
+    """Test that run_attack only queues a few requests per worker"""
+    print("\n=== Testing Bounded Attack Queue ===")
+
+    words = [str(i) for i in range(1000)]
+    sender = AdvancedSender(
+        raw_request="GET /?a=§1§&b=§2§ HTTP/1.1\nHost: example.com\n\n",
+        attack_type='cluster_bomb',
+        payload_sets=[words, words[:3]],
+        num_threads=2
+    )
+    lock = threading.Lock()
+    sent = []
+    rendered = []
+    queued = []
+
+    def send_prepared(prepared):
+        with lock:
+            sent.append(prepared.url)
+            # Generated combinations not yet sent: at most 4 per worker
+            queued.append(len(rendered) - (len(sent) - 1))
+        return SimpleNamespace(text="ok", content=b"ok", status_code=200, headers={},
+                               request=SimpleNamespace(url=prepared.url))
+    sender.send_prepared = send_prepared
+
+    class TrackedRequests:
+        def __init__(self, requests):
+            self.requests = requests
+            self.combinations = self
+
+        def __len__(self):
+            return len(self.requests)
+
+        def iter_range(self, start, stop):
+            for combo in self.requests.combinations.iter_range(start, stop):
+                with lock:
+                    rendered.append(combo)
+                yield combo
+
+    original_generate = sender.generate_requests
+    sender.generate_requests = lambda: TrackedRequests(original_generate())
+
+    results = []
+    sender.run_attack(results.append)
+    assert results[0] == {'type': 'progress_start', 'total': 3000}
+    assert sum(1 for m in results if m['type'] == 'result') == 3000
+    assert len(sent) == 3001  # baseline + attack
+    assert max(queued) <= 2 * 4, f"Too many requests queued: {max(queued)}"
+
+    print("✓ Attack queue stays bounded")
+    print("Bounded attack queue test passed! ✓")
+
+
+def test_random_access_combinations():
+    """Test that every combination can be computed directly from its index"""
+    print("\n=== Testing Random-Access Combinations ===")
+
+    sets = [["a", "b", "c"], ["x", "y"], ["1", "2", "3", "4"]]
+    for attack_type in ('sniper', 'battering_ram', 'pitchfork', 'cluster_bomb'):
+        combinations = PayloadCombinations(attack_type, sets, 3, defaults=["o1", "o2", "o3"])
+        expected = list(combinations)
+        assert len(expected) == len(combinations), f"{attack_type}: count mismatch"
+        assert [combinations[i] for i in range(len(combinations))] == expected, f"{attack_type}: index mismatch"
+        assert list(combinations.iter_range(2, 5)) == expected[2:5], f"{attack_type}: range mismatch"
+
+    words = [f"w{i}" for i in range(100000)]
+    huge = AttackTypeGenerator.cluster_bomb([words, words, words], 3)
+    assert huge[123456789012] == ["w12", "w34567", "w89012"]
+    assert huge[-1] == ["w99999", "w99999", "w99999"]
+
+    print("✓ Combination k matches iteration for all attack types")
+    print("Random-access combinations test passed! ✓")
+
+
+def test_shard_ranges():
+    """Test that shards split the attack into disjoint, complete index ranges"""
+    print("\n=== Testing Shard Ranges ===")
+
+    for total in (0, 1, 10, 1001):
+        for shards in (1, 3, 7):
+            ranges = [shard_range(total, shard, shards) for shard in range(shards)]
+            indexes = [i for r in ranges for i in r]
+            assert indexes == list(range(total)), f"Shards of {total} into {shards} are not a partition"
+            assert max(len(r) for r in ranges) - min(len(r) for r in ranges) <= 1
+    try:
+        shard_range(10, 3, 3)
+        assert False, "Invalid shard accepted"
+    except ValueError:
+        pass
+
+    print("✓ Shards are disjoint and cover the whole attack")
+    print("Shard ranges test passed! ✓")
+
+
+def _fake_sender(payload_sets, fail_after=None):
+    sender = AdvancedSender(
+        raw_request="GET /?a=§1§&b=§2§ HTTP/1.1\nHost: example.com\n\n",
+        attack_type='cluster_bomb',
+        payload_sets=payload_sets,
+        num_threads=4
+    )
+    sender.sent = []
+    lock = threading.Lock()
+
+    def send_prepared(prepared):
+        with lock:
+            if fail_after is not None and len(sender.sent) > fail_after:
+                raise RuntimeError("simulated crash")
+            sender.sent.append(prepared.url.split('example.com', 1)[1])
+        return SimpleNamespace(text="ok", content=b"ok", status_code=200, headers={},
+                               request=SimpleNamespace(url=prepared.url))
+    sender.send_prepared = send_prepared
+    return sender
+
+
+def test_attack_checkpoint_resume():
+    """Test that an interrupted attack resumes from its checkpoint"""
+    print("\n=== Testing Attack Checkpoint Resume ===")
+
+    payload_sets = [[str(i) for i in range(20)], [str(i) for i in range(10)]]
+    all_requests = {f"/?a={a}&b={b}" for a in payload_sets[0] for b in payload_sets[1]}
+    original_interval = advanced_sender.CHECKPOINT_INTERVAL
+    advanced_sender.CHECKPOINT_INTERVAL = 0
+    try:
+        with tempfile.TemporaryDirectory() as tmpdir:
+            checkpoint = os.path.join(tmpdir, "attack.json")
+            crashed = _fake_sender(payload_sets, fail_after=80)
+            try:
+                crashed.run_attack(checkpoint_file=checkpoint)
+                assert False, "The simulated crash did not interrupt the attack"
+            except RuntimeError:
+                pass
+            with open(checkpoint, encoding='utf-8') as f:
+                completed_until = json.load(f)['completed_until']
+            assert 0 < completed_until <= 80, f"Unexpected checkpoint: {completed_until}"
+
+            resumed = _fake_sender(payload_sets)
+            resumed.run_attack(checkpoint_file=checkpoint)
+            resent = set(resumed.sent[1:]) & set(crashed.sent[1:])
+            assert len(resent) <= 80 - completed_until + 4 * 4, f"Too many requests sent again: {len(resent)}"
+            assert set(crashed.sent[1:]) | set(resumed.sent[1:]) == all_requests
+            assert len(resumed.sent) - 1 == 200 - completed_until
+            with open(checkpoint, encoding='utf-8') as f:
+                assert json.load(f)['completed_until'] == 200
+
+            # A checkpoint only resumes the same attack
+            other = _fake_sender([payload_sets[0], ["z"]])
+            try:
+                other.run_attack(checkpoint_file=checkpoint)
+                assert False, "Checkpoint of another attack accepted"
+            except ValueError:
+                pass
+    finally:
+        advanced_sender.CHECKPOINT_INTERVAL = original_interval
+
+    print(f"✓ Resumed from index {completed_until}")
+    print("Attack checkpoint resume test passed! ✓")
+
+
+def test_sharded_attack_covers_every_combination():
+    """Test that shards of the same attack send every request exactly once"""
+    print("\n=== Testing Sharded Attack ===")
+
+    payload_sets = [[str(i) for i in range(7)], [str(i) for i in range(5)]]
+    sent = []
+    for shard in range(3):
+        sender = _fake_sender(payload_sets)
+        index_range = sender.shard(shard, 3)
+        sender.run_attack(start=index_range.start, stop=index_range.stop)
+        sent.extend(sender.sent[1:])
+    assert len(sent) == 35 and len(set(sent)) == 35, f"Shards overlap or miss requests: {len(sent)}"
+
+    print("✓ Shards sent all 35 requests exactly once")
+    print("Sharded attack test passed! ✓")
+
+
 def run_all_tests():
     """Run all tests"""
     print("=" * 60)
@@ -295,6 +507,12 @@ def run_all_tests():
         test_grep_extractor()
         test_advanced_sender_request_generation()
         test_payload_processing_integration()
+        test_streaming_combinations()
+        test_run_attack_bounds_pending_requests()
+        test_random_access_combinations()
+        test_shard_ranges()
+        test_attack_checkpoint_resume()
+        test_sharded_attack_covers_every_combination()
         
         print("\n" + "=" * 60)
         print("✓ ALL TESTS PASSED! ✓")
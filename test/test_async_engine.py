@@ -0,0 +1,227 @@
+import gzip
+import os
+import sys
+import tempfile
+import threading
+import unittest
+from queue import Queue
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Adiciona o diretório `src` ao path para encontrar os módulos
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+
+from core.advanced_sender import AdvancedSender
+from core.async_engine import AsyncHttpEngine
+from core.rate_limiter import AdaptiveRateLimiter
+from core.request_template import RequestTemplate
+from core.send_stats import SendStats, percentile
+from core.sender import run_sender_from_file
+
+
+class EngineHandler(BaseHTTPRequestHandler):
+    """Servidor HTTP/1.1 keep-alive: ecoa o path; /chunked responde chunked + gzip; /throttle responde 429 uma vez; /missing responde 404."""
+
+    protocol_version = "HTTP/1.1"
+    wbufsize = -1
+    lock = threading.Lock()
+    connections = 0
+    paths = []
+    throttled = False
+
+    def setup(self):
+        super().setup()
+        with type(self).lock:
+            type(self).connections += 1
+
+    def _reply(self, status, body, headers=()):
+        self.send_response(status)
+        for name, value in headers:
+            self.send_header(name, value)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        with type(self).lock:
+            type(self).paths.append(self.path)
+        if self.path.endswith('/chunked'):
+            data = gzip.compress("olá mundo".encode('utf-8') * 100)
+            self.send_response(200)
+            self.send_header("Content-Type", "text/plain; charset=utf-8")
+            self.send_header("Content-Encoding", "gzip")
+            self.send_header("Transfer-Encoding", "chunked")
+            self.end_headers()
+            for i in range(0, len(data), 100):
+                chunk = data[i:i + 100]
+                self.wfile.write(f"{len(chunk):x}\r\n".encode() + chunk + b"\r\n")
+            self.wfile.write(b"0\r\n\r\n")
+        elif '/redirect' in self.path:
+            self._reply(302, b"", [("Location", "/login")])
+        elif '/missing' in self.path:
+            self._reply(404, b"not found")
+        elif self.path.endswith('/throttle') and not type(self).throttled:
+            type(self).throttled = True
+            self._reply(429, b"slow down", [("Retry-After", "0")])
+        else:
+            self._reply(200, f"path={self.path}".encode())
+
+    do_POST = do_GET
+
+    def log_message(self, *args):
+        pass
+
+
+class TestAsyncEngine(unittest.TestCase):
+
+    def setUp(self):
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), EngineHandler)
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        EngineHandler.connections = 0
+        EngineHandler.paths = []
+        EngineHandler.throttled = False
+        self.port = self.server.server_port
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def _run(self, engine, paths):
+        results = {}
+        template = RequestTemplate(f"GET §/§ HTTP/1.1\nHost: 127.0.0.1:{self.port}\n\n")
+        engine.run(paths, lambda path: template.build([path]), lambda path, response, _: results.update({path: response}))
+        return results
+
+    def test_responses_and_connection_reuse(self):
+        engine = AsyncHttpEngine(in_flight=20)
+        paths = [f"/item/{i}" for i in range(300)]
+        results = self._run(engine, paths)
+        self.assertEqual(sorted(results), sorted(paths))
+        for path, response in results.items():
+            self.assertEqual((response.status_code, response.text), (200, f"path={path}"))
+        self.assertLessEqual(engine.get_stats()['connections'], 20)
+        self.assertEqual(EngineHandler.connections, engine.get_stats()['connections'])
+
+    def test_chunked_gzip_and_throttling(self):
+        engine = AsyncHttpEngine(in_flight=2, rate_limiter=AdaptiveRateLimiter())
+        results = self._run(engine, ["/chunked", "/throttle"])
+        self.assertEqual(results["/chunked"].text, "olá mundo" * 100)
+        # Sem reenvio por padrão: o 429 é o resultado
+        self.assertEqual(results["/throttle"].status_code, 429)
+        self.assertEqual(EngineHandler.paths.count("/throttle"), 1)
+
+        EngineHandler.throttled = False
+        results = self._run(AsyncHttpEngine(in_flight=2, rate_limiter=AdaptiveRateLimiter(), retries=1), ["/throttle"])
+        self.assertEqual(results["/throttle"].status_code, 200)
+        self.assertEqual(EngineHandler.paths.count("/throttle"), 3)
+
+    def test_jobs_are_consumed_on_demand(self):
+        consumed = []
+        in_flight = []
+
+        def jobs():
+            for i in range(200):
+                consumed.append(i)
+                yield f"/{i}"
+
+        def on_result(path, response, _):
+            in_flight.append(len(consumed) - len(in_flight) - 1)
+
+        template = RequestTemplate(f"GET §/§ HTTP/1.1\nHost: 127.0.0.1:{self.port}\n\n")
+        AsyncHttpEngine(in_flight=10).run(jobs(), lambda path: template.build([path]), on_result)
+        self.assertEqual(len(in_flight), 200)
+        self.assertLessEqual(max(in_flight), 10)
+
+    def test_connection_errors_are_reported(self):
+        results = {}
+        template = RequestTemplate("GET / HTTP/1.1\nHost: 127.0.0.1:1\n\n")
+        AsyncHttpEngine(in_flight=2).run(range(3), lambda _: template.build(),
+                                         lambda job, response, _: results.update({job: response}))
+        self.assertEqual(results, {0: None, 1: None, 2: None})
+
+    def test_intruder_async_engine_through_proxy(self):
+        # O servidor de teste faz o papel do proxy: recebe as requisições em forma absoluta
+        sender = AdvancedSender(
+            raw_request="GET /login?user=§admin§ HTTP/1.1\nHost: 127.0.0.1:8080\n\n",
+            payload_sets=[[f"u{i}" for i in range(50)]],
+            proxy_port=self.port,
+            engine='async',
+            in_flight=16,
+        )
+        messages = []
+        sender.run_attack(messages.append)
+        results = [m['data'] for m in messages if m['type'] == 'result']
+        self.assertEqual(len(results), 50)
+        self.assertTrue(all(r['status'] == 200 and not r['anomaly'] for r in results))
+        self.assertIn("http://127.0.0.1:8080/login?user=u7", EngineHandler.paths)
+        stats = [m['data'] for m in messages if m['type'] == 'stats'][0]
+        self.assertEqual((stats['requests'], stats['errors']), (50, 0))
+        self.assertIsNotNone(stats['latency_ms']['p99'])
+
+    def test_engines_do_not_follow_redirects(self):
+        for engine in ('threads', 'async'):
+            sender = AdvancedSender(
+                raw_request="GET /redirect?next=§a§ HTTP/1.1\nHost: 127.0.0.1:8080\n\n",
+                payload_sets=[["b", "c"]], proxy_port=self.port, engine=engine,
+            )
+            messages = []
+            sender.run_attack(messages.append)
+            results = [m['data'] for m in messages if m['type'] == 'result']
+            self.assertEqual([r['status'] for r in results], [302, 302], engine)
+        self.assertNotIn("http://127.0.0.1:8080/login", EngineHandler.paths)
+
+    def test_sender_async_engine(self):
+        with tempfile.NamedTemporaryFile('w', suffix='.txt', delete=False) as f:
+            f.write("\n".join(str(i) for i in range(30)))
+        try:
+            summary = run_sender_from_file("GET /busca?q=x HTTP/1.1\nHost: 127.0.0.1:8080\n\n", f.name, "q", 1,
+                                           proxy_port=self.port, engine='async', in_flight=8)
+        finally:
+            os.unlink(f.name)
+        self.assertEqual((summary['requests'], summary['errors']), (30, 0))
+        self.assertIn("http://127.0.0.1:8080/busca?q=29", EngineHandler.paths)
+
+    def test_sender_reports_error_statuses(self):
+        with tempfile.NamedTemporaryFile('w', suffix='.txt', delete=False) as f:
+            f.write("a\nb")
+        try:
+            for engine in ('threads', 'async'):
+                queue = Queue()
+                run_sender_from_file("GET /missing?q=x HTTP/1.1\nHost: 127.0.0.1:8080\n\n", f.name, "q", 2,
+                                     queue=queue, proxy_port=self.port, engine=engine)
+                results = [m['data'] for m in list(queue.queue) if m['type'] == 'result']
+                # Uma resposta 4xx é falsa para requests.Response, mas continua sendo uma resposta
+                self.assertEqual([r['status'] for r in results], [404, 404], engine)
+                self.assertTrue(all(r['response'] is not None for r in results))
+        finally:
+            os.unlink(f.name)
+
+    def test_invalid_engine(self):
+        with self.assertRaises(ValueError):
+            AdvancedSender("GET / HTTP/1.1\nHost: a\n\n", engine='fibers')
+
+
+class TestSendStats(unittest.TestCase):
+
+    def test_percentiles_and_error_rates(self):
+        stats = SendStats()
+        for ms in range(1, 101):
+            stats.record(ms / 1000, 200)
+        stats.record(None)
+        stats.record(0.5, 503)
+        summary = stats.summary()
+        self.assertEqual(summary['requests'], 102)
+        self.assertEqual(summary['latency_ms']['p50'], 51.0)
+        self.assertAlmostEqual(summary['error_rate'], 1 / 102)
+        self.assertAlmostEqual(summary['server_error_rate'], 1 / 102)
+        self.assertIsNone(percentile([], 50))
+
+    def test_memory_is_bounded(self):
+        stats = SendStats(max_samples=100)
+        for i in range(10000):
+            stats.record(i / 10000, 200)
+        self.assertEqual(len(stats.samples), 100)
+        self.assertAlmostEqual(stats.summary()['latency_ms']['p50'], 500, delta=150)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,146 @@
+import unittest
+import json
+import os
+import sys
+import tempfile
+import threading
+import time
+
+# Adiciona o diretório `src` ao path para encontrar os módulos
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+
+from core.config import InterceptConfig
+
+
+class TestConfigReload(unittest.TestCase):
+
+    def setUp(self):
+        self.config_file = "intercept_config_reload_test.json"
+        self._cleanup()
+
+    def tearDown(self):
+        self._cleanup()
+
+    def _cleanup(self):
+        for path in (self.config_file, f"{self.config_file}.tmp"):
+            if os.path.exists(path):
+                os.remove(path)
+
+    def _write_external(self, rules):
+        """Simula uma edição do arquivo feita por outro processo."""
+        with open(self.config_file, 'w', encoding='utf-8') as f:
+            json.dump({'rules': rules, 'port': 9507}, f)
+        stat = os.stat(self.config_file)
+        os.utime(self.config_file, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+
+    def test_snapshot_is_immutable_and_copy_on_write(self):
+        config = InterceptConfig(config_file=self.config_file)
+        config.add_rule("exemplo.com", "/a", "p", "1")
+        snapshot = config.get_rule_snapshot()
+
+        with self.assertRaises(TypeError):
+            snapshot.rules[0]['enabled'] = False
+
+        config.toggle_rule(0)
+        config.add_rule("exemplo.com", "/b", "q", "2")
+
+        # O snapshot antigo, ainda em uso por quem o leu, não muda
+        self.assertTrue(snapshot.rules[0]['enabled'])
+        self.assertEqual(len(snapshot.rules), 1)
+        self.assertFalse(config.get_rules()[0]['enabled'])
+        self.assertGreater(config.rules_version, snapshot.version)
+        self.assertEqual(config.get_rule_matcher().match("exemplo.com", "/b")[0]['param_name'], "q")
+
+    def test_debounced_atomic_save(self):
+        config = InterceptConfig(config_file=self.config_file, save_debounce=60)
+        for i in range(5):
+            config.add_rule("exemplo.com", f"/{i}", "p", str(i))
+        self.assertFalse(os.path.exists(self.config_file), "Gravação deveria estar adiada")
+
+        self.assertTrue(config.flush())
+        self.assertFalse(os.path.exists(f"{self.config_file}.tmp"))
+        self.assertEqual(len(InterceptConfig(config_file=self.config_file).get_rules()), 5)
+
+    def test_debounced_save_failure_is_reported(self):
+        tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(tmpdir.cleanup)
+        config_file = os.path.join(tmpdir.name, "nao_existe", "config.json")
+        config = InterceptConfig(config_file=config_file, save_debounce=0.05)
+        reported = threading.Event()
+        config.on_save_error = lambda error: reported.set()
+
+        # Agendada: o erro só aparece na gravação adiada
+        self.assertEqual(config.add_rule("exemplo.com", "/a", "p", "1"), (True, "Regra adicionada com sucesso!"))
+        self.assertTrue(reported.wait(2))
+        self.assertIsNotNone(config.save_error)
+
+        # Com a gravação em erro, a próxima é feita na hora e a alteração é desfeita
+        ok, _ = config.add_rule("exemplo.com", "/b", "p", "2")
+        self.assertFalse(ok)
+        self.assertEqual([rule['path'] for rule in config.get_rules()], ["/a"])
+
+        os.makedirs(os.path.dirname(config_file))
+        self.assertEqual(config.add_rule("exemplo.com", "/b", "p", "2")[0], True)
+        self.assertIsNone(config.save_error)
+        self.assertEqual(len(InterceptConfig(config_file=config_file).get_rules()), 2)
+
+    def test_reload_external_edit(self):
+        config = InterceptConfig(config_file=self.config_file)
+        config.add_rule("exemplo.com", "/a", "p", "1")
+        self.assertFalse(config.reload_if_changed(), "A própria gravação não deve disparar recarga")
+
+        self._write_external([{'host': 'outro.com', 'path': '/x', 'param_name': 'z',
+                               'param_value': '9', 'enabled': True}])
+        self.assertTrue(config.reload_if_changed())
+        self.assertEqual(config.get_rules()[0]['host'], 'outro.com')
+        self.assertEqual(len(config.get_rule_matcher().match("outro.com", "/x")), 1)
+
+    def test_pending_changes_win_and_conflict_is_logged_once(self):
+        config = InterceptConfig(config_file=self.config_file, save_debounce=60)
+        config.add_rule("exemplo.com", "/a", "p", "1")
+        self._write_external([])
+        with self.assertLogs("InteceptProxyLogger", level="WARNING") as logs:
+            for _ in range(3):
+                self.assertFalse(config.reload_if_changed())
+        # Uma edição externa, um aviso (o observador verifica a cada segundo)
+        self.assertEqual(len(logs.records), 1)
+        self.assertEqual(len(config.get_rules()), 1)
+        # Grava agora, e não na saída do processo (atexit), depois da limpeza do arquivo
+        self.assertTrue(config.flush())
+
+    def test_reload_does_not_race_local_saves(self):
+        config = InterceptConfig(config_file=self.config_file)
+        stop = threading.Event()
+
+        def watch():
+            while not stop.is_set():
+                config.reload_if_changed()
+
+        watcher = threading.Thread(target=watch)
+        watcher.start()
+        try:
+            for i in range(100):
+                self.assertTrue(config.add_rule("exemplo.com", f"/{i}", "p", str(i))[0])
+        finally:
+            stop.set()
+            watcher.join()
+        # Nenhuma gravação própria é relida como edição externa (o que desfaria regras recém-adicionadas)
+        self.assertEqual(len(config.get_rules()), 100)
+        self.assertEqual(len(InterceptConfig(config_file=self.config_file).get_rules()), 100)
+
+    def test_watcher_thread(self):
+        config = InterceptConfig(config_file=self.config_file)
+        config.add_rule("exemplo.com", "/a", "p", "1")
+        config.start_watching(interval=0.05)
+        try:
+            self._write_external([])
+            deadline = time.monotonic() + 5
+            while config.get_rules() and time.monotonic() < deadline:
+                time.sleep(0.02)
+            self.assertEqual(len(config.get_rules()), 0)
+        finally:
+            config.stop_watching()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,78 @@
+import unittest
+import os
+import sys
+from unittest.mock import Mock, PropertyMock
+
+# Adiciona o diretório `src` ao path para encontrar os módulos
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+
+from core.flow_view import FlowView
+from core.history import RequestHistory
+from core.config import InterceptConfig
+from core.cookie_manager import CookieManager
+from core.addon import InterceptAddon
+from core.spider import Spider
+
+
+class TestFlowView(unittest.TestCase):
+
+    def setUp(self):
+        """Configura um mock de flow que conta os acessos aos bodies e headers."""
+        self.request = Mock()
+        self.request.pretty_host = "exemplo.com"
+        self.request.method = "POST"
+        self.request.pretty_url = "http://exemplo.com/login?next=%2Fhome&debug="
+        self.request.path = "/login?next=%2Fhome&debug="
+        self.request_headers = PropertyMock(return_value={"Content-Type": "application/x-www-form-urlencoded",
+                                                          "Cookie": "sessao=abc"})
+        type(self.request).headers = self.request_headers
+        self.request_content = PropertyMock(return_value=b"user=admin&pass=1%262")
+        type(self.request).content = self.request_content
+
+        self.response = Mock()
+        self.response.status_code = 200
+        self.response_headers = PropertyMock(return_value={"Content-Type": "text/html; charset=utf-8",
+                                                           "Set-Cookie": "token=xyz; Path=/"})
+        type(self.response).headers = self.response_headers
+        self.response_content = PropertyMock(return_value='<a href="/perfil">Perfil ção</a>'.encode('utf-8'))
+        type(self.response).content = self.response_content
+
+        self.flow = Mock()
+        self.flow.request = self.request
+        self.flow.response = self.response
+
+    def test_memoized_values(self):
+        view = FlowView(self.flow)
+        self.assertEqual(view.response_text, '<a href="/perfil">Perfil ção</a>')
+        self.assertIs(view.response_text, view.response_text)
+        self.assertIs(view.request_headers, view.request_headers)
+        self.assertEqual(view.response_headers_lower['set-cookie'], "token=xyz; Path=/")
+        self.assertEqual(view.content_type, "text/html; charset=utf-8")
+
+        self.assertEqual(self.response_content.call_count, 1)
+        self.assertEqual(self.request_headers.call_count, 1)
+
+    def test_addon_response_reads_flow_once(self):
+        """Histórico, scanner, cookies e spider compartilham uma única visão do flow."""
+        history = RequestHistory()
+        spider = Spider()
+        spider.start()
+        cookie_manager = CookieManager()
+        addon = InterceptAddon(InterceptConfig("test_flow_view_config.json"), history, cookie_manager, spider)
+
+        addon.response(self.flow)
+        addon.scan_pipeline.wait_idle(timeout=5)
+        addon.scan_pipeline.stop()
+
+        self.assertEqual(self.response_content.call_count, 1)
+        self.assertEqual(self.request_content.call_count, 1)
+        self.assertEqual(self.response_headers.call_count, 1)
+        self.assertEqual(self.request_headers.call_count, 1)
+
+        self.assertEqual(history.get_entry_by_id(1)['request_body'], "user=admin&pass=1%262")
+        self.assertEqual(cookie_manager.get_all_cookies()['exemplo.com']['token'], "xyz")
+        self.assertIn("http://exemplo.com/perfil", spider.queue)
+
+
+if __name__ == '__main__':
+    unittest.main()
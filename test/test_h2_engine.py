@@ -0,0 +1,241 @@
+import asyncio
+import os
+import sys
+import threading
+import time
+import unittest
+
+import h2.config
+import h2.connection
+import h2.errors
+import h2.events
+import h2.exceptions
+import h2.settings
+
+# Adiciona o diretório `src` ao path para encontrar os módulos
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+
+from core.advanced_sender import AdvancedSender
+from core.h2_engine import Http2Engine
+from core.request_template import RequestTemplate
+
+
+class H2Server:
+    """
+    Servidor h2c (HTTP/2 sem TLS, conhecimento prévio) que responde "path=<path>|<tamanho do body>".
+
+    Registra a chegada de cada requisição completa (END_STREAM), o pico de streams abertos por
+    conexão e pode anunciar uma janela de recepção pequena, recusar streams (REFUSED_STREAM),
+    encerrar toda conexão com GOAWAY(last_stream_id=0) na primeira requisição ou enviar um GOAWAY
+    gracioso após `goaway_after` requisições, respondendo as já aceitas e ignorando as seguintes.
+    """
+
+    def __init__(self, max_streams=100, window=65535, delay=0.0, refuse_every=0, goaway=False, goaway_after=0):
+        self.max_streams = max_streams
+        self.window = window
+        self.delay = delay
+        self.refuse_every = refuse_every
+        self.goaway = goaway
+        self.goaway_after = goaway_after
+        self.connections = 0
+        self.arrivals = []
+        self.peak_streams = 0
+        self.refused = set()
+        self.loop = asyncio.new_event_loop()
+        started = threading.Event()
+
+        async def start():
+            self.server = await asyncio.start_server(self._handle, "127.0.0.1", 0)
+            self.port = self.server.sockets[0].getsockname()[1]
+            started.set()
+
+        self.thread = threading.Thread(target=self.loop.run_forever, daemon=True)
+        self.thread.start()
+        asyncio.run_coroutine_threadsafe(start(), self.loop)
+        started.wait(5)
+
+    def close(self):
+        async def stop():
+            self.server.close()
+        asyncio.run_coroutine_threadsafe(stop(), self.loop).result(5)
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self.thread.join(5)
+        self.loop.close()
+
+    async def _handle(self, reader, writer):
+        self.connections += 1
+        conn = h2.connection.H2Connection(h2.config.H2Configuration(client_side=False, header_encoding='utf-8'))
+        conn.local_settings = h2.settings.Settings(client=False, initial_values={
+            h2.settings.SettingCodes.MAX_CONCURRENT_STREAMS: self.max_streams,
+            h2.settings.SettingCodes.INITIAL_WINDOW_SIZE: self.window,
+        })
+        conn.initiate_connection()
+        writer.write(conn.data_to_send())
+        requests = {}
+        accepted = 0
+        last_stream_id = None
+
+        async def respond(stream_id, path, size):
+            await asyncio.sleep(self.delay)
+            body = f"path={path}|{size}".encode()
+            conn.send_headers(stream_id, [(':status', '200'), ('content-length', str(len(body)))])
+            conn.send_data(stream_id, body, end_stream=True)
+            writer.write(conn.data_to_send())
+            del requests[stream_id]
+
+        try:
+            while True:
+                data = await reader.read(65536)
+                if not data:
+                    break
+                for event in conn.receive_data(data):
+                    if isinstance(event, h2.events.RequestReceived) and self.goaway:
+                        conn.close_connection(last_stream_id=0)
+                    elif isinstance(event, h2.events.RequestReceived) and last_stream_id is None:
+                        requests[event.stream_id] = [dict(event.headers)[':path'], 0]
+                        self.peak_streams = max(self.peak_streams, len(requests))
+                        accepted += 1
+                        if accepted == self.goaway_after:
+                            # GOAWAY gracioso: o h2 fecharia a máquina de estados e impediria as respostas
+                            state = conn.state_machine.state
+                            conn.close_connection(last_stream_id=event.stream_id)
+                            conn.state_machine.state = state
+                            last_stream_id = event.stream_id
+                    elif isinstance(event, h2.events.DataReceived) and event.stream_id in requests:
+                        requests[event.stream_id][1] += len(event.data)
+                        conn.acknowledge_received_data(event.flow_controlled_length, event.stream_id)
+                    elif isinstance(event, h2.events.StreamEnded) and event.stream_id in requests:
+                        path, size = requests[event.stream_id]
+                        self.arrivals.append((time.perf_counter(), path))
+                        if self.refuse_every and len(self.arrivals) % self.refuse_every == 0 \
+                                and path not in self.refused:
+                            self.refused.add(path)
+                            del requests[event.stream_id]
+                            conn.reset_stream(event.stream_id, h2.errors.ErrorCodes.REFUSED_STREAM)
+                        else:
+                            asyncio.ensure_future(respond(event.stream_id, path, size))
+                writer.write(conn.data_to_send())
+        except (ConnectionError, h2.exceptions.ProtocolError):
+            pass
+        finally:
+            writer.close()
+
+
+class TestHttp2Engine(unittest.TestCase):
+
+    def _start(self, **options):
+        self.server = H2Server(**options)
+        self.addCleanup(self.server.close)
+        return self.server
+
+    def _run(self, engine, requests, race_size=0):
+        results = {}
+        engine.run(requests, lambda raw: RequestTemplate(raw).build(),
+                   lambda raw, response, _: results.update({raw: response}), race_size=race_size)
+        return results
+
+    def _get(self, path):
+        return f"GET {path} HTTP/1.1\nHost: 127.0.0.1:{self.server.port}\nConnection: keep-alive\n\n"
+
+    def test_streams_are_multiplexed(self):
+        self._start(max_streams=50, delay=0.05)
+        engine = Http2Engine(connections=2, max_streams=100)
+        paths = [f"/s/{i}" for i in range(300)]
+        results = self._run(engine, [self._get(path) for path in paths])
+        self.assertEqual(len(results), 300)
+        for path in paths:
+            response = results[self._get(path)]
+            self.assertEqual((response.status_code, response.text), (200, f"path={path}|0"))
+            self.assertEqual(response.timing.stream_id % 2, 1)
+            self.assertLessEqual(response.timing.first_byte, response.timing.complete)
+        self.assertEqual(self.server.connections, 2)
+        # Muitos streams em voo, sem passar do limite anunciado pelo servidor
+        self.assertGreater(self.server.peak_streams, 10)
+        self.assertLessEqual(self.server.peak_streams, 50)
+        self.assertLessEqual(engine.get_stats()['peak_streams'], 50)
+
+    def test_bodies_respect_flow_control_window(self):
+        self._start(window=1024)
+        engine = Http2Engine(connections=1, max_streams=10)
+        raw = [f"POST /upload/{i} HTTP/1.1\nHost: 127.0.0.1:{self.server.port}\n\n{'x' * 20000}" for i in range(20)]
+        results = self._run(engine, raw)
+        self.assertEqual({r.text for r in results.values()}, {f"path=/upload/{i}|20000" for i in range(20)})
+
+    def test_refused_streams_are_resent(self):
+        self._start(refuse_every=4)
+        engine = Http2Engine(connections=1)
+        paths = [f"/r/{i}" for i in range(40)]
+        results = self._run(engine, [self._get(path) for path in paths])
+        self.assertEqual({results[self._get(path)].text for path in paths}, {f"path={path}|0" for path in paths})
+        self.assertEqual(engine.get_stats()['resent'], len(self.server.refused))
+        self.assertGreater(len(self.server.refused), 0)
+
+    def test_refusals_are_capped(self):
+        # O servidor nunca processa nada: cada job é reenviado até o limite e vira erro
+        self._start(goaway=True)
+        engine = Http2Engine(connections=1, refused_retries=3)
+        results = self._run(engine, [self._get(f"/g/{i}") for i in range(5)])
+        self.assertEqual(len(results), 5)
+        self.assertTrue(all(response is None for response in results.values()))
+        self.assertGreater(engine.get_stats()['resent'], 0)
+        # Recusas (refused_retries) mais quedas da conexão (retries) por job
+        self.assertLessEqual(engine.get_stats()['resent'], 5 * (3 + engine.retries))
+
+        results = self._run(Http2Engine(refused_retries=2), [self._get("/race")], race_size=1)
+        self.assertEqual(results, {self._get("/race"): None})
+
+    def test_graceful_goaway_drains_accepted_streams(self):
+        self._start(max_streams=100, delay=0.05, goaway_after=50)
+        engine = Http2Engine(connections=1, max_streams=100)
+        paths = [f"/d/{i}" for i in range(300)]
+        results = self._run(engine, [self._get(path) for path in paths])
+        self.assertEqual({raw: response.text for raw, response in results.items()},
+                         {self._get(path): f"path={path}|0" for path in paths})
+        # Os streams aceitos terminam na conexão antiga; só os ignorados são reenviados
+        self.assertEqual(sorted(path for _, path in self.server.arrivals), sorted(paths))
+        self.assertGreater(engine.get_stats()['resent'], 0)
+        self.assertGreaterEqual(self.server.connections, 300 // 50)
+
+    def test_unreachable_target(self):
+        results = {}
+        Http2Engine(connections=1, retries=1).run(
+            range(3), lambda _: RequestTemplate("GET / HTTP/1.1\nHost: 127.0.0.1:1\n\n").build(),
+            lambda job, response, _: results.update({job: response}))
+        self.assertEqual(results, {0: None, 1: None, 2: None})
+
+    def test_single_packet_race(self):
+        self._start()
+        engine = Http2Engine(race_warmup=0.2)
+        started = time.perf_counter()
+        raw = [f"POST /race/{i} HTTP/1.1\nHost: 127.0.0.1:{self.server.port}\n\ncupom=X" for i in range(20)]
+        results = self._run(engine, raw, race_size=20)
+        self.assertEqual({r.text for r in results.values()}, {f"path=/race/{i}|7" for i in range(20)})
+        arrivals = [arrival for arrival, _ in self.server.arrivals]
+        # Nenhum stream termina antes da liberação; todos terminam juntos, na mesma conexão
+        self.assertGreaterEqual(min(arrivals) - started, 0.2)
+        self.assertLess(max(arrivals) - min(arrivals), 0.01)
+        self.assertEqual(self.server.connections, 1)
+        self.assertIsNotNone(engine.get_stats()['last_race'])
+
+    def test_intruder_h2_engine(self):
+        self._start()
+        sender = AdvancedSender(
+            raw_request=f"POST /login HTTP/1.1\nHost: 127.0.0.1:{self.server.port}\n\nsenha=§x§",
+            payload_sets=[[f"s{i}" * (i + 1) for i in range(30)]],
+            engine='h2', connections=1, streams=10,
+        )
+        messages = []
+        sender.run_attack(messages.append)
+        results = [m['data'] for m in messages if m['type'] == 'result']
+        self.assertEqual(len(results), 30)
+        for data in results:
+            self.assertEqual(data['response'].text, f"path=/login|{len('senha=' + data['payloads'][0])}")
+            self.assertEqual(data['timing'].connection, 1)
+        self.assertEqual(sender.last_stats['errors'], 0)
+
+        with self.assertRaises(ValueError):
+            AdvancedSender("GET / HTTP/1.1\nHost: a\n\n", engine='async', race_size=5)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -108,6 +108,83 @@ class TestHistory(unittest.TestCase):
         entry_final = history.get_entry_by_id(1)
         self.assertEqual(len(entry_final['vulnerabilities']), 2)
 
+    def test_get_new_entries_with_eviction(self):
+        """Testa get_new_entries e o índice por ID depois que o buffer descarta entradas."""
+        history = RequestHistory()
+        history.max_items = 5
+        for i in range(8):
+            history.add_request(self.mock_flow)  # IDs 1..8, mantém 4..8
+
+        self.assertEqual([e['id'] for e in history.get_new_entries(0)], [4, 5, 6, 7, 8])
+        self.assertEqual([e['id'] for e in history.get_new_entries(6)], [7, 8])
+        self.assertEqual([e['id'] for e in history.get_new_entries(1)], [4, 5, 6, 7, 8])
+        self.assertEqual(history.get_new_entries(8), [])
+        self.assertIsNone(history.get_entry_by_id(3))
+        self.assertEqual(history.get_entry_by_id(4)['id'], 4)
+
+    def test_bodies_kept_as_bytes(self):
+        """Os bodies ficam como bytes e o texto é decodificado sob demanda com o charset correto."""
+        history = RequestHistory()
+        binary = bytes(range(256))
+        self.mock_flow.request.content = binary
+        self.mock_flow.response.headers = {"Content-Type": "text/html; charset=iso-8859-1"}
+        self.mock_flow.response.content = "ação".encode('latin-1')
+        history.add_request(self.mock_flow)
+
+        entry = history.get_entry_by_id(1)
+        self.assertIs(entry['request_body_raw'], binary)
+        self.assertEqual(entry['response_body'], "ação")
+        self.assertEqual(entry.get('response_body'), "ação")
+        self.assertIn('request_body', entry)
+
+    def test_charset_detection_without_header(self):
+        """Sem charset no Content-Type, usa <meta charset> ou recorre a UTF-8/cp1252."""
+        from core.charset import decode_body, detect_charset
+
+        html = '<html><head><meta charset="windows-1252"></head>café</html>'.encode('cp1252')
+        self.assertEqual(detect_charset(html, {"Content-Type": "text/html"}), 'cp1252')
+        self.assertEqual(detect_charset("çã".encode('utf-8')), 'utf-8')
+        self.assertEqual(decode_body("çã".encode('cp1252')), "çã")
+        self.assertEqual(decode_body(b''), '')
+
+    def test_compressed_bodies(self):
+        """Bodies grandes são comprimidos e descomprimidos de forma transparente."""
+        from core.compression import BodyCompressor, CompressedBody
+
+        history = RequestHistory(compressor=BodyCompressor('zlib', threshold=1024))
+        html = ("<div class='item'>conteúdo</div>\n" * 2000).encode('utf-8')
+        self.mock_flow.response.headers = {"Content-Type": "text/html; charset=utf-8"}
+        self.mock_flow.response.content = html
+        history.add_request(self.mock_flow)
+
+        entry = history.get_entry_by_id(1)
+        self.assertIsInstance(dict.get(entry, 'response_body_compressed'), CompressedBody)
+        self.assertEqual(entry['response_body_raw'], html)
+        self.assertEqual(entry['response_body'], html.decode('utf-8'))
+        self.assertIn('response_body_raw', entry)
+        self.assertEqual(entry['request_body'], "test body")  # Abaixo do limite: sem compressão
+
+        stats = history.get_stats()['compression']
+        self.assertEqual(stats['bodies_compressed'], 1)
+        self.assertGreater(stats['ratio'], 10)
+        self.assertEqual(stats['decompressions'], 2)
+
+    def test_memory_budget_evicts_oldest(self):
+        """Ao ultrapassar o orçamento de memória, as entradas mais antigas são descartadas."""
+        history = RequestHistory(compress_bodies=False, max_memory_bytes=50 * 1024)
+        self.mock_flow.response.content = b"x" * (20 * 1024)
+        for i in range(5):
+            history.add_request(self.mock_flow)
+
+        stats = history.get_stats()
+        self.assertEqual(stats['entries'], 2)
+        self.assertEqual(stats['evicted'], 3)
+        self.assertLessEqual(stats['memory_used'], 50 * 1024)
+        self.assertEqual(history.get_oldest_id(), 4)
+
+        history.set_memory_budget(30 * 1024)
+        self.assertEqual([e['id'] for e in history.get_history()], [5])
+
 
 if __name__ == '__main__':
     unittest.main()
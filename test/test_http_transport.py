@@ -0,0 +1,111 @@
+import os
+import sys
+import threading
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Adiciona o diretório `src` ao path para encontrar os módulos
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+
+from core.active_scanner import ActiveScanner
+from core.http_transport import DnsCache, HttpTransport
+from core.rate_limiter import AdaptiveRateLimiter
+
+
+class KeepAliveHandler(BaseHTTPRequestHandler):
+    """Servidor HTTP/1.1 com keep-alive; conta conexões e guarda o header Cookie recebido."""
+
+    protocol_version = "HTTP/1.1"
+    wbufsize = -1  # resposta em um único envio (sem esperar o ACK atrasado entre header e body)
+    lock = threading.Lock()
+    connections = 0
+    cookies = []
+
+    def setup(self):
+        super().setup()
+        with type(self).lock:
+            type(self).connections += 1
+
+    def do_GET(self):
+        type(self).cookies.append(self.headers.get('Cookie'))
+        body = b"<html>ok</html>"
+        self.send_response(200)
+        self.send_header("Set-Cookie", "session=abc")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+class TestHttpTransport(unittest.TestCase):
+
+    def setUp(self):
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), KeepAliveHandler)
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        KeepAliveHandler.connections = 0
+        KeepAliveHandler.cookies = []
+        self.port = self.server.server_port
+        self.transport = HttpTransport(pool_maxsize=4)
+
+    def tearDown(self):
+        self.transport.close()
+        self.server.shutdown()
+        self.server.server_close()
+
+    def test_sequential_requests_reuse_one_connection(self):
+        for _ in range(20):
+            self.assertEqual(self.transport.get(f"http://127.0.0.1:{self.port}/x", timeout=5).status_code, 200)
+        stats = self.transport.get_stats()
+        host = stats['hosts'][f"127.0.0.1:{self.port}"]
+        self.assertEqual((host['requests'], host['connections'], host['tls_handshakes']), (20, 1, 0))
+        self.assertAlmostEqual(host['reuse_rate'], 0.95)
+        self.assertEqual(KeepAliveHandler.connections, 1)
+
+    def test_parallel_requests_are_capped_by_pool(self):
+        url = f"http://127.0.0.1:{self.port}/x"
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            statuses = list(executor.map(lambda _: self.transport.get(url, timeout=5).status_code, range(100)))
+        self.assertEqual(statuses, [200] * 100)
+        stats = self.transport.get_stats()
+        self.assertLessEqual(stats['connections'], 4)
+        self.assertEqual(stats['connections'], KeepAliveHandler.connections)
+        self.assertGreater(stats['reuse_rate'], 0.9)
+
+    def test_cookies_are_not_carried_between_requests(self):
+        for _ in range(2):
+            self.transport.get(f"http://127.0.0.1:{self.port}/", timeout=5)
+        self.transport.get(f"http://127.0.0.1:{self.port}/", headers={'Cookie': 'a=1'}, timeout=5)
+        self.assertEqual(KeepAliveHandler.cookies, [None, None, 'a=1'])
+
+    def test_dns_is_resolved_once_per_ttl(self):
+        url = f"http://localhost:{self.port}/"
+        self.transport.get(url, timeout=5)
+        self.transport.close()  # força uma conexão nova
+        self.transport.get(url, timeout=5)
+        self.assertEqual(self.transport.get_stats()['dns'], {'entries': 1, 'hits': 1, 'misses': 1})
+        self.assertEqual(KeepAliveHandler.connections, 2)
+
+    def test_dns_cache_ttl(self):
+        cache = DnsCache(ttl=0)
+        self.assertEqual(cache.resolve("127.0.0.1", 80), "127.0.0.1")
+        cache.resolve("localhost", 80)
+        cache.resolve("localhost", 80)
+        self.assertEqual(cache.get_stats(), {'entries': 1, 'hits': 0, 'misses': 2})
+
+    def test_active_scanner_reuses_connections(self):
+        scanner = ActiveScanner(transport=self.transport, rate_limiter=AdaptiveRateLimiter())
+        try:
+            scanner.scan_request({'method': 'GET', 'url': f"http://127.0.0.1:{self.port}/busca?q=1",
+                                  'headers': {}, 'body': ''})
+        finally:
+            scanner.close()
+        stats = self.transport.get_stats()
+        self.assertGreater(stats['requests'], 10)
+        self.assertLessEqual(stats['connections'], 4)
+
+
+if __name__ == '__main__':
+    unittest.main()
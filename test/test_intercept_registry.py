@@ -0,0 +1,128 @@
+import asyncio
+import os
+import sys
+import tempfile
+import threading
+import unittest
+
+from mitmproxy.test import tflow
+
+# Adiciona o diretório `src` ao path para encontrar os módulos
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+
+from core.addon import InterceptAddon
+from core.config import InterceptConfig
+from core.intercept_registry import InterceptRegistry
+
+
+def make_flow(path="/login", content=b"user=admin"):
+    flow = tflow.tflow()
+    flow.request.path = path
+    flow.request.content = content
+    return flow
+
+
+class TestInterceptRegistry(unittest.TestCase):
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.config = InterceptConfig(os.path.join(self.tmpdir.name, "config.json"))
+        self.config.toggle_intercept()
+        self.addon = InterceptAddon(self.config)
+
+    def tearDown(self):
+        self.addon.scan_pipeline.stop()
+        self.tmpdir.cleanup()
+
+    def run_hook(self, flows, decide):
+        """
+        Executa o hook `request` no event loop como o mitmproxy faz: chama o hook
+        e aguarda `wait_for_resume()`. `decide` roda em outra thread (a GUI).
+        """
+        async def proxy():
+            for flow in flows:
+                self.addon.request(flow)
+            gui = threading.Thread(target=decide)
+            gui.start()
+            await asyncio.wait_for(asyncio.gather(*(flow.wait_for_resume() for flow in flows)), timeout=5)
+            await asyncio.get_running_loop().run_in_executor(None, gui.join)
+
+        asyncio.run(proxy())
+
+    def test_hook_returns_without_blocking(self):
+        flow = make_flow()
+        self.addon.request(flow)
+        self.assertTrue(flow.intercepted)
+        self.assertTrue(self.config.intercept_registry.is_pending(flow.id))
+        queued = self.config.get_from_intercept_queue(timeout=0.1)
+        self.assertEqual(queued['flow_id'], flow.id)
+        self.assertNotIn('flow', queued)
+
+    def test_decisions_are_matched_by_flow_id(self):
+        flows = [make_flow(path=f"/item/{i}", content=f"id={i}".encode()) for i in range(200)]
+
+        def decide():
+            # Decide na ordem inversa: cada decisão deve ir para o seu flow
+            for i, flow in reversed(list(enumerate(flows))):
+                if i % 2:
+                    self.config.resolve_intercept(flow.id, {'action': 'drop'})
+                else:
+                    self.config.resolve_intercept(flow.id, {'action': 'forward', 'modified_body': f"editado={i}"})
+
+        self.assertEqual(len(flows), 200)
+        self.run_hook(flows, decide)
+
+        for i, flow in enumerate(flows):
+            self.assertFalse(flow.intercepted)
+            if i % 2:
+                self.assertFalse(flow.killable)
+            else:
+                self.assertTrue(flow.killable)
+                self.assertEqual(flow.request.content, f"editado={i}".encode())
+        stats = self.config.intercept_registry.get_stats()
+        self.assertEqual(stats['pending'], 0)
+        self.assertEqual(stats['forwarded'], 100)
+        self.assertEqual(stats['dropped'], 100)
+
+    def test_resolve_unknown_or_decided_flow(self):
+        flow = make_flow()
+
+        def decide():
+            self.assertTrue(self.config.resolve_intercept(flow.id, {'action': 'forward'}))
+            self.assertFalse(self.config.resolve_intercept(flow.id, {'action': 'drop'}))
+            self.assertFalse(self.config.resolve_intercept("inexistente", {'action': 'drop'}))
+
+        self.run_hook([flow], decide)
+        self.assertTrue(flow.killable)
+
+    def test_release_all_forwards_pending_flows(self):
+        flows = [make_flow(path=f"/{i}") for i in range(5)]
+        self.run_hook(flows, lambda: self.config.release_intercepts())
+        self.assertTrue(all(flow.killable and not flow.intercepted for flow in flows))
+
+    def test_timeout_kills_flow(self):
+        registry = InterceptRegistry(timeout=0.05)
+        flow = make_flow()
+
+        async def proxy():
+            registry.hold(flow)
+            await asyncio.wait_for(flow.wait_for_resume(), timeout=2)
+
+        asyncio.run(proxy())
+        self.assertFalse(flow.killable)
+        self.assertEqual(registry.get_stats()['expired'], 1)
+        self.assertFalse(registry.resolve(flow.id, {'action': 'forward'}))
+
+    def test_rules_applied_before_hold(self):
+        self.config.add_rule("address", "/login", "user", "root")
+        flow = make_flow()
+        flow.request.headers["content-type"] = "application/x-www-form-urlencoded"
+        flow.request.method = "POST"
+        self.addon.request(flow)
+        queued = self.config.get_from_intercept_queue(timeout=0.1)
+        self.assertEqual(queued['body'], "user=root")
+        self.config.release_intercepts()
+
+
+if __name__ == '__main__':
+    unittest.main()
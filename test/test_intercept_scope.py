@@ -0,0 +1,116 @@
+import os
+import sys
+import tempfile
+import unittest
+
+from mitmproxy.test import tflow
+
+# Adiciona o diretório `src` ao path para encontrar os módulos
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+
+from core.addon import InterceptAddon
+from core.config import InterceptConfig
+from core.intercept_scope import InterceptScope, default_scope, parse_scope_text, path_extension
+
+
+class TestInterceptScope(unittest.TestCase):
+
+    def test_default_scope_skips_static_assets(self):
+        scope = InterceptScope()
+        self.assertTrue(scope.matches("exemplo.com", "/login", "POST"))
+        self.assertTrue(scope.matches("exemplo.com", "/", "GET"))
+        self.assertFalse(scope.matches("exemplo.com", "/static/app.js?v=3", "GET"))
+        self.assertFalse(scope.matches("exemplo.com", "/img/LOGO.PNG", "GET"))
+
+    def test_host_suffix(self):
+        scope = InterceptScope({'hosts': ['exemplo.com'], 'exclude_hosts': ['telemetria.exemplo.com']})
+        self.assertTrue(scope.matches("exemplo.com", "/", "GET"))
+        self.assertTrue(scope.matches("API.exemplo.com", "/", "GET"))
+        self.assertFalse(scope.matches("outroexemplo.com", "/", "GET"))
+        self.assertFalse(scope.matches("exemplo.com.br", "/", "GET"))
+        self.assertFalse(scope.matches("telemetria.exemplo.com", "/", "GET"))
+        self.assertFalse(scope.matches("v2.telemetria.exemplo.com", "/", "GET"))
+
+    def test_path_prefixes(self):
+        scope = InterceptScope({'paths': ['/api', '/api/v1', 'login', '/b', '/a/z']})
+        self.assertEqual(scope.paths.prefixes, ['/a/z', '/api', '/b', '/login'])
+        self.assertTrue(scope.matches("h", "/api/v1/users", "GET"))
+        self.assertTrue(scope.matches("h", "/apix", "GET"))
+        self.assertTrue(scope.matches("h", "/login?next=/", "GET"))
+        self.assertTrue(scope.matches("h", "/a/z/1", "GET"))
+        self.assertFalse(scope.matches("h", "/a/y", "GET"))
+        self.assertFalse(scope.matches("h", "/", "GET"))
+        self.assertFalse(scope.matches("h", "/ap", "GET"))
+
+    def test_methods_and_content_types(self):
+        scope = InterceptScope({'methods': ['post', 'PUT'], 'content_types': ['application/json', 'multipart/*']})
+        self.assertTrue(scope.matches("h", "/", "POST", "application/json; charset=utf-8"))
+        self.assertTrue(scope.matches("h", "/", "PUT", "multipart/form-data; boundary=x"))
+        self.assertFalse(scope.matches("h", "/", "GET", "application/json"))
+        self.assertFalse(scope.matches("h", "/", "POST", "application/x-www-form-urlencoded"))
+        self.assertFalse(scope.matches("h", "/", "POST", ""))
+
+    def test_path_extension(self):
+        self.assertEqual(path_extension("/a/b.min.JS?x=1.png"), "js")
+        self.assertEqual(path_extension("/a.b/c"), "")
+        self.assertEqual(path_extension("/"), "")
+
+    def test_parse_scope_text(self):
+        valid, scope = parse_scope_text({'hosts': 'a.com, b.com ,', 'methods': 'POST'})
+        self.assertTrue(valid)
+        self.assertEqual(scope['hosts'], ['a.com', 'b.com'])
+        self.assertEqual(scope['paths'], [])
+        valid, message = parse_scope_text({'content_types': 'json'})
+        self.assertFalse(valid)
+        self.assertIn('json', message)
+
+
+class TestInterceptScopeAddon(unittest.TestCase):
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.config_file = os.path.join(self.tmpdir.name, "config.json")
+        self.config = InterceptConfig(self.config_file)
+        self.config.toggle_intercept()
+        self.addon = InterceptAddon(self.config)
+
+    def tearDown(self):
+        self.config.release_intercepts()
+        self.addon.scan_pipeline.stop()
+        self.tmpdir.cleanup()
+
+    def test_out_of_scope_flows_are_not_queued(self):
+        self.config.set_intercept_scope({'paths': ['/api'], 'exclude_extensions': ['png']})
+
+        held, passed = tflow.tflow(), tflow.tflow()
+        held.request.path = "/api/users"
+        passed.request.path = "/home"
+        asset = tflow.tflow()
+        asset.request.path = "/api/logo.png"
+        for flow in (held, passed, asset):
+            self.addon.request(flow)
+
+        self.assertTrue(held.intercepted)
+        self.assertFalse(passed.intercepted)
+        self.assertFalse(asset.intercepted)
+        self.assertEqual(self.config.get_from_intercept_queue(timeout=0.1)['flow_id'], held.id)
+        self.assertIsNone(self.config.get_from_intercept_queue(timeout=0.01))
+
+        stats = self.config.intercept_registry.get_stats()
+        self.assertEqual(stats['held'], 1)
+        self.assertEqual(stats['passed'], 2)
+
+    def test_scope_is_persisted(self):
+        self.assertEqual(self.config.get_intercept_scope().to_dict(), default_scope())
+        success, _ = self.config.set_intercept_scope({'hosts': ['exemplo.com'], 'methods': ['POST']})
+        self.assertTrue(success)
+
+        reloaded = InterceptConfig(self.config_file)
+        scope = reloaded.get_intercept_scope().to_dict()
+        self.assertEqual(scope['hosts'], ['exemplo.com'])
+        self.assertEqual(scope['methods'], ['POST'])
+        self.assertEqual(scope['exclude_extensions'], [])
+
+
+if __name__ == '__main__':
+    unittest.main()
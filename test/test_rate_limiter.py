@@ -0,0 +1,200 @@
+import os
+import sys
+import threading
+import time
+import unittest
+from email.utils import formatdate
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import requests
+
+# Adiciona o diretório `src` ao path para encontrar os módulos
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+
+from core.active_scanner import ActiveScanner
+from core.advanced_sender import AdvancedSender
+from core.rate_limiter import AdaptiveRateLimiter, parse_retry_after
+
+
+class ThrottlingHandler(BaseHTTPRequestHandler):
+    """Responde 429 com Retry-After às primeiras `throttle` requisições."""
+
+    lock = threading.Lock()
+    throttle = 0
+    received = []
+
+    def do_GET(self):
+        cls = type(self)
+        with cls.lock:
+            cls.received.append(time.monotonic())
+            throttled = len(cls.received) <= cls.throttle
+        body = b"devagar" if throttled else b"<html>ok</html>"
+        self.send_response(429 if throttled else 200)
+        if throttled:
+            self.send_header("Retry-After", "1")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+class TestAdaptiveRateLimiter(unittest.TestCase):
+
+    def test_parse_retry_after(self):
+        self.assertEqual(parse_retry_after("5"), 5.0)
+        self.assertIsNone(parse_retry_after(None))
+        self.assertIsNone(parse_retry_after("amanhã"))
+        self.assertAlmostEqual(parse_retry_after(formatdate(time.time() + 30, usegmt=True)), 30, delta=2)
+        self.assertEqual(parse_retry_after(formatdate(time.time() - 30, usegmt=True)), 0.0)
+
+    def test_unlimited_until_first_throttle(self):
+        limiter = AdaptiveRateLimiter()
+        for _ in range(50):
+            limiter.acquire("a.com")
+            limiter.release("a.com", status=200)
+        stats = limiter.get_stats()["a.com"]
+        self.assertIsNone(stats['rate_limit'])
+        self.assertEqual((stats['sent'], stats['succeeded']), (50, 50))
+
+    def test_multiplicative_decrease_once_per_rtt_and_additive_increase(self):
+        limiter = AdaptiveRateLimiter(min_rate=1.0)
+        for _ in range(20):
+            limiter.acquire("a.com")
+            limiter.release("a.com", status=200, latency=0.5)
+        # Várias respostas 429 da mesma rajada reduzem a taxa uma única vez
+        for _ in range(3):
+            limiter.acquire("a.com")
+            limiter.release("a.com", status=429)
+        reduced = limiter.get_stats()["a.com"]['rate_limit']
+        self.assertAlmostEqual(reduced, 10.0)
+
+        state = limiter.hosts["a.com"]
+        state.decreased_at -= 10  # passou mais de um RTT
+        limiter.acquire("a.com")
+        limiter.release("a.com", status=503)
+        self.assertAlmostEqual(state.rate, 5.0)
+
+        for _ in range(5):
+            limiter.acquire("a.com")
+            limiter.release("a.com", status=200)
+        self.assertGreater(state.rate, 5.0)
+        self.assertLess(state.rate, 7.0)
+        self.assertEqual(limiter.get_stats()["a.com"]['throttled'], 4)
+
+    def test_token_bucket_paces_requests(self):
+        limiter = AdaptiveRateLimiter()
+        limiter.acquire("a.com")
+        limiter.release("a.com", status=429)
+        limiter.hosts["a.com"].rate = 20.0
+        start = time.monotonic()
+        for _ in range(6):
+            limiter.acquire("a.com")
+            limiter.hosts["a.com"].in_flight -= 1
+        self.assertGreaterEqual(time.monotonic() - start, 0.2)
+
+    def test_retry_after_blocks_host_only(self):
+        limiter = AdaptiveRateLimiter()
+        limiter.acquire("a.com")
+        limiter.release("a.com", status=429, retry_after=0.3)
+        self.assertGreater(limiter.get_stats()["a.com"]['blocked_for'], 0)
+
+        start = time.monotonic()
+        limiter.acquire("b.com")
+        self.assertLess(time.monotonic() - start, 0.1)
+        limiter.acquire("a.com")
+        self.assertGreaterEqual(time.monotonic() - start, 0.25)
+
+    def test_errors_reduce_concurrency_not_rate(self):
+        limiter = AdaptiveRateLimiter(max_concurrency=8)
+        limiter.acquire("a.com")
+        limiter.release("a.com", error=True)
+        stats = limiter.get_stats()["a.com"]
+        self.assertIsNone(stats['rate_limit'])
+        self.assertEqual(stats['concurrency'], 4)
+        self.assertEqual(stats['errors'], 1)
+
+    def test_latency_degradation_caps_concurrency(self):
+        limiter = AdaptiveRateLimiter(max_concurrency=16)
+        for _ in range(5):
+            limiter.acquire("a.com")
+            limiter.release("a.com", status=200, latency=0.02)
+        self.assertEqual(limiter.get_stats()["a.com"]['concurrency'], 16)
+        for _ in range(20):
+            limiter.acquire("a.com")
+            limiter.release("a.com", status=200, latency=1.0)
+            limiter.hosts["a.com"].decreased_at -= 10
+        self.assertLess(limiter.get_stats()["a.com"]['concurrency'], 16)
+
+        # Latência alta, mas sem tempo registrado (payload com atraso proposital): ignorada
+        other = AdaptiveRateLimiter(max_concurrency=16)
+        for latency in [0.02] * 5 + [None] * 20:
+            other.acquire("b.com")
+            other.release("b.com", status=200, latency=latency)
+        self.assertEqual(other.get_stats()["b.com"]['concurrency'], 16)
+
+    def test_concurrency_limit_blocks_extra_requests(self):
+        limiter = AdaptiveRateLimiter(max_concurrency=2)
+        limiter.acquire("a.com")
+        limiter.acquire("a.com")
+        acquired = threading.Event()
+
+        def third():
+            limiter.acquire("a.com")
+            acquired.set()
+
+        threading.Thread(target=third, daemon=True).start()
+        self.assertFalse(acquired.wait(0.2))
+        limiter.release("a.com", status=200)
+        self.assertTrue(acquired.wait(1))
+
+
+class TestRateLimitedEngines(unittest.TestCase):
+
+    def setUp(self):
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), ThrottlingHandler)
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        ThrottlingHandler.received = []
+        ThrottlingHandler.throttle = 1
+        self.host = f"127.0.0.1:{self.server.server_port}"
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def test_send_honors_retry_after_and_retries(self):
+        limiter = AdaptiveRateLimiter()
+        response = limiter.send(self.host, lambda: requests.get(f"http://{self.host}/", timeout=5), retries=2)
+        self.assertEqual(response.status_code, 200)
+        first, second = ThrottlingHandler.received
+        self.assertGreaterEqual(second - first, 0.9)
+        stats = limiter.get_stats()[self.host]
+        self.assertEqual((stats['sent'], stats['throttled'], stats['succeeded']), (2, 1, 1))
+        self.assertIsNotNone(stats['rate_limit'])
+        self.assertIsNotNone(limiter.last_latency())
+
+    def test_intruder_reports_throttling_without_resending(self):
+        ThrottlingHandler.throttle = 2
+        sender = AdvancedSender(f"GET /login?senha=§x§ HTTP/1.1\nHost: {self.host}\n\n", payload_sets=[["1"]],
+                                proxy_port=self.server.server_port, rate_limiter=AdaptiveRateLimiter())
+        messages = []
+        sender.run_attack(messages.append)
+        results = [m['data'] for m in messages if m['type'] == 'result']
+        # Baseline + um envio do payload: o 429 chega ao resultado
+        self.assertEqual([r['status'] for r in results], [429])
+        self.assertEqual(len(ThrottlingHandler.received), 2)
+
+    def test_active_scanner_goes_through_limiter(self):
+        ThrottlingHandler.throttle = 0
+        limiter = AdaptiveRateLimiter()
+        scanner = ActiveScanner(rate_limiter=limiter)
+        try:
+            scanner.scan_request({'method': 'GET', 'url': f"http://{self.host}/busca?q=1", 'headers': {}, 'body': ''})
+        finally:
+            scanner.close()
+        self.assertEqual(limiter.get_stats()[self.host]['sent'], len(ThrottlingHandler.received))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,85 @@
+import os
+import random
+import sys
+import unittest
+
+# Adiciona o diretório `src` ao path para encontrar os módulos
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+
+from core.advanced_sender import PayloadPositionParser
+from core.request_template import RequestTemplate
+from core.sender import compile_raw_request
+
+RAW = ("POST /login?next=§/home§&pct=100% HTTP/1.1\n"
+       "Host: §127.0.0.1:8080§\n"
+       "X-Token: abc§123§def\n"
+       "Content-Type: application/x-www-form-urlencoded\n"
+       "Content-Length: 27\n"
+       "\n"
+       "user=§admin§&password=§secret§")
+
+
+class TestRequestTemplate(unittest.TestCase):
+
+    def test_render_matches_replace_positions(self):
+        template = RequestTemplate(RAW)
+        self.assertEqual(template.original_values, ['/home', '127.0.0.1:8080', '123', 'admin', 'secret'])
+        rng = random.Random(1)
+        alphabet = "ab%§\\\n :="
+        for count in range(7):
+            payloads = ["".join(rng.choice(alphabet) for _ in range(rng.randint(0, 6))) for _ in range(count)]
+            self.assertEqual(template.render(payloads), PayloadPositionParser.replace_positions(RAW, payloads))
+
+    def test_build_prepares_request(self):
+        template = RequestTemplate(RAW)
+        prepared = template.build(['/admin', 'alvo.com', '999', 'root', "' or '1'='1"])
+        self.assertEqual(prepared.method, 'POST')
+        self.assertEqual(prepared.url, 'https://alvo.com/login?next=/admin&pct=100%')
+        self.assertEqual(prepared.host, 'alvo.com')
+        self.assertEqual(prepared.headers, {'X-Token': 'abc999def',
+                                            'Content-Type': 'application/x-www-form-urlencoded'})
+        self.assertEqual(prepared.body, "user=root&password=' or '1'='1".encode('utf-8'))
+
+        # Os headers fixos não são compartilhados entre requisições
+        prepared.headers['X-Extra'] = '1'
+        self.assertNotIn('X-Extra', template.build(['a', 'b.com', 'c', 'd', 'e']).headers)
+
+    def test_payload_cannot_break_request_structure(self):
+        template = RequestTemplate("GET /?q=§x§ HTTP/1.1\nHost: 127.0.0.1\n\n")
+        prepared = template.build(["a b\nX-Injected: 1"])
+        self.assertEqual(prepared.url, "http://127.0.0.1/?q=a b\nX-Injected: 1")
+        self.assertEqual(prepared.headers, {})
+        self.assertIsNone(prepared.body)
+
+    def test_invalid_requests(self):
+        with self.assertRaises(ValueError):
+            RequestTemplate("GET /?q=§x§ HTTP/1.1\nAccept: */*\n\n").build(['1'])
+        malformed = RequestTemplate("lixo §x§")
+        self.assertEqual(malformed.render(['1']), "lixo 1")
+        with self.assertRaises(ValueError):
+            malformed.build(['1'])
+
+
+class TestSenderTemplate(unittest.TestCase):
+
+    def test_parameter_in_query(self):
+        template = compile_raw_request("GET /busca?q=teste&page=1 HTTP/1.1\nHost: 127.0.0.1:8000\n\n", "q")
+        self.assertEqual(template.build(["novo"]).url, "http://127.0.0.1:8000/busca?q=novo&page=1")
+
+    def test_parameter_in_urlencoded_body(self):
+        raw = ("POST /login HTTP/1.1\nHost: alvo.com\nContent-Type: application/x-www-form-urlencoded\n\n"
+               "user=admin&pw=123")
+        template = compile_raw_request(raw, "pw")
+        prepared = template.build([r"\1%s"])
+        self.assertEqual(prepared.url, "https://alvo.com/login")
+        self.assertEqual(prepared.body, rb"user=admin&pw=\1%s")
+
+    def test_missing_parameter_is_appended(self):
+        template = compile_raw_request("GET /busca HTTP/1.1\nHost: alvo.com\n\n", "id")
+        self.assertEqual(template.build(["7"]).url, "https://alvo.com/busca?id=7")
+        self.assertEqual(compile_raw_request("GET /busca HTTP/1.1\nHost: alvo.com\n\n").build().url,
+                         "https://alvo.com/busca")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,151 @@
+import os
+import random
+import subprocess
+import sys
+import unittest
+from types import SimpleNamespace
+
+# Adiciona o diretório `src` ao path para encontrar os módulos
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+
+from core.active_scanner import ActiveScanner
+from core.advanced_sender import AdvancedSender
+from core.response_fingerprint import fingerprint, header_signature
+
+WORDS = ["produto", "camiseta", "azul", "tamanho", "preço", "estoque", "carrinho", "comprar",
+         "frete", "grátis", "avaliação", "cliente", "loja", "oferta", "desconto", "categoria"]
+
+
+def product_page(rows=30, seed=0, extra=""):
+    """Página de listagem com conteúdo dinâmico: horário, token CSRF e IDs mudam a cada carga."""
+    rng = random.Random(seed)
+    catalog = random.Random(42)
+    items = "".join(
+        f"<tr><td>{' '.join(catalog.choice(WORDS) for _ in range(6))}</td><td>id {rng.randint(1, 99999)}</td></tr>"
+        for _ in range(rows)
+    )
+    csrf = "".join(rng.choice("abcdefghijklmnopqrstuvwxyzABCDEF0123456789") for _ in range(32))
+    return (f"<html><head><title>Loja</title></head><body>"
+            f"<input type=hidden name=csrf value={csrf}>"
+            f"<p>Gerado em 2024-05-{rng.randint(10, 28)} {rng.randint(10, 23)}:{rng.randint(10, 59)}</p>"
+            f"{extra}<table>{items}</table></body></html>")
+
+
+def fake_response(text, status=200, headers=None, url="http://alvo.local/"):
+    return SimpleNamespace(text=text, content=text.encode(), status_code=status,
+                           headers=headers or {'Content-Type': 'text/html'},
+                           request=SimpleNamespace(url=url))
+
+
+class TestResponseFingerprint(unittest.TestCase):
+
+    def test_dynamic_content_is_ignored(self):
+        first = fingerprint(product_page(seed=1), 200)
+        second = fingerprint(product_page(seed=2), 200)
+        self.assertEqual(first.content_hash, second.content_hash)
+        self.assertEqual(first.similarity(second), 1.0)
+        self.assertTrue(first.matches(second))
+
+    def test_similarity_orders_pages(self):
+        page = fingerprint(product_page(rows=40))
+        fewer_rows = fingerprint(product_page(rows=30))
+        error_page = fingerprint("<html><body><h1>Erro interno</h1><p>Tente novamente mais tarde</p></body></html>")
+        self.assertNotEqual(page.content_hash, fewer_rows.content_hash)
+        self.assertGreater(page.similarity(fewer_rows), page.similarity(error_page))
+        self.assertLess(page.similarity(error_page), 0.8)
+        self.assertEqual(page.similarity(fingerprint("")), 0.0)
+
+    def test_header_signature_ignores_volatile_headers(self):
+        a = header_signature(200, {'Content-Type': 'text/html; charset=utf-8', 'Date': 'x', 'Content-Length': '10',
+                                   'Set-Cookie': 'a=1', 'Server': 'nginx'})
+        b = header_signature(200, {'content-type': 'text/html', 'server': 'nginx', 'date': 'y'})
+        self.assertEqual(a, b)
+        self.assertNotEqual(a, header_signature(500, {'Content-Type': 'text/html', 'Server': 'nginx'}))
+        self.assertNotEqual(a, header_signature(200, {'Content-Type': 'application/json', 'Server': 'nginx'}))
+
+    def test_bytes_and_words(self):
+        fp = fingerprint("olá mundo 123".encode('utf-8'), 200)
+        self.assertEqual(fp.words, 3)
+        self.assertEqual(fp.length, len("olá mundo 123"))
+
+    def test_simhash_is_stable_across_processes(self):
+        code = ("import sys; sys.path.insert(0, 'src'); from core.response_fingerprint import fingerprint; "
+                "print(fingerprint('alpha beta gamma delta epsilon zeta eta theta').simhash)")
+        root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+        outputs = set()
+        for seed in ("1", "2"):
+            result = subprocess.run([sys.executable, "-c", code], cwd=root, capture_output=True, text=True,
+                                    env=dict(os.environ, PYTHONHASHSEED=seed), check=True)
+            outputs.add(result.stdout.strip())
+        self.assertEqual(len(outputs), 1)
+
+
+class TestBooleanSqliFingerprints(unittest.TestCase):
+
+    def setUp(self):
+        self.scanner = ActiveScanner()
+        self.request = {'method': 'GET', 'url': 'http://alvo.local/busca?q=camiseta', 'headers': {}, 'body': ''}
+        self.point = {'type': 'url', 'name': 'q', 'value': 'camiseta'}
+        self.loads = 0
+
+    def tearDown(self):
+        self.scanner.close()
+
+    def serve(self, respond):
+        def send(base_request, point, payload):
+            self.loads += 1
+            return respond(payload, self.loads)
+        self.scanner._send_modified_request = send
+
+    def test_detects_missing_rows_despite_dynamic_content_and_reflection(self):
+        def respond(payload, load):
+            # A busca reflete o termo; a condição falsa esconde uma única linha da tabela
+            rows = 29 if "'1'='2" in payload else 30
+            return fake_response(product_page(rows=rows, seed=load, extra=f"<p>Resultados para: {payload}</p>"))
+        self.serve(respond)
+        vulns = self.scanner._check_boolean_sqli(self.request, self.point)
+        self.assertEqual(len(vulns), 1)
+        self.assertIn("Página estável", vulns[0]['evidence'])
+
+    def test_error_status_for_false_condition(self):
+        self.serve(lambda payload, load: fake_response("<html>erro</html>", status=500) if "'1'='2" in payload
+                   else fake_response(product_page(seed=load)))
+        self.assertEqual(len(self.scanner._check_boolean_sqli(self.request, self.point)), 1)
+
+    def test_random_content_is_not_reported(self):
+        # Página que muda de conteúdo (e de tamanho) a cada carga, sem relação com o payload
+        self.serve(lambda payload, load: fake_response(
+            product_page(rows=random.Random(load).randint(5, 40), seed=load)))
+        self.assertEqual(self.scanner._check_boolean_sqli(self.request, self.point), [])
+
+    def test_not_vulnerable(self):
+        self.serve(lambda payload, load: fake_response(product_page(seed=load)))
+        self.assertEqual(self.scanner._check_boolean_sqli(self.request, self.point), [])
+        self.assertEqual(self.loads, 4)
+
+
+class TestIntruderAnomalies(unittest.TestCase):
+
+    def test_results_flag_responses_different_from_baseline(self):
+        sender = AdvancedSender("GET /login?user=§admin§ HTTP/1.1\nHost: alvo.local\n\n",
+                                payload_sets=[['root', 'guest', "'"]], num_threads=2)
+        self.assertEqual(sender.baseline_request(), "GET /login?user=admin HTTP/1.1\nHost: alvo.local\n\n")
+
+        def send_prepared(prepared):
+            if "user='" in prepared.url:
+                return fake_response("<html><h1>SQL syntax error</h1></html>", status=500)
+            return fake_response(product_page(seed=len(prepared.url)))
+        sender.send_prepared = send_prepared
+
+        results = []
+        sender.run_attack(results.append)
+        data = {tuple(m['data']['payloads']): m['data'] for m in results if m['type'] == 'result'}
+        self.assertEqual(len(data), 3)
+        self.assertFalse(data[('root',)]['anomaly'])
+        self.assertEqual(data[('root',)]['similarity'], 1.0)
+        self.assertTrue(data[("'",)]['anomaly'])
+        self.assertEqual(results[-1]['type'], 'progress_done')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,90 @@
+import unittest
+import os
+import random
+import sys
+from unittest.mock import Mock
+
+# Adiciona o diretório `src` ao path para encontrar os módulos
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+
+from core.rule_matcher import CompiledRuleMatcher, normalize_rule
+from core.config import InterceptConfig
+from core.addon import InterceptAddon
+
+
+def legacy_match(rules, host, path):
+    """Comparação regra a regra usada antes do índice compilado."""
+    matched = []
+    for rule in rules:
+        if not rule.get('enabled', True):
+            continue
+        rule_host, rule_path = normalize_rule(rule)
+        host_match = not rule_host or host.lower() == rule_host or host.lower().endswith(f".{rule_host}")
+        path_match = not rule_path or path.startswith(rule_path)
+        if host_match and path_match:
+            matched.append(rule)
+    return matched
+
+
+class TestRuleMatcher(unittest.TestCase):
+
+    def test_host_suffix_and_path_prefix(self):
+        rules = [
+            {'host': 'exemplo.com', 'path': '/api', 'param_name': 'a', 'param_value': '1', 'enabled': True},
+            {'host': 'https://Exemplo.com/admin', 'path': '', 'param_name': 'b', 'param_value': '2', 'enabled': True},
+            {'host': '', 'path': 'login', 'param_name': 'c', 'param_value': '3', 'enabled': True},
+            {'host': 'outro.com', 'path': '/', 'param_name': 'd', 'param_value': '4', 'enabled': True},
+            {'host': 'exemplo.com', 'path': '/', 'param_name': 'e', 'param_value': '5', 'enabled': False},
+        ]
+        matcher = CompiledRuleMatcher(rules)
+        self.assertEqual(matcher.rule_count, 4)
+
+        names = lambda host, path: [r['param_name'] for r in matcher.match(host, path)]
+        self.assertEqual(names("exemplo.com", "/api/v1?x=1"), ['a'])
+        self.assertEqual(names("www.EXEMPLO.com", "/admin/users"), ['b'])
+        self.assertEqual(names("qualquer.net", "/login"), ['c'])
+        self.assertEqual(names("naoexemplo.com", "/api"), [])
+        self.assertEqual(names("outro.com", "/login"), ['c', 'd'])
+
+    def test_equivalent_to_linear_scan(self):
+        """O índice deve retornar exatamente as mesmas regras, na mesma ordem, que a varredura linear."""
+        rng = random.Random(7)
+        hosts = ['exemplo.com', 'api.exemplo.com', 'a.b.exemplo.com', 'outro.org', 'com', '']
+        paths = ['/', '/api', '/api/v2', '/login', 'admin', '']
+        rules = [
+            {'host': rng.choice(hosts), 'path': rng.choice(paths), 'param_name': f'p{i}',
+             'param_value': 'x', 'enabled': rng.random() > 0.2}
+            for i in range(200)
+        ]
+        matcher = CompiledRuleMatcher(rules)
+        for host in ['exemplo.com', 'x.api.exemplo.com', 'b.exemplo.com', 'outro.org', 'site.com', 'nada.net']:
+            for path in ['/', '/api/v2/users', '/login?next=/', '/admin', '/apix']:
+                self.assertEqual(matcher.match(host, path), legacy_match(rules, host, path), f"{host}{path}")
+
+    def test_addon_applies_all_matching_rules(self):
+        config = InterceptConfig(config_file="test_rule_matcher_config.json")
+        try:
+            config.add_rule("exemplo.com", "/test", "param1", "primeiro")
+            config.add_rule("exemplo.com", "/", "param2", "segundo")
+            config.add_rule("exemplo.com", "/test", "param1", "ultimo")
+            addon = InterceptAddon(config)
+
+            mock_flow = Mock()
+            mock_flow.request.pretty_host = "www.exemplo.com"
+            mock_flow.request.path = "/test?param1=a&param2=b&param3=c"
+            mock_flow.request.query = {"param1": "a", "param2": "b", "param3": "c"}
+            addon.request(mock_flow)
+            self.assertEqual(mock_flow.request.query, {"param1": "ultimo", "param2": "segundo", "param3": "c"})
+
+            # Uma regra alterada invalida o índice compilado
+            config.toggle_rule(2)
+            mock_flow.request.query = {"param1": "a"}
+            addon.request(mock_flow)
+            self.assertEqual(mock_flow.request.query, {"param1": "primeiro"})
+        finally:
+            if os.path.exists("test_rule_matcher_config.json"):
+                os.remove("test_rule_matcher_config.json")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,155 @@
+import json
+import os
+import socket
+import sys
+import tempfile
+import threading
+import time
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import unquote_plus
+
+# Adiciona o diretório `src` ao path para encontrar os módulos
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+
+from core.active_scanner import ActiveScanner
+from core.scan_cache import ScanCache, insertion_point_key
+
+
+class CountingHandler(BaseHTTPRequestHandler):
+    """Conta as requisições recebidas; reflete a query quando `reflect` está ativo."""
+
+    lock = threading.Lock()
+    requests = 0
+    reflect = False
+
+    def do_GET(self):
+        cls = type(self)
+        with cls.lock:
+            cls.requests += 1
+        body = b"<html>ok</html>"
+        if cls.reflect:
+            body = f"<html>{unquote_plus(self.path)}</html>".encode()
+        self.send_response(200)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+class TestScanCache(unittest.TestCase):
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.cache_file = os.path.join(self.tmpdir.name, "cache.json")
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def test_key_ignores_value_and_ids_in_path(self):
+        point_a = {'type': 'url', 'name': 'q', 'value': 'a'}
+        point_b = {'type': 'url', 'name': 'q', 'value': 'b'}
+        key_a = insertion_point_key({'method': 'get', 'url': 'http://A.com/user/1?q=a'}, point_a, 'xss')
+        key_b = insertion_point_key({'method': 'GET', 'url': 'http://a.com/user/2?q=b'}, point_b, 'xss')
+        self.assertEqual(key_a, key_b)
+        self.assertEqual(key_a.path, '/user/{id}')
+        other_check = insertion_point_key({'method': 'GET', 'url': 'http://a.com/user/2?q=b'}, point_b, 'sqli_error')
+        self.assertNotEqual(key_a, other_check)
+
+    def test_persistence_and_invalidate(self):
+        cache = ScanCache(self.cache_file)
+        key = insertion_point_key({'method': 'GET', 'url': 'http://a.com/x?id=1'},
+                                  {'type': 'url', 'name': 'id'}, 'xss')
+        self.assertIsNone(cache.get(key))
+        cache.put(key, [{'type': 'XSS', 'url': 'http://a.com/x?id=1'}])
+        self.assertTrue(cache.save())
+        self.assertFalse(cache.save())  # nada mudou
+
+        reloaded = ScanCache(self.cache_file)
+        self.assertEqual(reloaded.get(key), [{'type': 'XSS', 'url': 'http://a.com/x?id=1'}])
+        self.assertEqual(reloaded.get_stats(), {'entries': 1, 'hits': 1, 'misses': 0})
+        self.assertEqual(reloaded.invalidate('b.com'), 0)
+        self.assertEqual(reloaded.invalidate('A.com'), 1)
+        self.assertIsNone(reloaded.get(key))
+
+    def test_ttl(self):
+        cache = ScanCache(ttl=60)
+        key = ('a.com', 'GET', '/', 'url', 'q', 'xss')
+        cache.put(key, [])
+        self.assertEqual(cache.get(key), [])
+        cache.entries[key]['tested_at'] = time.time() - 120
+        self.assertIsNone(cache.get(key))
+
+    def test_invalid_file_is_ignored(self):
+        with open(self.cache_file, 'w', encoding='utf-8') as f:
+            f.write("{não é json")
+        self.assertEqual(ScanCache(self.cache_file).get_stats()['entries'], 0)
+        with open(self.cache_file, 'w', encoding='utf-8') as f:
+            json.dump({'version': 99, 'entries': [{'key': ['a'], 'result': [], 'tested_at': 0}]}, f)
+        self.assertEqual(ScanCache(self.cache_file).get_stats()['entries'], 0)
+
+
+class TestActiveScannerCache(unittest.TestCase):
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.cache_file = os.path.join(self.tmpdir.name, "cache.json")
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), CountingHandler)
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        CountingHandler.requests = 0
+        CountingHandler.reflect = False
+        self.base = f"http://127.0.0.1:{self.server.server_port}"
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.server.server_close()
+        self.tmpdir.cleanup()
+
+    def scan(self, url, force=False):
+        scanner = ActiveScanner(cache_file=self.cache_file)
+        try:
+            before = CountingHandler.requests
+            vulnerabilities = scanner.scan_request({'method': 'GET', 'url': url, 'headers': {}, 'body': ''}, force=force)
+            return vulnerabilities, CountingHandler.requests - before
+        finally:
+            scanner.close()
+
+    def test_repeated_endpoint_is_skipped_across_sessions(self):
+        CountingHandler.reflect = True
+        first, sent = self.scan(f"{self.base}/item/1?q=a")
+        self.assertGreater(sent, 0)
+        self.assertTrue(any(v['type'] == 'Cross-Site Scripting (XSS)' for v in first))
+
+        # Mesmo endpoint, outro ID e outro valor, scanner novo: tudo vem do cache salvo
+        second, sent = self.scan(f"{self.base}/item/2?q=b")
+        self.assertEqual(sent, 0)
+        self.assertEqual(sorted(v['type'] for v in second), sorted(v['type'] for v in first))
+
+        # Parâmetro novo no mesmo endpoint: só ele é testado
+        _, sent_new = self.scan(f"{self.base}/item/3?q=c&page=2")
+        self.assertGreater(sent_new, 0)
+        _, sent_again = self.scan(f"{self.base}/item/3?q=c&page=3")
+        self.assertEqual(sent_again, 0)
+
+    def test_force_rescan_bypasses_cache(self):
+        _, sent = self.scan(f"{self.base}/busca?q=a")
+        _, forced = self.scan(f"{self.base}/busca?q=a", force=True)
+        self.assertEqual(forced, sent)
+
+    def test_failed_checks_are_not_cached(self):
+        with socket.socket() as sock:
+            sock.bind(("127.0.0.1", 0))
+            closed_port = sock.getsockname()[1]
+        scanner = ActiveScanner(cache_file=self.cache_file)
+        try:
+            scanner.scan_request({'method': 'GET', 'url': f"http://127.0.0.1:{closed_port}/x?q=1",
+                                  'headers': {}, 'body': ''})
+            self.assertEqual(scanner.cache.get_stats()['entries'], 0)
+        finally:
+            scanner.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
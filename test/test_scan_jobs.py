@@ -0,0 +1,217 @@
+import json
+import os
+import sys
+import tempfile
+import threading
+import time
+import unittest
+
+# Adiciona o diretório `src` ao path para encontrar os módulos
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+
+from core.scan_jobs import (BulkScanJob, dedupe_targets, endpoint_key, make_target, normalize_path,
+                            targets_from_forms, targets_from_history, targets_from_urls)
+from core.history import RequestHistory
+
+
+class FakeScanner:
+    """Registra as requisições varridas; pode bloquear até `gate` ser liberado."""
+
+    def __init__(self, gate=None, vulnerable_path=None, failing_path=None):
+        self.lock = threading.Lock()
+        self.scanned = []
+        self.gate = gate
+        self.vulnerable_path = vulnerable_path
+        self.failing_path = failing_path
+
+    def scan_request(self, request, force=False):
+        if self.gate is not None:
+            self.gate.wait()
+        with self.lock:
+            self.scanned.append(request['url'])
+        if self.failing_path and self.failing_path in request['url']:
+            raise ConnectionError("alvo fora do ar")
+        if self.vulnerable_path and self.vulnerable_path in request['url']:
+            return [{'type': 'XSS', 'severity': 'High', 'url': request['url'], 'method': request['method'],
+                     'description': 'teste', 'evidence': 'x'}]
+        return []
+
+
+def wait_until(condition, timeout=5):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        if condition():
+            return True
+        time.sleep(0.01)
+    return False
+
+
+class TestTargets(unittest.TestCase):
+
+    def test_normalize_path(self):
+        self.assertEqual(normalize_path("/users/42/"), "/users/{id}")
+        self.assertEqual(normalize_path("/doc/3f2a9c1e-1b2c-4d5e-8f90-123456789abc?x=1"), "/doc/{id}")
+        self.assertEqual(normalize_path("/v2/items"), "/v2/items")
+        self.assertEqual(normalize_path(""), "/")
+
+    def test_dedupe_by_method_path_and_parameter_names(self):
+        targets = [
+            make_target('GET', 'http://a.com/user/1?id=1&tab=x'),
+            make_target('GET', 'http://A.com/user/2?tab=y&id=2'),       # mesmo endpoint
+            make_target('GET', 'http://a.com/user/3?id=3'),             # outros parâmetros
+            make_target('POST', 'http://a.com/user/1?id=1&tab=x'),      # outro método
+            make_target('POST', 'http://a.com/login', {'Content-Type': 'application/x-www-form-urlencoded'}, 'u=1&p=2'),
+            make_target('POST', 'http://a.com/login', {'content-type': 'application/x-www-form-urlencoded'}, 'p=3&u=4'),
+        ]
+        unique, duplicates = dedupe_targets(targets)
+        self.assertEqual(duplicates, 2)
+        self.assertEqual(len(unique), 4)
+        self.assertEqual(endpoint_key(targets[4]), ('POST', 'http://a.com', '/login', ('p', 'u')))
+
+    def test_targets_from_forms_and_urls(self):
+        forms = [
+            {'method': 'POST', 'url': 'http://a.com/login', 'page_url': 'http://a.com/',
+             'inputs': [{'name': 'user', 'value': ''}, {'name': 'pass', 'value': ''}, {'name': '', 'value': 'x'}]},
+            {'method': 'GET', 'url': 'http://a.com/busca', 'inputs': [{'name': 'q', 'value': 'abc'}]},
+            {'method': 'GET', 'url': 'http://a.com/vazio', 'inputs': []},
+        ]
+        targets = targets_from_forms(forms)
+        self.assertEqual(len(targets), 2)
+        self.assertEqual(targets[0]['body'], 'user=&pass=')
+        self.assertEqual(targets[1]['url'], 'http://a.com/busca?q=abc')
+
+        urls = targets_from_urls(['http://a.com/', 'http://a.com/item?id=1'])
+        self.assertEqual([t['url'] for t in urls], ['http://a.com/item?id=1'])
+
+    def test_targets_from_history_filter(self):
+        history = RequestHistory()
+        for host, method in [('a.com', 'GET'), ('api.a.com', 'POST'), ('b.com', 'GET')]:
+            history.history.append({'id': len(history.history) + 1, 'host': host, 'method': method,
+                                    'status': 200, 'url': f'http://{host}/x?id=1',
+                                    'request_headers': {}, 'request_body': ''})
+        self.assertEqual(len(targets_from_history(history, host='a.com')), 2)
+        self.assertEqual(len(targets_from_history(history, host='a.com', method='post')), 1)
+        self.assertEqual([t['history_id'] for t in targets_from_history(history, ids=[3])], [3])
+
+
+class TestBulkScanJob(unittest.TestCase):
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.checkpoint = os.path.join(self.tmpdir.name, "job.json")
+        self.targets = [make_target('GET', f'http://a.com/p{i}?id=1', source='history', history_id=i) for i in range(10)]
+        # Duas duplicatas, que devem ser descartadas
+        self.targets += [make_target('GET', 'http://a.com/p1?id=9'), make_target('GET', 'http://a.com/p2?id=8')]
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def test_runs_all_endpoints_once_and_reports_progress(self):
+        scanner = FakeScanner(vulnerable_path='/p3')
+        updates = []
+        job = BulkScanJob(scanner, self.targets, workers=3, checkpoint_file=self.checkpoint,
+                          on_progress=updates.append)
+        job.start()
+        self.assertTrue(job.wait(timeout=5))
+        self.assertTrue(wait_until(lambda: job.state == 'completed'))
+
+        self.assertEqual(sorted(scanner.scanned), sorted(f'http://a.com/p{i}?id=1' for i in range(10)))
+        progress = job.get_progress()
+        self.assertEqual(progress['completed'], 10)
+        self.assertEqual(progress['duplicates'], 2)
+        self.assertEqual(progress['findings'], 1)
+        self.assertEqual(progress['percent'], 100.0)
+        self.assertEqual(len(updates), 10)
+        self.assertEqual(job.findings[0]['history_id'], 3)
+
+    def test_findings_are_attached_to_history(self):
+        history = RequestHistory()
+        history.entries_by_id[3] = {'id': 3, 'vulnerabilities': []}
+        job = BulkScanJob(FakeScanner(vulnerable_path='/p3'), self.targets, history=history)
+        job.start()
+        job.wait(timeout=5)
+        self.assertEqual(len(history.entries_by_id[3]['vulnerabilities']), 1)
+
+    def test_pause_and_resume(self):
+        gate = threading.Event()
+        scanner = FakeScanner(gate=gate)
+        job = BulkScanJob(scanner, self.targets, workers=2, checkpoint_file=self.checkpoint)
+        job.start()
+        job.pause()
+        gate.set()
+        # Os workers terminam o endpoint em andamento e param
+        self.assertTrue(wait_until(lambda: len(scanner.scanned) == 2))
+        time.sleep(0.05)
+        self.assertEqual(len(scanner.scanned), 2)
+        progress = job.get_progress()
+        self.assertEqual(progress['state'], 'paused')
+        self.assertIsNotNone(progress['eta'])
+
+        job.resume()
+        self.assertTrue(job.wait(timeout=5))
+        self.assertEqual(len(scanner.scanned), 10)
+
+    def test_cancel_and_resume_from_checkpoint(self):
+        gate = threading.Event()
+        job = BulkScanJob(FakeScanner(gate=gate, vulnerable_path='/p0'), self.targets, workers=1,
+                          checkpoint_file=self.checkpoint)
+        job.start()
+        job.cancel()
+        gate.set()
+        self.assertTrue(job.wait(timeout=5))
+        self.assertTrue(wait_until(lambda: os.path.exists(self.checkpoint)))
+        self.assertEqual(job.get_progress()['state'], 'cancelled')
+        self.assertIsNone(job.get_progress()['eta'])
+
+        with open(self.checkpoint, encoding='utf-8') as f:
+            saved = json.load(f)
+        self.assertEqual(saved['done'], [0])
+        self.assertEqual(len(saved['findings']), 1)
+
+        scanner = FakeScanner()
+        resumed = BulkScanJob.from_checkpoint(self.checkpoint, scanner, workers=2)
+        self.assertEqual(resumed.get_progress()['remaining'], 9)
+        self.assertEqual(resumed.duplicates, 2)
+        resumed.start()
+        self.assertTrue(resumed.wait(timeout=5))
+        self.assertNotIn('http://a.com/p0?id=1', scanner.scanned)
+        self.assertEqual(len(scanner.scanned), 9)
+        self.assertEqual(resumed.get_progress()['findings'], 1)
+
+    def test_failed_endpoints_are_retried_on_resume(self):
+        job = BulkScanJob(FakeScanner(failing_path='/p4'), self.targets, workers=2, checkpoint_file=self.checkpoint)
+        job.start()
+        self.assertTrue(job.wait(timeout=5))
+        progress = job.get_progress()
+        self.assertEqual((progress['state'], progress['completed'], progress['failed'], progress['errors']),
+                         ('completed', 9, 1, 1))
+        with open(self.checkpoint, encoding='utf-8') as f:
+            saved = json.load(f)
+        self.assertNotIn(4, saved['done'])
+        self.assertEqual(saved['failed'], [4])
+
+        scanner = FakeScanner()
+        resumed = BulkScanJob.from_checkpoint(self.checkpoint, scanner)
+        self.assertEqual(resumed.get_progress()['remaining'], 1)
+        resumed.start()
+        self.assertTrue(resumed.wait(timeout=5))
+        self.assertEqual(scanner.scanned, ['http://a.com/p4?id=1'])
+        progress = resumed.get_progress()
+        self.assertEqual((progress['completed'], progress['failed']), (10, 0))
+
+    def test_invalid_checkpoint_version(self):
+        with open(self.checkpoint, 'w', encoding='utf-8') as f:
+            json.dump({'version': 99, 'targets': []}, f)
+        with self.assertRaises(ValueError):
+            BulkScanJob.from_checkpoint(self.checkpoint, FakeScanner())
+
+    def test_start_twice(self):
+        job = BulkScanJob(FakeScanner(), self.targets)
+        job.start()
+        with self.assertRaises(RuntimeError):
+            job.start()
+        job.wait(timeout=5)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,126 @@
+import unittest
+import os
+import sys
+import threading
+from unittest.mock import Mock
+
+# Adiciona o diretório `src` ao path para encontrar os módulos
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+
+from core.history import RequestHistory
+from core.config import InterceptConfig
+from core.addon import InterceptAddon
+from core.scan_pipeline import PassiveScanPipeline
+
+
+class BlockingScanner:
+    """Scanner que só termina quando o teste libera o evento."""
+
+    def __init__(self):
+        self.release = threading.Event()
+
+    def scan_response(self, request_data, response_data):
+        self.release.wait(5)
+        return []
+
+
+class FlakyScanner:
+    """Scanner que falha na primeira chamada e depois reporta um achado."""
+
+    def __init__(self):
+        self.calls = 0
+
+    def scan_response(self, request_data, response_data):
+        self.calls += 1
+        if self.calls == 1:
+            raise RuntimeError("falhou")
+        return [{'type': 'Information Disclosure', 'severity': 'Low'}]
+
+
+class TestPassiveScanPipeline(unittest.TestCase):
+
+    def setUp(self):
+        self.mock_flow = Mock()
+        self.mock_flow.request = Mock()
+        self.mock_flow.request.pretty_host = "exemplo.com"
+        self.mock_flow.request.method = "GET"
+        self.mock_flow.request.pretty_url = "http://exemplo.com/busca?q=1'"
+        self.mock_flow.request.path = "/busca?q=1'"
+        self.mock_flow.request.headers = {"User-Agent": "Test"}
+        self.mock_flow.request.content = b""
+        self.mock_flow.request.query = {}
+
+        self.mock_flow.response = Mock()
+        self.mock_flow.response.status_code = 500
+        self.mock_flow.response.headers = {"Content-Type": "text/html"}
+        self.mock_flow.response.content = b"You have an error in your SQL syntax near ''"
+
+    def test_findings_attached_to_history(self):
+        """Os achados do worker devem ser anexados à entrada do histórico."""
+        history = RequestHistory()
+        pipeline = PassiveScanPipeline(history=history)
+        addon = InterceptAddon(InterceptConfig("test_pipeline_config.json"), history, scan_pipeline=pipeline)
+
+        addon.response(self.mock_flow)
+        self.assertTrue(pipeline.wait_idle(timeout=5))
+        pipeline.stop()
+
+        entry = history.get_entry_by_id(1)
+        self.assertTrue(any(v['type'] == 'SQL Injection' for v in entry['vulnerabilities']))
+        self.assertTrue(all(v['url'] == "http://exemplo.com/busca?q=1'" for v in entry['vulnerabilities']))
+
+        stats = pipeline.get_stats()
+        self.assertEqual(stats['scanned'], 1)
+        self.assertGreaterEqual(stats['findings'], 1)
+        self.assertGreaterEqual(stats['scan_latency_avg_ms'], 0)
+
+    def test_failed_scans_are_not_cached_and_duplicates_get_findings(self):
+        history = Mock()
+        scanner = FlakyScanner()
+        pipeline = PassiveScanPipeline(scanner=scanner, history=history, num_workers=1)
+        request_data = {'method': 'GET', 'url': 'http://exemplo.com/lib.js', 'headers': {}, 'body': b''}
+        response_data = {'status': 200, 'headers': {}, 'body': b'conteudo'}
+        for entry_id in (1, 2, 3):
+            self.assertTrue(pipeline.submit(entry_id, request_data, response_data))
+            self.assertTrue(pipeline.wait_idle(timeout=5))
+        pipeline.stop()
+
+        # A falha não marca a resposta como escaneada: a segunda cópia é escaneada de novo
+        self.assertEqual(scanner.calls, 2)
+        stats = pipeline.get_stats()
+        self.assertEqual((stats['errors'], stats['scanned'], stats['skipped']), (1, 1, 1))
+        # A terceira cópia não é escaneada, mas a entrada recebe os achados da segunda
+        finding = {'type': 'Information Disclosure', 'severity': 'Low',
+                   'url': 'http://exemplo.com/lib.js', 'method': 'GET'}
+        self.assertEqual([c.args for c in history.add_vulnerabilities_to_entry.call_args_list],
+                         [(2, [finding]), (3, [finding])])
+
+    def test_drop_policy_when_queue_is_full(self):
+        """Com a fila cheia a política 'drop' descarta em vez de bloquear o hook."""
+        scanner = BlockingScanner()
+        pipeline = PassiveScanPipeline(scanner=scanner, num_workers=1, max_queue_size=2, overflow_policy='drop')
+
+        response_data = {'status': 200, 'headers': {}, 'body': b'ok'}
+        accepted = [
+            pipeline.submit(None, {'method': 'GET', 'url': f'http://exemplo.com/{i}', 'headers': {}, 'body': b''}, response_data)
+            for i in range(10)
+        ]
+
+        scanner.release.set()
+        self.assertTrue(pipeline.wait_idle(timeout=5))
+        pipeline.stop()
+
+        stats = pipeline.get_stats()
+        self.assertIn(False, accepted)
+        self.assertEqual(stats['submitted'], 10)
+        self.assertEqual(stats['dropped'], accepted.count(False))
+        self.assertEqual(stats['scanned'], accepted.count(True))
+        self.assertLessEqual(stats['max_queue_depth'], 2)
+
+    def test_invalid_overflow_policy(self):
+        with self.assertRaises(ValueError):
+            PassiveScanPipeline(overflow_policy='invalida')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,95 @@
+import unittest
+import os
+import sys
+
+# Adiciona o diretório `src` ao path para encontrar os módulos
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+
+from core.scan_policy import ScanPolicy
+from core.scan_pipeline import PassiveScanPipeline
+
+
+class TestScanPolicy(unittest.TestCase):
+
+    def setUp(self):
+        self.policy = ScanPolicy(max_body_size=1024, head_bytes=100, tail_bytes=50)
+
+    def test_skip_binary_content_types(self):
+        """Imagens, fontes e wasm não devem ser escaneados."""
+        self.assertFalse(self.policy.admit({'Content-Type': 'image/png', 'Content-Length': '2048'}))
+        self.assertFalse(self.policy.admit({'content-type': 'font/woff2'}))
+        self.assertFalse(self.policy.admit({'Content-Type': 'application/wasm'}, body_size=10))
+        self.assertTrue(self.policy.admit({'Content-Type': 'text/html; charset=utf-8'}))
+        self.assertTrue(self.policy.admit({}))
+
+        stats = self.policy.get_stats()
+        self.assertEqual(stats['policies']['content_type']['responses'], 3)
+        self.assertEqual(stats['policies']['content_type']['bytes'], 2058)
+
+    def test_truncate_huge_body(self):
+        """Bodies grandes são reduzidos ao início e ao fim."""
+        body = b'A' * 100 + b'M' * 5000 + b'Z' * 50
+        result = self.policy.truncate(body, 'http://exemplo.com/app.js')
+        self.assertEqual(result, b'A' * 100 + b'\n' + b'Z' * 50)
+
+        stats = self.policy.get_stats()
+        self.assertEqual(stats['policies']['truncated']['bytes'], 5000)
+        self.assertEqual(stats['bytes_scanned'], len(result))
+
+    def _scanned_before(self, request, response, findings=()):
+        """Consulta o cache e, se a resposta é nova, a registra como escaneada."""
+        key = self.policy.cache_key(request, response)
+        cached = self.policy.cached_findings(key, len(response['body']))
+        if cached is None:
+            self.policy.remember(key, list(findings))
+        return cached
+
+    def test_cache_by_etag_and_hash(self):
+        """Assets idênticos (mesma URL + ETag/hash) são escaneados uma única vez."""
+        request = {'method': 'GET', 'url': 'http://exemplo.com/lib.js'}
+        self.assertIsNone(self._scanned_before(request, {'headers': {'ETag': '"v1"'}, 'body': b'abc'}))
+        self.assertEqual(self._scanned_before(request, {'headers': {'ETag': '"v1"'}, 'body': b'abc'}), [])
+        self.assertIsNone(self._scanned_before(request, {'headers': {'ETag': '"v2"'}, 'body': b'abc'}))
+
+        other = {'method': 'GET', 'url': 'http://exemplo.com/page'}
+        finding = {'type': 'Information Disclosure', 'url': 'http://exemplo.com/page'}
+        self.assertIsNone(self._scanned_before(other, {'headers': {}, 'body': b'conteudo'}, [finding]))
+        self.assertEqual(self._scanned_before(other, {'headers': {}, 'body': b'conteudo'}), [finding])
+        self.assertIsNone(self._scanned_before(other, {'headers': {}, 'body': b'conteudo novo'}))
+
+        self.assertEqual(self.policy.get_stats()['policies']['cached']['responses'], 2)
+
+    def test_cache_records_only_completed_scans(self):
+        request = {'method': 'GET', 'url': 'http://exemplo.com/lib.js'}
+        response = {'headers': {}, 'body': b'abc'}
+        key = self.policy.cache_key(request, response)
+        # Consultar não registra: até `remember`, a resposta continua a escanear
+        self.assertIsNone(self.policy.cached_findings(key))
+        self.assertIsNone(self.policy.cached_findings(key))
+        self.policy.remember(key, [])
+        self.assertEqual(self.policy.cached_findings(key), [])
+
+    def test_post_responses_are_not_cached(self):
+        """Respostas de POST dependem do body da requisição e são sempre escaneadas."""
+        request = {'method': 'POST', 'url': 'http://exemplo.com/login'}
+        self.assertIsNone(self.policy.cache_key(request, {'headers': {}, 'body': b'erro'}))
+        self.policy.remember(None, [])
+        self.assertEqual(self.policy.get_stats()['cache_entries'], 0)
+
+    def test_pipeline_skips_cached_responses(self):
+        pipeline = PassiveScanPipeline()
+        request_data = {'method': 'GET', 'url': 'http://exemplo.com/', 'headers': {}, 'body': b''}
+        response_data = {'status': 200, 'headers': {}, 'body': b'ok'}
+        pipeline.submit(None, request_data, response_data)
+        pipeline.submit(None, request_data, response_data)
+        self.assertTrue(pipeline.wait_idle(timeout=5))
+        pipeline.stop()
+
+        stats = pipeline.get_stats()
+        self.assertEqual(stats['scanned'], 1)
+        self.assertEqual(stats['skipped'], 1)
+        self.assertEqual(stats['policy']['bytes_scanned'], 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,161 @@
+import os
+import sys
+import threading
+import time
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Adiciona o diretório `src` ao path para encontrar os módulos
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+
+from core.active_scanner import ActiveScanner
+from core.scan_scheduler import ScanJob, ScanScheduler
+
+
+class ConcurrencyProbe:
+    """Mede quantos jobs rodam ao mesmo tempo, no total e por host."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.active = {}
+        self.exclusive = set()
+        self.peak = {}
+        self.peak_total = 0
+        self.exclusive_overlaps = 0
+
+    def job(self, host, exclusive=False, duration=0.02, result=None):
+        def run():
+            with self.lock:
+                self.active[host] = self.active.get(host, 0) + 1
+                # Um job exclusivo não pode dividir o host com nenhum outro
+                if host in self.exclusive or (exclusive and self.active[host] > 1):
+                    self.exclusive_overlaps += 1
+                if exclusive:
+                    self.exclusive.add(host)
+                self.peak[host] = max(self.peak.get(host, 0), self.active[host])
+                self.peak_total = max(self.peak_total, sum(self.active.values()))
+            time.sleep(duration)
+            with self.lock:
+                self.active[host] -= 1
+                self.exclusive.discard(host)
+            return result or []
+        return ScanJob(host=host, func=run, exclusive=exclusive)
+
+
+class TestScanScheduler(unittest.TestCase):
+
+    def setUp(self):
+        self.scheduler = ScanScheduler(max_workers=6, max_per_host=2)
+
+    def tearDown(self):
+        self.scheduler.shutdown()
+
+    def test_limits_and_result_order(self):
+        probe = ConcurrencyProbe()
+        jobs = [probe.job(f"host{i % 3}", result=[{'id': i}]) for i in range(24)]
+        results = self.scheduler.run(jobs)
+        self.assertEqual([r[0]['id'] for r in results], list(range(24)))
+        self.assertLessEqual(max(probe.peak.values()), 2)
+        self.assertLessEqual(probe.peak_total, 6)
+        self.assertGreater(probe.peak_total, 2)
+
+    def test_exclusive_jobs_run_alone_on_host(self):
+        probe = ConcurrencyProbe()
+        jobs = []
+        for i in range(12):
+            jobs.append(probe.job("alvo", exclusive=(i % 3 == 0)))
+        jobs.append(probe.job("outro", duration=0.05))
+        self.scheduler.run(jobs)
+        self.assertEqual(probe.exclusive_overlaps, 0)
+        self.assertEqual(self.scheduler.get_stats()['exclusive_jobs'], 4)
+
+    def test_waiting_jobs_do_not_hold_pool_threads(self):
+        scheduler = ScanScheduler(max_workers=2, max_per_host=1)
+        self.addCleanup(scheduler.shutdown)
+        probe = ConcurrencyProbe()
+        finished = {}
+        started = time.perf_counter()
+
+        def quick():
+            finished['outro'] = time.perf_counter() - started
+            return []
+
+        # Os jobs de "lento" que não cabem no host esperam fora do pool: "outro" roda na hora
+        jobs = [probe.job("lento", duration=0.2) for _ in range(4)] + [ScanJob("outro", quick)]
+        scheduler.run(jobs)
+        self.assertLess(finished['outro'], 0.2)
+        self.assertEqual(probe.peak["lento"], 1)
+
+    def test_failing_job_does_not_stop_others(self):
+        def boom():
+            raise RuntimeError("falhou")
+        results = self.scheduler.run([ScanJob("h", boom), ScanJob("h", lambda: [{'ok': True}])])
+        self.assertEqual(results, [[], [{'ok': True}]])
+        self.assertEqual(self.scheduler.get_stats()['jobs_failed'], 1)
+
+    def test_invalid_limits(self):
+        with self.assertRaises(ValueError):
+            ScanScheduler(max_workers=0)
+
+
+class SlowHandler(BaseHTTPRequestHandler):
+    """Responde após um atraso fixo e registra a concorrência observada pelo servidor."""
+
+    lock = threading.Lock()
+    active = 0
+    peak = 0
+
+    def do_GET(self):
+        cls = type(self)
+        with cls.lock:
+            cls.active += 1
+            cls.peak = max(cls.peak, cls.active)
+        time.sleep(0.01)
+        with cls.lock:
+            cls.active -= 1
+        body = b"<html>ok</html>"
+        self.send_response(200)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+class TestParallelActiveScan(unittest.TestCase):
+
+    def setUp(self):
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), SlowHandler)
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        SlowHandler.peak = 0
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def test_scan_respects_per_host_cap(self):
+        scanner = ActiveScanner(max_workers=8, max_per_host=3)
+        params = "&".join(f"p{i}={i}" for i in range(6))
+        request = {
+            'method': 'GET',
+            'url': f"http://127.0.0.1:{self.server.server_port}/busca?{params}",
+            'headers': {'User-Agent': 'teste'},
+            'body': '',
+        }
+        try:
+            vulnerabilities = scanner.scan_request(request)
+        finally:
+            scanner.close()
+
+        self.assertEqual(vulnerabilities, [])
+        self.assertEqual(request['headers'], {'User-Agent': 'teste'})
+        self.assertLessEqual(SlowHandler.peak, 3)
+        self.assertGreater(SlowHandler.peak, 1)
+        stats = scanner.scheduler.get_stats()
+        self.assertEqual(stats['jobs_completed'], 6 * len(ActiveScanner.CHECKS))
+        self.assertEqual(stats['exclusive_jobs'], 6 * 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
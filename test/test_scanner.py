@@ -3,12 +3,13 @@
 Test script para verificar a funcionalidade do Scanner de Vulnerabilidades
 """
 import os
+import re
 import sys
 
 # Adiciona o diretório `src` ao path para encontrar os módulos
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
 
-from core.scanner import VulnerabilityScanner
+from core.scanner import VulnerabilityScanner, CompiledRuleSet
 
 
 def test_sql_injection_detection():
@@ -248,6 +249,35 @@ def test_report_formatting():
     return True
 
 
+def test_compiled_rule_set():
+    """Testa o motor de regras pré-compilado"""
+    print("\nTestando motor de regras compilado...")
+
+    rules = CompiledRuleSet([
+        (r"(?i)sql\s+syntax", 'sql'),
+        (r"(?i)(password|passwd|pwd)\s*[:=]\s*(\w{3,})", 'senha'),
+        (r"[\\/]etc[\\/]passwd", 'passwd'),
+    ], re.IGNORECASE)
+
+    # Cada regra tem um literal obrigatório usado como pré-filtro
+    assert rules.literals[0] == ('syntax',), f"Literal inesperado: {rules.literals[0]}"
+    assert rules.candidates("nada de interessante aqui") == [], "Body limpo não deveria ter candidatos"
+
+    text = "Login: PWD=segredo ... You have an error in your SQL  Syntax near"
+    first = rules.search(text)
+    assert first is not None and first.label == 'senha', f"Match mais à esquerda deveria ser 'senha': {first}"
+    assert first.evidence == "PWD=segredo", f"Evidência incorreta: {first.evidence}"
+
+    labels = [m.label for m in rules.first_per_rule(text)]
+    assert labels == ['sql', 'senha'], f"Deveria identificar as duas regras na ordem: {labels}"
+
+    all_matches = [(m.label, m.evidence) for m in rules.finditer(text + " /etc/passwd")]
+    assert ('passwd', '/etc/passwd') in all_matches, f"finditer deveria identificar a regra: {all_matches}"
+    print(f"✓ Regras identificadas: {labels}")
+
+    return True
+
+
 if __name__ == "__main__":
     try:
         print("="*80)
@@ -263,6 +293,7 @@ if __name__ == "__main__":
             test_csrf_detection,
             test_no_vulnerabilities,
             test_report_formatting,
+            test_compiled_rule_set,
         ]
         
         for test in tests:
@@ -0,0 +1,99 @@
+import unittest
+import os
+import sys
+import tempfile
+from unittest.mock import Mock
+
+# Adiciona o diretório `src` ao path para encontrar os módulos
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+
+from core.sqlite_history import SQLiteRequestHistory
+
+
+class TestSQLiteHistory(unittest.TestCase):
+
+    def setUp(self):
+        """Configura um mock de flow e um banco temporário."""
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.db_path = os.path.join(self.tmpdir.name, "history.db")
+
+        self.mock_flow = Mock()
+        self.mock_flow.request = Mock()
+        self.mock_flow.request.pretty_host = "exemplo.com"
+        self.mock_flow.request.method = "POST"
+        self.mock_flow.request.pretty_url = "http://exemplo.com/login"
+        self.mock_flow.request.path = "/login"
+        self.mock_flow.request.headers = {"User-Agent": "Test"}
+        self.mock_flow.request.content = b"user=admin"
+
+        self.mock_flow.response = Mock()
+        self.mock_flow.response.status_code = 200
+        self.mock_flow.response.headers = {"Content-Type": "text/html"}
+        self.mock_flow.response.content = b"<html>ok</html>"
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def test_same_api_as_memory_history(self):
+        history = SQLiteRequestHistory(self.db_path)
+        self.assertEqual(len(history.get_history()), 0)
+
+        self.assertEqual(history.add_request(self.mock_flow), 1)
+        self.assertEqual(history.add_request(self.mock_flow), 2)
+        self.assertEqual(history.add_request(self.mock_flow), 3)
+
+        entry = history.get_history()[0]
+        self.assertEqual(entry['host'], "exemplo.com")
+        self.assertEqual(entry['method'], "POST")
+        self.assertEqual(entry['status'], 200)
+        self.assertEqual(entry['request_headers'], {"User-Agent": "Test"})
+
+        self.assertEqual([e['id'] for e in history.get_new_entries(1)], [2, 3])
+        self.assertEqual(history.get_new_entries(3), [])
+        self.assertIsNone(history.get_entry_by_id(99))
+
+        history.clear_history()
+        self.assertEqual(len(history.get_history()), 0)
+        self.assertEqual(history.add_request(self.mock_flow), 1)
+        history.close()
+
+    def test_bodies_are_loaded_lazily(self):
+        history = SQLiteRequestHistory(self.db_path)
+        history.add_request(self.mock_flow)
+
+        entry = history.get_entry_by_id(1)
+        self.assertNotIn('response_body', dict(entry))
+        self.assertEqual(entry['request_body'], "user=admin")
+        self.assertEqual(entry.get('response_body'), "<html>ok</html>")
+        history.close()
+
+    def test_persistence_and_vulnerabilities(self):
+        history = SQLiteRequestHistory(self.db_path)
+        history.add_request(self.mock_flow)
+        vuln = {'type': 'XSS', 'severity': 'High', 'description': 'teste'}
+        self.assertTrue(history.add_vulnerabilities_to_entry(1, [vuln]))
+        self.assertTrue(history.add_vulnerabilities_to_entry(1, [vuln]))
+        self.assertFalse(history.add_vulnerabilities_to_entry(42, [vuln]))
+        history.close()
+
+        # Reabre o banco: as entradas e os IDs continuam de onde pararam
+        reopened = SQLiteRequestHistory(self.db_path)
+        self.assertEqual(reopened.get_entry_by_id(1)['vulnerabilities'], [vuln])
+        self.assertEqual(reopened.add_request(self.mock_flow), 2)
+        reopened.close()
+
+    def test_size_limit_and_query(self):
+        history = SQLiteRequestHistory(self.db_path, max_items=5)
+        for i in range(10):
+            self.mock_flow.response.status_code = 200 if i % 2 else 404
+            history.add_request(self.mock_flow)
+
+        self.assertEqual(history.count(), 5)
+        self.assertEqual([e['id'] for e in history.get_history()], [6, 7, 8, 9, 10])
+        self.assertEqual([e['id'] for e in history.query(status=404)], [7, 9])
+        self.assertEqual(len(history.query(host="exemplo.com", method="POST", limit=2)), 2)
+        history.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,155 @@
+import os
+import random
+import re
+import sys
+import unittest
+
+# Adiciona o diretório `src` ao path para encontrar os módulos
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+
+from core.active_scanner import ActiveScanner
+from core.timing_oracle import TimingOracle
+
+
+class SimulatedTarget:
+    """Alvo com latência aleatória; se `vulnerable`, executa o atraso pedido."""
+
+    def __init__(self, latency=0.05, jitter=0.01, vulnerable=False, seed=1):
+        self.random = random.Random(seed)
+        self.latency = latency
+        self.jitter = jitter
+        self.vulnerable = vulnerable
+        self.requests = 0
+        self.slept = 0.0
+
+    def sample(self):
+        self.requests += 1
+        return self.latency + self.random.uniform(0, self.jitter)
+
+    def probe(self, delay):
+        elapsed = self.sample()
+        if self.vulnerable:
+            self.slept += delay
+            elapsed += delay
+        return elapsed
+
+
+class TestTimingOracle(unittest.TestCase):
+
+    def test_detects_delay_with_short_adaptive_delay(self):
+        oracle = TimingOracle()
+        target = SimulatedTarget(vulnerable=True)
+        verdict = oracle.test("endpoint", target.probe, target.sample)
+        self.assertTrue(verdict.vulnerable)
+        self.assertEqual(verdict.delay, 1)
+        self.assertEqual([delay for delay, _ in verdict.observations], [1, 0, 2])
+        # 5 amostras de latência + 3 sondas, 3 segundos de atraso no total
+        self.assertEqual(target.requests, 8)
+        self.assertEqual(target.slept, 3)
+        self.assertIn("atraso pedido", verdict.evidence)
+
+    def test_negative_stops_after_one_probe(self):
+        oracle = TimingOracle()
+        target = SimulatedTarget(vulnerable=False)
+        verdict = oracle.test("endpoint", target.probe, target.sample)
+        self.assertFalse(verdict.vulnerable)
+        self.assertEqual(len(verdict.observations), 1)
+        self.assertEqual(oracle.get_stats()['early_stops'], 1)
+
+    def test_baseline_is_cached_per_endpoint(self):
+        oracle = TimingOracle()
+        target = SimulatedTarget()
+        for _ in range(3):
+            oracle.test("a", target.probe, target.sample)
+        oracle.test("b", target.probe, target.sample)
+        # 2 endpoints x 5 amostras + 4 sondas
+        self.assertEqual(target.requests, 14)
+        self.assertEqual(oracle.get_stats()['baselines_cached'], 2)
+        oracle.invalidate("a")
+        self.assertEqual(oracle.get_stats()['baselines_cached'], 1)
+
+    def test_jittery_target_gets_longer_delay(self):
+        oracle = TimingOracle()
+        target = SimulatedTarget(latency=0.2, jitter=0.6, vulnerable=True)
+        verdict = oracle.test("endpoint", target.probe, target.sample)
+        self.assertTrue(verdict.vulnerable)
+        self.assertGreater(verdict.delay, 1)
+        self.assertLessEqual(verdict.delay, oracle.max_delay)
+
+    def test_spurious_slow_response_is_not_confirmed(self):
+        oracle = TimingOracle()
+        target = SimulatedTarget()
+        slow = iter([3.0, 0.05, 0.05])  # um pico isolado de latência e depois tudo normal
+        verdict = oracle.test("endpoint", lambda delay: next(slow), target.sample)
+        self.assertFalse(verdict.vulnerable)
+        self.assertEqual(verdict.reason, "atraso não se repetiu")
+
+    def test_slow_control_is_not_confirmed(self):
+        oracle = TimingOracle()
+        target = SimulatedTarget()
+        slow = iter([3.0, 3.0])  # o alvo ficou lento para tudo
+        verdict = oracle.test("endpoint", lambda delay: next(slow), target.sample)
+        self.assertFalse(verdict.vulnerable)
+        self.assertEqual(verdict.reason, "controle também atrasou (latência instável)")
+
+    def test_no_false_positives_on_noisy_targets(self):
+        oracle = TimingOracle()
+        false_positives = 0
+        for seed in range(200):
+            target = SimulatedTarget(latency=0.1, jitter=0.3, seed=seed)
+            # Picos ocasionais de latência, sem relação com o payload
+            spikes = random.Random(seed)
+            sample = lambda: target.sample() + (1.5 if spikes.random() < 0.2 else 0)
+            false_positives += oracle.test(seed, lambda delay: sample(), sample).vulnerable
+        self.assertLessEqual(false_positives, 2)
+
+    def test_invalid_parameters(self):
+        with self.assertRaises(ValueError):
+            TimingOracle(baseline_samples=1)
+        with self.assertRaises(ValueError):
+            TimingOracle(min_delay=3, max_delay=2)
+
+
+class TestActiveScannerTiming(unittest.TestCase):
+
+    def setUp(self):
+        self.scanner = ActiveScanner()
+        self.request = {'method': 'GET', 'url': 'http://alvo.local/item?id=1', 'headers': {}, 'body': ''}
+        self.point = {'type': 'url', 'name': 'id', 'value': '1'}
+
+    def tearDown(self):
+        self.scanner.close()
+
+    def fake_timed_request(self, vulnerable_marker):
+        """Simula o alvo: atrasa apenas payloads que contêm `vulnerable_marker`."""
+        def timed_request(base_request, point, payload, delayed=False):
+            match = re.search(r'(?:SLEEP\(|pg_sleep\(|sleep |/t )(\d+)', payload)
+            if match and vulnerable_marker in payload:
+                return 0.05 + int(match.group(1))
+            return 0.05
+        return timed_request
+
+    def test_time_based_sqli_uses_oracle(self):
+        self.scanner._timed_request = self.fake_timed_request("pg_sleep")
+        vulns = self.scanner._check_time_based_sqli(self.request, self.point)
+        self.assertEqual(len(vulns), 1)
+        self.assertIn("PostgreSQL", vulns[0]['description'])
+        # A latência normal do endpoint foi medida uma vez para os três payloads
+        stats = self.scanner.timing_oracle.get_stats()
+        self.assertEqual(stats['baselines_cached'], 1)
+        self.assertEqual(stats['tests'], 3)
+
+    def test_time_based_command_injection(self):
+        self.scanner._timed_request = self.fake_timed_request("| sleep")
+        vulns = self.scanner._check_time_based_command_injection(self.request, self.point)
+        self.assertEqual(len(vulns), 1)
+        self.assertIn("| sleep 1", vulns[0]['evidence'])
+
+    def test_not_vulnerable(self):
+        self.scanner._timed_request = self.fake_timed_request("nada")
+        self.assertEqual(self.scanner._check_time_based_sqli(self.request, self.point), [])
+        self.assertEqual(self.scanner.timing_oracle.get_stats()['requests_sent'], 5 + 3)
+
+
+if __name__ == '__main__':
+    unittest.main()
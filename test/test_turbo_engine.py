@@ -0,0 +1,159 @@
+import os
+import socket
+import sys
+import threading
+import time
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Adiciona o diretório `src` ao path para encontrar os módulos
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+
+from core.advanced_sender import AdvancedSender
+from core.turbo_engine import TurboEngine, wire_request
+
+
+class PipelineHandler(BaseHTTPRequestHandler):
+    """Servidor HTTP/1.1 que ecoa o path, registra a chegada de cada requisição e fecha a cada `close_every`."""
+
+    protocol_version = "HTTP/1.1"
+    wbufsize = -1
+    lock = threading.Lock()
+    connections = 0
+    arrivals = []
+    close_every = 0
+
+    def setup(self):
+        super().setup()
+        self.handled = 0
+        with type(self).lock:
+            type(self).connections += 1
+
+    def do_GET(self):
+        with type(self).lock:
+            type(self).arrivals.append((time.perf_counter(), self.path))
+        self.handled += 1
+        body = f"path={self.path}".encode()
+        self.send_response(200)
+        self.send_header("Content-Length", str(len(body)))
+        if type(self).close_every and self.handled % type(self).close_every == 0:
+            self.send_header("Connection", "close")
+            self.close_connection = True
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_POST(self):
+        length = int(self.headers.get('Content-Length', 0))
+        self.path = f"{self.path}|{self.rfile.read(length).decode()}"
+        self.do_GET()
+
+    def finish(self):
+        super().finish()
+        # Fechamento "lingering", como nginx/Apache: descarta o que o cliente já
+        # enviou em pipeline para que o RST não apague respostas ainda não lidas
+        self.connection.shutdown(socket.SHUT_WR)
+        self.connection.settimeout(1)
+        try:
+            while self.connection.recv(65536):
+                pass
+        except OSError:
+            pass
+
+    def log_message(self, *args):
+        pass
+
+
+class TestTurboEngine(unittest.TestCase):
+
+    def setUp(self):
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), PipelineHandler)
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        PipelineHandler.connections = 0
+        PipelineHandler.arrivals = []
+        PipelineHandler.close_every = 0
+        self.port = self.server.server_port
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def _run(self, engine, paths, race_size=0):
+        results = {}
+        engine.run(paths, lambda path: f"GET {path} HTTP/1.1\nHost: 127.0.0.1:{self.port}\n\n",
+                   lambda path, response, _: results.update({path: response}), race_size=race_size)
+        return results
+
+    def test_wire_request(self):
+        wire = wire_request("POST /login HTTP/1.1\nHost: 127.0.0.1:8080\nX-B: 2\nContent-Length: 999\n"
+                            "Connection: close\nx-a: 1\n\nuser=admin&senha=olá\n")
+        self.assertEqual(wire.target, ('http', '127.0.0.1', 8080))
+        self.assertEqual(wire.url, "http://127.0.0.1:8080/login")
+        self.assertEqual(wire.data, "POST /login HTTP/1.1\r\nHost: 127.0.0.1:8080\r\nX-B: 2\r\nx-a: 1\r\n"
+                                    "Connection: keep-alive\r\nContent-Length: 21\r\n\r\n"
+                                    "user=admin&senha=olá".encode('utf-8'))
+        self.assertEqual(wire_request("GET / HTTP/1.1\nHost: alvo.com\n\n").target, ('https', 'alvo.com', 443))
+        with self.assertRaises(ValueError):
+            wire_request("GET / HTTP/1.1\nAccept: */*\n\n")
+
+    def test_pipelined_responses_match_requests(self):
+        engine = TurboEngine(connections=2, pipeline=16)
+        paths = [f"/p/{i}" for i in range(200)]
+        results = self._run(engine, paths)
+        self.assertEqual(sorted(results), sorted(paths))
+        for path, response in results.items():
+            self.assertEqual((response.status_code, response.text), (200, f"path={path}"))
+        self.assertEqual(PipelineHandler.connections, 2)
+        self.assertEqual(engine.get_stats()['requests'], 200)
+
+    def test_requests_are_resent_when_server_closes(self):
+        PipelineHandler.close_every = 5
+        engine = TurboEngine(connections=2, pipeline=8)
+        paths = [f"/c/{i}" for i in range(60)]
+        results = self._run(engine, paths)
+        self.assertEqual({path: response.text for path, response in results.items()},
+                         {path: f"path={path}" for path in paths})
+        self.assertGreater(engine.get_stats()['resent'], 0)
+        # Só as requisições não processadas antes do fechamento são reenviadas
+        self.assertEqual(sorted(path for _, path in PipelineHandler.arrivals), sorted(paths))
+
+    def test_unreachable_target(self):
+        results = {}
+        TurboEngine(connections=1, retries=1).run(
+            range(3), lambda _: "GET / HTTP/1.1\nHost: 127.0.0.1:1\n\n",
+            lambda job, response, _: results.update({job: response}))
+        self.assertEqual(results, {0: None, 1: None, 2: None})
+
+    def test_last_byte_sync_releases_group_together(self):
+        engine = TurboEngine(race_warmup=0.2)
+        started = time.perf_counter()
+        results = self._run(engine, [f"/race/{i}" for i in range(10)], race_size=10)
+        self.assertEqual(len(results), 10)
+        self.assertTrue(all(response.status_code == 200 for response in results.values()))
+        arrivals = [arrival for arrival, _ in PipelineHandler.arrivals]
+        # Nenhuma requisição fica completa antes da liberação; todas chegam juntas
+        self.assertGreaterEqual(min(arrivals) - started, 0.2)
+        self.assertLess(max(arrivals) - min(arrivals), 0.05)
+        self.assertEqual(PipelineHandler.connections, 10)
+        self.assertIsNotNone(engine.get_stats()['last_race'])
+
+    def test_intruder_turbo_engine(self):
+        sender = AdvancedSender(
+            raw_request=f"POST /login HTTP/1.1\nHost: 127.0.0.1:{self.port}\nContent-Length: 0\n\n"
+                        "user=admin&senha=§x§",
+            payload_sets=[[f"s{i}" for i in range(40)]],
+            engine='turbo', connections=2, pipeline=8,
+        )
+        messages = []
+        sender.run_attack(messages.append)
+        results = [m['data'] for m in messages if m['type'] == 'result']
+        self.assertEqual(len(results), 40)
+        for data in results:
+            self.assertEqual(data['response'].text, f"path=/login|user=admin&senha={data['payloads'][0]}")
+        self.assertEqual(sender.last_stats['errors'], 0)
+
+        with self.assertRaises(ValueError):
+            AdvancedSender("GET / HTTP/1.1\nHost: a\n\n", race_size=5)
+
+
+if __name__ == '__main__':
+    unittest.main()